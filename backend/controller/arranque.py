@@ -0,0 +1,127 @@
+"""
+Preparación de la BD al arrancar: migraciones, particiones, índices de rankings y scheduler.
+
+Se hace en un hilo aparte para que el proceso atienda peticiones (y /health/live) desde el
+primer momento aunque la BD tarde en responder o no esté. Cada paso se reintenta con espera
+exponencial (1 s, 2 s, 4 s... hasta ARRANQUE_REINTENTO_MAX) y los pasos ya hechos no se
+repiten. Hasta que terminan todos, /health/ready responde 503.
+"""
+import logging
+import threading
+import time
+
+from backend.model.model import Model
+from backend.model.dao.postgresql.migrador import aplicar_migraciones
+from backend.controller.metricas import medir_job
+from backend.controller.planificador import iniciar_planificador
+from backend.controller.config import DB_MIGRAR_AL_ARRANCAR, RANKING_INDICE_MEMORIA, SCHEDULER_ACTIVO, ARRANQUE_REINTENTO_MAX
+
+logger = logging.getLogger(__name__)
+
+
+# --- 1. PASOS ---
+
+def crear_particiones():
+    with Model() as model:
+        model.mantener_particiones()
+
+# Los jobs periódicos están en planificador.py: solo los ejecuta la instancia líder.
+# Esto, en cambio, se hace en cada proceso (cada uno tiene su propio índice en memoria).
+@medir_job
+def cargar_indices_ranking():
+    logger.info("Cargando índices de rankings...")
+    with Model() as model:
+        model.cargar_indices_ranking()
+
+
+def pasos_arranque() -> list[tuple]:
+    """[(nombre, función)] en el orden en que se ejecutan."""
+    pasos = []
+    # Esquema de BD al día antes de usarla (sustituye a init.sql)
+    if DB_MIGRAR_AL_ARRANCAR:
+        pasos.append(("migraciones", aplicar_migraciones))
+    pasos.append(("particiones", crear_particiones))
+    if RANKING_INDICE_MEMORIA:
+        pasos.append(("indices_ranking", cargar_indices_ranking))
+    # Compite por ser el líder del scheduler; solo el líder ejecuta los jobs
+    if SCHEDULER_ACTIVO:
+        pasos.append(("planificador", iniciar_planificador))
+    return pasos
+
+
+# --- 2. EJECUCIÓN EN SEGUNDO PLANO ---
+
+class Arranque:
+    """Ejecuta los pasos en un hilo, reintentando el que falle hasta que salgan todos."""
+
+    def __init__(self, pasos: list[tuple], reintento_max: float = ARRANQUE_REINTENTO_MAX):
+        self.pasos = pasos
+        self.reintento_max = reintento_max
+        self._hechos = 0
+        self._intentos = 0
+        self._ultimo_error = None
+        self._inicio = None
+        self._segundos = None
+        self._parar = threading.Event()
+        self._hilo = None
+
+    @property
+    def listo(self) -> bool:
+        return self._hechos == len(self.pasos)
+
+    def iniciar(self):
+        self._parar.clear()
+        self._inicio = time.monotonic()
+        self._hilo = threading.Thread(target=self._bucle, name="arranque-bd", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Deja de reintentar (el paso en curso, si lo hay, termina antes)."""
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _bucle(self):
+        espera = 1.0
+        while not self.listo and not self._parar.is_set():
+            nombre, paso = self.pasos[self._hechos]
+            self._intentos += 1
+            try:
+                paso()
+            except Exception as e:
+                self._ultimo_error = f"{nombre}: {e}"
+                logger.error(f"Error al preparar la BD ({nombre}), se reintenta en {espera:.0f} s: {e}")
+                self._parar.wait(espera)
+                espera = min(espera * 2, self.reintento_max)
+                continue
+            self._hechos += 1
+            espera = 1.0
+
+        if self.listo:
+            self._ultimo_error = None
+            self._segundos = round(time.monotonic() - self._inicio, 3)
+            logger.info("BD preparada en %.2f s (%s intentos)", self._segundos, self._intentos)
+
+    def estado(self) -> dict:
+        return {
+            "listo": self.listo,
+            "pasosHechos": [nombre for nombre, _ in self.pasos[:self._hechos]],
+            "pasosPendientes": [nombre for nombre, _ in self.pasos[self._hechos:]],
+            "intentos": self._intentos,
+            "ultimoError": self._ultimo_error,
+            "segundos": self._segundos
+        }
+
+
+_arranque: Arranque | None = None
+
+def get_arranque() -> Arranque:
+    global _arranque
+    if _arranque is None:
+        _arranque = Arranque(pasos_arranque())
+    return _arranque
+
+def detener_arranque():
+    if _arranque is not None:
+        _arranque.detener()
@@ -27,6 +27,135 @@ COMUNIDAD_API_BASE_URL = os.getenv(
     "http://localhost:8084"
 )
 
+# CLIENTE HTTP DE LOS MICROSERVICIOS EXTERNOS (Usuarios, Contenido, Comunidad)
+# Conexiones keep-alive por servicio, reintentos con jitter y circuit breaker: tras
+# UPSTREAM_CIRCUITO_FALLOS fallos seguidos se responde 503 sin llamar durante UPSTREAM_CIRCUITO_ESPERA s.
+UPSTREAM_TIMEOUT_CONEXION = float(os.getenv("UPSTREAM_TIMEOUT_CONEXION", "3"))   # Segundos para conectar
+UPSTREAM_TIMEOUT_LECTURA = float(os.getenv("UPSTREAM_TIMEOUT_LECTURA", "10"))    # Segundos esperando la respuesta
+UPSTREAM_REINTENTOS = int(os.getenv("UPSTREAM_REINTENTOS", "2"))                 # Reintentos ante errores de red, 5xx o 429
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.2"))         # Segundos del primer reintento (se duplica)
+UPSTREAM_MAX_CONEXIONES = int(os.getenv("UPSTREAM_MAX_CONEXIONES", "20"))        # Conexiones keep-alive por servicio
+UPSTREAM_CIRCUITO_FALLOS = int(os.getenv("UPSTREAM_CIRCUITO_FALLOS", "5"))       # Fallos seguidos que abren el circuito
+UPSTREAM_CIRCUITO_ESPERA = float(os.getenv("UPSTREAM_CIRCUITO_ESPERA", "30"))    # Segundos abierto antes de probar otra vez
+
+# Segundos que se sirve el listado del MS Comunidad de memoria antes de revalidarlo (ETag / If-Modified-Since)
+COMUNIDADES_CATALOGO_TTL = float(os.getenv("COMUNIDADES_CATALOGO_TTL", "60"))
+
+# POOL DE CONEXIONES A POSTGRESQL
+# Cada petición HTTP toma una sesión de este pool y la devuelve al terminar,
+# así que el número de peticiones concurrentes contra la BD lo marca el pool.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))         # Conexiones que se mantienen abiertas
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))   # Conexiones extra en picos de carga
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800")) # Segundos antes de reciclar una conexión
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))   # Segundos esperando una conexión libre
+DB_TIMEOUT_CONEXION = int(os.getenv("DB_TIMEOUT_CONEXION", "5"))  # Segundos para abrir una conexión nueva con la BD
+# Con varios workers (gunicorn.conf.py) cada proceso tiene su propio pool. DB_MAX_CONEXIONES es el
+# total para todos los workers de la instancia: se reparte entre ellos (0 = sin tope, cada worker
+# abre hasta DB_POOL_SIZE + DB_MAX_OVERFLOW).
+DB_MAX_CONEXIONES = int(os.getenv("DB_MAX_CONEXIONES", "0"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))            # Workers de la instancia (lo fija gunicorn.conf.py)
+
+# RÉPLICAS DE LECTURA
+# URLs de réplicas de PostgreSQL separadas por comas (vacío = todo al primario). Los métodos de
+# solo lectura de los DAOs se reparten entre ellas por turnos; escrituras y transacciones que
+# ya han escrito van al primario. Cada réplica tiene su propio pool (mismo tamaño que el del primario).
+DB_REPLICAS = [url.strip() for url in os.getenv("DB_REPLICAS", "").split(",") if url.strip()]
+DB_REPLICA_EXPULSION = float(os.getenv("DB_REPLICA_EXPULSION", "30"))  # Segundos sin usar una réplica tras un error de conexión
+
+# MODO DE ACCESO A DATOS
+# "sync": Model (psycopg2) ejecutado en el threadpool de Starlette.
+# "async": AsyncModel (asyncpg + httpx) esperado directamente en el event loop.
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+# MIGRACIONES Y PARTICIONES
+# Al arrancar se aplican los scripts pendientes de migraciones/ (sustituye a init.sql).
+DB_MIGRAR_AL_ARRANCAR = os.getenv("DB_MIGRAR_AL_ARRANCAR", "true").lower() == "true"
+MIGRACIONES_DIR = os.getenv(
+    "MIGRACIONES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "migraciones")
+)
+PARTICIONES_MESES_ADELANTE = int(os.getenv("PARTICIONES_MESES_ADELANTE", "2"))  # Meses futuros con partición ya creada
+
+# SINCRONIZACIÓN MASIVA DE CONTENIDOS (job mensual)
+SYNC_CONCURRENCIA = int(os.getenv("SYNC_CONCURRENCIA", "20"))            # Contenidos procesados a la vez
+SYNC_MAX_CONEXIONES_HOST = int(os.getenv("SYNC_MAX_CONEXIONES_HOST", "20"))  # Conexiones keep-alive al MS Contenido
+SYNC_REINTENTOS = int(os.getenv("SYNC_REINTENTOS", "3"))                 # Reintentos ante errores de red o 5xx
+SYNC_BACKOFF_BASE = float(os.getenv("SYNC_BACKOFF_BASE", "0.5"))         # Segundos del primer reintento (se duplica)
+SYNC_TAMANO_LOTE = int(os.getenv("SYNC_TAMANO_LOTE", "500"))             # Contenidos por escritura en BD
+
+# SINCRONIZACIÓN DELTA (artistas y contenidos)
+# Se guarda una huella (hash) de cada fila sincronizada y solo se escriben las que cambian.
+# Con SYNC_DELTA=false la sync masiva reescribe todas las filas (y renueva las huellas).
+SYNC_DELTA = os.getenv("SYNC_DELTA", "true").lower() == "true"
+SYNC_DELTA_INTERVALO_HORAS = int(os.getenv("SYNC_DELTA_INTERVALO_HORAS", "0"))  # Sync delta periódica extra (0 = solo la mensual)
+
+# SCHEDULER (jobs mensuales, particiones y sync delta)
+# Con varias instancias solo ejecuta los jobs la que tiene el advisory lock del scheduler (el líder).
+# Con SCHEDULER_ACTIVO=false la API no compite por él: los jobs los ejecuta el worker
+# `python -m backend.controller.planificador` (u otra instancia).
+SCHEDULER_ACTIVO = os.getenv("SCHEDULER_ACTIVO", "true").lower() == "true"
+SCHEDULER_LIDER_INTERVALO = float(os.getenv("SCHEDULER_LIDER_INTERVALO", "15"))  # Segundos entre intentos de ser líder (y comprobaciones del líder)
+SCHEDULER_RECUPERAR_HORAS = float(os.getenv("SCHEDULER_RECUPERAR_HORAS", "72"))  # Retraso máximo con el que se recupera una ejecución perdida
+
+# ARRANQUE Y SONDAS DE SALUD (/health/live, /health/ready)
+# La API atiende peticiones en cuanto arranca; migraciones, particiones, índices de rankings y
+# scheduler se preparan en segundo plano, reintentando mientras la BD no responda.
+ARRANQUE_REINTENTO_MAX = float(os.getenv("ARRANQUE_REINTENTO_MAX", "30"))  # Espera máxima entre reintentos (empieza en 1 s y se duplica)
+SALUD_CACHE_SEGUNDOS = float(os.getenv("SALUD_CACHE_SEGUNDOS", "5"))      # Segundos que se reutiliza cada comprobación de /health/ready
+SALUD_TIMEOUT = float(os.getenv("SALUD_TIMEOUT", "2"))                    # Segundos máximos de cada comprobación
+# Si es true, /health/ready responde 503 cuando no se alcanza algún microservicio (si no, solo "degradado")
+SALUD_READY_UPSTREAMS = os.getenv("SALUD_READY_UPSTREAMS", "false").lower() == "true"
+
+# BUFFER DE REPRODUCCIONES (PUT /reproducciones/registrar)
+# Las reproducciones se acumulan y se escriben con COPY cuando se llena el lote o pasa el intervalo.
+# "flush": se responde cuando el lote está en BD. "spool": se responde cuando está en el fichero
+# local (append + fsync) y se escribe en BD después; al arrancar se reenvía lo que quedara.
+REPRODUCCIONES_DURABILIDAD = os.getenv("REPRODUCCIONES_DURABILIDAD", "flush").lower()
+REPRODUCCIONES_TAMANO_LOTE = int(os.getenv("REPRODUCCIONES_TAMANO_LOTE", "1000"))        # Eventos por COPY
+REPRODUCCIONES_INTERVALO_MS = int(os.getenv("REPRODUCCIONES_INTERVALO_MS", "200"))       # Espera máxima antes de escribir
+REPRODUCCIONES_MAX_PENDIENTES = int(os.getenv("REPRODUCCIONES_MAX_PENDIENTES", "50000")) # Eventos en memoria antes de rechazar
+# Cada proceso (worker) escribe en su propia subcarpeta, bloqueada con flock; al arrancar solo se
+# reenvían las de procesos que ya no existen. Tiene que ser un disco local (flock no es fiable en NFS).
+REPRODUCCIONES_SPOOL_DIR = os.getenv("REPRODUCCIONES_SPOOL_DIR", "spool")                # Carpeta del spool (modo spool)
+
+# BUFFER DE BÚSQUEDAS DE ARTISTAS (PUT /artistas/busqueda)
+# Se responde al momento y se escriben por lotes en segundo plano. Si la cola se llena,
+# las búsquedas nuevas se descartan (y se cuentan en GET /buffers).
+BUSQUEDAS_TAMANO_LOTE = int(os.getenv("BUSQUEDAS_TAMANO_LOTE", "500"))             # Búsquedas por INSERT
+BUSQUEDAS_INTERVALO_MS = int(os.getenv("BUSQUEDAS_INTERVALO_MS", "1000"))          # Espera máxima antes de escribir
+BUSQUEDAS_MAX_PENDIENTES = int(os.getenv("BUSQUEDAS_MAX_PENDIENTES", "100000"))    # Búsquedas en memoria antes de descartar
+
+# CACHÉ DE RANKINGS
+# "memoria": LRU con TTL en cada proceso. "redis": compartida entre procesos/instancias.
+# "ninguna": desactivada. Se invalida al guardar cambios en la tabla correspondiente.
+# "memoria" solo vale con un único proceso: una escritura invalida la caché del worker que la
+# hace y los demás seguirían sirviendo lo de antes hasta CACHE_TTL. Con WEB_WORKERS > 1 el valor
+# por defecto es "ninguna", y gunicorn.conf.py no arranca si se pide "memoria" explícitamente.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria" if WEB_WORKERS <= 1 else "ninguna").lower()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))                     # Segundos que dura una entrada
+CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", "1000"))  # Entradas en memoria (LRU)
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# ÍNDICE DE RANKINGS EN MEMORIA
+# Copia ordenada de las tablas mensuales (artistas, contenidos, comunidades) que se carga al
+# arrancar y se actualiza con cada escritura confirmada: los tops no consultan la BD.
+# Las escrituras de otros procesos se detectan con la versión de cada tabla en la BD
+# (versionesrankings, migración 007), que se comprueba como mucho cada
+# RANKING_INDICE_COMPROBACION_SEGUNDOS: es el retraso máximo con el que un worker ve lo que escribe otro.
+RANKING_INDICE_MEMORIA = os.getenv("RANKING_INDICE_MEMORIA", "true").lower() == "true"
+RANKING_INDICE_MAX_LIMIT = int(os.getenv("RANKING_INDICE_MAX_LIMIT", "100"))  # Límites mayores van a la BD
+RANKING_INDICE_COMPROBACION_SEGUNDOS = float(os.getenv("RANKING_INDICE_COMPROBACION_SEGUNDOS", "1"))
+
+# LISTADOS COMPLETOS EN STREAMING (?formato=ndjson)
+STREAM_TAMANO_LOTE = int(os.getenv("STREAM_TAMANO_LOTE", "1000"))  # Filas por viaje al cursor de servidor y por trozo enviado
+
+# LOGS
+# Los mensajes se encolan y los escribe un hilo aparte. "json": una línea JSON por mensaje; "texto": legible.
+LOG_NIVEL = os.getenv("LOG_NIVEL", "INFO").upper()                         # DEBUG, INFO, WARNING, ERROR
+LOG_FORMATO = os.getenv("LOG_FORMATO", "json").lower()
+LOG_MUESTREO_EVENTOS = int(os.getenv("LOG_MUESTREO_EVENTOS", "100"))        # Se escribe 1 de cada N eventos frecuentes (reproducciones...)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"                   # Registrar cada sentencia SQL (solo para depurar)
+
 def setup_cors(app):
     app.add_middleware(
         CORSMiddleware,
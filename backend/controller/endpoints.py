@@ -1,35 +1,159 @@
-from fastapi import APIRouter, HTTPException, Request
+import logging
+import inspect
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from backend.model.model import Model
+from backend.model.buffers.bufferEscritura import BufferLleno, BufferNoVaciado
+from backend.model.buffers.bufferReproducciones import ResultadoIncierto
+from backend.controller.respuestaJson import RespuestaJSON, a_json
+from backend.controller.planificador import estado_planificador
+from backend.controller.config import DB_MODE, STREAM_TAMANO_LOTE
+
+logger = logging.getLogger(__name__)
+
+if DB_MODE == "async":
+    # Solo se importa en modo async (requiere asyncpg y httpx)
+    from backend.model.asyncModel import AsyncModel
 
 router = APIRouter(prefix="/estadisticas", tags=["Estadísticas"])
-model = Model()
 limiteSuperado = "'limit' no puede ser mayor que 100."
 errorServidor = "Error interno del servidor."
 
+def get_model_sync():
+    """
+    Dependencia de FastAPI (unidad de trabajo por petición).
+    Toma una sesión del pool, construye los DAOs ligados a ella
+    y la devuelve al pool cuando termina la petición.
+    """
+    model = Model()
+    try:
+        yield model
+    finally:
+        model.close()
+
+async def get_model_async():
+    """Igual que get_model_sync, pero con AsyncModel (asyncpg) para DB_MODE=async."""
+    model = AsyncModel()
+    try:
+        yield model
+    finally:
+        await model.close()
+
+# El modo se elige por configuración para poder comparar ambos caminos
+get_model = get_model_async if DB_MODE == "async" else get_model_sync
+
+async def llamar_modelo(metodo, *args, **kwargs):
+    """
+    Ejecuta un método del modelo sin bloquear el event loop:
+    - AsyncModel: el método es una corrutina y se espera directamente.
+    - Model: el método es bloqueante y se ejecuta en el threadpool.
+    """
+    if inspect.iscoroutinefunction(metodo):
+        return await metodo(*args, **kwargs)
+    return await run_in_threadpool(metodo, *args, **kwargs)
+
+# ========================= LISTADOS COMPLETOS =========================
+
+def validar_listado(limit: int | None, formato: str):
+    """Parámetros comunes de los listados: paginación por id (`limit`, `despues_de`) o streaming."""
+    if formato not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="'formato' debe ser 'json' o 'ndjson'.")
+    if limit is not None and limit <= 0:
+        raise HTTPException(status_code=400, detail="'limit' debe ser un entero positivo.")
+    if limit is not None and limit > 100:
+        raise HTTPException(status_code=400, detail=limiteSuperado)
+
+def respuesta_pagina(datos: list, limite: int, clave_id: str) -> RespuestaJSON:
+    """Página por clave: `siguiente` es el `despues_de` de la próxima página (None si no hay más)."""
+    siguiente = getattr(datos[-1], clave_id) if len(datos) == limite else None
+    return RespuestaJSON({
+        "status": "success",
+        "count": len(datos),
+        "data": datos,
+        "siguiente": siguiente
+    })
+
+def respuesta_ndjson(metodo: str) -> StreamingResponse:
+    """
+    Devuelve la tabla completa en NDJSON (un objeto por línea) leyendo de un cursor de servidor.
+    El generador abre su propio modelo: no depende de la sesión de la petición, que se puede
+    liberar antes de que termine de enviarse la respuesta.
+    """
+    def lineas(filas):
+        return b"".join(a_json(fila) + b"\n" for fila in filas)
+
+    if DB_MODE == "async":
+        async def trozos():
+            model = AsyncModel()
+            try:
+                lote = []
+                async for fila in getattr(model, metodo)(STREAM_TAMANO_LOTE):
+                    lote.append(fila)
+                    if len(lote) >= STREAM_TAMANO_LOTE:
+                        yield lineas(lote)
+                        lote = []
+                if lote:
+                    yield lineas(lote)
+            except Exception as e:
+                # Las cabeceras ya se han enviado: solo queda cortar la respuesta
+                logger.error(f"Error en streaming de {metodo}: {e}")
+                raise
+            finally:
+                await model.close()
+    else:
+        def trozos():
+            with Model() as model:
+                try:
+                    lote = []
+                    for fila in getattr(model, metodo)(STREAM_TAMANO_LOTE):
+                        lote.append(fila)
+                        if len(lote) >= STREAM_TAMANO_LOTE:
+                            yield lineas(lote)
+                            lote = []
+                    if lote:
+                        yield lineas(lote)
+                except Exception as e:
+                    logger.error(f"Error en streaming de {metodo}: {e}")
+                    raise
+
+    return StreamingResponse(trozos(), media_type="application/x-ndjson")
+
 # ========================= ARTISTAS =========================
 
 @router.get("/artistas/oyentes")
-async def get_todos_oyentes_artistas(request: Request):
+async def get_todos_oyentes_artistas(request: Request, limit: int | None = None, despues_de: int | None = None,
+                                     formato: str = "json", model=Depends(get_model)):
     """
     Obtiene los oyentes y valoración de TODOS los artistas.
+    - `limit` / `despues_de`: paginación por id (la respuesta trae `siguiente` para pedir la próxima página).
+    - `formato=ndjson`: todos los artistas en streaming, un JSON por línea.
     """
     try:
+        validar_listado(limit, formato)
+        if formato == "ndjson":
+            return respuesta_ndjson("iterar_todos_los_artistas")
+        if limit is not None or despues_de is not None:
+            limite = limit or 100
+            data = await llamar_modelo(model.get_pagina_artistas, despues_de, limite)
+            return respuesta_pagina(data, limite, "idArtista")
+
         # Llamada al modelo
-        data = model.get_todos_los_artistas()
+        data = await llamar_modelo(model.get_todos_los_artistas)
 
         # Opcional: Si quieres devolver 404 si la lista está vacía
         # if not data:
         #    raise HTTPException(status_code=404, detail="No se encontraron artistas.")
 
-        return {
+        return RespuestaJSON({
             "status": "success",
             "count": len(data),
             "data": data
-        }
+        })
 
     except Exception as e:
         # Log del error para depuración
-        print(f"❌ Error en get_todos_oyentes_artistas: {e}")
+        logger.error(f"Error en get_todos_oyentes_artistas: {e}")
         
         # Si ya es una excepción HTTP, la relanzamos
         if isinstance(e, HTTPException):
@@ -41,7 +165,7 @@ async def get_todos_oyentes_artistas(request: Request):
         )
     
 @router.get("/artistas/oyentes/{id_artista}")
-async def get_oyentes_artista(id_artista: int, request: Request):
+async def get_oyentes_artista(id_artista: int, request: Request, model=Depends(get_model)):
     """
     Obtiene los oyentes de un artista.
     Maneja errores comunes:
@@ -59,7 +183,7 @@ async def get_oyentes_artista(id_artista: int, request: Request):
             )
 
         # Llamada al modelo
-        data = model.get_artista_oyentes(id_artista)
+        data = await llamar_modelo(model.get_artista_oyentes, id_artista)
 
         # 404 - No existe ese artista
         if not data:
@@ -80,7 +204,7 @@ async def get_oyentes_artista(id_artista: int, request: Request):
     # Error de base de datos (SQLAlchemy)
     except Exception as e:
         # Log del error para depuración
-        print(f"❌ Error en get_oyentes_artista: {e}")
+        logger.error(f"Error en get_oyentes_artista: {e}")
 
         raise HTTPException(
             status_code=500,
@@ -89,7 +213,7 @@ async def get_oyentes_artista(id_artista: int, request: Request):
 
 
 @router.put("/artistas/oyentes")
-async def sync_oyentes_artista(request: Request):
+async def sync_oyentes_artista(request: Request, model=Depends(get_model)):
     """
     Sincroniza los oyentes de un artista.
     Manejo de errores:
@@ -124,7 +248,7 @@ async def sync_oyentes_artista(request: Request):
             )
 
         # Llamada al modelo
-        data = model.sync_artista_oyentes(id_artista)
+        data = await llamar_modelo(model.sync_artista_oyentes, id_artista)
 
         # Si devuelve None → artista no existe
         if data is None:
@@ -139,14 +263,14 @@ async def sync_oyentes_artista(request: Request):
         raise
 
     except Exception as e:
-        print(f"❌ Error interno en sync_oyentes_artista: {e}")
+        logger.error(f"Error interno en sync_oyentes_artista: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Error interno al sincronizar oyentes: {str(e)}"
         )
 
 @router.delete("/artistas/{id_artista}")
-async def delete_artista_stats(id_artista: int, request: Request):
+async def delete_artista_stats(id_artista: int, request: Request, model=Depends(get_model)):
     """
     Elimina las estadísticas de un artista.
     Maneja errores comunes:
@@ -163,7 +287,7 @@ async def delete_artista_stats(id_artista: int, request: Request):
             )
 
         # Llamada al modelo
-        data = model.delete_artista_estadisticas(id_artista)
+        data = await llamar_modelo(model.delete_artista_estadisticas, id_artista)
 
         # 404 - No se encontró registro para borrar
         if not data:
@@ -183,14 +307,14 @@ async def delete_artista_stats(id_artista: int, request: Request):
 
     # 500 - Error interno (Base de datos, etc.)
     except Exception as e:
-        print(f"❌ Error en delete_artista_stats: {e}")
+        logger.error(f"Error en delete_artista_stats: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Error interno al eliminar el artista: {str(e)}"
         )
 
 @router.get("/artistas/ranking/oyentes")
-async def ranking_oyentes(request: Request):
+async def ranking_oyentes(request: Request, model=Depends(get_model)):
     """
     Devuelve el ranking de artistas por oyentes mensuales.
     Manejo de errores:
@@ -198,7 +322,7 @@ async def ranking_oyentes(request: Request):
     - 500: Error interno del servidor
     """
     try:
-        ranking = model.get_ranking_artistas_oyentes()
+        ranking = await llamar_modelo(model.get_ranking_artistas_oyentes)
 
         if ranking is None or len(ranking) == 0:
             raise HTTPException(
@@ -206,13 +330,13 @@ async def ranking_oyentes(request: Request):
                 detail="No hay datos de ranking disponibles."
             )
 
-        return ranking
+        return RespuestaJSON(ranking)
 
     except HTTPException:
         raise
 
     except Exception as e:
-        print(f"❌ Error interno en ranking_oyentes: {e}")
+        logger.error(f"Error interno en ranking_oyentes: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Error interno al obtener ranking: {str(e)}"
@@ -220,7 +344,7 @@ async def ranking_oyentes(request: Request):
 
 
 @router.put("/artistas/busqueda")
-async def registrar_busqueda_artista(request: Request):
+async def registrar_busqueda_artista(request: Request, model=Depends(get_model)):
     """
     Registra una búsqueda de un artista cada vez que un usuario busque o haga clic en el perfil de un artista.
     Manejo de errores:
@@ -263,7 +387,7 @@ async def registrar_busqueda_artista(request: Request):
                 )
 
         # Registrar/actualizar la búsqueda
-        model.registrar_o_actualizar_busqueda_artista(id_artista, id_usuario)
+        await llamar_modelo(model.registrar_o_actualizar_busqueda_artista, id_artista, id_usuario)
 
         return {"msg": "Búsqueda registrada correctamente."}
 
@@ -272,20 +396,89 @@ async def registrar_busqueda_artista(request: Request):
         raise
 
     except Exception as e:
-        print(f"❌ Error interno en registrar_busqueda_artista: {e}")
+        logger.error(f"Error interno en registrar_busqueda_artista: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Error interno al registrar la búsqueda."
         )
     
+# ==========================================
+# PUT BÚSQUEDAS EN LOTE
+# ==========================================
+@router.put("/artistas/busqueda/lote")
+async def registrar_busquedas_artistas_lote(request: Request, model=Depends(get_model)):
+    """
+    Registra varias búsquedas de artistas en una sola petición.
+    Body: lista de objetos {idArtista, idUsuario (opcional)}.
+    Las búsquedas se escriben en segundo plano; si el buffer está lleno se descartan
+    y 'count' indica cuántas se aceptaron.
+    Manejo de errores:
+    - 400: Lista vacía o algún elemento inválido
+    - 422: Cuerpo no es JSON válido
+    - 500: Error interno
+    """
+    try:
+        try:
+            body = await request.json()
+        except Exception:
+            raise HTTPException(
+                status_code=422,
+                detail="El cuerpo de la solicitud no es un JSON válido."
+            )
+
+        if not isinstance(body, list) or len(body) == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Se espera una lista no vacía de búsquedas."
+            )
+
+        # Mismas validaciones que /artistas/busqueda, indicando la posición
+        busquedas = []
+        for i, item in enumerate(body):
+            if not isinstance(item, dict):
+                raise HTTPException(status_code=400, detail=f"Búsqueda {i}: se espera un objeto.")
+
+            id_artista = item.get("idArtista")
+            id_usuario = item.get("idUsuario")  # opcional
+
+            if not isinstance(id_artista, int) or id_artista <= 0:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Búsqueda {i}: 'idArtista' debe ser un entero positivo."
+                )
+
+            if id_usuario is not None and (not isinstance(id_usuario, int) or id_usuario <= 0):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Búsqueda {i}: 'idUsuario', si se proporciona, debe ser un entero positivo."
+                )
+
+            busquedas.append((id_artista, id_usuario))
+
+        aceptadas = await llamar_modelo(model.registrar_busquedas_lote, busquedas)
+
+        return {"msg": "Búsquedas registradas correctamente.", "count": aceptadas}
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.error(f"Error interno en registrar_busquedas_artistas_lote: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno al registrar las búsquedas."
+        )
+
 # ==========================================
 # DELETE BÚSQUEDAS POR ARTISTA
 # ==========================================
 @router.delete("/artistas/busqueda/artista/{id_artista}")
-async def delete_busquedas_por_artista(id_artista: int, request: Request):
+async def delete_busquedas_por_artista(id_artista: int, request: Request, model=Depends(get_model)):
     """
     Elimina el historial de búsquedas asociado a un artista.
     Útil cuando se elimina un artista del sistema.
+    Antes se escriben las búsquedas que sigan en el buffer; si no se puede, no se
+    borra nada y se responde 503.
     """
     try:
         # Validación manual
@@ -293,7 +486,7 @@ async def delete_busquedas_por_artista(id_artista: int, request: Request):
             raise HTTPException(status_code=400, detail="El ID del artista debe ser positivo.")
 
         # Llamada al modelo
-        resultado = model.delete_busquedas_artista(id_artista)
+        resultado = await llamar_modelo(model.delete_busquedas_artista, id_artista)
 
         # Nota: No devolvemos 404 si borra 0 filas, porque el objetivo es "limpiar".
         # Si ya estaba limpio, misión cumplida (200 OK).
@@ -301,8 +494,10 @@ async def delete_busquedas_por_artista(id_artista: int, request: Request):
 
     except HTTPException:
         raise
+    except BufferNoVaciado:
+        raise HTTPException(status_code=503, detail="No se ha borrado nada: hay búsquedas pendientes que no se han podido guardar, inténtalo más tarde.")
     except Exception as e:
-        print(f"❌ Error eliminando búsquedas de artista: {e}")
+        logger.error(f"Error eliminando búsquedas de artista: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 
@@ -310,10 +505,12 @@ async def delete_busquedas_por_artista(id_artista: int, request: Request):
 # DELETE BÚSQUEDAS POR USUARIO
 # ==========================================
 @router.delete("/artistas/busqueda/usuario/{id_usuario}")
-async def delete_busquedas_por_usuario(id_usuario: int, request: Request):
+async def delete_busquedas_por_usuario(id_usuario: int, request: Request, model=Depends(get_model)):
     """
     Elimina el historial de búsquedas realizado por un usuario.
     Útil cuando se elimina un usuario del sistema (GDPR/Limpieza).
+    Antes se escriben las búsquedas que sigan en el buffer; si no se puede, no se
+    borra nada y se responde 503.
     """
     try:
         # Validación manual
@@ -321,18 +518,20 @@ async def delete_busquedas_por_usuario(id_usuario: int, request: Request):
             raise HTTPException(status_code=400, detail="El ID del usuario debe ser positivo.")
 
         # Llamada al modelo
-        resultado = model.delete_busquedas_usuario(id_usuario)
+        resultado = await llamar_modelo(model.delete_busquedas_usuario, id_usuario)
 
         return resultado
 
     except HTTPException:
         raise
+    except BufferNoVaciado:
+        raise HTTPException(status_code=503, detail="No se ha borrado nada: hay búsquedas pendientes que no se han podido guardar, inténtalo más tarde.")
     except Exception as e:
-        print(f"❌ Error eliminando búsquedas de usuario: {e}")
+        logger.error(f"Error eliminando búsquedas de usuario: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 @router.get("/artistas/top")
-async def get_top_artistas(request: Request, limit: int = 10):
+async def get_top_artistas(request: Request, limit: int = 10, model=Depends(get_model)):
     """
     Devuelve el top de artistas más buscados del mes.
     Manejo de errores:
@@ -355,7 +554,7 @@ async def get_top_artistas(request: Request, limit: int = 10):
                 detail=limiteSuperado
             )
 
-        top = model.get_top_artistas_busquedas(limit=limit)
+        top = await llamar_modelo(model.get_top_artistas_busquedas, limit=limit)
 
         if not top or len(top) == 0:
             raise HTTPException(
@@ -363,61 +562,72 @@ async def get_top_artistas(request: Request, limit: int = 10):
                 detail="No hay datos de artistas más buscados para este periodo."
             )
 
-        return top
+        return RespuestaJSON(top)
 
     except HTTPException:
         raise
 
     except Exception as e:
-        print(f"❌ Error interno en get_top_artistas: {e}")
+        logger.error(f"Error interno en get_top_artistas: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Error interno al obtener el top de artistas."
         )
 
 @router.get("/contenido")
-async def get_todos_los_contenidos(request: Request):
+async def get_todos_los_contenidos(request: Request, limit: int | None = None, despues_de: int | None = None,
+                                   formato: str = "json", model=Depends(get_model)):
     """
     Obtiene todos los contenidos con sus estadísticas.
+    - `limit` / `despues_de`: paginación por id (la respuesta trae `siguiente` para pedir la próxima página).
+    - `formato=ndjson`: todos los contenidos en streaming, un JSON por línea.
 
     Posibles errores:
     - 404: No se encontraron contenidos
     - 500: Error interno del servidor o de la base de datos
     """
     try:
+        validar_listado(limit, formato)
+        if formato == "ndjson":
+            return respuesta_ndjson("iterar_todos_los_contenidos")
+        if limit is not None or despues_de is not None:
+            limite = limit or 100
+            contenidos = await llamar_modelo(model.get_pagina_contenidos, despues_de, limite)
+            return respuesta_pagina(contenidos, limite, "idContenido")
+
         # Llamada al modelo
-        contenidos = model.get_todos_los_contenidos()
+        contenidos = await llamar_modelo(model.get_todos_los_contenidos)
 
         # Si el modelo devuelve None o una lista vacía
         if contenidos is None:
-            print("⚠️ El modelo devolvió None en get_todos_los_contenidos()")
+            logger.warning("El modelo devolvió None en get_todos_los_contenidos()")
             raise HTTPException(
                 status_code=500,
                 detail="El servicio no devolvió datos válidos."
             )
 
         if isinstance(contenidos, list) and len(contenidos) == 0:
-            print("ℹ️ No hay contenidos registrados en la base de datos.")
+            logger.info("No hay contenidos registrados en la base de datos.")
             raise HTTPException(
                 status_code=404,
                 detail="No se encontraron contenidos."
             )
 
         # Todo OK
-        return {
+        return RespuestaJSON({
             "status": "success",
             "count": len(contenidos) if isinstance(contenidos, list) else None,
             "data": contenidos
-        }
+        })
 
     except HTTPException as http_error:
         # Errores lanzados manualmente
-        print(f"⚠️ Error controlado: {http_error.detail}")
+        logger.warning(f"Error controlado: {http_error.detail}")
         raise http_error
 
     except ConnectionError as ce:
         # Error típico de DB o API externa
-        print(f"❌ Error de conexión con la base de datos: {ce}")
+        logger.error(f"Error de conexión con la base de datos: {ce}")
         raise HTTPException(
             status_code=500,
             detail="Error de conexión con la base de datos."
@@ -425,14 +635,14 @@ async def get_todos_los_contenidos(request: Request):
 
     except Exception as e:
         # Error inesperado
-        print(f"❌ Error interno no controlado en get_todos_los_contenidos: {e}")
+        logger.error(f"Error interno no controlado en get_todos_los_contenidos: {e}")
         raise HTTPException(
             status_code=500,
             detail="Error interno al obtener los contenidos."
         )
 
 @router.put("/contenido")
-async def sincronizar_contenido(request: Request):
+async def sincronizar_contenido(request: Request, model=Depends(get_model)):
     """
     Sincroniza un contenido específico trayendo datos frescos de las APIs externas.
     Body: { "idContenido": 123 }
@@ -445,7 +655,7 @@ async def sincronizar_contenido(request: Request):
             raise HTTPException(status_code=400, detail="JSON inválido: Falta 'idContenido' (int).")
 
         # Llamada al modelo
-        resultado = model.sincronizar_desde_api_externa(id_contenido)
+        resultado = await llamar_modelo(model.sincronizar_desde_api_externa, id_contenido)
 
         return {
             "status": "success",
@@ -454,17 +664,17 @@ async def sincronizar_contenido(request: Request):
         }
     
     except Exception as e:
-        print(f"❌ Error interno: {e}")
+        logger.error(f"Error interno: {e}")
         raise HTTPException(status_code=500, detail=errorServidor)
     
 @router.get("/contenido/{id_contenido}")
-async def get_estadisticas_contenido(id_contenido: int, request: Request):
+async def get_estadisticas_contenido(id_contenido: int, request: Request, model=Depends(get_model)):
     """ Obtiene las estadísticas (ventas, comentarios, etc.) """
     try:
         if id_contenido <= 0:
             raise HTTPException(status_code=400, detail="El ID debe ser positivo.")
 
-        data = model.get_contenido_detalle(id_contenido)
+        data = await llamar_modelo(model.get_contenido_detalle, id_contenido)
 
         if not data:
             raise HTTPException(status_code=404, detail=f"No existen estadísticas para ID {id_contenido}.")
@@ -474,18 +684,18 @@ async def get_estadisticas_contenido(id_contenido: int, request: Request):
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"❌ Error GET contenido: {e}")
+        logger.error(f"Error GET contenido: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 
 @router.delete("/contenido/{id_contenido}")
-async def delete_estadisticas_contenido(id_contenido: int, request: Request):
+async def delete_estadisticas_contenido(id_contenido: int, request: Request, model=Depends(get_model)):
     """ Elimina el registro de estadísticas """
     try:
         if id_contenido <= 0:
             raise HTTPException(status_code=400, detail="El ID debe ser positivo.")
 
-        resultado = model.delete_contenido(id_contenido)
+        resultado = await llamar_modelo(model.delete_contenido, id_contenido)
 
         if not resultado:
             raise HTTPException(status_code=404, detail=f"No encontrado ID {id_contenido}.")
@@ -495,14 +705,14 @@ async def delete_estadisticas_contenido(id_contenido: int, request: Request):
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"❌ Error DELETE contenido: {e}")
+        logger.error(f"Error DELETE contenido: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
     
 # ==========================================
 # 1. TOP VALORACIÓN
 # ==========================================
 @router.get("/contenidos/valoracion/top")
-async def get_top_valoracion(request: Request, limit: int = 10):
+async def get_top_valoracion(request: Request, limit: int = 10, model=Depends(get_model)):
     """
     Devuelve el top de contenidos mejor valorados.
     """
@@ -521,7 +731,7 @@ async def get_top_valoracion(request: Request, limit: int = 10):
             )
 
         # Llamada al modelo
-        top = model.get_top_contenidos_valoracion(limit=limit)
+        top = await llamar_modelo(model.get_top_contenidos_valoracion, limit=limit)
 
         # 404 - Si la lista está vacía
         if not top or len(top) == 0:
@@ -530,12 +740,12 @@ async def get_top_valoracion(request: Request, limit: int = 10):
                 detail="No hay datos de valoración para este periodo."
             )
 
-        return top
+        return RespuestaJSON(top)
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error interno en get_top_valoracion: {e}")
+        logger.error(f"Error interno en get_top_valoracion: {e}")
         raise HTTPException(
             status_code=500, 
             detail="Error interno al obtener el top de valoraciones."
@@ -546,7 +756,7 @@ async def get_top_valoracion(request: Request, limit: int = 10):
 # 2. TOP COMENTARIOS
 # ==========================================
 @router.get("/contenidos/comentarios/top")
-async def get_top_comentarios(request: Request, limit: int = 10):
+async def get_top_comentarios(request: Request, limit: int = 10, model=Depends(get_model)):
     """
     Devuelve el top de contenidos con más comentarios.
     """
@@ -556,7 +766,7 @@ async def get_top_comentarios(request: Request, limit: int = 10):
         if limit > 100:
             raise HTTPException(status_code=400, detail=limiteSuperado)
 
-        top = model.get_top_contenidos_comentarios(limit=limit)
+        top = await llamar_modelo(model.get_top_contenidos_comentarios, limit=limit)
 
         if not top or len(top) == 0:
             raise HTTPException(
@@ -564,12 +774,12 @@ async def get_top_comentarios(request: Request, limit: int = 10):
                 detail="No hay datos de comentarios para este periodo."
             )
 
-        return top
+        return RespuestaJSON(top)
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error interno en get_top_comentarios: {e}")
+        logger.error(f"Error interno en get_top_comentarios: {e}")
         raise HTTPException(
             status_code=500, 
             detail="Error interno al obtener el top de comentarios."
@@ -580,7 +790,7 @@ async def get_top_comentarios(request: Request, limit: int = 10):
 # 3. TOP VENTAS
 # ==========================================
 @router.get("/contenidos/ventas/top")
-async def get_top_ventas(request: Request, limit: int = 10):
+async def get_top_ventas(request: Request, limit: int = 10, model=Depends(get_model)):
     """
     Devuelve el top de contenidos más vendidos.
     """
@@ -590,7 +800,7 @@ async def get_top_ventas(request: Request, limit: int = 10):
         if limit > 100:
             raise HTTPException(status_code=400, detail=limiteSuperado)
 
-        top = model.get_top_contenidos_ventas(limit=limit)
+        top = await llamar_modelo(model.get_top_contenidos_ventas, limit=limit)
 
         if not top or len(top) == 0:
             raise HTTPException(
@@ -598,19 +808,19 @@ async def get_top_ventas(request: Request, limit: int = 10):
                 detail="No hay datos de ventas para este periodo."
             )
 
-        return top
+        return RespuestaJSON(top)
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error interno en get_top_ventas: {e}")
+        logger.error(f"Error interno en get_top_ventas: {e}")
         raise HTTPException(
             status_code=500, 
             detail="Error interno al obtener el top de ventas."
         )
         
 @router.get("/contenidos/genero/top")
-async def get_top_generos(request: Request, limit: int = 5):
+async def get_top_generos(request: Request, limit: int = 5, model=Depends(get_model)):
     """
     Devuelve los géneros musicales con más ventas acumuladas.
     Ejemplo: Rock (1500 ventas), Pop (1200 ventas).
@@ -619,7 +829,7 @@ async def get_top_generos(request: Request, limit: int = 5):
         if limit <= 0 or limit > 100:
             limit = 5  # Valor por defecto seguro
             
-        ranking = model.get_top_generos(limit=limit)
+        ranking = await llamar_modelo(model.get_top_generos, limit=limit)
 
         if not ranking:
             # Opción A: Devolver 404
@@ -627,7 +837,7 @@ async def get_top_generos(request: Request, limit: int = 5):
             # Opción B: Devolver lista vacía (a veces es mejor para frontend)
             return []
 
-        return ranking
+        return RespuestaJSON(ranking)
 
     except HTTPException:
         raise
@@ -639,7 +849,7 @@ async def get_top_generos(request: Request, limit: int = 5):
 # ==========================================
 
 @router.put("/comunidad")
-async def sincronizar_comunidad(request: Request):
+async def sincronizar_comunidad(request: Request, model=Depends(get_model)):
     """
     Sincroniza una comunidad específica trayendo datos frescos de la API externa.
     Body: { "idComunidad": "1" }
@@ -652,8 +862,8 @@ async def sincronizar_comunidad(request: Request):
         if not id_comunidad:
             raise HTTPException(status_code=400, detail="JSON inválido: Falta 'idComunidad'.")
 
-        # Llamada al modelo (instancia global definida arriba)
-        resultado = model.sincronizar_comunidad_desde_api(id_comunidad)
+        # Llamada al modelo (sesión propia de esta petición)
+        resultado = await llamar_modelo(model.sincronizar_comunidad_desde_api, id_comunidad)
 
         return {
             "status": "success",
@@ -662,34 +872,47 @@ async def sincronizar_comunidad(request: Request):
         }
     
     except Exception as e:
-        print(f"❌ Error interno comunidad: {e}")
+        logger.error(f"Error interno comunidad: {e}")
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(status_code=500, detail=f"{errorServidor}: {str(e)}")
     
 @router.get("/comunidad")
-async def obtener_todas_las_comunidades():
+async def obtener_todas_las_comunidades(limit: int | None = None, despues_de: int | None = None,
+                                        formato: str = "json", model=Depends(get_model)):
     """
     Obtiene todas las estadísticas de comunidades almacenadas en BD local.
     Ruta final: GET /estadisticas/comunidad
+    - `limit` / `despues_de`: paginación por id (la respuesta trae `siguiente` para pedir la próxima página).
+    - `formato=ndjson`: todas las comunidades en streaming, un JSON por línea.
     """
     try:
-        datos = model.obtener_todas_las_comunidades()
-        return {
+        validar_listado(limit, formato)
+        if formato == "ndjson":
+            return respuesta_ndjson("iterar_todas_las_comunidades")
+        if limit is not None or despues_de is not None:
+            limite = limit or 100
+            datos = await llamar_modelo(model.obtener_pagina_comunidades, despues_de, limite)
+            return respuesta_pagina(datos, limite, "idComunidad")
+
+        datos = await llamar_modelo(model.obtener_todas_las_comunidades)
+        return RespuestaJSON({
             "status": "success",
             "data": datos
-        }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener datos: {str(e)}")
 
 @router.delete("/comunidad/{id_comunidad}")
-async def eliminar_comunidad(id_comunidad: str):
+async def eliminar_comunidad(id_comunidad: str, model=Depends(get_model)):
     """
     Elimina una comunidad de la tabla de estadísticas.
     Ruta final: DELETE /estadisticas/comunidad/{id}
     """
     try:
-        exito = model.eliminar_comunidad(id_comunidad)
+        exito = await llamar_modelo(model.eliminar_comunidad, id_comunidad)
         
         if not exito:
             raise HTTPException(status_code=404, detail=f"Comunidad {id_comunidad} no encontrada.")
@@ -703,45 +926,45 @@ async def eliminar_comunidad(id_comunidad: str):
         raise HTTPException(status_code=500, detail=f"Error al eliminar: {str(e)}")
     
 @router.get("/comunidad/ranking/miembros")
-async def ranking_miembros():
+async def ranking_miembros(model=Depends(get_model)):
     """
     Obtiene el TOP 10 de comunidades con más miembros (seguidores).
     Ruta: GET /estadisticas/comunidad/ranking/miembros
     """
     try:
-        datos = model.obtener_ranking_comunidades_miembros()
-        return {
+        datos = await llamar_modelo(model.obtener_ranking_comunidades_miembros)
+        return RespuestaJSON({
             "status": "success",
             "message": "Ranking por miembros obtenido",
             "data": datos
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener ranking: {str(e)}")
 
 @router.get("/comunidad/ranking/publicaciones")
-async def ranking_publicaciones():
+async def ranking_publicaciones(model=Depends(get_model)):
     """
     Obtiene el TOP 10 de comunidades con más actividad (publicaciones).
     Ruta: GET /estadisticas/comunidad/ranking/publicaciones
     """
     try:
-        datos = model.obtener_ranking_comunidades_publicaciones()
-        return {
+        datos = await llamar_modelo(model.obtener_ranking_comunidades_publicaciones)
+        return RespuestaJSON({
             "status": "success",
             "message": "Ranking por publicaciones obtenido",
             "data": datos
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener ranking: {str(e)}")
     
 @router.get("/comunidad/{id_comunidad}")
-async def obtener_comunidad_por_id(id_comunidad: str):
+async def obtener_comunidad_por_id(id_comunidad: str, model=Depends(get_model)):
     """
     Obtiene las estadísticas de una comunidad específica por ID.
     Ruta: GET /estadisticas/comunidad/1
     """
     try:
-        resultado = model.obtener_comunidad_por_id(id_comunidad)
+        resultado = await llamar_modelo(model.obtener_comunidad_por_id, id_comunidad)
         
         if not resultado:
              raise HTTPException(status_code=404, detail=f"Comunidad {id_comunidad} no encontrada.")
@@ -759,9 +982,11 @@ async def obtener_comunidad_por_id(id_comunidad: str):
 #  REPRODUCCIONES
 # ==========================================
 @router.put("/reproducciones/registrar")
-async def registrar_reproduccion(request: Request):
+async def registrar_reproduccion(request: Request, model=Depends(get_model)):
     """
     Registra los segundos escuchados de una canción.
+    En modo flush, si se agota la espera a la BD: 503 si no se ha escrito nada (se puede
+    reintentar) o 202 con estado "incierto" si ya se estaba escribiendo (no reintentar).
     """
     try:
         try:
@@ -784,52 +1009,205 @@ async def registrar_reproduccion(request: Request):
             raise HTTPException(status_code=400, detail="'segundos' debe ser un entero positivo.")
 
         # Llamada al modelo
-        model.registrar_reproduccion(id_usuario, id_contenido, segundos)
+        await llamar_modelo(model.registrar_reproduccion, id_usuario, id_contenido, segundos)
 
         return {"msg": "Reproducción registrada correctamente"}
 
     except HTTPException:
         raise
+    except BufferLleno:
+        raise HTTPException(status_code=503, detail="Demasiadas reproducciones pendientes, inténtalo más tarde.")
+    except ResultadoIncierto:
+        # Aceptada, pero sin saber si se ha guardado: no es un error que el cliente deba reintentar
+        return RespuestaJSON({"msg": "Reproducción aceptada; no se ha podido confirmar si se ha guardado", "estado": "incierto"}, status_code=202)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="No se ha guardado ninguna reproducción (tiempo agotado), inténtalo más tarde.")
     except Exception as e:
-        print(f"❌ Error interno en registrar_reproduccion: {e}")
+        logger.error(f"Error interno en registrar_reproduccion: {e}")
+        raise HTTPException(status_code=500, detail=errorServidor)
+
+@router.put("/reproducciones/registrar/lote")
+async def registrar_reproducciones_lote(request: Request, model=Depends(get_model)):
+    """
+    Registra varias reproducciones en una sola petición.
+    Body: lista de objetos {idUsuario, idContenido, segundos}. Se guardan todas o ninguna.
+    Tiempo agotado: igual que /reproducciones/registrar (503 sin escribir nada, 202 "incierto").
+    """
+    try:
+        try:
+            body = await request.json()
+        except Exception:
+            raise HTTPException(status_code=422, detail="JSON inválido")
+
+        if not isinstance(body, list) or len(body) == 0:
+            raise HTTPException(status_code=400, detail="Se espera una lista no vacía de reproducciones.")
+
+        # Validaciones (las mismas que en /reproducciones/registrar, indicando la posición)
+        reproducciones = []
+        for i, item in enumerate(body):
+            if not isinstance(item, dict):
+                raise HTTPException(status_code=400, detail=f"Reproducción {i}: se espera un objeto.")
+
+            id_usuario = item.get("idUsuario")
+            id_contenido = item.get("idContenido")
+            segundos = item.get("segundos")
+
+            if not id_usuario or not isinstance(id_usuario, int):
+                raise HTTPException(status_code=400, detail=f"Reproducción {i}: falta 'idUsuario' válido.")
+
+            if not id_contenido or not isinstance(id_contenido, int):
+                raise HTTPException(status_code=400, detail=f"Reproducción {i}: falta 'idContenido' válido.")
+
+            if segundos is None or not isinstance(segundos, int) or segundos < 0:
+                raise HTTPException(status_code=400, detail=f"Reproducción {i}: 'segundos' debe ser un entero positivo.")
+
+            reproducciones.append((id_usuario, id_contenido, segundos))
+
+        total = await llamar_modelo(model.registrar_reproducciones_lote, reproducciones)
+
+        return {"msg": "Reproducciones registradas correctamente", "count": total}
+
+    except HTTPException:
+        raise
+    except BufferLleno:
+        raise HTTPException(status_code=503, detail="Demasiadas reproducciones pendientes, inténtalo más tarde.")
+    except ResultadoIncierto:
+        # Aceptada, pero sin saber si se ha guardado: no es un error que el cliente deba reintentar
+        return RespuestaJSON({"msg": "Reproducciones aceptadas; no se ha podido confirmar si se han guardado", "estado": "incierto"}, status_code=202)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="No se ha guardado ninguna reproducción (tiempo agotado), inténtalo más tarde.")
+    except Exception as e:
+        logger.error(f"Error interno en registrar_reproducciones_lote: {e}")
         raise HTTPException(status_code=500, detail=errorServidor)
     
 @router.get("/reproducciones/usuario/{id_usuario}")
-async def obtener_historial_reproducciones(id_usuario: int, request: Request):
+async def obtener_historial_reproducciones(id_usuario: int, request: Request, model=Depends(get_model)):
     """
-    Obtiene el historial de reproducciones de un usuario.
+    Obtiene las últimas reproducciones de un usuario. Solo llega a los meses que el rollover
+    aún no ha archivado; de los anteriores queda el resumen en reproduccionesmensual.
     """
     try:
         if id_usuario <= 0:
             raise HTTPException(status_code=400, detail="El ID del usuario debe ser positivo.")
 
-        historial = model.obtener_historial_personal(id_usuario)
+        historial = await llamar_modelo(model.obtener_historial_personal, id_usuario)
 
         if not historial or len(historial) == 0:
             raise HTTPException(status_code=404, detail="No hay reproducciones para este usuario.")
 
-        return {
+        return RespuestaJSON({
             "status": "success",
             "count": len(historial),
             "data": historial
-        }
+        })
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"❌ Error obteniendo historial de reproducciones: {e}")
+        logger.error(f"Error obteniendo historial de reproducciones: {e}")
         raise HTTPException(status_code=500, detail=errorServidor)
     
 @router.get("/reproducciones/top/usuario/{id_usuario}")
-async def get_top_reproducciones_por_usuario(id_usuario: int, limit: int = 5):
+async def get_top_reproducciones_por_usuario(id_usuario: int, limit: int = 5, orden: str = "reproducciones",
+                                            model=Depends(get_model)):
+    """
+    Contenidos más escuchados por el usuario en todo su histórico. `orden`: "reproducciones" (veces) o "segundos"
+    (tiempo total); 'segundosReproducidos' lleva ese total y 'fechaReproduccion' la última escucha.
+    """
     try:
         if id_usuario <= 0:
             raise HTTPException(status_code=400, detail="ID de usuario inválido")
+        if orden not in ("reproducciones", "segundos"):
+            raise HTTPException(status_code=400, detail="'orden' debe ser 'reproducciones' o 'segundos'.")
+
+        return await llamar_modelo(model.obtener_top_canciones_usuario, id_usuario, limit, orden)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error endpoint top usuario: {e}")
+        raise HTTPException(status_code=500, detail=errorServidor)
+
+
+# ==========================================
+#  BUFFERS DE ESCRITURA
+# ==========================================
+@router.get("/buffers")
+async def get_estadisticas_buffers(model=Depends(get_model)):
+    """
+    Métricas de los buffers de escritura (reproducciones y búsquedas):
+    eventos pendientes, escritos y descartados, errores y duración de las escrituras.
+    """
+    try:
+        return await llamar_modelo(model.obtener_estadisticas_buffers)
+    except Exception as e:
+        logger.error(f"Error obteniendo estadísticas de buffers: {e}")
+        raise HTTPException(status_code=500, detail=errorServidor)
+
+
+@router.get("/upstreams")
+async def get_estadisticas_upstreams(model=Depends(get_model)):
+    """
+    Estado de los microservicios externos (Usuarios, Contenido, Comunidad): circuito
+    (cerrado/abierto/semiabierto), llamadas, reintentos, errores, rechazos y latencia.
+    """
+    try:
+        return await llamar_modelo(model.obtener_estadisticas_upstreams)
+    except Exception as e:
+        logger.error(f"Error obteniendo estadísticas de microservicios externos: {e}")
+        raise HTTPException(status_code=500, detail=errorServidor)
+
+
+@router.get("/jobs")
+async def get_estado_jobs(job: str | None = None, limit: int = 50, model=Depends(get_model)):
+    """
+    Estado del scheduler en esta instancia (si es la líder y la próxima ejecución de cada job)
+    y las últimas `limit` ejecuciones registradas (de `job`, o de todos): instancia que lo
+    ejecutó, inicio, duración, estado y filas escritas.
+    """
+    try:
+        if limit <= 0:
+            raise HTTPException(status_code=400, detail="'limit' debe ser un entero positivo.")
+        if limit > 100:
+            raise HTTPException(status_code=400, detail=limiteSuperado)
+
+        historial = await llamar_modelo(model.obtener_historial_jobs, job, limit)
+        return {**estado_planificador(), "historial": historial}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error obteniendo el estado de los jobs: {e}")
+        raise HTTPException(status_code=500, detail=errorServidor)
+
+
+@router.get("/cache")
+async def get_estadisticas_cache(model=Depends(get_model)):
+    """
+    Métricas de la caché de rankings: aciertos y fallos (total y por espacio de nombres),
+    invalidaciones y entradas guardadas.
+    """
+    try:
+        return await llamar_modelo(model.obtener_estadisticas_cache)
+    except Exception as e:
+        logger.error(f"Error obteniendo estadísticas de caché: {e}")
+        raise HTTPException(status_code=500, detail=errorServidor)
 
-        return model.obtener_top_canciones_usuario(id_usuario, limit)
 
+@router.get("/rankings/consistencia")
+async def comprobar_indices_ranking(limit: int = 100, model=Depends(get_model)):
+    """
+    Compara los tops servidos desde el índice de rankings en memoria con las mismas
+    consultas en SQL (las `limit` primeras posiciones). Devuelve las diferencias encontradas.
+    """
+    try:
+        if limit <= 0:
+            raise HTTPException(status_code=400, detail="'limit' debe ser un entero positivo.")
+        if limit > 100:
+            raise HTTPException(status_code=400, detail=limiteSuperado)
+
+        return await llamar_modelo(model.comprobar_indices_ranking, limit=limit)
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error endpoint top usuario: {e}")
-        raise HTTPException(status_code=500, detail=errorServidor)
\ No newline at end of file
+        logger.error(f"Error comprobando índices de rankings: {e}")
+        raise HTTPException(status_code=500, detail=errorServidor)
@@ -1,101 +1,65 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from apscheduler.schedulers.background import BackgroundScheduler
 
 # Importaciones de tu backend
 from backend.controller.endpoints import router as estadisticas_router
-from backend.controller.endpoints import model  # Importar el modelo
-
-# --- 1. DEFINICIÓN DEL SCHEDULER Y FUNCIONES ---
-scheduler = BackgroundScheduler()
-
-def actualizar_mensualmente():
-    print("🔄 Actualizando oyentes mensuales...", flush=True)
-    try:
-        model.sync_todos_los_artistas()
-        print("✅ Actualización mensual completada", flush=True)
-    except Exception as e:
-        print(f"❌ Error actualización mensual: {str(e)}", flush=True)
-
-def actualizar_contenido_mensualmente():
-    print("🔄 Actualizando CONTENIDOS...", flush=True)
-    try:
-        model.sync_todos_los_contenidos()
-        print("✅ Contenidos actualizados", flush=True)
-    except Exception as e:
-        print(f"❌ Error contenidos: {str(e)}", flush=True)
-        
-def actualizar_comunidades_mensualmente():
-    print("🔄 Actualizando COMUNIDADES...", flush=True)
-    try:
-        model.sync_todas_las_comunidades()
-        print("✅ Comunidades actualizadas", flush=True)
-    except Exception as e:
-        print(f"❌ Error comunidades: {str(e)}", flush=True)
-        
-
-        
-
-# --- 2. CONFIGURACIÓN DEL LIFESPAN (Ciclo de Vida) ---
+from backend.controller.respuestaJson import RespuestaJSON
+from backend.model.buffers.bufferReproducciones import get_buffer_reproducciones, detener_buffer_reproducciones
+from backend.model.buffers.bufferBusquedas import get_buffer_busquedas, detener_buffer_busquedas
+from backend.controller.logs import configurar_logs
+from backend.controller.metricas import MiddlewareMetricas, respuesta_metricas
+from backend.controller.planificador import detener_planificador
+from backend.controller.arranque import get_arranque, detener_arranque
+from backend.controller.salud import vivo, preparado
+from backend.controller.config import DB_MODE
+
+# Logs JSON por cola (LOG_NIVEL, LOG_FORMATO, DB_ECHO...): antes de que nada escriba
+configurar_logs()
+logger = logging.getLogger(__name__)
+
+# --- 1. CONFIGURACIÓN DEL LIFESPAN (Ciclo de Vida) ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # === AL INICIAR (STARTUP) ===
-    print("🚀 Iniciando aplicación y planificador...", flush=True)
-    
-    if not scheduler.running:
-        # Jobs mensuales
-        scheduler.add_job(actualizar_mensualmente, trigger="cron", day=1, hour=0, minute=0)
-        scheduler.add_job(actualizar_contenido_mensualmente, trigger="cron", day=1, hour=0, minute=2)
-        scheduler.add_job(actualizar_comunidades_mensualmente, trigger="cron", day=1, hour=0, minute=3)
-        
-        # Job de PRUEBA (Cada 30 segundos) - Para ver si funciona ahora
-        # scheduler.add_job(
-        #     actualizar_comunidades_mensualmente, 
-        #     trigger="interval", 
-        #     seconds=5,
-        #     id="job_prueba_comunidades", # ID para evitar duplicados
-        #     replace_existing=True
-        # )
-        
-        # scheduler.add_job(
-        #     actualizar_mensualmente, 
-        #     trigger="interval", 
-        #     seconds=10,
-        #     id="job_prueba_artistas", # ID para evitar duplicados
-        #     replace_existing=True
-        # )
-        
-        
-        # scheduler.add_job(
-        #     actualizar_contenido_mensualmente, 
-        #     trigger="interval", 
-        #     seconds=20,
-        #     id="job_prueba_contenidos", # ID para evitar duplicados
-        #     replace_existing=True
-        # )
-        
-
-        scheduler.start()
-        print("🗓️ Scheduler iniciado correctamente", flush=True)
-        scheduler.print_jobs() # Imprime en consola qué trabajos hay programados
-
-    app.state.model = model
-    
+    logger.info("Iniciando aplicación y planificador...")
+
+    # Migraciones, particiones, índices de rankings y scheduler, en segundo plano y con
+    # reintentos (arranque.py): el proceso no espera a la BD para empezar a atender.
+    # /health/ready responde 503 hasta que termina.
+    get_arranque().iniciar()
+
+    # Buffers de escritura (el de reproducciones, en modo spool, reenvía lo que quedara)
+    get_buffer_reproducciones().iniciar()
+    get_buffer_busquedas().iniciar()
+
     yield # <--- Aquí la app se queda corriendo
     
     # === AL APAGAR (SHUTDOWN) ===
-    if scheduler.running:
-        scheduler.shutdown()
-        print("🛑 Scheduler detenido", flush=True)
+    # Primero se escriben los eventos pendientes, mientras la BD sigue disponible
+    detener_buffer_reproducciones()
+    detener_buffer_busquedas()
 
-# --- 3. INICIALIZAR LA APP (UNA SOLA VEZ) ---
+    # Si la BD seguía sin estar lista, deja de reintentar
+    detener_arranque()
+
+    # Si era el líder, espera a los jobs en curso y suelta el lock para que otra instancia siga
+    detener_planificador()
+
+    if DB_MODE == "async":
+        from backend.model.sincronizacion.clienteUpstream import cerrar_clientes_async
+        from backend.model.dao.postgresql.posgresAsyncConnector import PostgreSQLAsyncConnector
+        await cerrar_clientes_async()
+        await PostgreSQLAsyncConnector.dispose()
+
+# --- 2. INICIALIZAR LA APP (UNA SOLA VEZ) ---
 app = FastAPI(
     title="Microservicio de Estadísticas",
     lifespan=lifespan # Aquí vinculamos el ciclo de vida
 )
 
-# --- 4. CONFIGURAR MIDDLEWARE (CORS) ---
+# --- 3. CONFIGURAR MIDDLEWARE (CORS) ---
 # Nota: He quitado 'setup_cors(app)' porque chocaba con esto. 
 # Es mejor configurar CORS explícitamente aquí.
 app.add_middleware(
@@ -105,10 +69,27 @@ app.add_middleware(
     allow_methods=["*"], 
     allow_headers=["*"], 
 )
+# Peticiones y latencia por ruta (ver /metrics)
+app.add_middleware(MiddlewareMetricas)
 
-# --- 5. INCLUIR RUTAS ---
+# --- 4. INCLUIR RUTAS ---
 app.include_router(estadisticas_router)
 
 @app.get("/")
 def root():
-    return {"message": "Microservicio de Estadísticas activo"}
\ No newline at end of file
+    return {"message": "Microservicio de Estadísticas activo"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Formato de texto de Prometheus: peticiones, pool de BD, DAOs, microservicios y jobs
+    return respuesta_metricas()
+
+# Sondas para el orquestador (ver salud.py)
+@app.get("/health/live", tags=["Salud"])
+def health_live():
+    return vivo()
+
+@app.get("/health/ready", tags=["Salud"])
+async def health_ready():
+    listo, detalle = await preparado()
+    return RespuestaJSON(detalle, status_code=200 if listo else 503)
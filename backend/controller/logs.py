@@ -0,0 +1,130 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+import orjson
+from sqlalchemy.engine import make_url
+from backend.controller.config import LOG_NIVEL, LOG_FORMATO, LOG_MUESTREO_EVENTOS, DB_ECHO
+
+# Logger de los eventos de alta frecuencia (una línea por reproducción, por búsqueda
+# descartada...). Pasa por FiltroMuestreo: solo se escribe uno de cada LOG_MUESTREO_EVENTOS.
+LOGGER_EVENTOS = "backend.eventos"
+
+# Atributos que tiene cualquier LogRecord: el resto son los `extra` del mensaje
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+_lock = threading.Lock()
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por mensaje: fecha, nivel, logger, mensaje, `extra` y excepción."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD:
+                datos[clave] = valor
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return orjson.dumps(datos, default=str).decode()
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Deja pasar uno de cada `cada` mensajes con la misma plantilla (record.msg) y le añade
+    `muestreo=cada`, para saber cuántos eventos representa cada línea.
+    """
+
+    def __init__(self, cada: int):
+        super().__init__()
+        self.cada = max(1, cada)
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.cada == 1:
+            return True
+        with self._lock:
+            n = self._contadores.get(record.msg, 0)
+            self._contadores[record.msg] = n + 1
+        if n % self.cada:
+            return False
+        record.muestreo = self.cada
+        return True
+
+
+def ocultar_password(url) -> str:
+    """URL de la base de datos con la contraseña sustituida por ***."""
+    try:
+        return make_url(url).render_as_string(hide_password=True)
+    except Exception:
+        return "<url no válida>"
+
+
+def configurar_logs(nivel: str = LOG_NIVEL, formato: str = LOG_FORMATO):
+    """
+    Configura el logging del proceso (una sola vez):
+    - Los loggers solo encolan el mensaje (QueueHandler); un hilo aparte (QueueListener)
+      lo formatea y lo escribe en stdout, así que una petición nunca espera a la consola.
+    - `formato`: "json" (una línea JSON por mensaje) o "texto".
+    - El código de la app (loggers `backend.*`) registra desde `nivel`; las librerías,
+      solo avisos y errores. Con DB_ECHO se registra también cada sentencia SQL.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        salida = logging.StreamHandler(sys.stdout)
+        if formato == "json":
+            salida.setFormatter(FormatoJSON())
+        else:
+            salida.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+
+        cola = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(cola, salida, respect_handler_level=False)
+        _listener.start()
+        atexit.register(detener_logs)
+
+        raiz = logging.getLogger()
+        raiz.handlers = [logging.handlers.QueueHandler(cola)]
+        raiz.setLevel(logging.WARNING)
+
+        logging.getLogger("backend").setLevel(nivel.upper())
+        logging.getLogger(LOGGER_EVENTOS).addFilter(FiltroMuestreo(LOG_MUESTREO_EVENTOS))
+        # El echo de SQLAlchemy va por su logger (y por la cola), no por su propio handler
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if DB_ECHO else logging.WARNING)
+
+
+def detener_logs():
+    """Escribe lo que quede en la cola y para el hilo de escritura (al apagar)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _tras_fork():
+    """
+    En un proceso hijo (workers de gunicorn con preload) no existe el hilo de escritura del
+    padre: se arranca otro sobre la misma cola y los mismos handlers.
+    """
+    global _listener, _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=False)
+        _listener.start()
+
+
+os.register_at_fork(after_in_child=_tras_fork)
@@ -0,0 +1,188 @@
+import functools
+import inspect
+import os
+import time
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from starlette.responses import Response
+
+# ---------- definición de las métricas ----------
+
+HTTP_PETICIONES = Counter(
+    "http_peticiones_total", "Peticiones HTTP atendidas",
+    ["metodo", "ruta", "codigo"]
+)
+HTTP_LATENCIA = Histogram(
+    "http_peticion_segundos", "Duración de las peticiones HTTP (hasta enviar el último byte)",
+    ["metodo", "ruta"]
+)
+
+DB_POOL_ESPERA = Histogram(
+    "db_pool_espera_segundos", "Espera hasta obtener una conexión del pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+)
+DB_POOL_EN_USO = Gauge(
+    "db_pool_conexiones_en_uso", "Conexiones del pool prestadas en este momento",
+    ["engine"],
+    # Con varios workers se suman las de los procesos vivos
+    multiprocess_mode="livesum"
+)
+
+DB_LECTURAS = Counter(
+    "db_lecturas_total", "Sentencias de métodos de solo lectura de los DAOs, por destino (con DB_REPLICAS)",
+    ["destino"]
+)
+
+DAO_LATENCIA = Histogram(
+    "dao_consulta_segundos", "Duración de cada método de los DAOs",
+    ["dao", "metodo"]
+)
+
+UPSTREAM_LATENCIA = Histogram(
+    "upstream_peticion_segundos", "Duración de las llamadas a microservicios externos (con reintentos)",
+    ["servicio"]
+)
+UPSTREAM_EVENTOS = Counter(
+    "upstream_eventos_total", "Errores, reintentos y llamadas rechazadas por el circuit breaker",
+    ["servicio", "tipo"]
+)
+
+JOB_DURACION = Histogram(
+    "job_duracion_segundos", "Duración de los jobs del scheduler",
+    ["job"],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+)
+
+
+# ---------- HTTP ----------
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que cuenta las peticiones y mide su duración por ruta.
+    La ruta es la plantilla (/estadisticas/contenido/{id}), no la URL, para que el
+    número de series no crezca con los ids. Las peticiones sin ruta van a "sin_ruta".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codigo = 500
+        async def enviar(mensaje):
+            nonlocal codigo
+            if mensaje["type"] == "http.response.start":
+                codigo = mensaje["status"]
+            await send(mensaje)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # El router de FastAPI deja en el scope la ruta que ha atendido la petición
+            ruta = getattr(scope.get("route"), "path", "sin_ruta")
+            HTTP_LATENCIA.labels(scope["method"], ruta).observe(time.perf_counter() - inicio)
+            HTTP_PETICIONES.labels(scope["method"], ruta, str(codigo)).inc()
+
+
+def respuesta_metricas() -> Response:
+    """
+    Respuesta de GET /metrics en el formato de texto de Prometheus. Con varios workers
+    (PROMETHEUS_MULTIPROC_DIR, ver gunicorn.conf.py) se juntan las métricas de todos.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return Response(generate_latest(registro), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+# ---------- pool de conexiones ----------
+
+def pool_medido(clase_pool, engine: str):
+    """
+    Subclase de `clase_pool` (QueuePool, AsyncAdaptedQueuePool...) que mide cuánto
+    espera cada checkout hasta tener conexión. Se pasa como `poolclass` al crear el engine.
+    """
+    espera = DB_POOL_ESPERA.labels(engine)
+
+    class PoolMedido(clase_pool):
+        def _do_get(self):
+            inicio = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                espera.observe(time.perf_counter() - inicio)
+
+    PoolMedido.__name__ = f"{clase_pool.__name__}Medido"
+    return PoolMedido
+
+
+def medir_conexiones_en_uso(engine: str, motor):
+    """
+    Publica las conexiones prestadas de `motor` (Engine o AsyncEngine), contando los
+    checkouts y checkins del pool (sirve también con varios workers).
+    """
+    en_uso = DB_POOL_EN_USO.labels(engine)
+    motor = getattr(motor, "sync_engine", motor)
+    event.listen(motor, "checkout", lambda *_: en_uso.inc())
+    event.listen(motor, "checkin", lambda *_: en_uso.dec())
+
+
+# ---------- DAOs ----------
+
+def _medir_metodo(dao: str, nombre: str, funcion):
+    histograma = DAO_LATENCIA.labels(dao, nombre)
+
+    if inspect.isgeneratorfunction(funcion):
+        # Los recorridos con cursor se miden hasta que se termina (o se abandona) el generador
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                yield from funcion(*args, **kwargs)
+            finally:
+                histograma.observe(time.perf_counter() - inicio)
+    else:
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                histograma.observe(time.perf_counter() - inicio)
+
+    return envoltura
+
+
+def instrumentar_dao(cls):
+    """
+    Decorador de clase para los DAOs: mide cada método público.
+    Los DAOs asíncronos ejecutan estos mismos métodos por run_sync, así que también quedan medidos.
+    """
+    for nombre, atributo in list(vars(cls).items()):
+        if not nombre.startswith("_") and inspect.isfunction(atributo):
+            setattr(cls, nombre, _medir_metodo(cls.__name__, nombre, atributo))
+    return cls
+
+
+# ---------- jobs del scheduler ----------
+
+def medir_job(funcion):
+    """Decorador de los jobs del scheduler: registra su duración con el nombre de la función."""
+    histograma = JOB_DURACION.labels(funcion.__name__)
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            histograma.observe(time.perf_counter() - inicio)
+
+    return envoltura
@@ -0,0 +1,285 @@
+"""
+Scheduler de los jobs periódicos (sincronizaciones mensuales, rollover de logs, particiones
+y sync delta), seguro con varias instancias de la API:
+
+  - Solo ejecuta los jobs el líder: la instancia que tiene el advisory lock del scheduler
+    (ver LiderAdvisoryLock). Si el líder cae, otra instancia toma el lock y sigue.
+  - Los jobs se guardan en la BD (apscheduler_jobs) con su próxima ejecución, así que un
+    reinicio o un cambio de líder no la pierde: lo que tocaba mientras no había líder se
+    ejecuta una vez (coalesce) al volver, si no han pasado más de SCHEDULER_RECUPERAR_HORAS.
+  - Cada ejecución toma además el lock propio del job, para que no se solape con otra
+    ejecución del mismo job en otra instancia, y queda registrada en ejecucionesjobs.
+
+Se puede ejecutar aparte de la API (con SCHEDULER_ACTIVO=false en las instancias de la API):
+    python -m backend.controller.planificador
+"""
+import functools
+import logging
+import signal
+import threading
+import time
+from datetime import datetime
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from backend.model.model import Model
+from backend.model.dao.postgresql.posgresConnector import PostgreSQLConnector
+from backend.model.dao.postgresql.liderazgo import LiderAdvisoryLock, bloqueo_job, CLAVE_LOCK_SCHEDULER, instancia
+from backend.controller.metricas import medir_job
+from backend.controller.config import SYNC_DELTA_INTERVALO_HORAS, SCHEDULER_LIDER_INTERVALO, SCHEDULER_RECUPERAR_HORAS
+
+logger = logging.getLogger(__name__)
+
+TABLA_JOBS = "apscheduler_jobs"
+
+
+# --- 1. JOBS ---
+
+def job_cluster(funcion):
+    """
+    Decorador de los jobs del scheduler. El job devuelve las filas que ha escrito (o None).
+    Si otra instancia está ejecutando el mismo job, esta ejecución se omite; si no, se mide
+    en /metrics (job_duracion_segundos) y se guarda en ejecucionesjobs con su duración,
+    estado y filas. Los errores se registran y no se propagan al scheduler.
+    """
+    nombre = funcion.__name__
+    medida = medir_job(funcion)
+
+    @functools.wraps(funcion)
+    def envoltura():
+        with bloqueo_job(nombre) as obtenido:
+            if not obtenido:
+                logger.warning("Job %s en ejecución en otra instancia, se omite", nombre)
+                return None
+
+            inicio = datetime.now()
+            t0 = time.perf_counter()
+            estado, filas, error = "ok", None, None
+            try:
+                filas = medida()
+            except Exception as e:
+                estado, error = "error", str(e)
+                logger.error(f"Error en el job {nombre}: {e}")
+            duracion_ms = int((time.perf_counter() - t0) * 1000)
+
+            try:
+                with Model() as model:
+                    model.registrar_ejecucion_job(nombre, instancia(), inicio, duracion_ms, estado, filas, error)
+            except Exception as e:
+                logger.error(f"No se pudo guardar la ejecución del job {nombre}: {e}")
+            return filas
+
+    return envoltura
+
+
+# Cada job abre su propia sesión del pool y la libera al terminar
+@job_cluster
+def actualizar_mensualmente():
+    logger.info("Actualizando oyentes mensuales...")
+    with Model() as model:
+        resumen = model.sync_todos_los_artistas()
+    logger.info("Actualización mensual completada")
+    return resumen["cambiados"]
+
+@job_cluster
+def actualizar_contenido_mensualmente():
+    logger.info("Actualizando CONTENIDOS...")
+    with Model() as model:
+        resumen = model.sync_todos_los_contenidos()
+    logger.info("Contenidos actualizados")
+    return resumen["cambiados"]
+
+@job_cluster
+def actualizar_comunidades_mensualmente():
+    logger.info("Actualizando COMUNIDADES...")
+    with Model() as model:
+        comunidades = model.sync_todas_las_comunidades()
+    logger.info("Comunidades actualizadas")
+    return len(comunidades or [])
+
+@job_cluster
+def sincronizar_delta():
+    """Sync delta de artistas y contenidos: solo escribe lo que ha cambiado desde la última."""
+    logger.info("Sincronización delta de artistas y contenidos...")
+    with Model() as model:
+        artistas = model.sync_todos_los_artistas(delta=True)
+        contenidos = model.sync_todos_los_contenidos(delta=True)
+    return artistas["cambiados"] + contenidos["cambiados"]
+
+@job_cluster
+def rollover_logs_mensual():
+    logger.info("Rollover mensual de los logs...")
+    with Model() as model:
+        archivadas = model.rollover_logs()
+    logger.info("Rollover de logs completado")
+    return sum(particion["filasResumen"] for particion in archivadas)
+
+@job_cluster
+def crear_particiones_futuras():
+    logger.info("Comprobando particiones de los logs...")
+    with Model() as model:
+        return len(model.mantener_particiones())
+
+
+def definir_jobs() -> list[tuple]:
+    """[(función, trigger)] de los jobs que deben estar programados. El id de cada job es el nombre de su función."""
+    jobs = [
+        # Jobs mensuales
+        (actualizar_mensualmente, CronTrigger(day=1, hour=0, minute=0)),
+        (actualizar_contenido_mensualmente, CronTrigger(day=1, hour=0, minute=2)),
+        (actualizar_comunidades_mensualmente, CronTrigger(day=1, hour=0, minute=3)),
+        (rollover_logs_mensual, CronTrigger(day=1, hour=0, minute=15)),
+        # Diario: siempre hay particiones creadas para los próximos meses
+        (crear_particiones_futuras, CronTrigger(hour=0, minute=10)),
+    ]
+    # Opcional: sync delta más frecuente (cuesta lo que cambie, no el tamaño del catálogo)
+    if SYNC_DELTA_INTERVALO_HORAS > 0:
+        jobs.append((sincronizar_delta, IntervalTrigger(hours=SYNC_DELTA_INTERVALO_HORAS)))
+    return jobs
+
+
+# --- 2. SCHEDULER DEL LÍDER ---
+
+class AlmacenJobs(SQLAlchemyJobStore):
+    """Almacén de jobs sobre el engine de la API: al parar el scheduler no se cierra el engine."""
+
+    def shutdown(self):
+        pass
+
+
+def crear_scheduler() -> BackgroundScheduler:
+    return BackgroundScheduler(
+        jobstores={"default": AlmacenJobs(engine=PostgreSQLConnector.obtener_engine(), tablename=TABLA_JOBS)},
+        job_defaults={
+            "coalesce": True,       # Varias ejecuciones perdidas se recuperan con una sola
+            "max_instances": 1,
+            "misfire_grace_time": int(SCHEDULER_RECUPERAR_HORAS * 3600)
+        }
+    )
+
+
+def sincronizar_jobs(scheduler: BackgroundScheduler):
+    """
+    Deja en el almacén exactamente los jobs de definir_jobs(). Los que ya estaban conservan
+    su próxima ejecución (aunque haya pasado: así se recuperan) salvo que cambie su trigger.
+    """
+    definidos = {funcion.__name__: (funcion, trigger) for funcion, trigger in definir_jobs()}
+    gracia = int(SCHEDULER_RECUPERAR_HORAS * 3600)
+
+    for id_job, (funcion, trigger) in definidos.items():
+        existente = scheduler.get_job(id_job)
+        if existente is None:
+            scheduler.add_job(funcion, trigger, id=id_job, name=id_job)
+            continue
+        if existente.misfire_grace_time != gracia:
+            scheduler.modify_job(id_job, misfire_grace_time=gracia)
+        if str(existente.trigger) != str(trigger):
+            scheduler.reschedule_job(id_job, trigger=trigger)
+
+    for job in scheduler.get_jobs():
+        if job.id not in definidos:
+            scheduler.remove_job(job.id)
+            logger.info("Job %s eliminado del almacén (ya no está programado)", job.id)
+
+
+_scheduler: BackgroundScheduler | None = None
+_lider: LiderAdvisoryLock | None = None
+
+
+def _al_ganar():
+    global _scheduler
+    scheduler = crear_scheduler()
+    # En pausa hasta tener los jobs al día, para que no se ejecute nada con la programación vieja
+    scheduler.start(paused=True)
+    try:
+        sincronizar_jobs(scheduler)
+        ahora = datetime.now().astimezone()
+        for job in scheduler.get_jobs():
+            if job.next_run_time is None or job.next_run_time > ahora:
+                logger.info("Job programado: %s (%s), próxima ejecución %s", job.id, job.trigger, job.next_run_time)
+            elif (ahora - job.next_run_time).total_seconds() <= job.misfire_grace_time:
+                logger.info("Job %s: se recupera la ejecución de %s", job.id, job.next_run_time)
+            else:
+                logger.warning("Job %s: la ejecución de %s es de hace más de %s h, no se recupera",
+                               job.id, job.next_run_time, SCHEDULER_RECUPERAR_HORAS)
+        scheduler.resume()
+    except Exception:
+        scheduler.shutdown(wait=False)
+        raise
+    _scheduler = scheduler
+    logger.info("Scheduler iniciado correctamente")
+
+
+def _al_perder():
+    global _scheduler
+    if _scheduler is not None:
+        # Espera a los jobs en curso: hasta que terminen no se suelta el lock del líder
+        _scheduler.shutdown()
+        _scheduler = None
+        logger.info("Scheduler detenido")
+
+
+def iniciar_planificador():
+    """Empieza a competir por ser el líder del scheduler (en un hilo aparte)."""
+    global _lider
+    if _lider is None:
+        _lider = LiderAdvisoryLock(CLAVE_LOCK_SCHEDULER, _al_ganar, _al_perder, SCHEDULER_LIDER_INTERVALO)
+        _lider.iniciar()
+
+
+def detener_planificador():
+    """Deja de competir y, si era el líder, para el scheduler y suelta el lock."""
+    global _lider
+    if _lider is not None:
+        _lider.detener()
+        _lider = None
+
+
+def estado_planificador() -> dict:
+    """Si esta instancia es el líder y, en ese caso, la próxima ejecución de cada job."""
+    scheduler = _scheduler
+    jobs = []
+    if scheduler is not None:
+        jobs = [
+            {
+                "job": job.id,
+                "trigger": str(job.trigger),
+                "proximaEjecucion": job.next_run_time.isoformat() if job.next_run_time else None
+            }
+            for job in scheduler.get_jobs()
+        ]
+    return {
+        "instancia": instancia(),
+        "activo": _lider is not None,
+        "lider": _lider is not None and _lider.es_lider,
+        "jobs": jobs
+    }
+
+
+def main():
+    """Worker del scheduler sin la API."""
+    from backend.controller.logs import configurar_logs, detener_logs
+    from backend.controller.config import DB_MIGRAR_AL_ARRANCAR
+    from backend.model.dao.postgresql.migrador import aplicar_migraciones
+
+    configurar_logs()
+    if DB_MIGRAR_AL_ARRANCAR:
+        aplicar_migraciones()
+
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+
+    iniciar_planificador()
+    parar.wait()
+    detener_planificador()
+    detener_logs()
+
+
+if __name__ == "__main__":
+    # python -m backend.controller.planificador
+    # Se importa por su nombre: el almacén guarda los jobs como "backend.controller.planificador:<job>"
+    from backend.controller.planificador import main
+    main()
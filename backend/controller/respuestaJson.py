@@ -0,0 +1,30 @@
+from decimal import Decimal
+import orjson
+from fastapi.responses import Response
+
+
+def _por_defecto(valor):
+    """Lo que orjson no serializa por sí mismo, igual que lo haría jsonable_encoder de FastAPI."""
+    if hasattr(valor, "to_dict"):
+        return valor.to_dict()
+    if isinstance(valor, Decimal):
+        # Como pydantic: entero si no tiene decimales, float si los tiene
+        return int(valor) if valor.as_tuple().exponent >= 0 else float(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def a_json(contenido) -> bytes:
+    """Serializa con orjson. Los DTOs (dataclasses con slots) se codifican sin pasar por dict."""
+    return orjson.dumps(contenido, default=_por_defecto)
+
+
+class RespuestaJSON(Response):
+    """
+    Respuesta JSON con orjson. Devolverla directamente desde un endpoint evita el
+    jsonable_encoder de FastAPI (que recorre y copia toda la respuesta) y el json.dumps
+    posterior. La salida es la misma que la de JSONResponse: compacta y en UTF-8.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return a_json(content)
@@ -0,0 +1,140 @@
+"""
+Sondas de salud de la API:
+
+  - /health/live: el proceso responde. No toca la BD ni la red (para reiniciar el contenedor
+    solo si está colgado, no si la BD se ha caído).
+  - /health/ready: puede atender tráfico. La preparación de la BD ha terminado (arranque.py)
+    y el pool da una conexión; los microservicios se informan y, con SALUD_READY_UPSTREAMS,
+    también cuentan.
+
+Cada comprobación se cachea SALUD_CACHE_SEGUNDOS y tiene un tope de SALUD_TIMEOUT segundos,
+así que un balanceador que sondee a menudo no carga la BD y una sonda nunca se queda colgada.
+"""
+import asyncio
+import inspect
+import socket
+import time
+from urllib.parse import urlsplit
+from sqlalchemy import text
+
+from backend.controller.arranque import get_arranque
+from backend.model.sincronizacion.clienteUpstream import get_cliente_upstream, UPSTREAM_USUARIOS, UPSTREAM_CONTENIDO, UPSTREAM_COMUNIDAD
+from backend.controller.config import DB_MODE, SALUD_CACHE_SEGUNDOS, SALUD_TIMEOUT, SALUD_READY_UPSTREAMS
+
+
+class ComprobacionCacheada:
+    """
+    Resultado de `comprobar` reutilizado durante `ttl` segundos. Si llegan varias sondas a la
+    vez con el resultado caducado, comparten la misma comprobación. `comprobar` puede ser una
+    función bloqueante (se ejecuta en un hilo) o una corrutina; devuelve un dict con detalles
+    y lanza una excepción si falla.
+    """
+
+    def __init__(self, comprobar, ttl: float = SALUD_CACHE_SEGUNDOS, timeout: float = SALUD_TIMEOUT):
+        self.comprobar = comprobar
+        self.ttl = ttl
+        self.timeout = timeout
+        self._resultado = None
+        self._caduca = 0.0
+        self._en_curso = None
+
+    async def resultado(self) -> dict:
+        if self._resultado is not None and time.monotonic() < self._caduca:
+            return self._resultado
+
+        if self._en_curso is None or self._en_curso.done():
+            self._en_curso = asyncio.ensure_future(self._ejecutar())
+        try:
+            # shield: si se agota el tiempo, la comprobación sigue y la aprovecha la siguiente sonda
+            resultado = await asyncio.wait_for(asyncio.shield(self._en_curso), self.timeout)
+        except asyncio.TimeoutError:
+            resultado = {"ok": False, "error": f"sin respuesta en {self.timeout:g} s"}
+
+        self._resultado = resultado
+        self._caduca = time.monotonic() + self.ttl
+        return resultado
+
+    async def _ejecutar(self) -> dict:
+        inicio = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(self.comprobar):
+                detalle = await self.comprobar()
+            else:
+                detalle = await asyncio.to_thread(self.comprobar)
+            resultado = {"ok": True, **(detalle or {})}
+        except Exception as e:
+            resultado = {"ok": False, "error": str(e)}
+        resultado["ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+        return resultado
+
+
+# --- COMPROBACIONES ---
+
+def _estado_pool(engine, replicas) -> dict:
+    pool = engine.pool
+    estado = {"pool": {"tamano": pool.size(), "enUso": pool.checkedout(), "overflow": max(0, pool.overflow())}}
+    if replicas is not None:
+        # Informativo: sin réplicas disponibles las lecturas van al primario
+        estado["replicas"] = replicas.estado()
+    return estado
+
+def comprobar_bd_sync() -> dict:
+    """Una conexión del pool de las peticiones responde a SELECT 1."""
+    from backend.model.dao.postgresql.posgresConnector import PostgreSQLConnector
+    engine = PostgreSQLConnector.obtener_engine()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return _estado_pool(engine, PostgreSQLConnector.replicas)
+
+async def comprobar_bd_async() -> dict:
+    from backend.model.dao.postgresql.posgresAsyncConnector import PostgreSQLAsyncConnector
+    engine = PostgreSQLAsyncConnector.obtener_engine()
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return _estado_pool(engine.sync_engine, PostgreSQLAsyncConnector.replicas)
+
+def comprobador_upstream(servicio: str):
+    """
+    Alcanzable = circuito no abierto y su host acepta conexiones TCP. No se llama a ninguna
+    ruta: la sonda no cuenta como tráfico del microservicio ni abre su circuito.
+    """
+    def comprobar() -> dict:
+        cliente = get_cliente_upstream(servicio)
+        circuito = cliente.circuito.estado
+        if circuito == cliente.circuito.ABIERTO:
+            raise RuntimeError("circuito abierto")
+        url = urlsplit(cliente.base_url)
+        puerto = url.port or (443 if url.scheme == "https" else 80)
+        with socket.create_connection((url.hostname, puerto), timeout=SALUD_TIMEOUT):
+            pass
+        return {"circuito": circuito}
+
+    return comprobar
+
+
+_bd = ComprobacionCacheada(comprobar_bd_async if DB_MODE == "async" else comprobar_bd_sync)
+_upstreams = {
+    servicio: ComprobacionCacheada(comprobador_upstream(servicio))
+    for servicio in (UPSTREAM_USUARIOS, UPSTREAM_CONTENIDO, UPSTREAM_COMUNIDAD)
+}
+
+
+def vivo() -> dict:
+    return {"estado": "vivo"}
+
+async def preparado() -> tuple[bool, dict]:
+    """(listo, detalle) para /health/ready."""
+    arranque = get_arranque()
+    bd, *upstreams = await asyncio.gather(_bd.resultado(), *(c.resultado() for c in _upstreams.values()))
+    upstreams = dict(zip(_upstreams, upstreams))
+
+    listo = arranque.listo and bd["ok"]
+    if SALUD_READY_UPSTREAMS:
+        listo = listo and all(u["ok"] for u in upstreams.values())
+    degradado = not all(u["ok"] for u in upstreams.values())
+    return listo, {
+        "estado": ("degradado" if degradado else "listo") if listo else "no listo",
+        "arranque": arranque.estado(),
+        "bd": bd,
+        "upstreams": upstreams
+    }
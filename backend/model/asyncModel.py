@@ -0,0 +1,315 @@
+import logging
+import asyncio
+from datetime import datetime
+from fastapi import HTTPException
+from backend.model.model import Model
+from backend.model.sincronizacion import mapeoApi
+from backend.model.sincronizacion.catalogoComunidades import get_catalogo_comunidades
+from backend.model.sincronizacion.huellas import huella, HUELLA_ARTISTAS, HUELLA_CONTENIDOS
+from backend.model.sincronizacion.clienteUpstream import get_cliente_upstream, estadisticas_upstreams, UPSTREAM_USUARIOS, UPSTREAM_CONTENIDO
+from backend.model.buffers.bufferReproducciones import get_buffer_reproducciones
+from backend.model.buffers.bufferBusquedas import get_buffer_busquedas
+from backend.model.cache.cacheConsultas import get_cache, CACHE_ARTISTAS, CACHE_CONTENIDOS, CACHE_COMUNIDADES
+from backend.model.ranking.indiceRanking import tras_escritura
+from backend.model.dao.postgresql.replicas import en_primario
+from backend.model.dto.reproduccionDTO import ReproduccionDTO
+from backend.model.dao.postgresql.postgresAsyncDAOFactory import PostgreSQLAsyncDAOFactory
+from backend.controller.config import MS_USUARIOS_BASE_URL, CONTENIDO_API_BASE_URL, COMUNIDAD_API_BASE_URL
+
+logger = logging.getLogger(__name__)
+
+class AsyncModel:
+    """
+    Versión asíncrona de Model (DB_MODE=async) con la misma API, pero con métodos `async`.
+    - Lecturas y escrituras en BD: se reutiliza la lógica de Model ejecutándola sobre una
+      AsyncSession (asyncpg) con run_sync, así que la E/S no bloquea el event loop.
+    - Sincronizaciones con otros microservicios: httpx asíncrono + DAOs asíncronos.
+    """
+    def __init__(self, db=None):
+        # Crear fábrica de DAOs asíncronos (una sesión del pool por instancia)
+        self.factory = PostgreSQLAsyncDAOFactory(db)
+
+        # Instancias de los DAOs
+        self.artistasMensualesDAO = self.factory.get_artistas_mensuales_dao()
+        self.busquedasArtistasDAO = self.factory.get_busquedas_artistas_dao()
+        self.contenidoDAO = self.factory.get_contenido_dao()
+        self.comunidadDAO = self.factory.get_comunidad_dao()
+        self.reproduccionesDAO = self.factory.get_reproducciones_dao()
+        self.huellasDAO = self.factory.get_huellas_sincronizacion_dao()
+        self.ejecucionesJobsDAO = self.factory.get_ejecuciones_jobs_dao()
+
+        # URLs
+        self.URL_CONTENIDOS = f"{CONTENIDO_API_BASE_URL}/elementos"
+        self.URL_VALORACIONES = f"{CONTENIDO_API_BASE_URL}/usuarioValoraElem"
+        self.URL_COMUNIDAD = f"{COMUNIDAD_API_BASE_URL}/comunidad"
+
+        # Sesión DB (AsyncSession)
+        self.db = self.factory.db
+
+    async def close(self):
+        """Libera la sesión de esta unidad de trabajo (vuelve al pool)."""
+        await self.factory.close()
+
+    async def _delegar(self, nombre: str, *args, **kwargs):
+        """
+        Ejecuta el método homónimo de Model dentro de la sesión asíncrona.
+        El método se ejecuta en el hilo del event loop: solo debe esperar a la sesión.
+        Lo que bloquee por otro lado se hace fuera, con asyncio.to_thread:
+        - Métodos @cacheado: la consulta y el guardado en la caché (redis es un cliente
+          bloqueante). Un acierto no llega a pedir conexión al pool.
+        - tras_escritura (invalidar la caché y aplicar el cambio al índice), después del método.
+        - Buffers y otras conexiones: los vacía antes quien llama (ver delete_busquedas_*).
+        """
+        metodo = getattr(Model, nombre)
+        namespace = getattr(metodo, "cache_namespace", None)
+        cache = get_cache()
+        if namespace is None or not cache.activa:
+            return await self._en_sesion(lambda model: getattr(model, nombre)(*args, **kwargs))
+
+        encontrado, valor, clave = await asyncio.to_thread(
+            cache.obtener, namespace, nombre, metodo.cache_argumentos(args, kwargs)
+        )
+        if encontrado:
+            return valor
+        with en_primario(self.db):
+            valor = await self._en_sesion(lambda model: metodo.__wrapped__(model, *args, **kwargs))
+        await asyncio.to_thread(cache.guardar, namespace, clave, valor)
+        return valor
+
+    async def _en_sesion(self, llamar):
+        """`llamar(Model(sesion))` con run_sync; las tras_escritura que deje se ejecutan después en un hilo."""
+        diferidas = []
+
+        def ejecutar(sesion):
+            model = Model(sesion)
+            model.escrituras_diferidas = diferidas
+            return llamar(model)
+
+        try:
+            return await self.db.run_sync(ejecutar)
+        finally:
+            for escritura in diferidas:
+                await asyncio.to_thread(tras_escritura, *escritura)
+
+    # ================== ARTISTAS ==================
+
+    async def get_todos_los_artistas(self):
+        return await self._delegar("get_todos_los_artistas")
+
+    async def get_pagina_artistas(self, despues_de: int | None = None, limite: int = 100):
+        return await self._delegar("get_pagina_artistas", despues_de, limite)
+
+    async def iterar_todos_los_artistas(self, tamano_lote: int = 1000):
+        async for dto in self.artistasMensualesDAO.iterar_todos(tamano_lote):
+            yield dto
+
+    async def get_artista_oyentes(self, id_artista: int):
+        return await self._delegar("get_artista_oyentes", id_artista)
+
+    async def get_ranking_artistas_oyentes(self):
+        return await self._delegar("get_ranking_artistas_oyentes")
+
+    async def sync_artista_oyentes(self, id_artista: int):
+        try:
+            url = f"{MS_USUARIOS_BASE_URL}/api/usuarios/artistas/{id_artista}"
+
+            # 1. Petición API Externa (sin bloquear el event loop)
+            resp = await get_cliente_upstream(UPSTREAM_USUARIOS).get_async(url)
+            if resp.status_code == 404:
+                raise HTTPException(status_code=404, detail="Artista no encontrado en MS Usuarios")
+            resp.raise_for_status()
+
+            # 2. Crear DTO y guardarlo
+            dto = mapeoApi.dto_artista_desde_api(resp.json(), id_artista)
+            await self.artistasMensualesDAO.actualizar_o_insertar(dto)
+            await self.huellasDAO.guardar(HUELLA_ARTISTAS, {int(dto.idArtista): huella(dto)})
+            await self.db.commit()
+            await self._delegar("_tras_escritura", CACHE_ARTISTAS, actualizados=[dto])
+
+            return dto.to_dict()
+
+        except Exception as e:
+            logger.error(f"Error en sync_artista_oyentes (async): {e}")
+            await self.db.rollback()
+            raise e
+
+    async def delete_artista_estadisticas(self, id_artista: int):
+        return await self._delegar("delete_artista_estadisticas", id_artista)
+
+    # ================== BUSQUEDAS ARTISTAS ==================
+
+    # Encolar en el buffer de búsquedas no hace E/S, así que no hace falta salir del event loop
+    async def registrar_o_actualizar_busqueda_artista(self, id_artista: int, id_usuario: int | None = None):
+        get_buffer_busquedas().registrar([(id_artista, id_usuario)])
+
+    async def registrar_busquedas_lote(self, busquedas: list[tuple[int, int | None]]) -> int:
+        return get_buffer_busquedas().registrar(busquedas)
+
+    async def get_top_artistas_busquedas(self, limit: int = 10):
+        return await self._delegar("get_top_artistas_busquedas", limit)
+
+    # Vaciar el buffer espera a su escritura en curso (psycopg2, otra sesión): va a un hilo
+    # y no dentro de _delegar, que se ejecuta en el event loop
+    async def delete_busquedas_artista(self, id_artista: int):
+        await asyncio.to_thread(get_buffer_busquedas().vaciar_o_fallar)
+        return await self._delegar("delete_busquedas_artista", id_artista, vaciar_buffer=False)
+
+    async def delete_busquedas_usuario(self, id_usuario: int):
+        await asyncio.to_thread(get_buffer_busquedas().vaciar_o_fallar)
+        return await self._delegar("delete_busquedas_usuario", id_usuario, vaciar_buffer=False)
+
+    # ================== CONTENIDO ==================
+
+    async def get_todos_los_contenidos(self):
+        return await self._delegar("get_todos_los_contenidos")
+
+    async def get_pagina_contenidos(self, despues_de: int | None = None, limite: int = 100):
+        return await self._delegar("get_pagina_contenidos", despues_de, limite)
+
+    async def iterar_todos_los_contenidos(self, tamano_lote: int = 1000):
+        async for dto in self.contenidoDAO.iterar_todos(tamano_lote):
+            yield dto
+
+    async def sincronizar_desde_api_externa(self, id_contenido: int):
+        logger.info(f"Sincronizando contenido ID: {id_contenido} (async)...")
+        try:
+            # 1. Las dos llamadas a la API de contenidos se hacen en paralelo
+            cliente = get_cliente_upstream(UPSTREAM_CONTENIDO)
+            resp_elem, resp_com = await asyncio.gather(
+                cliente.get_async(f"{self.URL_CONTENIDOS}/{id_contenido}"),
+                cliente.get_async(f"{self.URL_VALORACIONES}/{id_contenido}"),
+                return_exceptions=True
+            )
+            if isinstance(resp_elem, Exception):
+                raise resp_elem
+            resp_elem.raise_for_status()
+
+            # Los comentarios son opcionales: si fallan, contamos 0
+            num_comentarios = 0
+            try:
+                if not isinstance(resp_com, Exception) and resp_com.status_code == 200:
+                    num_comentarios = mapeoApi.contar_comentarios(resp_com.json())
+            except ValueError:
+                logger.warning(f"No se pudieron obtener comentarios para contenido {id_contenido}")
+
+            # 2. Crear DTO y guardarlo
+            dto = mapeoApi.dto_contenido_desde_api(id_contenido, resp_elem.json(), num_comentarios)
+            await self.contenidoDAO.actualizar_o_insertar(dto)
+            await self.huellasDAO.guardar(HUELLA_CONTENIDOS, {int(dto.idContenido): huella(dto)})
+            await self.db.commit()
+            await self._delegar("_tras_escritura", CACHE_CONTENIDOS, actualizados=[dto])
+
+            logger.info(f"Contenido {id_contenido} sincronizado")
+            return dto.to_dict()
+
+        except Exception as e:
+            logger.error(f"Error procesando contenido (async): {e}")
+            await self.db.rollback()
+            raise e
+
+    async def get_contenido_detalle(self, id_contenido: int):
+        return await self._delegar("get_contenido_detalle", id_contenido)
+
+    async def delete_contenido(self, id_contenido: int):
+        return await self._delegar("delete_contenido", id_contenido)
+
+    async def get_top_contenidos_valoracion(self, limit: int = 10):
+        return await self._delegar("get_top_contenidos_valoracion", limit)
+
+    async def get_top_contenidos_comentarios(self, limit: int = 10):
+        return await self._delegar("get_top_contenidos_comentarios", limit)
+
+    async def get_top_contenidos_ventas(self, limit: int = 10):
+        return await self._delegar("get_top_contenidos_ventas", limit)
+
+    async def get_top_generos(self, limit: int = 5):
+        return await self._delegar("get_top_generos", limit)
+
+    # ================== COMUNIDAD ==================
+
+    async def sincronizar_comunidad_desde_api(self, id_comunidad):
+        logger.info(f"Sincronizando comunidad ID: {id_comunidad} (async)...")
+        try:
+            datos = await get_catalogo_comunidades().obtener_async(id_comunidad)
+            if not datos:
+                logger.warning(f"Comunidad {id_comunidad} no encontrada.")
+                return None
+
+            dto = mapeoApi.dto_comunidad_desde_api(datos)
+            await self.comunidadDAO.actualizar_o_insertar_comunidad(dto)
+            await self.db.commit()
+            await self._delegar("_tras_escritura", CACHE_COMUNIDADES, actualizados=[dto])
+
+            logger.info(f"Comunidad {id_comunidad} sincronizada.")
+            return dto.to_dict()
+
+        except Exception as e:
+            logger.error(f"Error comunidad (async): {e}")
+            await self.db.rollback()
+            raise e
+
+    async def obtener_todas_las_comunidades(self):
+        return await self._delegar("obtener_todas_las_comunidades")
+
+    async def obtener_pagina_comunidades(self, despues_de: int | None = None, limite: int = 100):
+        return await self._delegar("obtener_pagina_comunidades", despues_de, limite)
+
+    async def iterar_todas_las_comunidades(self, tamano_lote: int = 1000):
+        async for dto in self.comunidadDAO.iterar_todas(tamano_lote):
+            yield dto
+
+    async def eliminar_comunidad(self, id_comunidad):
+        return await self._delegar("eliminar_comunidad", id_comunidad)
+
+    async def obtener_ranking_comunidades_miembros(self):
+        return await self._delegar("obtener_ranking_comunidades_miembros")
+
+    async def obtener_ranking_comunidades_publicaciones(self):
+        return await self._delegar("obtener_ranking_comunidades_publicaciones")
+
+    async def obtener_comunidad_por_id(self, id_comunidad):
+        return await self._delegar("obtener_comunidad_por_id", id_comunidad)
+
+    # ================== JOBS DEL SCHEDULER ==================
+
+    async def obtener_historial_jobs(self, job: str | None = None, limite: int = 50):
+        return await self._delegar("obtener_historial_jobs", job, limite)
+
+    # ================== BUFFERS ==================
+
+    async def obtener_estadisticas_buffers(self):
+        return [
+            get_buffer_reproducciones().estadisticas(),
+            get_buffer_busquedas().estadisticas()
+        ]
+
+    # ================== MICROSERVICIOS EXTERNOS ==================
+
+    async def obtener_estadisticas_upstreams(self):
+        return estadisticas_upstreams()
+
+    # ================== CACHÉ ==================
+
+    async def obtener_estadisticas_cache(self):
+        return {**get_cache().estadisticas(), "catalogoComunidades": get_catalogo_comunidades().estadisticas()}
+
+    async def comprobar_indices_ranking(self, limit: int = 100):
+        return await self._delegar("comprobar_indices_ranking", limit)
+
+    # ================== REPRODUCCIONES ==================
+
+    # El buffer no usa la sesión de la petición; en modo flush bloquea hasta el COPY, así que va a un hilo
+    async def registrar_reproduccion(self, id_usuario: int, id_contenido: int, segundos: int):
+        dto = ReproduccionDTO(id_usuario=id_usuario, id_contenido=id_contenido, segundos=segundos, fecha=datetime.now())
+        await asyncio.to_thread(get_buffer_reproducciones().registrar, [dto])
+
+    async def registrar_reproducciones_lote(self, reproducciones: list[tuple[int, int, int]]) -> int:
+        ahora = datetime.now()
+        dtos = [ReproduccionDTO(id_usuario=u, id_contenido=c, segundos=s, fecha=ahora) for u, c, s in reproducciones]
+        return await asyncio.to_thread(get_buffer_reproducciones().registrar, dtos)
+
+    async def obtener_historial_personal(self, id_usuario: int) -> list[dict]:
+        return await self._delegar("obtener_historial_personal", id_usuario)
+
+    async def obtener_top_canciones_usuario(self, id_usuario: int, limit: int = 5, orden: str = "reproducciones"):
+        return await self._delegar("obtener_top_canciones_usuario", id_usuario, limit, orden)
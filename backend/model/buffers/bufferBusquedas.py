@@ -0,0 +1,86 @@
+import logging
+import threading
+from datetime import datetime
+from backend.model.buffers.bufferEscritura import BufferEscritura, BufferLleno
+from backend.model.dao.postgresql.postgresDAOFactory import PostgreSQLDAOFactory
+from backend.model.dao.postgresql.collection.postgresParticionesDAO import es_error_sin_particion
+from backend.controller.logs import LOGGER_EVENTOS
+from backend.controller.config import (
+    BUSQUEDAS_TAMANO_LOTE,
+    BUSQUEDAS_INTERVALO_MS,
+    BUSQUEDAS_MAX_PENDIENTES,
+)
+
+eventos = logging.getLogger(LOGGER_EVENTOS)
+
+
+class BufferBusquedas(BufferEscritura):
+    """
+    Escritura agrupada de `busquedasartistas`.
+
+    Cada elemento de la cola es (idartista, idusuario, fecha). `registrar` no espera
+    a la BD: las búsquedas se escriben con INSERT multi-fila cada `intervalo` o al
+    llenarse el lote. Si la BD falla se reintenta el lote; si la cola está llena,
+    las búsquedas nuevas se descartan y se cuentan en `estadisticas()`.
+    """
+
+    def __init__(self, tamano_lote: int = BUSQUEDAS_TAMANO_LOTE,
+                 intervalo_ms: int = BUSQUEDAS_INTERVALO_MS,
+                 max_pendientes: int = BUSQUEDAS_MAX_PENDIENTES):
+        super().__init__("busquedas", tamano_lote, intervalo_ms / 1000, max_pendientes)
+
+    def registrar(self, busquedas: list[tuple[int, int | None]]) -> int:
+        """
+        Encola búsquedas (idartista, idusuario) con la fecha actual.
+        Devuelve cuántas se aceptaron (0 si la cola estaba llena).
+        """
+        ahora = datetime.now()
+        try:
+            return self.agregar([(id_artista, id_usuario, ahora) for id_artista, id_usuario in busquedas])
+        except BufferLleno as e:
+            eventos.warning("%s: se descartan %d búsquedas", e, len(busquedas))
+            return 0
+
+    def _escribir(self, lote: list):
+        factory = PostgreSQLDAOFactory()
+        try:
+            try:
+                factory.get_busquedas_artistas_dao().insertar_busquedas_lote(lote)
+            except Exception as e:
+                if not es_error_sin_particion(e):
+                    raise
+                # Igual que en el buffer de reproducciones: se crea la partición que falte o,
+                # si el mes ya se archivó, las búsquedas solo se suman a su contador mensual
+                factory.db.rollback()
+                con_particion, archivadas = factory.get_particiones_dao().separar_por_particion(
+                    "busquedasartistas", lote, lambda b: b[2]
+                )
+                factory.get_busquedas_artistas_dao().insertar_busquedas_lote(con_particion)
+                factory.get_busquedas_artistas_dao().sumar_busquedas_archivadas(archivadas)
+                if archivadas:
+                    eventos.warning("%d búsquedas de meses ya archivados sumadas a busquedasartistasmensual", len(archivadas))
+            factory.db.commit()
+        except Exception:
+            factory.db.rollback()
+            raise
+        finally:
+            factory.close()
+
+
+# Buffer compartido por todas las peticiones del proceso
+_buffer = None
+_lock_buffer = threading.Lock()
+
+def get_buffer_busquedas() -> BufferBusquedas:
+    global _buffer
+    with _lock_buffer:
+        if _buffer is None:
+            _buffer = BufferBusquedas()
+    return _buffer
+
+def detener_buffer_busquedas():
+    global _buffer
+    with _lock_buffer:
+        if _buffer is not None:
+            _buffer.detener()
+            _buffer = None
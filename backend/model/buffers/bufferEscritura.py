@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+
+class BufferLleno(Exception):
+    """El buffer ya tiene el máximo de eventos pendientes y no admite más."""
+    pass
+
+
+class BufferNoVaciado(Exception):
+    """Algún lote no se ha podido escribir: siguen quedando eventos sin llegar a la BD."""
+    pass
+
+
+class BufferEscritura(ABC):
+    """
+    Buffer de escritura en segundo plano para eventos de mucho volumen y poco valor individual.
+
+    - `agregar(eventos)` solo los deja en memoria; un hilo los escribe en BD por lotes
+      cuando hay `tamano_lote` pendientes o cuando pasan `intervalo` segundos.
+    - Como mucho hay `max_pendientes` eventos en memoria; lo que no cabe se descarta
+      (y se cuenta) para no dejar sin memoria al proceso si la BD se cae.
+    - Solo hay un lote escribiéndose a la vez, así que cada subclase puede usar
+      una única sesión por lote sin preocuparse de la concurrencia.
+
+    Las subclases implementan `_escribir(lote)` y pueden cambiar qué pasa tras
+    escribir (`_al_escribir`) o fallar (`_al_fallar`).
+    """
+
+    def __init__(self, nombre: str, tamano_lote: int, intervalo: float, max_pendientes: int):
+        self.nombre = nombre
+        self.tamano_lote = max(1, tamano_lote)
+        self.intervalo = max(0.01, intervalo)
+        self.max_pendientes = max(self.tamano_lote, max_pendientes)
+
+        self._pendientes = []
+        self._lock = threading.Lock()             # Protege _pendientes y los contadores
+        self._lock_escritura = threading.Lock()   # Un solo lote escribiéndose a la vez
+        self._hay_trabajo = threading.Event()
+        self._parar = threading.Event()
+        self._hilo = None
+
+        # Métricas
+        self._escritos = 0
+        self._descartados = 0
+        self._errores = 0
+        self._lotes = 0
+        self._ultimo_lote_ms = 0.0
+        self._max_lote_ms = 0.0
+        self._total_lote_ms = 0.0
+        self._ultima_escritura = None
+
+    # ================== CICLO DE VIDA ==================
+
+    def iniciar(self):
+        """Arranca el hilo de escritura (si no estaba ya arrancado)."""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._parar.clear()
+            self._hilo = threading.Thread(target=self._bucle, name=f"buffer-{self.nombre}", daemon=True)
+            self._hilo.start()
+        logger.info(f"Buffer '{self.nombre}' iniciado (lote={self.tamano_lote}, intervalo={self.intervalo}s)")
+
+    def detener(self, timeout: float = 30):
+        """Para el hilo escribiendo antes lo que quede pendiente."""
+        hilo = self._hilo
+        if hilo is None:
+            return
+        self._parar.set()
+        self._hay_trabajo.set()
+        hilo.join(timeout)
+        self._hilo = None
+        logger.info(f"Buffer '{self.nombre}' detenido ({len(self._pendientes)} eventos sin escribir)")
+
+    # ================== ENTRADA ==================
+
+    def agregar(self, eventos: list) -> int:
+        """
+        Encola `eventos`. Si no caben, se descartan todos y se lanza BufferLleno
+        (así quien llama decide si responder con error o ignorarlo).
+        """
+        if not eventos:
+            return 0
+        if self._hilo is None:
+            self.iniciar()
+
+        with self._lock:
+            self._encolar(eventos)
+            lleno = len(self._pendientes) >= self.tamano_lote
+
+        if lleno:
+            self._hay_trabajo.set()
+        return len(eventos)
+
+    def _encolar(self, eventos: list):
+        """Añade eventos a la cola. Se llama con `_lock` cogido."""
+        if len(self._pendientes) + len(eventos) > self.max_pendientes:
+            self._descartados += len(eventos)
+            raise BufferLleno(f"Buffer '{self.nombre}' lleno ({len(self._pendientes)} eventos pendientes)")
+        self._pendientes.extend(eventos)
+
+    # ================== ESCRITURA ==================
+
+    def _bucle(self):
+        while not self._parar.is_set():
+            self._hay_trabajo.wait(self.intervalo)
+            self._hay_trabajo.clear()
+            self.vaciar()
+        # Al parar escribimos lo que quede
+        self.vaciar()
+
+    def vaciar(self) -> bool:
+        """
+        Escribe todo lo pendiente (por lotes). Se para en el primer lote que falla y
+        devuelve False; True si no ha quedado nada por escribir.
+        """
+        with self._lock_escritura:
+            while True:
+                with self._lock:
+                    lote = self._tomar_lote()
+                if not lote:
+                    return True
+
+                inicio = time.perf_counter()
+                try:
+                    self._escribir(lote)
+                except Exception as e:
+                    logger.error(f"Error escribiendo lote de '{self.nombre}' ({len(lote)} eventos): {e}")
+                    with self._lock:
+                        self._errores += 1
+                    self._al_fallar(lote, e)
+                    return False
+
+                duracion_ms = (time.perf_counter() - inicio) * 1000
+                with self._lock:
+                    self._escritos += len(lote)
+                    self._lotes += 1
+                    self._ultimo_lote_ms = duracion_ms
+                    self._max_lote_ms = max(self._max_lote_ms, duracion_ms)
+                    self._total_lote_ms += duracion_ms
+                    self._ultima_escritura = datetime.now()
+                self._al_escribir(lote)
+
+    def vaciar_o_fallar(self):
+        """Como `vaciar`, pero lanza BufferNoVaciado si algún lote ha fallado (para quien necesita que todo esté en BD)."""
+        if not self.vaciar():
+            raise BufferNoVaciado(f"Buffer '{self.nombre}': no se han podido escribir los eventos pendientes")
+
+    def _tomar_lote(self) -> list:
+        """Saca de la cola el siguiente lote. Se llama con `_lock` cogido."""
+        lote = self._pendientes[:self.tamano_lote]
+        del self._pendientes[:self.tamano_lote]
+        return lote
+
+    @abstractmethod
+    def _escribir(self, lote: list):
+        """Persiste el lote (y hace commit). Si lanza excepción se llama a `_al_fallar`."""
+        pass
+
+    def _al_escribir(self, lote: list):
+        pass
+
+    def _al_fallar(self, lote: list, error: Exception):
+        """Por defecto se devuelve el lote a la cabeza de la cola, si cabe, para reintentarlo."""
+        with self._lock:
+            if len(self._pendientes) + len(lote) <= self.max_pendientes:
+                self._pendientes[:0] = lote
+            else:
+                self._descartados += len(lote)
+
+    # ================== MÉTRICAS ==================
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "nombre": self.nombre,
+                "pendientes": len(self._pendientes),
+                "maxPendientes": self.max_pendientes,
+                "escritos": self._escritos,
+                "descartados": self._descartados,
+                "errores": self._errores,
+                "lotes": self._lotes,
+                "ultimoLoteMs": round(self._ultimo_lote_ms, 2),
+                "mediaLoteMs": round(self._total_lote_ms / self._lotes, 2) if self._lotes else 0.0,
+                "maxLoteMs": round(self._max_lote_ms, 2),
+                "ultimaEscritura": self._ultima_escritura.isoformat() if self._ultima_escritura else None
+            }
@@ -0,0 +1,432 @@
+import logging
+import csv
+import fcntl
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from backend.model.buffers.bufferEscritura import BufferEscritura
+from backend.model.dto.reproduccionDTO import ReproduccionDTO
+from backend.model.dao.postgresql.postgresDAOFactory import PostgreSQLDAOFactory
+from backend.model.dao.postgresql.collection.postgresParticionesDAO import es_error_sin_particion
+from backend.controller.config import (
+    REPRODUCCIONES_DURABILIDAD,
+    REPRODUCCIONES_TAMANO_LOTE,
+    REPRODUCCIONES_INTERVALO_MS,
+    REPRODUCCIONES_MAX_PENDIENTES,
+    REPRODUCCIONES_SPOOL_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+MODOS_DURABILIDAD = ("flush", "spool")
+
+
+def es_error_de_datos(error: Exception) -> bool:
+    """
+    Errores de las propias filas (clase 22, datos, o 23, restricciones): repetir el mismo lote
+    volvería a fallar. Los de conexión o de la BD caída sí se arreglan reintentando, y los
+    de fecha sin partición se arreglan al reintentar (ver _insertar).
+    """
+    codigo = getattr(getattr(error, "orig", error), "pgcode", None) or ""
+    return codigo[:2] in ("22", "23") and not es_error_sin_particion(error)
+
+
+class ResultadoIncierto(Exception):
+    """
+    Modo flush: se agotó la espera cuando parte de las reproducciones de la petición ya iban
+    en un lote escribiéndose. Pueden acabar guardadas o no; reintentar podría duplicarlas.
+    """
+    pass
+
+
+class _Confirmacion:
+    """Espera de una petición (modo flush) hasta que todas sus reproducciones están en BD."""
+
+    def __init__(self, total: int):
+        self._restantes = total
+        self._lock = threading.Lock()
+        self._hecho = threading.Event()
+        self.error = None
+
+    def completar(self, cuantas: int, error: Exception | None = None):
+        with self._lock:
+            if error is not None and self.error is None:
+                self.error = error
+            self._restantes -= cuantas
+            if self._restantes <= 0:
+                self._hecho.set()
+
+    def terminada(self) -> bool:
+        return self._hecho.is_set()
+
+    def esperar(self, timeout: float):
+        if not self._hecho.wait(timeout):
+            raise TimeoutError("Tiempo agotado esperando a que se guarden las reproducciones")
+        if self.error is not None:
+            raise self.error
+
+
+class BufferReproducciones(BufferEscritura):
+    """
+    Ingesta de reproducciones en `historialreproducciones` con COPY FROM STDIN.
+
+    Cada elemento de la cola es (ReproduccionDTO, _Confirmacion | None).
+    - Modo "flush": `registrar` no vuelve hasta que el lote con sus reproducciones
+      está confirmado en BD (si falla, la petición recibe el error, como antes).
+    - Modo "spool": `registrar` añade las reproducciones al fichero de spool (append +
+      fsync) y vuelve. Cada escritura en BD se lleva los segmentos de spool que cubre
+      y los borra al confirmarse; si la BD falla se reintenta y, si el proceso muere,
+      los segmentos que queden se reenvían al arrancar. Si el lote falla por sus datos,
+      se parte para aislar las filas que la BD rechaza; esas van a `rechazadas/` dentro de
+      (no se reenvían) y el resto se guarda.
+
+    Con varios workers cada proceso escribe en su propia carpeta dentro de `spool_dir`
+    (proceso-<pid>-<ns>), bloqueada con flock mientras vive. Al arrancar, un proceso solo
+    se queda con las carpetas cuyo cerrojo está libre, es decir, las de procesos muertos:
+    nunca reenvía segmentos que otro worker vivo todavía tiene en su cola.
+    """
+
+    def __init__(self, durabilidad: str = REPRODUCCIONES_DURABILIDAD,
+                 tamano_lote: int = REPRODUCCIONES_TAMANO_LOTE,
+                 intervalo_ms: int = REPRODUCCIONES_INTERVALO_MS,
+                 max_pendientes: int = REPRODUCCIONES_MAX_PENDIENTES,
+                 spool_dir: str = REPRODUCCIONES_SPOOL_DIR,
+                 timeout_confirmacion: float = 30):
+        if durabilidad not in MODOS_DURABILIDAD:
+            raise ValueError(f"REPRODUCCIONES_DURABILIDAD debe ser uno de {MODOS_DURABILIDAD}, no '{durabilidad}'")
+        super().__init__("reproducciones", tamano_lote, intervalo_ms / 1000, max_pendientes)
+        self.durabilidad = durabilidad
+        self.timeout_confirmacion = timeout_confirmacion
+
+        # Spool
+        self.spool_raiz = spool_dir
+        self.spool_dir = None              # Carpeta de este proceso (se crea al iniciar)
+        self._spool_cerrojo = None         # Fichero .lock de esa carpeta, con flock mientras vive
+        self._spool = None                 # Segmento abierto en el que se añaden eventos
+        self._spool_ruta = None
+        self._segmentos_pendientes = []    # Segmentos cerrados cuyos eventos aún no están en BD
+        self._segmentos_lote = []          # Segmentos que cubre el lote que se está escribiendo
+        self._spool_recuperado = False
+        self._rechazadas = 0
+
+    # ================== ENTRADA ==================
+
+    def registrar(self, reproducciones: list[ReproduccionDTO]) -> int:
+        """Encola reproducciones y vuelve según el modo de durabilidad."""
+        if not reproducciones:
+            return 0
+        if self.durabilidad == "spool":
+            return self.agregar([(r, None) for r in reproducciones])
+
+        confirmacion = _Confirmacion(len(reproducciones))
+        self.agregar([(r, confirmacion) for r in reproducciones])
+        try:
+            confirmacion.esperar(self.timeout_confirmacion)
+        except TimeoutError:
+            # Si ninguna ha entrado todavía en un lote se retiran todas: la petición falla y no
+            # se guardará nada, así que el cliente puede reintentar sin duplicar
+            if self._retirar(confirmacion, len(reproducciones)):
+                raise
+            if confirmacion.terminada():
+                confirmacion.esperar(0)   # Ha terminado justo ahora: éxito, o su error
+                return len(reproducciones)
+            raise ResultadoIncierto(
+                "Tiempo agotado con reproducciones ya escribiéndose: pueden guardarse o no"
+            ) from None
+        return len(reproducciones)
+
+    def _retirar(self, confirmacion: _Confirmacion, total: int) -> bool:
+        """Quita de la cola los eventos de `confirmacion` si siguen estando todos (ninguno en un lote)."""
+        with self._lock:
+            if sum(1 for _, c in self._pendientes if c is confirmacion) != total:
+                return False
+            self._pendientes = [e for e in self._pendientes if e[1] is not confirmacion]
+            return True
+
+    def _encolar(self, eventos: list):
+        super()._encolar(eventos)
+        if self.durabilidad != "spool":
+            return
+        try:
+            self._escribir_spool([r for r, _ in eventos])
+        except Exception:
+            # Si no se pudo guardar en disco no se confirma nada
+            del self._pendientes[-len(eventos):]
+            raise
+
+    # ================== ESCRITURA EN BD ==================
+
+    def _tomar_lote(self) -> list:
+        if self.durabilidad != "spool":
+            return super()._tomar_lote()
+
+        # En modo spool el lote es todo lo pendiente, para que cubra segmentos completos
+        lote = self._pendientes
+        self._pendientes = []
+        self._cerrar_segmento()
+        self._segmentos_lote = self._segmentos_pendientes
+        self._segmentos_pendientes = []
+        return lote
+
+    def _escribir(self, lote: list):
+        factory = PostgreSQLDAOFactory()
+        reproducciones = [r for r, _ in lote]
+        rechazadas = []
+        try:
+            if self.durabilidad == "spool":
+                rechazadas = self._insertar_aislando(factory, reproducciones)
+            else:
+                self._insertar(factory, reproducciones)
+            factory.db.commit()
+        except Exception:
+            factory.db.rollback()
+            raise
+        finally:
+            factory.close()
+        if rechazadas:
+            self._apartar_rechazadas(rechazadas)
+
+    def _insertar(self, factory, reproducciones: list[ReproduccionDTO]):
+        try:
+            with factory.db.begin_nested():
+                factory.get_reproducciones_dao().insertar_reproducciones_lote(reproducciones)
+        except Exception as e:
+            if not es_error_sin_particion(e):
+                raise
+            # Alguna fecha sin partición: se crea la que falte o, si el mes ya se archivó,
+            # esas reproducciones van a su resumen mensual. El resto del lote se reintenta.
+            con_particion, archivadas = factory.get_particiones_dao().separar_por_particion(
+                "historialreproducciones", reproducciones, lambda r: r.fecha
+            )
+            factory.get_reproducciones_dao().insertar_reproducciones_lote(con_particion)
+            factory.get_reproducciones_dao().sumar_reproducciones_archivadas(archivadas)
+            if archivadas:
+                logger.warning(f"{len(archivadas)} reproducciones de meses ya archivados sumadas a reproduccionesmensual")
+
+    def _insertar_aislando(self, factory, reproducciones: list[ReproduccionDTO]) -> list[tuple]:
+        """
+        Inserta lo que la BD acepte y devuelve [(reproducción, error)] de las que rechaza por
+        sus datos, partiendo el lote por la mitad hasta aislarlas. Cada intento va en un
+        SAVEPOINT de la misma transacción: si falla por otra causa (BD caída) no queda nada
+        escrito y el lote entero se reintenta.
+        """
+        try:
+            with factory.db.begin_nested():
+                self._insertar(factory, reproducciones)
+            return []
+        except Exception as e:
+            if not es_error_de_datos(e):
+                raise
+            if len(reproducciones) == 1:
+                return [(reproducciones[0], e)]
+        mitad = len(reproducciones) // 2
+        return (self._insertar_aislando(factory, reproducciones[:mitad])
+                + self._insertar_aislando(factory, reproducciones[mitad:]))
+
+    def _apartar_rechazadas(self, rechazadas: list[tuple]):
+        """Guarda las reproducciones rechazadas (con el error) fuera del spool, para revisarlas a mano."""
+        carpeta = os.path.join(self.spool_raiz, "rechazadas")
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"reproducciones-{os.getpid()}-{time.time_ns()}.csv")
+        with open(ruta, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            for r, error in rechazadas:
+                escritor.writerow([r.id_usuario, r.id_contenido, r.segundos, r.fecha.isoformat(), str(error).strip()])
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self._rechazadas += len(rechazadas)
+        logger.error(f"{len(rechazadas)} reproducciones rechazadas por la BD apartadas en {ruta}")
+
+    def _al_escribir(self, lote: list):
+        if self.durabilidad == "spool":
+            for ruta in self._segmentos_lote:
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+            self._segmentos_lote = []
+            return
+
+        for confirmacion, cuantas in Counter(c for _, c in lote if c is not None).items():
+            confirmacion.completar(cuantas)
+
+    def _al_fallar(self, lote: list, error: Exception):
+        if self.durabilidad == "spool":
+            # Ya estaban confirmadas: se reintentan (y siguen en disco). Aquí solo llegan errores
+            # que no son de los datos, porque las filas rechazadas ya se han apartado
+            with self._lock:
+                self._pendientes[:0] = lote
+                self._segmentos_pendientes[:0] = self._segmentos_lote
+            self._segmentos_lote = []
+            return
+
+        # Modo flush: la petición recibe el error y decide si reintentar
+        for confirmacion, cuantas in Counter(c for _, c in lote if c is not None).items():
+            confirmacion.completar(cuantas, error)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            rechazadas = self._rechazadas
+        return {**super().estadisticas(), "rechazadas": rechazadas}
+
+    # ================== SPOOL ==================
+
+    def iniciar(self):
+        if self.durabilidad == "spool" and not self._spool_recuperado:
+            self._recuperar_spool()
+        super().iniciar()
+
+    def detener(self, timeout: float = 30):
+        super().detener(timeout)
+        if self.durabilidad == "spool":
+            self._soltar_carpeta_spool()
+
+    def _escribir_spool(self, reproducciones: list[ReproduccionDTO]):
+        """Añade reproducciones al segmento abierto. Se llama con `_lock` cogido."""
+        if self._spool is None:
+            if self.spool_dir is None:
+                self._tomar_carpeta_spool()
+            self._spool_ruta = os.path.join(self.spool_dir, f"reproducciones-{time.time_ns()}.spool")
+            self._spool = open(self._spool_ruta, "a", newline="", encoding="utf-8")
+
+        escritor = csv.writer(self._spool)
+        for r in reproducciones:
+            escritor.writerow([r.id_usuario, r.id_contenido, r.segundos, r.fecha.isoformat()])
+        self._spool.flush()
+        os.fsync(self._spool.fileno())
+
+    def _cerrar_segmento(self):
+        """Cierra el segmento abierto y lo pasa a pendientes. Se llama con `_lock` cogido."""
+        if self._spool is None:
+            return
+        self._spool.close()
+        self._segmentos_pendientes.append(self._spool_ruta)
+        self._spool = None
+        self._spool_ruta = None
+
+    @staticmethod
+    def _es_segmento(nombre: str) -> bool:
+        return nombre.startswith("reproducciones-") and nombre.endswith(".spool")
+
+    @staticmethod
+    def _bloquear(carpeta: str):
+        """flock exclusivo sobre el .lock de `carpeta`. Devuelve el fichero, o None si lo tiene otro proceso."""
+        cerrojo = open(os.path.join(carpeta, ".lock"), "a")
+        try:
+            fcntl.flock(cerrojo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            cerrojo.close()
+            return None
+        return cerrojo
+
+    def _tomar_carpeta_spool(self):
+        """Crea la carpeta de spool de este proceso y la bloquea."""
+        os.makedirs(self.spool_raiz, exist_ok=True)
+        # Se bloquea con un nombre que nadie adopta y luego se renombra: así no hay un momento
+        # en que otro proceso la vea con el cerrojo libre
+        temporal = os.path.join(self.spool_raiz, f".nueva-{os.getpid()}-{time.time_ns()}")
+        os.makedirs(temporal)
+        self._spool_cerrojo = self._bloquear(temporal)
+        self.spool_dir = os.path.join(self.spool_raiz, os.path.basename(temporal).replace(".nueva-", "proceso-", 1))
+        os.rename(temporal, self.spool_dir)
+
+    def _soltar_carpeta_spool(self):
+        """Al parar: si no queda nada por escribir se borra la carpeta; si queda, la adoptará otro proceso."""
+        if self._spool_cerrojo is None:
+            return
+        with self._lock:
+            self._cerrar_segmento()
+        try:
+            if not any(self._es_segmento(f) for f in os.listdir(self.spool_dir)):
+                os.remove(os.path.join(self.spool_dir, ".lock"))
+                os.rmdir(self.spool_dir)
+        except OSError as e:
+            logger.warning(f"No se pudo borrar la carpeta de spool {self.spool_dir}: {e}")
+        self._spool_cerrojo.close()
+        self._spool_cerrojo = None
+        self.spool_dir = None
+
+    def _adoptar_segmentos_huerfanos(self):
+        """
+        Mueve a la carpeta de este proceso los segmentos de procesos muertos (su cerrojo está
+        libre) y los que haya sueltos en `spool_raiz` (de versiones sin carpeta por proceso).
+        """
+        for nombre in sorted(os.listdir(self.spool_raiz)):
+            origen = os.path.join(self.spool_raiz, nombre)
+            if self._es_segmento(nombre):
+                os.rename(origen, os.path.join(self.spool_dir, nombre))
+                continue
+            if not nombre.startswith("proceso-") or origen == self.spool_dir:
+                continue
+            try:
+                cerrojo = self._bloquear(origen)
+                if cerrojo is None:
+                    continue    # Su proceso sigue vivo
+                try:
+                    for segmento in os.listdir(origen):
+                        if self._es_segmento(segmento):
+                            os.rename(os.path.join(origen, segmento), os.path.join(self.spool_dir, segmento))
+                    os.remove(os.path.join(origen, ".lock"))
+                    os.rmdir(origen)
+                finally:
+                    cerrojo.close()
+            except OSError:
+                # Otro proceso la ha adoptado a la vez y ya la ha borrado
+                continue
+
+    def _recuperar_spool(self):
+        """Vuelve a encolar las reproducciones de segmentos que no llegaron a la BD."""
+        self._spool_recuperado = True
+        with self._lock:
+            if self.spool_dir is None:
+                self._tomar_carpeta_spool()
+        self._adoptar_segmentos_huerfanos()
+
+        segmentos = sorted(
+            os.path.join(self.spool_dir, f)
+            for f in os.listdir(self.spool_dir)
+            if self._es_segmento(f)
+        )
+        recuperadas = []
+        for ruta in segmentos:
+            with open(ruta, newline="", encoding="utf-8") as f:
+                for fila in csv.reader(f):
+                    try:
+                        recuperadas.append((ReproduccionDTO(
+                            id_usuario=int(fila[0]),
+                            id_contenido=int(fila[1]),
+                            segundos=int(fila[2]),
+                            fecha=datetime.fromisoformat(fila[3])
+                        ), None))
+                    except (IndexError, ValueError):
+                        # Última línea a medias si el proceso murió escribiendo
+                        continue
+
+        with self._lock:
+            self._pendientes[:0] = recuperadas
+            self._segmentos_pendientes[:0] = segmentos
+        if segmentos:
+            logger.info(f"Recuperadas {len(recuperadas)} reproducciones de {len(segmentos)} segmentos de spool")
+            self._hay_trabajo.set()
+
+
+# Buffer compartido por todas las peticiones del proceso
+_buffer = None
+_lock_buffer = threading.Lock()
+
+def get_buffer_reproducciones() -> BufferReproducciones:
+    global _buffer
+    with _lock_buffer:
+        if _buffer is None:
+            _buffer = BufferReproducciones()
+    return _buffer
+
+def detener_buffer_reproducciones():
+    global _buffer
+    with _lock_buffer:
+        if _buffer is not None:
+            _buffer.detener()
+            _buffer = None
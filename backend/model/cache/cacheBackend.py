@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+
+
+class CacheBackend(ABC):
+    """
+    Almacén de la caché de consultas. Guarda cadenas (JSON) con un TTL y lleva
+    un número de versión por espacio de nombres, que es lo que se incrementa para
+    invalidar (las claves incluyen la versión, así que las antiguas dejan de usarse).
+    """
+
+    @abstractmethod
+    def get(self, clave: str) -> str | None:
+        """Devuelve el valor guardado o None si no está o ha caducado."""
+        pass
+
+    @abstractmethod
+    def set(self, clave: str, valor: str, ttl: int):
+        """Guarda `valor` durante `ttl` segundos."""
+        pass
+
+    @abstractmethod
+    def get_version(self, namespace: str) -> int:
+        """Versión actual del espacio de nombres (0 si nunca se ha invalidado)."""
+        pass
+
+    @abstractmethod
+    def incrementar_version(self, namespace: str) -> int:
+        """Invalida todo el espacio de nombres. Devuelve la nueva versión."""
+        pass
+
+    @abstractmethod
+    def num_entradas(self) -> int | None:
+        """Entradas guardadas (None si el backend no lo sabe de forma barata)."""
+        pass
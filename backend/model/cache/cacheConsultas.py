@@ -0,0 +1,214 @@
+import logging
+import functools
+import inspect
+import json
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from backend.model.cache.cacheBackend import CacheBackend
+from backend.model.cache.cacheMemoria import CacheMemoria
+from backend.model.dao.postgresql.replicas import en_primario
+from backend.controller.config import CACHE_BACKEND, CACHE_TTL, CACHE_MAX_ENTRADAS, CACHE_REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Espacios de nombres: uno por tabla de origen. Se invalida el espacio entero
+# cuando se confirma cualquier escritura en esa tabla.
+CACHE_ARTISTAS = "artistas"        # artistasmensual
+CACHE_CONTENIDOS = "contenidos"    # contenidosmensual
+CACHE_COMUNIDADES = "comunidades"  # comunidadesmensual
+
+
+def _a_json(valor):
+    """Tipos que devuelven los DAOs y que json no sabe serializar (igual que haría FastAPI)."""
+    if hasattr(valor, "to_dict"):
+        return valor.to_dict()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"No se puede cachear un {type(valor).__name__}")
+
+
+class CacheConsultas:
+    """
+    Caché de lectura de los métodos de Model, con clave (espacio, versión, método, argumentos).
+    Los valores se guardan como JSON, así que cada acierto devuelve una copia nueva.
+    Si el backend falla, se comporta como un fallo de caché (nunca rompe la petición).
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: int = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._metricas = {}   # namespace -> {"aciertos", "fallos", "invalidaciones", "errores"}
+
+    @property
+    def activa(self) -> bool:
+        return self.backend is not None
+
+    def _contar(self, namespace: str, metrica: str):
+        with self._lock:
+            metricas = self._metricas.setdefault(
+                namespace, {"aciertos": 0, "fallos": 0, "invalidaciones": 0, "errores": 0}
+            )
+            metricas[metrica] += 1
+
+    def _clave(self, namespace: str, metodo: str, argumentos: dict) -> str:
+        version = self.backend.get_version(namespace)
+        args = json.dumps(argumentos, sort_keys=True, default=str)
+        return f"{namespace}:v{version}:{metodo}:{args}"
+
+    def obtener(self, namespace: str, metodo: str, argumentos: dict):
+        """Devuelve (encontrado, valor, clave). La clave sirve luego para `guardar`."""
+        try:
+            clave = self._clave(namespace, metodo, argumentos)
+            valor = self.backend.get(clave)
+        except Exception as e:
+            logger.warning(f"Error leyendo caché ({namespace}.{metodo}): {e}")
+            self._contar(namespace, "errores")
+            return False, None, None
+
+        if valor is None:
+            self._contar(namespace, "fallos")
+            return False, None, clave
+        self._contar(namespace, "aciertos")
+        return True, json.loads(valor), clave
+
+    def guardar(self, namespace: str, clave: str | None, valor):
+        if clave is None:
+            return
+        try:
+            self.backend.set(clave, json.dumps(valor, default=_a_json), self.ttl)
+        except Exception as e:
+            logger.warning(f"Error guardando en caché ({clave}): {e}")
+            self._contar(namespace, "errores")
+
+    def version(self, namespace: str) -> int | None:
+        """Versión actual del espacio de nombres (None si la caché está desactivada o falla)."""
+        if not self.activa:
+            return None
+        try:
+            return self.backend.get_version(namespace)
+        except Exception as e:
+            logger.warning(f"Error leyendo versión de caché ({namespace}): {e}")
+            self._contar(namespace, "errores")
+            return None
+
+    def invalidar(self, *namespaces: str) -> dict:
+        """Invalida los espacios indicados. Devuelve {namespace: nueva versión}."""
+        versiones = {}
+        if not self.activa:
+            return versiones
+        for namespace in namespaces:
+            try:
+                versiones[namespace] = self.backend.incrementar_version(namespace)
+                self._contar(namespace, "invalidaciones")
+            except Exception as e:
+                logger.warning(f"Error invalidando caché ({namespace}): {e}")
+                self._contar(namespace, "errores")
+        return versiones
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            por_namespace = {n: dict(m) for n, m in self._metricas.items()}
+        aciertos = sum(m["aciertos"] for m in por_namespace.values())
+        fallos = sum(m["fallos"] for m in por_namespace.values())
+
+        entradas = None
+        if self.activa:
+            try:
+                entradas = self.backend.num_entradas()
+            except Exception:
+                entradas = None
+
+        return {
+            "backend": type(self.backend).__name__ if self.activa else None,
+            "ttl": self.ttl,
+            "entradas": entradas,
+            "aciertos": aciertos,
+            "fallos": fallos,
+            "ratioAciertos": round(aciertos / (aciertos + fallos), 4) if aciertos + fallos else 0.0,
+            "porNamespace": por_namespace
+        }
+
+
+def crear_backend(tipo: str = CACHE_BACKEND) -> CacheBackend | None:
+    if tipo == "memoria":
+        return CacheMemoria(CACHE_MAX_ENTRADAS)
+    if tipo == "redis":
+        from backend.model.cache.cacheRedis import CacheRedis
+        return CacheRedis(CACHE_REDIS_URL)
+    if tipo == "ninguna":
+        return None
+    raise ValueError(f"CACHE_BACKEND debe ser 'memoria', 'redis' o 'ninguna', no '{tipo}'")
+
+
+# Caché compartida por todo el proceso
+_cache = None
+_lock_cache = threading.Lock()
+
+def get_cache() -> CacheConsultas:
+    global _cache
+    with _lock_cache:
+        if _cache is None:
+            _cache = CacheConsultas(crear_backend())
+    return _cache
+
+def invalidar_cache(*namespaces: str) -> dict:
+    """Invalida los espacios indicados. Llamar después del commit, no antes."""
+    return get_cache().invalidar(*namespaces)
+
+
+def cacheado(namespace: str):
+    """
+    Decorador para métodos de lectura (síncronos o async) de Model/AsyncModel.
+    La clave usa el nombre del método y sus argumentos ya con los valores por defecto,
+    así que f(10) y f(limit=10) comparten entrada, también entre Model y AsyncModel.
+    Lo que se guarda se lee del primario, no de una réplica: una réplica con retraso
+    volvería a llenar la caché, recién invalidada, con datos de antes de la escritura.
+
+    El método envuelto queda con `cache_namespace` y `cache_argumentos(args, kwargs)`, para
+    que AsyncModel consulte la caché fuera del event loop y llame solo al método original
+    (`__wrapped__`) dentro de la sesión.
+    """
+    def decorador(metodo):
+        firma = inspect.signature(metodo)
+
+        def argumentos(args, kwargs) -> dict:
+            enlazados = firma.bind(None, *args, **kwargs)
+            enlazados.apply_defaults()
+            return {k: v for k, v in list(enlazados.arguments.items())[1:]}   # sin self
+
+        if inspect.iscoroutinefunction(metodo):
+            @functools.wraps(metodo)
+            async def envoltorio_async(self, *args, **kwargs):
+                cache = get_cache()
+                if not cache.activa:
+                    return await metodo(self, *args, **kwargs)
+                encontrado, valor, clave = cache.obtener(namespace, metodo.__name__, argumentos(args, kwargs))
+                if encontrado:
+                    return valor
+                with en_primario(self.db):
+                    valor = await metodo(self, *args, **kwargs)
+                cache.guardar(namespace, clave, valor)
+                return valor
+            return envoltorio_async
+
+        @functools.wraps(metodo)
+        def envoltorio(self, *args, **kwargs):
+            cache = get_cache()
+            if not cache.activa:
+                return metodo(self, *args, **kwargs)
+            encontrado, valor, clave = cache.obtener(namespace, metodo.__name__, argumentos(args, kwargs))
+            if encontrado:
+                return valor
+            with en_primario(self.db):
+                valor = metodo(self, *args, **kwargs)
+            cache.guardar(namespace, clave, valor)
+            return valor
+        envoltorio.cache_namespace = namespace
+        envoltorio.cache_argumentos = argumentos
+        return envoltorio
+
+    return decorador
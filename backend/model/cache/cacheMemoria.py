@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import OrderedDict
+from backend.model.cache.cacheBackend import CacheBackend
+
+
+class CacheMemoria(CacheBackend):
+    """
+    Caché en el propio proceso: LRU con como mucho `max_entradas` y caducidad por TTL.
+    Cada worker tiene la suya, así que una invalidación solo afecta a este proceso
+    (para compartirla entre workers usar CacheRedis).
+    """
+
+    def __init__(self, max_entradas: int = 1000):
+        self.max_entradas = max(1, max_entradas)
+        self._entradas = OrderedDict()   # clave -> (caduca_en, valor)
+        self._versiones = {}
+        self._lock = threading.Lock()
+
+    def get(self, clave: str) -> str | None:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            caduca_en, valor = entrada
+            if caduca_en <= time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return valor
+
+    def set(self, clave: str, valor: str, ttl: int):
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def get_version(self, namespace: str) -> int:
+        with self._lock:
+            return self._versiones.get(namespace, 0)
+
+    def incrementar_version(self, namespace: str) -> int:
+        with self._lock:
+            self._versiones[namespace] = self._versiones.get(namespace, 0) + 1
+            # Las entradas de versiones anteriores ya no se pueden pedir: se liberan ya
+            prefijo = f"{namespace}:"
+            for clave in [c for c in self._entradas if c.startswith(prefijo)]:
+                del self._entradas[clave]
+            return self._versiones[namespace]
+
+    def num_entradas(self) -> int | None:
+        with self._lock:
+            return len(self._entradas)
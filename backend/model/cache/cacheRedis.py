@@ -0,0 +1,42 @@
+from backend.model.cache.cacheBackend import CacheBackend
+
+
+class CacheRedis(CacheBackend):
+    """
+    Caché compartida en Redis: todos los workers e instancias ven las mismas entradas
+    y la misma versión de cada espacio de nombres, así que una invalidación hecha por
+    uno (p. ej. el job de sincronización) vale para todos.
+
+    Se le puede pasar un `cliente` ya creado (p. ej. fakeredis.FakeRedis() en local);
+    si no, se crea uno a partir de `url` (requiere el paquete `redis`).
+    """
+
+    PREFIJO = "estadisticas:cache:"
+
+    def __init__(self, url: str | None = None, cliente=None):
+        if cliente is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis necesita el paquete 'redis' (pip install redis)") from e
+            cliente = redis.Redis.from_url(url, decode_responses=True)
+        self.cliente = cliente
+
+    def get(self, clave: str) -> str | None:
+        valor = self.cliente.get(self.PREFIJO + clave)
+        if isinstance(valor, bytes):
+            valor = valor.decode("utf-8")
+        return valor
+
+    def set(self, clave: str, valor: str, ttl: int):
+        self.cliente.set(self.PREFIJO + clave, valor, ex=ttl)
+
+    def get_version(self, namespace: str) -> int:
+        return int(self.cliente.get(f"{self.PREFIJO}version:{namespace}") or 0)
+
+    def incrementar_version(self, namespace: str) -> int:
+        # Las entradas de la versión anterior no se borran: caducan solas por TTL
+        return int(self.cliente.incr(f"{self.PREFIJO}version:{namespace}"))
+
+    def num_entradas(self) -> int | None:
+        return None
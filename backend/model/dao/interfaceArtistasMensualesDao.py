@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from backend.model.dto.artistaMensualDTO import ArtistaMensualDTO
 
 
@@ -12,10 +12,25 @@ class InterfaceArtistasMensualesDao(ABC):
         """Actualiza o inserta un artista mensual."""
         pass
 
+    @abstractmethod
+    def bulk_upsert(self, dtos: List[ArtistaMensualDTO]) -> int:
+        """Actualiza o inserta muchos artistas mensuales de una vez. Devuelve las filas afectadas."""
+        pass
+
     @abstractmethod
     def obtener_todos(self) -> List[ArtistaMensualDTO]:
         """Devuelve todos los artistas mensuales."""
         pass
+
+    @abstractmethod
+    def obtener_pagina(self, despues_de: Optional[int] = None, limite: int = 100) -> List[ArtistaMensualDTO]:
+        """Devuelve hasta `limite` artistas con id mayor que `despues_de`, ordenados por id."""
+        pass
+
+    @abstractmethod
+    def iterar_todos(self, tamano_lote: int = 1000) -> Iterator[ArtistaMensualDTO]:
+        """Recorre todos los artistas con un cursor de servidor, sin cargarlos a la vez en memoria."""
+        pass
     
     @abstractmethod
     def obtener_por_id(self, id_artista: int) -> Optional[ArtistaMensualDTO]:
@@ -27,3 +42,7 @@ class InterfaceArtistasMensualesDao(ABC):
         """Devuelve el ranking de artistas por número de oyentes."""
         pass
 
+    @abstractmethod
+    def eliminar(self, id_artista: int) -> bool:
+        """Elimina un artista mensual. Devuelve False si no existía."""
+        pass
@@ -12,6 +12,16 @@ class InterfaceBusquedasArtistasDao(ABC):
         """Inserta una búsqueda para un artista o actualiza si ya existe."""
         pass
 
+    @abstractmethod
+    def insertar_busquedas_lote(self, busquedas: List[tuple]) -> int:
+        """Inserta un lote de búsquedas (idartista, idusuario, fecha), devolviendo cuántas se escribieron."""
+        pass
+
+    @abstractmethod
+    def sumar_busquedas_archivadas(self, busquedas: List[tuple]) -> int:
+        """Suma al resumen mensual búsquedas de meses ya archivados (sin partición en el log)."""
+        pass
+
     @abstractmethod
     def get_top_artistas_busquedas(self, limit: int = 10) -> List[BusquedaArtistaDTO]:
         """Devuelve el ranking de artistas más buscados del mes."""
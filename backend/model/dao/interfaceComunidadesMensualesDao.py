@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from backend.model.dto.comunidadMensualDTO import ComunidadDTO
 
 
@@ -12,10 +12,25 @@ class InterfaceComunidadesMensualesDAO(ABC):
         """Inserta o actualiza una comunidad mensual."""
         pass 
 
+    @abstractmethod
+    def bulk_upsert(self, dtos: List[ComunidadDTO]) -> int:
+        """Inserta o actualiza muchas comunidades mensuales de una vez. Devuelve las filas afectadas."""
+        pass
+
     @abstractmethod
     def obtener_todas(self) -> List[dict]:
         """Devuelve una lista de diccionarios con todas las comunidades."""
         pass
+
+    @abstractmethod
+    def obtener_pagina(self, despues_de: Optional[int] = None, limite: int = 100) -> List[ComunidadDTO]:
+        """Devuelve hasta `limite` comunidades con id mayor que `despues_de`, ordenadas por id."""
+        pass
+
+    @abstractmethod
+    def iterar_todas(self, tamano_lote: int = 1000) -> Iterator[ComunidadDTO]:
+        """Recorre todas las comunidades con un cursor de servidor, sin cargarlas a la vez en memoria."""
+        pass
     
     @abstractmethod
     def obtener_ranking_miembros(self, top_n: Optional[int] = 10) -> List[dict]:
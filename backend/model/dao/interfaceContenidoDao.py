@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from backend.model.dto.contenidoDTO import ContenidoDTO
 
 class InterfaceContenidoDao(ABC):
@@ -12,10 +12,25 @@ class InterfaceContenidoDao(ABC):
         """Devuelve todos los registros de números de reproducciones de contenidos."""
         pass
 
+    @abstractmethod
+    def obtener_pagina(self, despues_de: Optional[int] = None, limite: int = 100) -> List[ContenidoDTO]:
+        """Devuelve hasta `limite` contenidos con id mayor que `despues_de`, ordenados por id."""
+        pass
+
+    @abstractmethod
+    def iterar_todos(self, tamano_lote: int = 1000) -> Iterator[ContenidoDTO]:
+        """Recorre todos los contenidos con un cursor de servidor, sin cargarlos a la vez en memoria."""
+        pass
+
     @abstractmethod
     def actualizar_o_insertar(self, dto: ContenidoDTO) -> bool:
         """Actualiza o inserta un registro de número de reproducciones de contenido."""
         pass
+
+    @abstractmethod
+    def bulk_upsert(self, dtos: List[ContenidoDTO]) -> int:
+        """Actualiza o inserta muchos contenidos de una vez. Devuelve las filas afectadas."""
+        pass
     
     @abstractmethod
     def obtener_por_id(self, id_contenido: int) -> Optional[ContenidoDTO]:
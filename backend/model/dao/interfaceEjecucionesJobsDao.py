@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class InterfaceEjecucionesJobsDao(ABC):
+    """
+    Interfaz para el historial de ejecuciones de los jobs del scheduler.
+    """
+
+    @abstractmethod
+    def registrar(self, job: str, instancia: str, inicio: datetime, duracion_ms: int,
+                  estado: str, filas: int | None = None, error: str | None = None):
+        """Guarda una ejecución terminada (estado 'ok' o 'error')."""
+        pass
+
+    @abstractmethod
+    def obtener_ultimas(self, job: str | None = None, limite: int = 50) -> list[dict]:
+        """Últimas ejecuciones (de `job`, o de todos), de la más reciente a la más antigua."""
+        pass
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable
+
+
+class InterfaceHuellasSincronizacionDao(ABC):
+    """
+    Interfaz para las huellas de la última sincronización de cada entidad
+    (hash de lo escrito), que usa la sincronización masiva en modo delta.
+    """
+
+    @abstractmethod
+    def obtener(self, entidad: str) -> Dict[int, str]:
+        """Devuelve {id: huella} de todas las filas de `entidad`."""
+        pass
+
+    @abstractmethod
+    def guardar(self, entidad: str, huellas: Dict[int, str]) -> int:
+        """Inserta o actualiza las huellas {id: huella}. Devuelve las filas afectadas."""
+        pass
+
+    @abstractmethod
+    def eliminar(self, entidad: str, ids: Iterable[int]) -> int:
+        """Borra las huellas de `ids` (la fila ya no existe). Devuelve las filas borradas."""
+        pass
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List
+
+
+class InterfaceParticionesDao(ABC):
+    """
+    Interfaz para el mantenimiento de las particiones mensuales de los logs
+    (busquedasartistas e historialreproducciones).
+    """
+
+    @abstractmethod
+    def crear_particion_mensual(self, tabla: str, mes: date) -> str:
+        """Crea (si no existe) la partición de `tabla` para el mes de `mes`. Devuelve su nombre."""
+        pass
+
+    @abstractmethod
+    def asegurar_particiones(self, meses_adelante: int = 2) -> List[str]:
+        """Crea las particiones del mes actual y de los `meses_adelante` siguientes en todos los logs."""
+        pass
+
+    @abstractmethod
+    def separar_por_particion(self, tabla: str, eventos: list, fecha_de) -> tuple[list, list]:
+        """Crea las particiones que falten desde el mes en curso y separa (con partición, de meses ya archivados)."""
+        pass
+
+    @abstractmethod
+    def listar_particiones_cerradas(self, antes_de: date) -> List[tuple]:
+        """Devuelve [(tabla, particion, mes)] de las particiones de meses anteriores a `antes_de` (colgadas o ya sueltas)."""
+        pass
+
+    @abstractmethod
+    def soltar_particion(self, tabla: str, particion: str):
+        """Suelta la partición de la tabla sin bloquear las demás. Después ya no recibe filas."""
+        pass
+
+    @abstractmethod
+    def archivar_particion(self, tabla: str, particion: str, mes: date) -> int:
+        """Suma la partición ya soltada a su tabla mensual y la borra. Devuelve las filas de resumen escritas."""
+        pass
@@ -12,6 +12,16 @@ class InterfaceReproduccionesDao(ABC):
         """Registra una nueva reproducción."""
         pass
 
+    @abstractmethod
+    def insertar_reproducciones_lote(self, reproducciones: List[ReproduccionDTO]) -> int:
+        """Inserta un lote de reproducciones de una vez, devolviendo cuántas se escribieron."""
+        pass
+
+    @abstractmethod
+    def sumar_reproducciones_archivadas(self, reproducciones: List[ReproduccionDTO]) -> int:
+        """Suma a reproduccionesmensual reproducciones de meses ya archivados (sin partición en el log)."""
+        pass
+
     @abstractmethod
     def obtener_historial_por_usuario(self, id_usuario: int, limit: int = 50) -> list[ReproduccionDTO]:
         """Recupera el historial de reproducciones de un usuario."""
@@ -23,7 +33,7 @@ class InterfaceReproduccionesDao(ABC):
         pass
     
     @abstractmethod
-    def get_top_reproducciones_usuario(self, id_usuario: int, limit: int = 10) -> list[ReproduccionDTO]:
-        """Devuelve los contenidos más reproducidos por un usuario."""
+    def get_top_reproducciones_usuario(self, id_usuario: int, limit: int = 10, orden: str = "reproducciones") -> list[ReproduccionDTO]:
+        """Devuelve los contenidos más reproducidos por un usuario, por número de veces o por segundos."""
         pass
     
@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class InterfaceVersionesRankingsDao(ABC):
+    """
+    Interfaz para la versión de las tablas mensuales de los rankings
+    (versionesrankings, la suben los triggers de la migración 007).
+    """
+
+    @abstractmethod
+    def obtener(self, tabla: str) -> Optional[int]:
+        """Devuelve la versión actual de `tabla`, o None si no tiene fila."""
+        pass
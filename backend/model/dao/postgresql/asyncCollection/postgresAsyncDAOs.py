@@ -0,0 +1,65 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.model.dao.postgresql.replicas import leyendo
+from backend.model.dao.postgresql.collection.postgresArtistasMensualesDAO import PostgresArtistasMensualesDAO
+from backend.model.dao.postgresql.collection.postgresBusquedasArtistasDAO import BusquedasArtistasDAO
+from backend.model.dao.postgresql.collection.postgresContenidoDAO import PostgresContenidoDAO
+from backend.model.dao.postgresql.collection.postgesComunidadesMensualesDAO import PostgresComunidadesMensualesDAO
+from backend.model.dao.postgresql.collection.postgresReproduccionesDAO import ReproduccionesDAO
+from backend.model.dao.postgresql.collection.postgresHuellasSincronizacionDAO import PostgresHuellasSincronizacionDAO
+from backend.model.dao.postgresql.collection.postgresEjecucionesJobsDAO import PostgresEjecucionesJobsDAO
+
+class PostgresAsyncDAO:
+    """
+    DAO asíncrono: envuelve un DAO de postgresql/collection y ejecuta sus métodos
+    sobre una AsyncSession (asyncpg) mediante run_sync.
+    El SQL es el mismo que el de la versión síncrona, pero la E/S se espera
+    sin bloquear el event loop. Cada método devuelve una corrutina.
+    """
+    dao_class = None
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def __getattr__(self, nombre):
+        metodo = getattr(self.dao_class, nombre)
+        if nombre.startswith("_") or not callable(metodo):
+            raise AttributeError(nombre)
+
+        async def llamada(*args, **kwargs):
+            return await self.db.run_sync(lambda sesion: metodo(self.dao_class(sesion), *args, **kwargs))
+
+        return llamada
+
+    async def iterar_todos(self, tamano_lote: int = 1000):
+        """
+        Recorrido completo con cursor de servidor (AsyncSession.stream). No puede ir por
+        run_sync porque es un generador: usa el SQL y el mapeo del DAO síncrono.
+        """
+        dao = self.dao_class(self.db)
+        with leyendo(self.db):
+            resultado = await self.db.stream(dao.SQL_TODOS, execution_options={"yield_per": tamano_lote})
+            async for row in resultado:
+                yield dao._map_row_to_dto(row)
+
+
+class PostgresAsyncArtistasMensualesDAO(PostgresAsyncDAO):
+    dao_class = PostgresArtistasMensualesDAO
+
+class PostgresAsyncBusquedasArtistasDAO(PostgresAsyncDAO):
+    dao_class = BusquedasArtistasDAO
+
+class PostgresAsyncContenidoDAO(PostgresAsyncDAO):
+    dao_class = PostgresContenidoDAO
+
+class PostgresAsyncComunidadesMensualesDAO(PostgresAsyncDAO):
+    dao_class = PostgresComunidadesMensualesDAO
+    iterar_todas = PostgresAsyncDAO.iterar_todos
+
+class PostgresAsyncReproduccionesDAO(PostgresAsyncDAO):
+    dao_class = ReproduccionesDAO
+
+class PostgresAsyncHuellasSincronizacionDAO(PostgresAsyncDAO):
+    dao_class = PostgresHuellasSincronizacionDAO
+
+class PostgresAsyncEjecucionesJobsDAO(PostgresAsyncDAO):
+    dao_class = PostgresEjecucionesJobsDAO
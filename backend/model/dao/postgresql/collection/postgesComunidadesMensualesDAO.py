@@ -1,44 +1,64 @@
+import logging
 from sqlalchemy import text
 from backend.model.dto.comunidadMensualDTO import ComunidadDTO
 from backend.model.dao.interfaceComunidadesMensualesDao import InterfaceComunidadesMensualesDAO
+from backend.model.dao.postgresql.upsertMasivo import upsert_multifila
+from backend.controller.metricas import instrumentar_dao
+from backend.model.dao.postgresql.replicas import solo_lectura
 
+logger = logging.getLogger(__name__)
+
+@instrumentar_dao
 class PostgresComunidadesMensualesDAO(InterfaceComunidadesMensualesDAO):
+    # Recorrido completo por clave primaria (lo usan iterar_todas y su versión async)
+    SQL_TODOS = text("SELECT idcomunidad, numpublicaciones, nummiembros FROM comunidadesmensual ORDER BY idcomunidad")
+
     def __init__(self, db):
         self.db = db
 
+    def _map_row_to_dto(self, row) -> ComunidadDTO:
+        return ComunidadDTO(
+            idcomunidad=row.idcomunidad,
+            numpublicaciones=row.numpublicaciones,
+            nummiembros=row.nummiembros
+        )
+
     def actualizar_o_insertar_comunidad(self, dto: ComunidadDTO) -> bool:
+        # El ID puede llegar como string ("1"); la columna es integer, así que lo
+        # convertimos aquí (asyncpg no hace el cast implícito que sí hace psycopg2).
         try:
-            sql_check = text("SELECT idcomunidad FROM comunidadesmensual WHERE idcomunidad = :id")
-            existe = self.db.execute(sql_check, {"id": dto.idComunidad}).fetchone()
-
-            if existe:
-                sql_update = text("""
-                    UPDATE comunidadesmensual
-                    SET numpublicaciones = :np, nummiembros = :nm
-                    WHERE idcomunidad = :id
-                """)
-                self.db.execute(sql_update, {
-                    "id": dto.idComunidad,
-                    "np": dto.numPublicaciones,
-                    "nm": dto.numMiembros
-                })
-            else:
-                sql_insert = text("""
-                    INSERT INTO comunidadesmensual (idcomunidad, numpublicaciones, nummiembros)
-                    VALUES (:id, :np, :nm)
-                """)
-                self.db.execute(sql_insert, {
-                    "id": dto.idComunidad,
-                    "np": dto.numPublicaciones,
-                    "nm": dto.numMiembros
-                })
+            # Una sola sentencia (INSERT ... ON CONFLICT): sin carreras entre dos syncs
+            sql_upsert = text("""
+                INSERT INTO comunidadesmensual (idcomunidad, numpublicaciones, nummiembros)
+                VALUES (:id, :np, :nm)
+                ON CONFLICT (idcomunidad) DO UPDATE
+                SET numpublicaciones = EXCLUDED.numpublicaciones, nummiembros = EXCLUDED.nummiembros
+            """)
+            self.db.execute(sql_upsert, {
+                "id": int(dto.idComunidad),
+                "np": dto.numPublicaciones,
+                "nm": dto.numMiembros
+            })
             
             return True
 
         except Exception as e:
-            print(f"❌ Error DB DAO Comunidad: {e}")
+            logger.error(f"Error DB DAO Comunidad: {e}")
+            raise e
+
+    def bulk_upsert(self, dtos: list[ComunidadDTO]) -> int:
+        """Inserta o actualiza muchas comunidades con un INSERT multi-fila por bloque."""
+        try:
+            return upsert_multifila(
+                self.db, "comunidadesmensual",
+                ["idcomunidad", "numpublicaciones", "nummiembros"], "idcomunidad",
+                [(int(dto.idComunidad), dto.numPublicaciones, dto.numMiembros) for dto in dtos]
+            )
+        except Exception as e:
+            logger.error(f"Error DB DAO Comunidad (Bulk Upsert): {e}")
             raise e
         
+    @solo_lectura
     def obtener_todas(self) -> list[ComunidadDTO]:
         try:
             sql = text("SELECT idcomunidad, numpublicaciones, nummiembros FROM comunidadesmensual")
@@ -53,15 +73,45 @@ class PostgresComunidadesMensualesDAO(InterfaceComunidadesMensualesDAO):
                 ) for row in result
             ]
         except Exception as e:
-            print(f"❌ Error DB DAO Comunidad (Get All): {e}")
+            logger.error(f"Error DB DAO Comunidad (Get All): {e}")
+            raise e
+
+    @solo_lectura
+    def obtener_pagina(self, despues_de: int | None = None, limite: int = 100) -> list[ComunidadDTO]:
+        """Paginación por clave (keyset): usa el índice de la PK en lugar de OFFSET."""
+        try:
+            filtro = "WHERE idcomunidad > :despues" if despues_de is not None else ""
+            sql = text(f"""
+                SELECT idcomunidad, numpublicaciones, nummiembros
+                FROM comunidadesmensual
+                {filtro}
+                ORDER BY idcomunidad
+                LIMIT :lim
+            """)
+            result = self.db.execute(sql, {"despues": despues_de, "lim": limite}).fetchall()
+            return [self._map_row_to_dto(row) for row in result]
+        except Exception as e:
+            logger.error(f"Error DB DAO Comunidad (Get Page): {e}")
+            raise e
+
+    @solo_lectura
+    def iterar_todas(self, tamano_lote: int = 1000):
+        """Generador: las filas llegan de `tamano_lote` en `tamano_lote` desde un cursor de servidor."""
+        try:
+            result = self.db.execute(self.SQL_TODOS, execution_options={"yield_per": tamano_lote})
+            for row in result:
+                yield self._map_row_to_dto(row)
+        except Exception as e:
+            logger.error(f"Error DB DAO Comunidad (Iterate All): {e}")
             raise e
 
+    @solo_lectura
     def obtener_ranking_miembros(self, limite=10) -> list[ComunidadDTO]:
         try:
             sql = text("""
                 SELECT idcomunidad, numpublicaciones, nummiembros 
                 FROM comunidadesmensual 
-                ORDER BY nummiembros DESC 
+                ORDER BY nummiembros DESC, idcomunidad
                 LIMIT :lim
             """)
             result = self.db.execute(sql, {"lim": limite}).fetchall()
@@ -74,15 +124,16 @@ class PostgresComunidadesMensualesDAO(InterfaceComunidadesMensualesDAO):
                 ) for row in result
             ]
         except Exception as e:
-            print(f"❌ Error DAO Ranking Miembros: {e}")
+            logger.error(f"Error DAO Ranking Miembros: {e}")
             raise e
 
+    @solo_lectura
     def obtener_ranking_publicaciones(self, limite=10) -> list[ComunidadDTO]:
         try:
             sql = text("""
                 SELECT idcomunidad, numpublicaciones, nummiembros 
                 FROM comunidadesmensual 
-                ORDER BY numpublicaciones DESC 
+                ORDER BY numpublicaciones DESC, idcomunidad
                 LIMIT :lim
             """)
             result = self.db.execute(sql, {"lim": limite}).fetchall()
@@ -95,13 +146,14 @@ class PostgresComunidadesMensualesDAO(InterfaceComunidadesMensualesDAO):
                 ) for row in result
             ]
         except Exception as e:
-            print(f"❌ Error DAO Ranking Publicaciones: {e}")
+            logger.error(f"Error DAO Ranking Publicaciones: {e}")
             raise e
 
+    @solo_lectura
     def obtener_por_id(self, id_comunidad) -> ComunidadDTO | None:
         try:
             sql = text("SELECT idcomunidad, numpublicaciones, nummiembros FROM comunidadesmensual WHERE idcomunidad = :id")
-            row = self.db.execute(sql, {"id": id_comunidad}).fetchone()
+            row = self.db.execute(sql, {"id": int(id_comunidad)}).fetchone()
             
             if row:
                 return ComunidadDTO(
@@ -111,14 +163,14 @@ class PostgresComunidadesMensualesDAO(InterfaceComunidadesMensualesDAO):
                 )
             return None
         except Exception as e:
-            print(f"❌ Error DAO Obtener por ID Comunidad: {e}")
+            logger.error(f"Error DAO Obtener por ID Comunidad: {e}")
             raise e
 
     def eliminar(self, id_comunidad):
         try:
             sql = text("DELETE FROM comunidadesmensual WHERE idcomunidad = :id")
-            result = self.db.execute(sql, {"id": id_comunidad})
+            result = self.db.execute(sql, {"id": int(id_comunidad)})
             return result.rowcount > 0
         except Exception as e:
-            print(f"❌ Error DB DAO Comunidad (Delete): {e}")
+            logger.error(f"Error DB DAO Comunidad (Delete): {e}")
             raise e
\ No newline at end of file
@@ -1,51 +1,65 @@
+import logging
 from sqlalchemy import text
 from backend.model.dto.artistaMensualDTO import ArtistaMensualDTO
 from backend.model.dao.interfaceArtistasMensualesDao import InterfaceArtistasMensualesDao
+from backend.model.dao.postgresql.upsertMasivo import upsert_multifila
+from backend.controller.metricas import instrumentar_dao
+from backend.model.dao.postgresql.replicas import solo_lectura
 
+logger = logging.getLogger(__name__)
+
+@instrumentar_dao
 class PostgresArtistasMensualesDAO(InterfaceArtistasMensualesDao):
+    # Recorrido completo por clave primaria (lo usan iterar_todos y su versión async)
+    SQL_TODOS = text("SELECT idartista, numoyentes, valoracionmedia FROM artistasmensual ORDER BY idartista")
     
     def __init__(self, db):
         self.db = db
 
+    def _map_row_to_dto(self, row) -> ArtistaMensualDTO:
+        return ArtistaMensualDTO(
+            idartista=row.idartista,
+            numOyentes=row.numoyentes,
+            valoracionmedia=row.valoracionmedia
+        )
+
     def actualizar_o_insertar(self, dto: ArtistaMensualDTO) -> bool:
         """
         Inserta o actualiza un registro usando el DTO estandarizado.
+        Una sola sentencia (INSERT ... ON CONFLICT): sin carreras entre dos syncs.
         """
         try:
-            # Comprobar si existe
-            sql_check = text("SELECT idartista FROM artistasmensual WHERE idartista = :id")
-            existe = self.db.execute(sql_check, {"id": dto.idArtista}).fetchone()
-
-            if existe:
-                # UPDATE
-                sql_update = text("""
-                    UPDATE artistasmensual
-                    SET numoyentes = :no, valoracionmedia = :vm
-                    WHERE idartista = :id
-                """)
-                self.db.execute(sql_update, {
-                    "id": dto.idArtista, 
-                    "no": dto.numOyentes, 
-                    "vm": dto.valoracionMedia
-                })
-            else:
-                # INSERT
-                sql_insert = text("""
-                    INSERT INTO artistasmensual (idartista, numoyentes, valoracionmedia)
-                    VALUES (:id, :no, :vm)
-                """)
-                self.db.execute(sql_insert, {
-                    "id": dto.idArtista, 
-                    "no": dto.numOyentes, 
-                    "vm": dto.valoracionMedia
-                })
+            sql_upsert = text("""
+                INSERT INTO artistasmensual (idartista, numoyentes, valoracionmedia)
+                VALUES (:id, :no, :vm)
+                ON CONFLICT (idartista) DO UPDATE
+                SET numoyentes = EXCLUDED.numoyentes, valoracionmedia = EXCLUDED.valoracionmedia
+            """)
+            self.db.execute(sql_upsert, {
+                "id": dto.idArtista, 
+                "no": dto.numOyentes, 
+                "vm": dto.valoracionMedia
+            })
 
             return True
 
         except Exception as e:
-            print(f"❌ Error DAO Artistas Upsert: {e}")
+            logger.error(f"Error DAO Artistas Upsert: {e}")
             raise e
 
+    def bulk_upsert(self, dtos: list[ArtistaMensualDTO]) -> int:
+        """Inserta o actualiza muchos artistas con un INSERT multi-fila por bloque."""
+        try:
+            return upsert_multifila(
+                self.db, "artistasmensual",
+                ["idartista", "numoyentes", "valoracionmedia"], "idartista",
+                [(dto.idArtista, dto.numOyentes, dto.valoracionMedia) for dto in dtos]
+            )
+        except Exception as e:
+            logger.error(f"Error DAO Artistas Bulk Upsert: {e}")
+            raise e
+
+    @solo_lectura
     def obtener_todos(self) -> list[ArtistaMensualDTO]:
         try:
             sql = text("SELECT idartista, numoyentes, valoracionmedia FROM artistasmensual")
@@ -60,9 +74,39 @@ class PostgresArtistasMensualesDAO(InterfaceArtistasMensualesDao):
             ]
 
         except Exception as e:
-            print(f"❌ Error DAO Artistas Obtener Todos: {e}")
+            logger.error(f"Error DAO Artistas Obtener Todos: {e}")
+            raise e
+
+    @solo_lectura
+    def obtener_pagina(self, despues_de: int | None = None, limite: int = 100) -> list[ArtistaMensualDTO]:
+        """Paginación por clave (keyset): usa el índice de la PK en lugar de OFFSET."""
+        try:
+            filtro = "WHERE idartista > :despues" if despues_de is not None else ""
+            sql = text(f"""
+                SELECT idartista, numoyentes, valoracionmedia
+                FROM artistasmensual
+                {filtro}
+                ORDER BY idartista
+                LIMIT :lim
+            """)
+            result = self.db.execute(sql, {"despues": despues_de, "lim": limite}).fetchall()
+            return [self._map_row_to_dto(row) for row in result]
+        except Exception as e:
+            logger.error(f"Error DAO Artistas Obtener Página: {e}")
+            raise e
+
+    @solo_lectura
+    def iterar_todos(self, tamano_lote: int = 1000):
+        """Generador: las filas llegan de `tamano_lote` en `tamano_lote` desde un cursor de servidor."""
+        try:
+            result = self.db.execute(self.SQL_TODOS, execution_options={"yield_per": tamano_lote})
+            for row in result:
+                yield self._map_row_to_dto(row)
+        except Exception as e:
+            logger.error(f"Error DAO Artistas Iterar Todos: {e}")
             raise e
         
+    @solo_lectura
     def obtener_por_id(self, id_artista: int) -> ArtistaMensualDTO | None:
         try:
             sql = text("SELECT idartista, numoyentes, valoracionmedia FROM artistasmensual WHERE idartista = :id")
@@ -77,15 +121,16 @@ class PostgresArtistasMensualesDAO(InterfaceArtistasMensualesDao):
                 valoracionmedia=row.valoracionmedia
             )
         except Exception as e:
-            print(f"❌ Error DAO Artistas Obtener ID: {e}")
+            logger.error(f"Error DAO Artistas Obtener ID: {e}")
             raise e
 
+    @solo_lectura
     def obtener_ranking_oyentes(self, limite: int = 10) -> list[ArtistaMensualDTO]:
         try:
             sql = text("""
                 SELECT idartista, numoyentes, valoracionmedia
                 FROM artistasmensual
-                ORDER BY numoyentes DESC
+                ORDER BY numoyentes DESC, idartista
                 LIMIT :lim
             """)
             result = self.db.execute(sql, {"lim": limite}).fetchall()
@@ -98,5 +143,14 @@ class PostgresArtistasMensualesDAO(InterfaceArtistasMensualesDao):
                 ) for row in result
             ]
         except Exception as e:
-            print(f"❌ Error DAO Artistas Ranking: {e}")
-            raise e
\ No newline at end of file
+            logger.error(f"Error DAO Artistas Ranking: {e}")
+            raise e
+
+    def eliminar(self, id_artista: int) -> bool:
+        try:
+            sql = text("DELETE FROM artistasmensual WHERE idartista = :id")
+            result = self.db.execute(sql, {"id": id_artista})
+            return result.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error DAO Artistas eliminar: {e}")
+            raise e
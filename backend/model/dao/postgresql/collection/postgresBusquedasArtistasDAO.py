@@ -1,7 +1,20 @@
+import logging
+from collections import Counter
+from datetime import datetime, date
 from sqlalchemy import text
 from backend.model.dto.busquedaArtistaDTO import BusquedaArtistaDTO
 from backend.model.dao.interfaceBusquedasArtistasDao import InterfaceBusquedasArtistasDao
+from backend.model.dao.postgresql.upsertMasivo import trocear
+from backend.controller.metricas import instrumentar_dao
+from backend.model.dao.postgresql.replicas import solo_lectura
 
+logger = logging.getLogger(__name__)
+
+def primer_dia_mes(fecha: datetime) -> date:
+    """Mes al que se suma una búsqueda en busquedasartistasmensual."""
+    return fecha.date().replace(day=1)
+
+@instrumentar_dao
 class BusquedasArtistasDAO(InterfaceBusquedasArtistasDao):
     def __init__(self, db):
         self.db = db
@@ -12,32 +25,101 @@ class BusquedasArtistasDAO(InterfaceBusquedasArtistasDao):
         Como es un log, siempre hacemos INSERT (no update).
         """
         try:
-            # Simplemente insertamos una nueva fila con la fecha actual (NOW)
+            # Simplemente insertamos una nueva fila con la fecha actual
+            ahora = datetime.now()
             sql_insert = text("""
                 INSERT INTO busquedasartistas (idartista, idusuario, fecha)
-                VALUES (:idartista, :idusuario, NOW())
+                VALUES (:idartista, :idusuario, :fecha)
             """)
             
-            self.db.execute(sql_insert, {"idartista": id_artista, "idusuario": id_usuario})
+            self.db.execute(sql_insert, {"idartista": id_artista, "idusuario": id_usuario, "fecha": ahora})
+            self._sumar_busquedas_mensuales({(primer_dia_mes(ahora), id_artista): 1})
             
             # El commit lo suele hacer el modelo, pero si aquí controlas la transacción:
             # self.db.commit() 
             
         except Exception as e:
-            print(f"❌ Error DAO Registrando Búsqueda: {e}")
+            logger.error(f"Error DAO Registrando Búsqueda: {e}")
             self.db.rollback()
             raise e
 
+    def insertar_busquedas_lote(self, busquedas: list[tuple]) -> int:
+        """
+        Inserta muchas búsquedas (idartista, idusuario, fecha) con INSERT multi-fila
+        y las suma a los contadores de busquedasartistasmensual.
+        La fecha viene de fuera (momento en que se recibió la búsqueda).
+        No hace commit: lo gestiona quien llama (el buffer de búsquedas).
+        """
+        try:
+            total = 0
+            for bloque in trocear(busquedas):
+                valores = []
+                params = {}
+                for i, (id_artista, id_usuario, fecha) in enumerate(bloque):
+                    valores.append(f"(:a_{i}, :u_{i}, :f_{i})")
+                    params[f"a_{i}"] = id_artista
+                    params[f"u_{i}"] = id_usuario
+                    params[f"f_{i}"] = fecha
+
+                sql = text(f"""
+                    INSERT INTO busquedasartistas (idartista, idusuario, fecha)
+                    VALUES {', '.join(valores)}
+                """)
+                total += self.db.execute(sql, params).rowcount
+
+            # Contadores mensuales: una fila por (mes, artista), no una por búsqueda
+            contadores = Counter((primer_dia_mes(fecha), id_artista) for id_artista, _, fecha in busquedas)
+            self._sumar_busquedas_mensuales(contadores)
+            return total
+
+        except Exception as e:
+            logger.error(f"Error DAO Registrando lote de búsquedas: {e}")
+            raise e
+
+    def sumar_busquedas_archivadas(self, busquedas: list[tuple]) -> int:
+        """
+        Búsquedas (idartista, idusuario, fecha) de un mes cuya partición ya soltó el rollover:
+        solo se suman a busquedasartistasmensual. No hace commit.
+        """
+        if not busquedas:
+            return 0
+        try:
+            self._sumar_busquedas_mensuales(Counter((primer_dia_mes(fecha), id_artista) for id_artista, _, fecha in busquedas))
+            return len(busquedas)
+        except Exception as e:
+            logger.error(f"Error DAO sumando búsquedas de meses archivados: {e}")
+            raise e
+
+    def _sumar_busquedas_mensuales(self, contadores: dict):
+        """Suma {(mes, idartista): n} a busquedasartistasmensual (en la misma transacción que el log)."""
+        for bloque in trocear(list(contadores.items())):
+            valores = []
+            params = {}
+            for i, ((mes, id_artista), n) in enumerate(bloque):
+                valores.append(f"(:m_{i}, :a_{i}, :n_{i})")
+                params[f"m_{i}"] = mes
+                params[f"a_{i}"] = id_artista
+                params[f"n_{i}"] = n
+
+            sql = text(f"""
+                INSERT INTO busquedasartistasmensual (mes, idartista, numbusquedas)
+                VALUES {', '.join(valores)}
+                ON CONFLICT (mes, idartista)
+                DO UPDATE SET numbusquedas = busquedasartistasmensual.numbusquedas + EXCLUDED.numbusquedas
+            """)
+            self.db.execute(sql, params)
+
+    @solo_lectura
     def get_top_artistas_busquedas(self, limit: int = 10) -> list[BusquedaArtistaDTO]:
             try:
-                # MAGIA SQL: "WHERE fecha >= primer_dia_de_este_mes"
-                # Esto hace que solo cuente las búsquedas del mes actual.
+                # Se lee el contador del mes actual (índice por mes y número de búsquedas),
+                # así que el coste depende de 'limit' y no de las búsquedas del mes.
                 sql = text("""
-                    SELECT idartista, COUNT(*) AS num_busquedas
-                    FROM busquedasartistas
-                    WHERE fecha >= DATE_TRUNC('month', CURRENT_DATE)
-                    GROUP BY idartista
-                    ORDER BY num_busquedas DESC
+                    SELECT idartista, numbusquedas AS num_busquedas
+                    FROM busquedasartistasmensual
+                    WHERE mes = DATE_TRUNC('month', CURRENT_DATE)::date
+                      AND numbusquedas > 0
+                    ORDER BY numbusquedas DESC
                     LIMIT :limit
                 """)
                 
@@ -51,18 +133,36 @@ class BusquedasArtistasDAO(InterfaceBusquedasArtistasDao):
                     for r in rows
                 ]
             except Exception as e:
-                print(f"❌ Error DAO Top Busquedas: {e}")
+                logger.error(f"Error DAO Top Busquedas: {e}")
                 raise e
 
     def eliminar_busquedas_por_artista(self, id_artista: int) -> int:
         sql = text("DELETE FROM busquedasartistas WHERE idartista = :id")
         result = self.db.execute(sql, {"id": id_artista})
+        self.db.execute(text("DELETE FROM busquedasartistasmensual WHERE idartista = :id"), {"id": id_artista})
         return result.rowcount
 
     def eliminar_busquedas_por_usuario(self, id_usuario: int) -> int:
-        sql = text("DELETE FROM busquedasartistas WHERE idusuario = :id")
-        result = self.db.execute(sql, {"id": id_usuario})
-        return result.rowcount
+        # Se borran las búsquedas del usuario y se restan de los contadores de cada mes
+        sql = text("""
+            WITH borradas AS (
+                DELETE FROM busquedasartistas WHERE idusuario = :id
+                RETURNING idartista, fecha
+            ),
+            por_mes AS (
+                SELECT DATE_TRUNC('month', fecha)::date AS mes, idartista, COUNT(*) AS n
+                FROM borradas
+                GROUP BY 1, 2
+            ),
+            restadas AS (
+                UPDATE busquedasartistasmensual m
+                SET numbusquedas = GREATEST(m.numbusquedas - p.n, 0)
+                FROM por_mes p
+                WHERE m.mes = p.mes AND m.idartista = p.idartista
+            )
+            SELECT COALESCE(SUM(n), 0) AS filas FROM por_mes
+        """)
+        return int(self.db.execute(sql, {"id": id_usuario}).scalar())
     
     def eliminar_todas_las_busquedas(self):
         """
@@ -76,9 +176,12 @@ class BusquedasArtistasDAO(InterfaceBusquedasArtistasDao):
             # sql = text("TRUNCATE TABLE busquedasartistas RESTART IDENTITY")
             
             self.db.execute(sql)
+
+            # El contador del periodo actual también empieza de cero (los meses anteriores se conservan)
+            self.db.execute(text("DELETE FROM busquedasartistasmensual WHERE mes >= DATE_TRUNC('month', CURRENT_DATE)::date"))
             self.db.commit()
             return True
         except Exception as e:
-            print(f"❌ Error DAO Eliminando todas las búsquedas: {e}")
+            logger.error(f"Error DAO Eliminando todas las búsquedas: {e}")
             self.db.rollback()
             raise e
\ No newline at end of file
@@ -1,8 +1,19 @@
+import logging
 from sqlalchemy import text
 from backend.model.dto.contenidoDTO import ContenidoDTO
 from backend.model.dao.interfaceContenidoDao import InterfaceContenidoDao
+from backend.model.dao.postgresql.upsertMasivo import upsert_multifila
+from backend.controller.metricas import instrumentar_dao
+from backend.model.dao.postgresql.replicas import solo_lectura
 
+logger = logging.getLogger(__name__)
+
+@instrumentar_dao
 class PostgresContenidoDAO(InterfaceContenidoDao):
+    COLUMNAS = "idcontenido, numventas, esalbum, sumavaloraciones, numcomentarios, genero, esnovedad"
+    # Recorrido completo por clave primaria (lo usan iterar_todos y su versión async)
+    SQL_TODOS = text(f"SELECT {COLUMNAS} FROM contenidosmensual ORDER BY idcontenido")
+
     def __init__(self, db):
         self.db = db
         
@@ -18,6 +29,7 @@ class PostgresContenidoDAO(InterfaceContenidoDao):
             esnovedad=row.esnovedad
         )
 
+    @solo_lectura
     def obtener_todos(self) -> list[ContenidoDTO]:
         try:
             sql = text("""
@@ -27,42 +39,78 @@ class PostgresContenidoDAO(InterfaceContenidoDao):
             result = self.db.execute(sql).fetchall()
             return [self._map_row_to_dto(row) for row in result]
         except Exception as e:
-            print(f"❌ Error DAO Contenido obtener_todos: {e}")
+            logger.error(f"Error DAO Contenido obtener_todos: {e}")
             raise e
 
-    def actualizar_o_insertar(self, dto: ContenidoDTO) -> bool:
+    @solo_lectura
+    def obtener_pagina(self, despues_de: int | None = None, limite: int = 100) -> list[ContenidoDTO]:
+        """Paginación por clave (keyset): usa el índice de la PK en lugar de OFFSET."""
+        try:
+            filtro = "WHERE idcontenido > :despues" if despues_de is not None else ""
+            sql = text(f"""
+                SELECT {self.COLUMNAS}
+                FROM contenidosmensual
+                {filtro}
+                ORDER BY idcontenido
+                LIMIT :lim
+            """)
+            result = self.db.execute(sql, {"despues": despues_de, "lim": limite}).fetchall()
+            return [self._map_row_to_dto(row) for row in result]
+        except Exception as e:
+            logger.error(f"Error DAO Contenido obtener_pagina: {e}")
+            raise e
+
+    @solo_lectura
+    def iterar_todos(self, tamano_lote: int = 1000):
+        """Generador: las filas llegan de `tamano_lote` en `tamano_lote` desde un cursor de servidor."""
         try:
-            sql_check = text("SELECT idcontenido FROM contenidosmensual WHERE idcontenido = :id")
-            existe = self.db.execute(sql_check, {"id": dto.idContenido}).fetchone()
+            result = self.db.execute(self.SQL_TODOS, execution_options={"yield_per": tamano_lote})
+            for row in result:
+                yield self._map_row_to_dto(row)
+        except Exception as e:
+            logger.error(f"Error DAO Contenido iterar_todos: {e}")
+            raise e
 
-            if existe:
-                sql_update = text("""
-                    UPDATE contenidosmensual
-                    SET numventas = :nr, esalbum = :ea, sumavaloraciones = :sv,
-                        numcomentarios = :nc, genero = :gen, esnovedad = :nov
-                    WHERE idcontenido = :id
-                """)
-                self.db.execute(sql_update, {
-                    "id": dto.idContenido, "nr": dto.numVentas, "ea": dto.esAlbum,
-                    "sv": dto.sumaValoraciones, "nc": dto.numComentarios,
-                    "gen": dto.genero, "nov": dto.esNovedad
-                })
-            else:
-                sql_insert = text("""
-                    INSERT INTO contenidosmensual (idcontenido, numventas, esalbum, sumavaloraciones, numcomentarios, genero, esnovedad)
-                    VALUES (:id, :nr, :ea, :sv, :nc, :gen, :nov)
-                """)
-                self.db.execute(sql_insert, {
-                    "id": dto.idContenido, "nr": dto.numVentas, "ea": dto.esAlbum,
-                    "sv": dto.sumaValoraciones, "nc": dto.numComentarios,
-                    "gen": dto.genero, "nov": dto.esNovedad
-                })
+    def actualizar_o_insertar(self, dto: ContenidoDTO) -> bool:
+        try:
+            # Una sola sentencia (INSERT ... ON CONFLICT): sin carreras entre dos syncs
+            sql_upsert = text("""
+                INSERT INTO contenidosmensual (idcontenido, numventas, esalbum, sumavaloraciones, numcomentarios, genero, esnovedad)
+                VALUES (:id, :nr, :ea, :sv, :nc, :gen, :nov)
+                ON CONFLICT (idcontenido) DO UPDATE
+                SET numventas = EXCLUDED.numventas, esalbum = EXCLUDED.esalbum,
+                    sumavaloraciones = EXCLUDED.sumavaloraciones, numcomentarios = EXCLUDED.numcomentarios,
+                    genero = EXCLUDED.genero, esnovedad = EXCLUDED.esnovedad
+            """)
+            self.db.execute(sql_upsert, {
+                "id": dto.idContenido, "nr": dto.numVentas, "ea": dto.esAlbum,
+                "sv": dto.sumaValoraciones, "nc": dto.numComentarios,
+                "gen": dto.genero, "nov": dto.esNovedad
+            })
             
             return True
         except Exception as e:
-            print(f"❌ Error DAO Contenido Upsert: {e}")
+            logger.error(f"Error DAO Contenido Upsert: {e}")
+            raise e
+
+    def bulk_upsert(self, dtos: list[ContenidoDTO]) -> int:
+        """Inserta o actualiza muchos contenidos con un INSERT multi-fila por bloque."""
+        try:
+            return upsert_multifila(
+                self.db, "contenidosmensual",
+                ["idcontenido", "numventas", "esalbum", "sumavaloraciones", "numcomentarios", "genero", "esnovedad"],
+                "idcontenido",
+                [
+                    (dto.idContenido, dto.numVentas, dto.esAlbum, dto.sumaValoraciones,
+                     dto.numComentarios, dto.genero, dto.esNovedad)
+                    for dto in dtos
+                ]
+            )
+        except Exception as e:
+            logger.error(f"Error DAO Contenido Bulk Upsert: {e}")
             raise e
 
+    @solo_lectura
     def obtener_por_id(self, id_contenido: int) -> ContenidoDTO | None:
         try:
             sql = text("""
@@ -73,7 +121,7 @@ class PostgresContenidoDAO(InterfaceContenidoDao):
             row = self.db.execute(sql, {"id": id_contenido}).fetchone()
             return self._map_row_to_dto(row) if row else None
         except Exception as e:
-            print(f"❌ Error DAO Contenido obtener_id: {e}")
+            logger.error(f"Error DAO Contenido obtener_id: {e}")
             raise e
 
     def eliminar(self, id_contenido: int) -> bool:
@@ -82,51 +130,55 @@ class PostgresContenidoDAO(InterfaceContenidoDao):
             result = self.db.execute(sql, {"id": id_contenido})
             return result.rowcount > 0
         except Exception as e:
-            print(f"❌ Error DAO Contenido eliminar: {e}")
+            logger.error(f"Error DAO Contenido eliminar: {e}")
             raise e
     
+    @solo_lectura
     def get_top_valorados(self, limit: int) -> list[ContenidoDTO]:
         try:
             sql = text("""
                 SELECT idcontenido, numventas, esalbum, sumavaloraciones, numcomentarios, genero, esnovedad
                 FROM contenidosmensual
-                ORDER BY sumavaloraciones DESC
+                ORDER BY sumavaloraciones DESC, idcontenido
                 LIMIT :lim
             """)
             result = self.db.execute(sql, {"lim": limit}).fetchall()
             return [self._map_row_to_dto(row) for row in result]
         except Exception as e:
-            print(f"❌ Error DAO Contenido Top Valorados: {e}")
+            logger.error(f"Error DAO Contenido Top Valorados: {e}")
             raise e
 
+    @solo_lectura
     def get_top_comentados(self, limit: int) -> list[ContenidoDTO]:
         try:
             sql = text("""
                 SELECT idcontenido, numventas, esalbum, sumavaloraciones, numcomentarios, genero, esnovedad
                 FROM contenidosmensual
-                ORDER BY numcomentarios DESC
+                ORDER BY numcomentarios DESC, idcontenido
                 LIMIT :lim
             """)
             result = self.db.execute(sql, {"lim": limit}).fetchall()
             return [self._map_row_to_dto(row) for row in result]
         except Exception as e:
-            print(f"❌ Error DAO Contenido Top Comentados: {e}")
+            logger.error(f"Error DAO Contenido Top Comentados: {e}")
             raise e
 
+    @solo_lectura
     def get_top_vendidos(self, limit: int) -> list[ContenidoDTO]:
         try:
             sql = text("""
                 SELECT idcontenido, numventas, esalbum, sumavaloraciones, numcomentarios, genero, esnovedad
                 FROM contenidosmensual
-                ORDER BY numventas DESC
+                ORDER BY numventas DESC, idcontenido
                 LIMIT :lim
             """)
             result = self.db.execute(sql, {"lim": limit}).fetchall()
             return [self._map_row_to_dto(row) for row in result]
         except Exception as e:
-            print(f"❌ Error DAO Contenido Top Vendidos: {e}")
+            logger.error(f"Error DAO Contenido Top Vendidos: {e}")
             raise e
     
+    @solo_lectura
     def get_top_generos_por_ventas(self, limit: int):
         """
         Este devuelve una lista de diccionarios personalizada (no DTO de contenido)
@@ -138,7 +190,7 @@ class PostgresContenidoDAO(InterfaceContenidoDao):
                 FROM contenidosmensual
                 WHERE genero IS NOT NULL AND genero != 'Desconocido'
                 GROUP BY genero
-                ORDER BY total_ventas DESC
+                ORDER BY total_ventas DESC, genero COLLATE "C"
                 LIMIT :lim
             """)
             result = self.db.execute(sql, {"lim": limit}).fetchall()
@@ -148,5 +200,5 @@ class PostgresContenidoDAO(InterfaceContenidoDao):
                 for row in result
             ]
         except Exception as e:
-            print(f"❌ Error DAO Contenido Top Generos: {e}")
+            logger.error(f"Error DAO Contenido Top Generos: {e}")
             raise e
\ No newline at end of file
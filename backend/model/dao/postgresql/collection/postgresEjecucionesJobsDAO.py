@@ -0,0 +1,52 @@
+import logging
+from datetime import datetime
+from sqlalchemy import text
+from backend.model.dao.interfaceEjecucionesJobsDao import InterfaceEjecucionesJobsDao
+from backend.controller.metricas import instrumentar_dao
+
+logger = logging.getLogger(__name__)
+
+@instrumentar_dao
+class PostgresEjecucionesJobsDAO(InterfaceEjecucionesJobsDao):
+    def __init__(self, db):
+        self.db = db
+
+    def registrar(self, job: str, instancia: str, inicio: datetime, duracion_ms: int,
+                  estado: str, filas: int | None = None, error: str | None = None):
+        try:
+            sql = text("""
+                INSERT INTO ejecucionesjobs (job, instancia, inicio, duracion_ms, estado, filas, error)
+                VALUES (:job, :instancia, :inicio, :duracion_ms, :estado, :filas, :error)
+            """)
+            self.db.execute(sql, {
+                "job": job, "instancia": instancia, "inicio": inicio, "duracion_ms": duracion_ms,
+                "estado": estado, "filas": filas, "error": error
+            })
+        except Exception as e:
+            logger.error(f"Error DAO EjecucionesJobs Registrar ({job}): {e}")
+            raise e
+
+    def obtener_ultimas(self, job: str | None = None, limite: int = 50) -> list[dict]:
+        try:
+            sql = text("""
+                SELECT job, instancia, inicio, duracion_ms, estado, filas, error
+                FROM ejecucionesjobs
+                WHERE CAST(:job AS text) IS NULL OR job = :job
+                ORDER BY inicio DESC
+                LIMIT :limite
+            """)
+            return [
+                {
+                    "job": row.job,
+                    "instancia": row.instancia,
+                    "inicio": row.inicio.isoformat(),
+                    "duracionMs": row.duracion_ms,
+                    "estado": row.estado,
+                    "filas": row.filas,
+                    "error": row.error
+                }
+                for row in self.db.execute(sql, {"job": job, "limite": limite})
+            ]
+        except Exception as e:
+            logger.error(f"Error DAO EjecucionesJobs Obtener: {e}")
+            raise e
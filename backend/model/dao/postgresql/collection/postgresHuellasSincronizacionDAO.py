@@ -0,0 +1,54 @@
+import logging
+from sqlalchemy import text
+from backend.model.dao.interfaceHuellasSincronizacionDao import InterfaceHuellasSincronizacionDao
+from backend.controller.metricas import instrumentar_dao
+
+logger = logging.getLogger(__name__)
+
+@instrumentar_dao
+class PostgresHuellasSincronizacionDAO(InterfaceHuellasSincronizacionDao):
+    def __init__(self, db):
+        self.db = db
+
+    def obtener(self, entidad: str) -> dict[int, str]:
+        try:
+            sql = text("SELECT id, huella FROM huellassincronizacion WHERE entidad = :entidad")
+            return {row.id: row.huella for row in self.db.execute(sql, {"entidad": entidad})}
+        except Exception as e:
+            logger.error(f"Error DAO Huellas Obtener ({entidad}): {e}")
+            raise e
+
+    def guardar(self, entidad: str, huellas: dict[int, str]) -> int:
+        """
+        Un único INSERT ... ON CONFLICT con los ids y huellas como arrays (unnest),
+        sea cual sea el número de filas. No hace commit (va en la transacción de la sync).
+        """
+        if not huellas:
+            return 0
+        try:
+            sql = text("""
+                INSERT INTO huellassincronizacion (entidad, id, huella, actualizado_en)
+                SELECT :entidad, i, h, now()
+                FROM unnest(CAST(:ids AS bigint[]), CAST(:huellas AS text[])) AS t(i, h)
+                ON CONFLICT (entidad, id) DO UPDATE
+                SET huella = EXCLUDED.huella, actualizado_en = EXCLUDED.actualizado_en
+            """)
+            return self.db.execute(sql, {
+                "entidad": entidad,
+                "ids": list(huellas.keys()),
+                "huellas": list(huellas.values())
+            }).rowcount
+        except Exception as e:
+            logger.error(f"Error DAO Huellas Guardar ({entidad}): {e}")
+            raise e
+
+    def eliminar(self, entidad: str, ids) -> int:
+        ids = list(ids)
+        if not ids:
+            return 0
+        try:
+            sql = text("DELETE FROM huellassincronizacion WHERE entidad = :entidad AND id = ANY(CAST(:ids AS bigint[]))")
+            return self.db.execute(sql, {"entidad": entidad, "ids": ids}).rowcount
+        except Exception as e:
+            logger.error(f"Error DAO Huellas Eliminar ({entidad}): {e}")
+            raise e
@@ -0,0 +1,173 @@
+import logging
+import re
+from datetime import date
+from sqlalchemy import text
+from backend.model.dao.interfaceParticionesDao import InterfaceParticionesDao
+from backend.controller.metricas import instrumentar_dao
+
+logger = logging.getLogger(__name__)
+
+# Logs particionados por mes y su columna de partición (ver migraciones/002_particiones_logs.sql)
+TABLAS_PARTICIONADAS = {
+    "busquedasartistas": "fecha",
+    "historialreproducciones": "fecha_reproduccion",
+}
+
+# Resumen de una partición ya soltada en su tabla mensual. Suma (no sustituye) porque
+# las reproducciones o búsquedas que llegan tarde a ese mes ya se han sumado al resumen
+# (sumar_*_archivadas). Va en la misma transacción que el DROP de la partición, así
+# que no se repite aunque el rollover se interrumpa.
+SQL_ARCHIVAR = {
+    "busquedasartistas": """
+        INSERT INTO busquedasartistasmensual (mes, idartista, numbusquedas)
+        SELECT :mes, idartista, COUNT(*)
+        FROM public."{particion}"
+        GROUP BY idartista
+        ON CONFLICT (mes, idartista) DO UPDATE
+        SET numbusquedas = busquedasartistasmensual.numbusquedas + EXCLUDED.numbusquedas
+    """,
+    "historialreproducciones": """
+        INSERT INTO reproduccionesmensual (mes, id_usuario, id_contenido, numreproducciones, segundostotales)
+        SELECT :mes, id_usuario, id_contenido, COUNT(*), COALESCE(SUM(segundos_reproducidos), 0)
+        FROM public."{particion}"
+        GROUP BY id_usuario, id_contenido
+        ON CONFLICT (mes, id_usuario, id_contenido) DO UPDATE
+        SET numreproducciones = reproduccionesmensual.numreproducciones + EXCLUDED.numreproducciones,
+            segundostotales = reproduccionesmensual.segundostotales + EXCLUDED.segundostotales
+    """,
+}
+
+# Nombre que les da crear_particion_mensual: <tabla>_pAAAA_MM
+PATRON_PARTICION = re.compile(r"_p(\d{4})_(\d{2})$")
+
+def primer_dia_mes(fecha) -> date:
+    return date(fecha.year, fecha.month, 1)
+
+def es_error_sin_particion(error: Exception) -> bool:
+    """Una fila cuya fecha no cae en ninguna partición (check_violation "no partition of relation")."""
+    original = getattr(error, "orig", error)   # Con text() llega envuelto por SQLAlchemy; con COPY, tal cual
+    return getattr(original, "pgcode", None) == "23514" and "no partition" in str(original)
+
+@instrumentar_dao
+class PostgresParticionesDAO(InterfaceParticionesDao):
+    def __init__(self, db):
+        self.db = db
+
+    def crear_particion_mensual(self, tabla: str, mes: date) -> str:
+        """
+        Crea la partición del mes con la función crear_particion_mensual de la BD.
+        Si ya existe no hace nada. No hace commit (lo gestiona el modelo).
+        """
+        if tabla not in TABLAS_PARTICIONADAS:
+            raise ValueError(f"La tabla '{tabla}' no está particionada por mes")
+        try:
+            sql = text("SELECT public.crear_particion_mensual(:tabla, :columna, :mes)")
+            return self.db.execute(sql, {
+                "tabla": tabla,
+                "columna": TABLAS_PARTICIONADAS[tabla],
+                "mes": mes
+            }).scalar()
+        except Exception as e:
+            logger.error(f"Error DAO creando partición de {tabla} ({mes}): {e}")
+            raise e
+
+    def asegurar_particiones(self, meses_adelante: int = 2) -> list[str]:
+        hoy = date.today()
+        particiones = []
+        for i in range(meses_adelante + 1):
+            anio, mes = divmod(hoy.month - 1 + i, 12)
+            primer_dia = date(hoy.year + anio, mes + 1, 1)
+            for tabla in TABLAS_PARTICIONADAS:
+                particiones.append(self.crear_particion_mensual(tabla, primer_dia))
+        return particiones
+
+    def separar_por_particion(self, tabla: str, eventos: list, fecha_de) -> tuple[list, list]:
+        """
+        Para reintentar un lote que ha fallado con es_error_sin_particion. Crea las particiones
+        que falten del mes en curso en adelante (reloj adelantado, meses aún no creados) y separa
+        los eventos en (con partición, de meses ya archivados). Los de meses anteriores sin
+        partición llegan tarde (p. ej. el spool reenviado tras una caída que cruzó el rollover):
+        ya no hay partición que archivar y se suman directamente al resumen mensual.
+        No hace commit.
+        """
+        mes_actual = primer_dia_mes(date.today())
+        archivados = set()
+        for mes in {primer_dia_mes(fecha_de(e)) for e in eventos}:
+            if mes >= mes_actual:
+                self.crear_particion_mensual(tabla, mes)
+            elif not self._tiene_particion(tabla, mes):
+                archivados.add(mes)
+        con_particion = [e for e in eventos if primer_dia_mes(fecha_de(e)) not in archivados]
+        de_archivados = [e for e in eventos if primer_dia_mes(fecha_de(e)) in archivados]
+        return con_particion, de_archivados
+
+    def _tiene_particion(self, tabla: str, mes: date) -> bool:
+        # Una partición a medio soltar (DETACH CONCURRENTLY) ya no admite filas: cuenta como archivada
+        sql = text("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_inherits i
+                WHERE i.inhrelid = to_regclass(:particion) AND i.inhparent = to_regclass(:tabla)
+                  AND NOT i.inhdetachpending
+            )
+        """)
+        particion = f"public.{tabla}_p{mes:%Y_%m}"
+        return self.db.execute(sql, {"particion": particion, "tabla": f"public.{tabla}"}).scalar()
+
+    def listar_particiones_cerradas(self, antes_de: date) -> list[tuple]:
+        """
+        Particiones de meses anteriores a `antes_de`, sigan colgadas de su tabla o no:
+        una que se soltó en un rollover interrumpido aún tiene que archivarse y borrarse.
+        """
+        sql = text("""
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind = 'r' AND c.relname LIKE :prefijo
+            ORDER BY c.relname
+        """)
+        cerradas = []
+        for tabla in TABLAS_PARTICIONADAS:
+            for nombre in self.db.execute(sql, {"prefijo": f"{tabla}\\_p%"}).scalars():
+                coincidencia = PATRON_PARTICION.search(nombre)
+                if not coincidencia:
+                    continue
+                mes = date(int(coincidencia.group(1)), int(coincidencia.group(2)), 1)
+                if mes < antes_de:
+                    cerradas.append((tabla, nombre, mes))
+        return cerradas
+
+    def soltar_particion(self, tabla: str, particion: str):
+        """
+        DETACH PARTITION ... CONCURRENTLY (o FINALIZE si uno anterior se quedó a medias).
+        No puede ir dentro de una transacción, así que se usa una conexión propia en
+        autocommit (no la sesión del DAO). Mientras tanto el resto de particiones sigue
+        aceptando lecturas y escrituras. Si ya estaba suelta no hace nada.
+        """
+        try:
+            with self.db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                pendiente = conn.execute(text("""
+                    SELECT i.inhdetachpending
+                    FROM pg_inherits i
+                    WHERE i.inhrelid = to_regclass(:particion) AND i.inhparent = to_regclass(:tabla)
+                """), {"particion": f"public.{particion}", "tabla": f"public.{tabla}"}).scalar()
+
+                if pendiente is True:
+                    conn.execute(text(f'ALTER TABLE public."{tabla}" DETACH PARTITION public."{particion}" FINALIZE'))
+                elif pendiente is False:
+                    conn.execute(text(f'ALTER TABLE public."{tabla}" DETACH PARTITION public."{particion}" CONCURRENTLY'))
+        except Exception as e:
+            logger.error(f"Error DAO soltando partición {particion}: {e}")
+            raise e
+
+    def archivar_particion(self, tabla: str, particion: str, mes: date) -> int:
+        """
+        Suma la partición ya soltada al resumen del mes y la borra. No hace commit: el resumen
+        y el DROP se confirman juntos. Devuelve las filas de resumen escritas.
+        """
+        try:
+            filas = self.db.execute(text(SQL_ARCHIVAR[tabla].format(particion=particion)), {"mes": mes}).rowcount
+            self.db.execute(text(f'DROP TABLE public."{particion}"'))
+            return filas
+        except Exception as e:
+            logger.error(f"Error DAO archivando {particion}: {e}")
+            raise e
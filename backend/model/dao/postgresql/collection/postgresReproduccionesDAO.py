@@ -1,35 +1,158 @@
+import logging
+import csv
+import io
+from datetime import datetime
 from sqlalchemy import text
 from backend.model.dto.reproduccionDTO import ReproduccionDTO # Corrige el nombre del archivo si es necesario
 from backend.model.dao.interfaceReproduccionesDao import InterfaceReproduccionesDao
+from backend.controller.metricas import instrumentar_dao
+from backend.model.dao.postgresql.upsertMasivo import trocear
+from backend.model.dao.postgresql.replicas import solo_lectura
 
+logger = logging.getLogger(__name__)
+
+# Criterios del top de un usuario y su columna en reproduccionesusuario
+ORDENES_TOP_USUARIO = {
+    "reproducciones": "numreproducciones",
+    "segundos": "segundostotales",
+}
+
+@instrumentar_dao
 class ReproduccionesDAO(InterfaceReproduccionesDao):
     def __init__(self, db):
         self.db = db
 
     def insertar_reproduccion(self, id_usuario: int, id_contenido: int, segundos: int):
         """
-        Registra una nueva reproducción usando NOW() de PostgreSQL.
+        Registra una nueva reproducción con la fecha actual.
         """
         try:
+            ahora = datetime.now()
             sql_insert = text("""
                 INSERT INTO historialreproducciones (id_usuario, id_contenido, segundos_reproducidos, fecha_reproduccion)
-                VALUES (:id_usuario, :id_contenido, :segundos, NOW())
+                VALUES (:id_usuario, :id_contenido, :segundos, :fecha)
             """)
             
             self.db.execute(sql_insert, {
                 "id_usuario": id_usuario,
                 "id_contenido": id_contenido,
-                "segundos": segundos
+                "segundos": segundos,
+                "fecha": ahora
             })
+            self._sumar_reproducciones_usuario([ReproduccionDTO(id_usuario, id_contenido, segundos, ahora)])
             
             # Siguiendo tu patrón en BusquedasDAO, hacemos commit aquí
             self.db.commit()
             
         except Exception as e:
-            print(f"❌ Error DAO Reproducciones Insert: {e}")
+            logger.error(f"Error DAO Reproducciones Insert: {e}")
             self.db.rollback()
             raise e
 
+    def insertar_reproducciones_lote(self, reproducciones: list[ReproduccionDTO]) -> int:
+        """
+        Inserta muchas reproducciones con COPY FROM STDIN (una sola ida y vuelta)
+        y las suma al acumulado de reproduccionesusuario.
+        La fecha viene en cada DTO (momento en que se recibió el evento).
+        No hace commit: lo gestiona quien llama (el buffer de reproducciones).
+        """
+        if not reproducciones:
+            return 0
+        try:
+            datos = io.StringIO()
+            escritor = csv.writer(datos)
+            for r in reproducciones:
+                escritor.writerow([r.id_usuario, r.id_contenido, r.segundos, r.fecha.isoformat()])
+            datos.seek(0)
+
+            # COPY no pasa por text(): se usa el cursor de psycopg2 de la conexión de la sesión
+            conexion = self.db.connection().connection
+            with conexion.cursor() as cursor:
+                cursor.copy_expert(
+                    "COPY historialreproducciones (id_usuario, id_contenido, segundos_reproducidos, fecha_reproduccion) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    datos
+                )
+            self._sumar_reproducciones_usuario(reproducciones)
+            return len(reproducciones)
+
+        except Exception as e:
+            logger.error(f"Error DAO Reproducciones COPY: {e}")
+            raise e
+
+    def sumar_reproducciones_archivadas(self, reproducciones: list[ReproduccionDTO]) -> int:
+        """
+        Reproducciones de un mes cuya partición ya soltó el rollover: se suman a su resumen
+        en reproduccionesmensual y al acumulado de reproduccionesusuario (el historial ya no
+        cubre ese mes). No hace commit.
+        """
+        if not reproducciones:
+            return 0
+        try:
+            resumen = {}
+            for r in reproducciones:
+                clave = (r.fecha.date().replace(day=1), r.id_usuario, r.id_contenido)
+                veces, segundos = resumen.get(clave, (0, 0))
+                resumen[clave] = (veces + 1, segundos + (r.segundos or 0))
+
+            for bloque in trocear(sorted(resumen.items())):
+                valores = []
+                params = {}
+                for i, ((mes, id_usuario, id_contenido), (veces, segundos)) in enumerate(bloque):
+                    valores.append(f"(:m_{i}, :u_{i}, :c_{i}, :n_{i}, :s_{i})")
+                    params[f"m_{i}"] = mes
+                    params[f"u_{i}"] = id_usuario
+                    params[f"c_{i}"] = id_contenido
+                    params[f"n_{i}"] = veces
+                    params[f"s_{i}"] = segundos
+
+                sql = text(f"""
+                    INSERT INTO reproduccionesmensual (mes, id_usuario, id_contenido, numreproducciones, segundostotales)
+                    VALUES {', '.join(valores)}
+                    ON CONFLICT (mes, id_usuario, id_contenido) DO UPDATE
+                    SET numreproducciones = reproduccionesmensual.numreproducciones + EXCLUDED.numreproducciones,
+                        segundostotales = reproduccionesmensual.segundostotales + EXCLUDED.segundostotales
+                """)
+                self.db.execute(sql, params)
+            self._sumar_reproducciones_usuario(reproducciones)
+            return len(reproducciones)
+
+        except Exception as e:
+            logger.error(f"Error DAO sumando reproducciones de meses archivados: {e}")
+            raise e
+
+    def _sumar_reproducciones_usuario(self, reproducciones: list[ReproduccionDTO]):
+        """Suma las reproducciones a reproduccionesusuario (en la misma transacción que el log)."""
+        # Una fila por (usuario, contenido), no una por reproducción
+        acumulado = {}
+        for r in reproducciones:
+            clave = (r.id_usuario, r.id_contenido)
+            veces, segundos, ultima = acumulado.get(clave, (0, 0, r.fecha))
+            acumulado[clave] = (veces + 1, segundos + (r.segundos or 0), max(ultima, r.fecha))
+
+        # En orden de clave: dos lotes concurrentes bloquean las filas comunes en el mismo orden
+        for bloque in trocear(sorted(acumulado.items())):
+            valores = []
+            params = {}
+            for i, ((id_usuario, id_contenido), (veces, segundos, ultima)) in enumerate(bloque):
+                valores.append(f"(:u_{i}, :c_{i}, :n_{i}, :s_{i}, :f_{i})")
+                params[f"u_{i}"] = id_usuario
+                params[f"c_{i}"] = id_contenido
+                params[f"n_{i}"] = veces
+                params[f"s_{i}"] = segundos
+                params[f"f_{i}"] = ultima
+
+            sql = text(f"""
+                INSERT INTO reproduccionesusuario (id_usuario, id_contenido, numreproducciones, segundostotales, ultimareproduccion)
+                VALUES {', '.join(valores)}
+                ON CONFLICT (id_usuario, id_contenido) DO UPDATE
+                SET numreproducciones = reproduccionesusuario.numreproducciones + EXCLUDED.numreproducciones,
+                    segundostotales = reproduccionesusuario.segundostotales + EXCLUDED.segundostotales,
+                    ultimareproduccion = GREATEST(reproduccionesusuario.ultimareproduccion, EXCLUDED.ultimareproduccion)
+            """)
+            self.db.execute(sql, params)
+
+    @solo_lectura
     def obtener_historial_por_usuario(self, id_usuario: int, limit: int = 50) -> list[ReproduccionDTO]:
         """
         Recupera el historial para mostrarlo en las estadísticas personales.
@@ -58,7 +181,7 @@ class ReproduccionesDAO(InterfaceReproduccionesDao):
                 for r in rows
             ]
         except Exception as e:
-            print(f"❌ Error DAO Obtener Historial: {e}")
+            logger.error(f"Error DAO Obtener Historial: {e}")
             raise e
         
     def eliminar_todo_el_historial(self):
@@ -68,7 +191,7 @@ class ReproduccionesDAO(InterfaceReproduccionesDao):
         """
         try:
             # TRUNCATE es instantáneo y perfecto para reseteos mensuales
-            sql = text("TRUNCATE TABLE historialreproducciones RESTART IDENTITY")
+            sql = text("TRUNCATE TABLE historialreproducciones, reproduccionesusuario RESTART IDENTITY")
             self.db.execute(sql)
             
             # Nota: Al igual que en busquedas, el commit lo hacemos en el modelo
@@ -76,37 +199,44 @@ class ReproduccionesDAO(InterfaceReproduccionesDao):
             # self.db.commit()
             return True
         except Exception as e:
-            print(f"❌ Error DAO vaciando historial reproducciones: {e}")
+            logger.error(f"Error DAO vaciando historial reproducciones: {e}")
             self.db.rollback() # Por si acaso
             raise e
 
-    def get_top_reproducciones_usuario(self, id_usuario: int, limit: int = 10) -> list[ReproduccionDTO]:
+    @solo_lectura
+    def get_top_reproducciones_usuario(self, id_usuario: int, limit: int = 10, orden: str = "reproducciones") -> list[ReproduccionDTO]:
+        """
+        Contenidos más escuchados por el usuario, por número de veces o por segundos
+        (`orden`). Se lee el acumulado de reproduccionesusuario por su índice del
+        criterio, así que el coste depende de 'limit' y no del historial del usuario.
+        """
+        if orden not in ORDENES_TOP_USUARIO:
+            raise ValueError(f"'orden' debe ser uno de {tuple(ORDENES_TOP_USUARIO)}, no '{orden}'")
         try:
-            # Seleccionamos el contenido y CONTAMOS las veces que aparece.
-            sql = text("""
-                SELECT id_contenido, COUNT(*) as total_veces
-                FROM historialreproducciones
+            columna = ORDENES_TOP_USUARIO[orden]
+            sql = text(f"""
+                SELECT id_contenido, {columna} AS total, ultimareproduccion
+                FROM reproduccionesusuario
                 WHERE id_usuario = :uid
-                GROUP BY id_contenido
-                ORDER BY total_veces DESC
+                ORDER BY {columna} DESC, id_contenido
                 LIMIT :lim
             """)
             
             rows = self.db.execute(sql, {"uid": id_usuario, "lim": limit}).fetchall()
 
             # REUTILIZACIÓN DEL DTO:
-            # Usamos 'segundos' para guardar el 'total_veces'.
-            # Ponemos fecha en None porque es un acumulado, no una fecha concreta.
+            # Usamos 'segundos' para guardar el total del criterio (veces o segundos)
+            # y 'fecha' para la última vez que se escuchó.
             return [
                 ReproduccionDTO(
-                    id_reproduccion=None,        # No hay ID único de fila, es un grupo
+                    id_reproduccion=None,        # No hay ID único de fila, es un acumulado
                     id_usuario=id_usuario,
                     id_contenido=r.id_contenido,
-                    segundos=r.total_veces,      # <--- AQUÍ GUARDAMOS EL CONTEO
-                    fecha=None                   # No aplica fecha
+                    segundos=r.total,            # <--- AQUÍ GUARDAMOS EL TOTAL
+                    fecha=r.ultimareproduccion
                 )
                 for r in rows
             ]
         except Exception as e:
-            print(f"❌ Error DAO Top Reproducciones Usuario: {e}")
-            raise e
\ No newline at end of file
+            logger.error(f"Error DAO Top Reproducciones Usuario: {e}")
+            raise e
@@ -0,0 +1,20 @@
+import logging
+from typing import Optional
+from sqlalchemy import text
+from backend.model.dao.interfaceVersionesRankingsDao import InterfaceVersionesRankingsDao
+from backend.controller.metricas import instrumentar_dao
+
+logger = logging.getLogger(__name__)
+
+@instrumentar_dao
+class PostgresVersionesRankingsDAO(InterfaceVersionesRankingsDao):
+    def __init__(self, db):
+        self.db = db
+
+    def obtener(self, tabla: str) -> Optional[int]:
+        try:
+            sql = text("SELECT version FROM versionesrankings WHERE tabla = :tabla")
+            return self.db.execute(sql, {"tabla": tabla}).scalar()
+        except Exception as e:
+            logger.error(f"Error DAO Versiones Rankings Obtener ({tabla}): {e}")
+            raise e
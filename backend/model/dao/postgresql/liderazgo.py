@@ -0,0 +1,143 @@
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from sqlalchemy import text
+from backend.model.dao.postgresql.posgresConnector import PostgreSQLConnector
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock del líder del scheduler (la 72_0001 es la de las migraciones)
+CLAVE_LOCK_SCHEDULER = 72_0002
+# Clase de los advisory locks de cada job: pg_try_advisory_lock(CLAVE_LOCK_JOBS, hashtext(job))
+CLAVE_LOCK_JOBS = 72_0003
+
+
+def instancia() -> str:
+    """Identifica a este proceso (host:pid) en los logs y en el historial de jobs."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _engine():
+    return PostgreSQLConnector.obtener_engine()
+
+
+class LiderAdvisoryLock:
+    """
+    Elección de líder entre instancias con un advisory lock de sesión de PostgreSQL.
+
+    Un hilo intenta tomar el lock cada `intervalo` segundos. La instancia que lo consigue
+    guarda la conexión que lo tiene y es líder hasta que se detiene o pierde esa conexión
+    (PostgreSQL suelta el lock al cerrarse la sesión, así que otra instancia lo tomará).
+    El líder comprueba su conexión con la misma frecuencia y, si se ha caído, deja de serlo.
+
+    `al_ganar` y `al_perder` se llaman desde el hilo de la elección.
+    """
+
+    def __init__(self, clave: int, al_ganar, al_perder, intervalo: float = 15):
+        self.clave = clave
+        self.al_ganar = al_ganar
+        self.al_perder = al_perder
+        self.intervalo = intervalo
+        self._conn = None
+        self._parar = threading.Event()
+        self._hilo = None
+
+    @property
+    def es_lider(self) -> bool:
+        return self._conn is not None
+
+    def iniciar(self):
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="lider-scheduler", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Deja de competir y, si era líder, llama a `al_perder` y suelta el lock."""
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+        if self.es_lider:
+            self._dejar(soltar=True)
+
+    def _bucle(self):
+        while not self._parar.is_set():
+            try:
+                if not self.es_lider:
+                    self._intentar()
+                elif not self._conexion_viva():
+                    logger.warning("Instancia %s: se ha perdido la conexión del lock, deja de ser líder", instancia())
+                    self._dejar(soltar=False)
+            except Exception as e:
+                logger.error(f"Error en la elección de líder: {e}")
+            self._parar.wait(self.intervalo)
+
+    def _intentar(self):
+        conn = _engine().connect()
+        try:
+            obtenido = conn.execute(text("SELECT pg_try_advisory_lock(:clave)"), {"clave": self.clave}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not obtenido:
+            conn.close()
+            return
+
+        self._conn = conn
+        logger.info("Instancia %s elegida líder del scheduler", instancia())
+        try:
+            self.al_ganar()
+        except Exception as e:
+            logger.error(f"Error al asumir el liderazgo: {e}")
+            self._dejar(soltar=True)
+
+    def _conexion_viva(self) -> bool:
+        try:
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            return True
+        except Exception:
+            return False
+
+    def _dejar(self, soltar: bool):
+        conn, self._conn = self._conn, None
+        try:
+            self.al_perder()
+        except Exception as e:
+            logger.error(f"Error al dejar el liderazgo: {e}")
+        try:
+            if soltar:
+                conn.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": self.clave})
+                conn.commit()
+            else:
+                # La sesión ya no existe: que el pool no reutilice la conexión
+                conn.invalidate()
+        except Exception:
+            conn.invalidate()
+        finally:
+            conn.close()
+        logger.info("Instancia %s ya no es líder del scheduler", instancia())
+
+
+@contextmanager
+def bloqueo_job(nombre: str):
+    """
+    Advisory lock propio del job `nombre` mientras dura el bloque. Devuelve True si se ha
+    obtenido y False si otra instancia lo está ejecutando (no se espera).
+    """
+    with _engine().connect() as conn:
+        parametros = {"clase": CLAVE_LOCK_JOBS, "nombre": nombre}
+        obtenido = conn.execute(text("SELECT pg_try_advisory_lock(:clase, hashtext(:nombre))"), parametros).scalar()
+        conn.commit()
+        try:
+            yield obtenido
+        finally:
+            if obtenido:
+                try:
+                    conn.execute(text("SELECT pg_advisory_unlock(:clase, hashtext(:nombre))"), parametros)
+                    conn.commit()
+                except Exception:
+                    conn.invalidate()
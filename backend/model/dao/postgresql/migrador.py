@@ -0,0 +1,108 @@
+import logging
+import os
+import re
+from sqlalchemy import text
+from backend.model.dao.postgresql.posgresConnector import PostgreSQLConnector
+from backend.controller.config import MIGRACIONES_DIR
+
+# Nombre fijo: con `python -m` __name__ es "__main__", fuera de la jerarquía "backend" que configura logs.py
+logger = logging.getLogger("backend.model.dao.postgresql.migrador")
+
+# Clave del advisory lock: si arrancan varias instancias a la vez, solo una migra
+CLAVE_LOCK_MIGRACIONES = 72_0001
+
+# Tabla que ya existía en las bases de datos creadas con init.sql
+TABLA_ESQUEMA_INICIAL = "public.artistasmensual"
+
+PATRON_MIGRACION = re.compile(r"^(\d+)_.+\.sql$")
+
+
+def leer_migraciones(directorio: str = MIGRACIONES_DIR) -> list[tuple[int, str, str]]:
+    """Devuelve [(version, nombre, ruta)] de los scripts de `directorio`, ordenados por versión."""
+    migraciones = []
+    for nombre in os.listdir(directorio):
+        coincidencia = PATRON_MIGRACION.match(nombre)
+        if coincidencia:
+            migraciones.append((int(coincidencia.group(1)), nombre, os.path.join(directorio, nombre)))
+    migraciones.sort()
+
+    versiones = [v for v, _, _ in migraciones]
+    if len(versiones) != len(set(versiones)):
+        raise ValueError(f"Hay dos migraciones con la misma versión en {directorio}")
+    return migraciones
+
+
+def aplicar_migraciones(directorio: str = MIGRACIONES_DIR) -> list[str]:
+    """
+    Aplica, en orden, las migraciones de `directorio` que falten en schema_migraciones.
+    Cada script se ejecuta en su propia transacción junto con su registro, así que
+    o se aplica entero o no se aplica. Devuelve los nombres de las migraciones aplicadas.
+    """
+    engine = PostgreSQLConnector.obtener_engine()
+
+    migraciones = leer_migraciones(directorio)
+    aplicadas_ahora = []
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:clave)"), {"clave": CLAVE_LOCK_MIGRACIONES})
+        conn.commit()
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS public.schema_migraciones (
+                    version integer PRIMARY KEY,
+                    nombre text NOT NULL,
+                    aplicada_en timestamp without time zone DEFAULT now() NOT NULL
+                )
+            """))
+            aplicadas = set(conn.execute(text("SELECT version FROM public.schema_migraciones")).scalars())
+
+            # Base de datos creada con el antiguo init.sql: el esquema inicial ya está
+            if not aplicadas and migraciones and migraciones[0][0] == 0:
+                existe = conn.execute(text("SELECT to_regclass(:tabla)"), {"tabla": TABLA_ESQUEMA_INICIAL}).scalar()
+                if existe is not None:
+                    conn.execute(
+                        text("INSERT INTO public.schema_migraciones (version, nombre) VALUES (0, :nombre)"),
+                        {"nombre": migraciones[0][1]}
+                    )
+                    aplicadas.add(0)
+                    logger.info(f"Esquema inicial ya presente: {migraciones[0][1]} marcada como aplicada")
+            conn.commit()
+
+            for version, nombre, ruta in migraciones:
+                if version in aplicadas:
+                    continue
+
+                logger.info(f"Aplicando migración {nombre}...")
+                with open(ruta, encoding="utf-8") as f:
+                    sql = f.read()
+                try:
+                    with conn.begin():
+                        # Cursor de psycopg2 sin parámetros: el script puede tener varias
+                        # sentencias y '%' (format() en funciones) sin que se interprete nada
+                        with conn.connection.cursor() as cursor:
+                            cursor.execute(sql)
+                        conn.execute(
+                            text("INSERT INTO public.schema_migraciones (version, nombre) VALUES (:version, :nombre)"),
+                            {"version": version, "nombre": nombre}
+                        )
+                except Exception as e:
+                    logger.error(f"Error aplicando migración {nombre}: {e}")
+                    raise e
+
+                aplicadas_ahora.append(nombre)
+                logger.info(f"Migración {nombre} aplicada")
+
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": CLAVE_LOCK_MIGRACIONES})
+            conn.commit()
+
+    if not aplicadas_ahora:
+        logger.info("Base de datos al día, no hay migraciones pendientes")
+    return aplicadas_ahora
+
+
+if __name__ == "__main__":
+    # python -m backend.model.dao.postgresql.migrador
+    from backend.controller.logs import configurar_logs
+    configurar_logs()
+    aplicar_migraciones()
@@ -0,0 +1,115 @@
+import logging
+import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from backend.model.dao.postgresql.posgresConnector import obtener_database_url, tamano_pool, parametros_pool
+from backend.model.dao.postgresql.replicas import ReplicasLectura, SesionEnrutada
+from backend.controller.config import DB_TIMEOUT_CONEXION, DB_REPLICAS, DB_REPLICA_EXPULSION
+from backend.controller.logs import ocultar_password
+from backend.controller.metricas import pool_medido, medir_conexiones_en_uso
+
+logger = logging.getLogger(__name__)
+
+class PostgreSQLAsyncConnector:
+    """
+    Conector asíncrono (SQLAlchemy AsyncEngine sobre asyncpg).
+    Usa la misma base de datos y los mismos parámetros de pool que PostgreSQLConnector.
+    """
+    # --- VARIABLES DE CLASE (Compartidas por todas las instancias) ---
+    db_initialized = False
+    engine = None
+    engines_replicas = []
+    replicas = None
+    SessionLocal = None
+
+    def __init__(self):
+        try:
+            if not PostgreSQLAsyncConnector.db_initialized:
+                # Misma URL que el conector síncrono, pero con el driver asyncpg
+                database_url = make_url(obtener_database_url()).set(drivername="postgresql+asyncpg")
+
+                pool_size, max_overflow = tamano_pool()
+                logger.info("Conectando a BD (async): %s (pool %s + %s)", ocultar_password(database_url), pool_size, max_overflow)
+
+                PostgreSQLAsyncConnector.engine = self._crear_engine(database_url, "async")
+
+                # Las réplicas se enrutan igual que en el conector síncrono: la sesión síncrona
+                # que hay debajo de la AsyncSession (la que usa run_sync) es una SesionEnrutada
+                if DB_REPLICAS:
+                    PostgreSQLAsyncConnector.engines_replicas = [
+                        self._crear_engine(make_url(url).set(drivername="postgresql+asyncpg"), f"async-replica{i}")
+                        for i, url in enumerate(DB_REPLICAS)
+                    ]
+                    PostgreSQLAsyncConnector.replicas = ReplicasLectura(
+                        [engine.sync_engine for engine in PostgreSQLAsyncConnector.engines_replicas], DB_REPLICA_EXPULSION
+                    )
+
+                PostgreSQLAsyncConnector.SessionLocal = async_sessionmaker(
+                    sync_session_class=SesionEnrutada,
+                    replicas=PostgreSQLAsyncConnector.replicas,
+                    autoflush=False,
+                    expire_on_commit=False,
+                    bind=PostgreSQLAsyncConnector.engine
+                )
+
+                PostgreSQLAsyncConnector.db_initialized = True
+                logger.info("Async connection to PostgreSQL database initialized successfully.")
+
+        except Exception as e:
+            logger.error(f"Error in connecting to the PostgreSQL database (async): {e}")
+            PostgreSQLAsyncConnector.engine = None
+            PostgreSQLAsyncConnector.engines_replicas = []
+            PostgreSQLAsyncConnector.replicas = None
+            PostgreSQLAsyncConnector.SessionLocal = None
+
+    @staticmethod
+    def _crear_engine(database_url, etiqueta: str):
+        engine = create_async_engine(
+            database_url,
+            # Las sentencias SQL se registran por el logger sqlalchemy.engine (DB_ECHO)
+            echo=False,
+            poolclass=pool_medido(AsyncAdaptedQueuePool, etiqueta),
+            connect_args={"timeout": DB_TIMEOUT_CONEXION},
+            **parametros_pool()
+        )
+        medir_conexiones_en_uso(etiqueta, engine)
+        return engine
+
+    @classmethod
+    def obtener_engine(cls):
+        """Igual que PostgreSQLConnector.obtener_engine: reintenta la inicialización si falló."""
+        if cls.engine is None:
+            cls()
+        if cls.engine is None:
+            raise RuntimeError("La conexión asíncrona con la base de datos no está inicializada")
+        return cls.engine
+
+    def get_db(self) -> AsyncSession:
+        """Devuelve una nueva sesión asíncrona (toma una conexión del pool al usarse)."""
+        PostgreSQLAsyncConnector.obtener_engine()
+        return PostgreSQLAsyncConnector.SessionLocal()
+
+    @classmethod
+    async def dispose(cls):
+        """Cierra todas las conexiones del pool asíncrono (apagado de la app)."""
+        if cls.engine is not None:
+            await cls.engine.dispose()
+        for engine in cls.engines_replicas:
+            await engine.dispose()
+
+    @classmethod
+    def _tras_fork(cls):
+        """Igual que PostgreSQLConnector._tras_fork: el hijo crea su propio engine y pool."""
+        if cls.engine is not None:
+            cls.engine.sync_engine.dispose(close=False)
+        if cls.replicas is not None:
+            cls.replicas.dispose(close=False)
+        cls.engine = None
+        cls.engines_replicas = []
+        cls.replicas = None
+        cls.SessionLocal = None
+        cls.db_initialized = False
+
+
+os.register_at_fork(after_in_child=PostgreSQLAsyncConnector._tras_fork)
@@ -0,0 +1,46 @@
+from backend.model.dao.postgresql.posgresAsyncConnector import PostgreSQLAsyncConnector
+from backend.model.dao.postgresql.asyncCollection.postgresAsyncDAOs import (
+    PostgresAsyncArtistasMensualesDAO,
+    PostgresAsyncBusquedasArtistasDAO,
+    PostgresAsyncContenidoDAO,
+    PostgresAsyncComunidadesMensualesDAO,
+    PostgresAsyncReproduccionesDAO,
+    PostgresAsyncHuellasSincronizacionDAO,
+    PostgresAsyncEjecucionesJobsDAO,
+)
+
+class PostgreSQLAsyncDAOFactory:
+
+    def __init__(self, db=None):
+        """
+        Igual que PostgreSQLDAOFactory pero sobre una AsyncSession (asyncpg).
+        Todos los DAOs de esta fábrica comparten la misma sesión.
+        """
+        self.connector = PostgreSQLAsyncConnector()
+        self.db = db if db is not None else self.connector.get_db()
+
+    async def close(self):
+        """Cierra la sesión y devuelve su conexión al pool."""
+        if self.db is not None:
+            await self.db.close()
+
+    def get_artistas_mensuales_dao(self):
+        return PostgresAsyncArtistasMensualesDAO(self.db)
+
+    def get_busquedas_artistas_dao(self):
+        return PostgresAsyncBusquedasArtistasDAO(self.db)
+
+    def get_contenido_dao(self):
+        return PostgresAsyncContenidoDAO(self.db)
+
+    def get_comunidad_dao(self):
+        return PostgresAsyncComunidadesMensualesDAO(self.db)
+
+    def get_reproducciones_dao(self):
+        return PostgresAsyncReproduccionesDAO(self.db)
+
+    def get_huellas_sincronizacion_dao(self):
+        return PostgresAsyncHuellasSincronizacionDAO(self.db)
+
+    def get_ejecuciones_jobs_dao(self):
+        return PostgresAsyncEjecucionesJobsDAO(self.db)
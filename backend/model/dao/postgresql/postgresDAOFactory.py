@@ -4,14 +4,30 @@ from backend.model.dao.postgresql.collection.postgresBusquedasArtistasDAO import
 from backend.model.dao.postgresql.collection.postgresContenidoDAO import PostgresContenidoDAO
 from backend.model.dao.postgresql.collection.postgesComunidadesMensualesDAO import PostgresComunidadesMensualesDAO
 from backend.model.dao.postgresql.collection.postgresReproduccionesDAO import ReproduccionesDAO
+from backend.model.dao.postgresql.collection.postgresParticionesDAO import PostgresParticionesDAO
+from backend.model.dao.postgresql.collection.postgresHuellasSincronizacionDAO import PostgresHuellasSincronizacionDAO
+from backend.model.dao.postgresql.collection.postgresEjecucionesJobsDAO import PostgresEjecucionesJobsDAO
+from backend.model.dao.postgresql.collection.postgresVersionesRankingsDAO import PostgresVersionesRankingsDAO
 
 class PostgreSQLDAOFactory:
 
-    def __init__(self):
-        """Inicializa el conector a la base de datos PostgreSQL"""
-        self.connector = PostgreSQLConnector()  # Usamos el conector para crear una conexión con la base de datos
-        self.db = self.connector.get_db()  # SOLO UNA CONEXIÓN, que se reutiliza
-        
+    def __init__(self, db=None):
+        """
+        Inicializa el conector a la base de datos PostgreSQL.
+        Si no se pasa una sesión, se abre una nueva del pool: todos los DAOs
+        de esta fábrica comparten esa sesión (una unidad de trabajo).
+        """
+        self.connector = None
+        if db is None:
+            self.connector = PostgreSQLConnector()  # Usamos el conector para crear una conexión con la base de datos
+            db = self.connector.get_db()
+        self.db = db
+
+    def close(self):
+        """Cierra la sesión y devuelve su conexión al pool."""
+        if self.db is not None:
+            self.db.close()
+
     def get_artistas_mensuales_dao(self):
         return PostgresArtistasMensualesDAO(self.db)
     
@@ -27,4 +43,14 @@ class PostgreSQLDAOFactory:
     def get_reproducciones_dao(self):
         return ReproduccionesDAO(self.db)
 
+    def get_particiones_dao(self):
+        return PostgresParticionesDAO(self.db)
+
+    def get_huellas_sincronizacion_dao(self):
+        return PostgresHuellasSincronizacionDAO(self.db)
+
+    def get_ejecuciones_jobs_dao(self):
+        return PostgresEjecucionesJobsDAO(self.db)
 
+    def get_versiones_rankings_dao(self):
+        return PostgresVersionesRankingsDAO(self.db)
@@ -0,0 +1,180 @@
+"""
+Réplicas de lectura (DB_REPLICAS).
+
+Los métodos de los DAOs marcados con @solo_lectura pueden leer de una réplica; todo lo demás
+va al primario. La sesión lo decide en cada sentencia (SesionEnrutada.get_bind):
+
+  - Va a una réplica si se ejecuta dentro de un método @solo_lectura, la transacción no ha
+    usado todavía el primario (una lectura dentro de una transacción de escritura se queda
+    en el primario) y la sesión no está fijada al primario con `en_primario`.
+  - Las réplicas se eligen por turnos (round-robin), y una transacción sigue en la réplica
+    que empezó. Una réplica que da un error de conexión se expulsa DB_REPLICA_EXPULSION
+    segundos y la lectura se repite en el primario. Sin réplicas disponibles, se lee del primario.
+
+Las réplicas van con retraso respecto al primario: una lectura justo después de escribir
+puede no ver todavía la escritura. Lo que debe ser exacto (índices de rankings, cachés) se
+lee con `en_primario`.
+"""
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from backend.controller.logs import ocultar_password
+from backend.controller.metricas import DB_LECTURAS
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicasLectura:
+    """Engines de las réplicas, con el turno del round-robin y las expulsiones por fallo."""
+
+    def __init__(self, engines: list, expulsion: float):
+        self.engines = engines
+        self.expulsion = expulsion
+        self._expulsada_hasta = {engine: 0.0 for engine in engines}
+        self._turno = itertools.count()
+        self._lock = threading.Lock()
+        for engine in engines:
+            event.listen(engine, "handle_error", functools.partial(self._al_fallar, engine))
+
+    def elegir(self):
+        """La siguiente réplica no expulsada, o None si no hay ninguna."""
+        ahora = time.monotonic()
+        inicio = next(self._turno)
+        for i in range(len(self.engines)):
+            engine = self.engines[(inicio + i) % len(self.engines)]
+            if self._expulsada_hasta[engine] <= ahora:
+                return engine
+        return None
+
+    def expulsada(self, engine) -> bool:
+        return self._expulsada_hasta.get(engine, 0.0) > time.monotonic()
+
+    def expulsar(self, engine):
+        with self._lock:
+            if not self.expulsada(engine):
+                logger.warning("Réplica %s expulsada durante %s s", ocultar_password(engine.url), self.expulsion)
+            self._expulsada_hasta[engine] = time.monotonic() + self.expulsion
+
+    def _al_fallar(self, engine, contexto):
+        # Conexión perdida o imposible de abrir (sin conexión): la réplica no está sana.
+        # Un error del SQL no la expulsa.
+        if contexto.is_disconnect or contexto.connection is None:
+            self.expulsar(engine)
+
+    def estado(self) -> list[dict]:
+        ahora = time.monotonic()
+        return [
+            {
+                "url": ocultar_password(engine.url),
+                "expulsada": self._expulsada_hasta[engine] > ahora,
+                "segundosExpulsada": round(max(0.0, self._expulsada_hasta[engine] - ahora), 1)
+            }
+            for engine in self.engines
+        ]
+
+    def dispose(self, close: bool = True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+
+class SesionEnrutada(Session):
+    """Session que manda las lecturas marcadas a una réplica (ver el docstring del módulo)."""
+
+    def __init__(self, *args, replicas: ReplicasLectura | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if self.replicas is not None and self.info.get("lecturas"):
+            replica = self._replica()
+            if replica is not None:
+                DB_LECTURAS.labels("replica").inc()
+                return replica
+            DB_LECTURAS.labels("primario").inc()
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _replica(self):
+        if self.info.get("primario") or self.info.get("primario_en_transaccion"):
+            return None
+        replica = self.info.get("replica_en_transaccion")
+        if replica is None or self.replicas.expulsada(replica):
+            replica = self.replicas.elegir()
+        self.info["replica_elegida"] = replica
+        return replica
+
+
+@event.listens_for(SesionEnrutada, "after_begin")
+def _al_empezar(sesion, transaccion, conexion):
+    """Anota qué engines usa la transacción: si ha tocado el primario, ya no se lee de réplicas."""
+    if sesion.replicas is not None and conexion.engine in sesion.replicas.engines:
+        sesion.info["replica_en_transaccion"] = conexion.engine
+    else:
+        sesion.info["primario_en_transaccion"] = True
+
+@event.listens_for(SesionEnrutada, "after_transaction_end")
+def _al_terminar(sesion, transaccion):
+    if transaccion.parent is None:
+        sesion.info.pop("replica_en_transaccion", None)
+        sesion.info.pop("primario_en_transaccion", None)
+
+
+@contextmanager
+def leyendo(sesion):
+    """Lo que se ejecute en el bloque puede ir a una réplica (lo que hace @solo_lectura)."""
+    sesion = getattr(sesion, "sync_session", sesion)   # También con una AsyncSession
+    sesion.info["lecturas"] = sesion.info.get("lecturas", 0) + 1
+    try:
+        yield
+    finally:
+        sesion.info["lecturas"] -= 1
+
+@contextmanager
+def en_primario(sesion):
+    """Todo lo que se ejecute en el bloque va al primario, aunque sea @solo_lectura."""
+    sesion = getattr(sesion, "sync_session", sesion)   # También con una AsyncSession
+    anterior = sesion.info.get("primario", False)
+    sesion.info["primario"] = True
+    try:
+        yield
+    finally:
+        sesion.info["primario"] = anterior
+
+
+def solo_lectura(metodo):
+    """
+    Marca un método de un DAO (que usa self.db) como de solo lectura: puede ir a una réplica.
+    Si la réplica falla por la conexión, se expulsa y el método se repite en el primario
+    (salvo en los recorridos con cursor, que ya han podido devolver filas).
+    """
+    if inspect.isgeneratorfunction(metodo):
+        @functools.wraps(metodo)
+        def envoltura_generador(self, *args, **kwargs):
+            with leyendo(self.db):
+                yield from metodo(self, *args, **kwargs)
+        return envoltura_generador
+
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        sesion = self.db
+        sesion.info.pop("replica_elegida", None)
+        with leyendo(sesion):
+            try:
+                return metodo(self, *args, **kwargs)
+            except DBAPIError:
+                replica = sesion.info.get("replica_elegida")
+                replicas = getattr(sesion, "replicas", None)
+                if replica is None or replicas is None or not replicas.expulsada(replica):
+                    raise
+        logger.warning("Lectura %s repetida en el primario", metodo.__qualname__)
+        sesion.rollback()
+        with en_primario(sesion):
+            return metodo(self, *args, **kwargs)
+
+    return envoltura
@@ -0,0 +1,47 @@
+from sqlalchemy import text
+
+# Filas por sentencia. 1000 filas x 7 columnas queda muy por debajo del
+# límite de parámetros de asyncpg (32767) y de PostgreSQL (65535).
+TAMANO_BLOQUE = 1000
+
+def trocear(filas: list, tamano: int = TAMANO_BLOQUE):
+    """Divide una lista en bloques de como mucho `tamano` elementos."""
+    for i in range(0, len(filas), tamano):
+        yield filas[i:i + tamano]
+
+def upsert_multifila(db, tabla: str, columnas: list[str], clave: str, filas: list[tuple],
+                     tamano_bloque: int = TAMANO_BLOQUE) -> int:
+    """
+    Inserta o actualiza `filas` (tuplas en el orden de `columnas`) con un único
+    INSERT ... ON CONFLICT (clave) DO UPDATE multi-fila por bloque.
+    No hace commit (lo gestiona el modelo). Devuelve el número de filas afectadas.
+    """
+    # ON CONFLICT no permite tocar dos veces la misma fila en una sentencia:
+    # si un ID llega repetido, se queda el último.
+    pos_clave = columnas.index(clave)
+    unicas = {}
+    for fila in filas:
+        unicas[fila[pos_clave]] = fila
+    filas = list(unicas.values())
+
+    actualizar = ", ".join(f"{c} = EXCLUDED.{c}" for c in columnas if c != clave)
+    total = 0
+
+    for bloque in trocear(filas, tamano_bloque):
+        valores = []
+        params = {}
+        for i, fila in enumerate(bloque):
+            marcadores = []
+            for columna, valor in zip(columnas, fila):
+                params[f"{columna}_{i}"] = valor
+                marcadores.append(f":{columna}_{i}")
+            valores.append(f"({', '.join(marcadores)})")
+
+        sql = text(f"""
+            INSERT INTO {tabla} ({', '.join(columnas)})
+            VALUES {', '.join(valores)}
+            ON CONFLICT ({clave}) DO UPDATE SET {actualizar}
+        """)
+        total += db.execute(sql, params).rowcount
+
+    return total
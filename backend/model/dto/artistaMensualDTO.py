@@ -1,4 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(init=False, eq=False, slots=True)
 class ArtistaMensualDTO:
+    idArtista: int
+    numOyentes: int
+    valoracionMedia: int
+
     def __init__(self, idartista: int, numOyentes: int = 0, valoracionmedia: int = 0):
         self.idArtista = idartista
         self.numOyentes = numOyentes
@@ -9,4 +16,4 @@ class ArtistaMensualDTO:
             "idArtista": self.idArtista,
             "numOyentes": self.numOyentes,
             "valoracionMedia": self.valoracionMedia
-        }
\ No newline at end of file
+        }
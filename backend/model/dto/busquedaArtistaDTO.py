@@ -1,4 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass(init=False, eq=False, slots=True)
 class BusquedaArtistaDTO:
+    idArtista: int
+    numBusquedas: int
+
     def __init__(self, idartista: int, numBusquedas: int = 0):
         self.idArtista = idartista
         self.numBusquedas = numBusquedas
@@ -7,4 +13,4 @@ class BusquedaArtistaDTO:
         return {
             "idArtista": self.idArtista,
             "numBusquedas": self.numBusquedas
-        }
\ No newline at end of file
+        }
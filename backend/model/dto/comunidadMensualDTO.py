@@ -1,4 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(init=False, eq=False, slots=True)
 class ComunidadDTO:
+    idComunidad: int | str
+    numPublicaciones: int
+    numMiembros: int
+
     def __init__(self, idcomunidad, numpublicaciones: int = 0, nummiembros: int = 0):
         # idcomunidad lo dejamos dinámico (sin int estricto) porque a veces llega como string "1"
         self.idComunidad = idcomunidad
@@ -10,4 +17,4 @@ class ComunidadDTO:
             "idComunidad": self.idComunidad,
             "numPublicaciones": self.numPublicaciones,
             "numMiembros": self.numMiembros
-        }
\ No newline at end of file
+        }
@@ -1,4 +1,18 @@
+from dataclasses import dataclass
+
+# dataclass con __slots__: sin __dict__ por instancia, y orjson la serializa tal cual
+# (los atributos ya tienen los nombres camelCase de la respuesta), sin pasar por to_dict().
+# Los DTOs de artistas, búsquedas y comunidades siguen el mismo patrón.
+@dataclass(init=False, eq=False, slots=True)
 class ContenidoDTO:
+    idContenido: int
+    numVentas: int
+    esAlbum: bool
+    sumaValoraciones: float
+    numComentarios: int
+    genero: str | None
+    esNovedad: bool
+
     def __init__(self, idcontenido: int, numventas: int = 0, esalbum: bool = False, 
                  sumavaloraciones: float = 0, numcomentarios: int = 0, 
                  genero: str = None, esnovedad: bool = False): 
@@ -20,4 +34,4 @@ class ContenidoDTO:
             "numComentarios": self.numComentarios,
             "genero": self.genero,
             "esNovedad": self.esNovedad
-        }
\ No newline at end of file
+        }
@@ -1,6 +1,10 @@
 from datetime import datetime
 
 class ReproduccionDTO:
+    # Sin __dict__ por instancia: los buffers llegan a tener decenas de miles en memoria.
+    # Sus claves JSON no coinciden con los atributos, así que se serializa con to_dict().
+    __slots__ = ("id_reproduccion", "id_usuario", "id_contenido", "segundos", "fecha")
+
     def __init__(self, id_usuario: int, id_contenido: int, segundos: int, fecha: datetime | None = None, id_reproduccion: int | None = None):
         self.id_reproduccion = id_reproduccion
         self.id_usuario = id_usuario
@@ -1,7 +1,21 @@
-import requests
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date
 from fastapi import HTTPException
 from backend.model.dao.postgresql.postgresDAOFactory import PostgreSQLDAOFactory
-from backend.controller.config import MS_USUARIOS_BASE_URL, CONTENIDO_API_BASE_URL, COMUNIDAD_API_BASE_URL
+from backend.controller.config import MS_USUARIOS_BASE_URL, CONTENIDO_API_BASE_URL, COMUNIDAD_API_BASE_URL, PARTICIONES_MESES_ADELANTE, RANKING_INDICE_MEMORIA, RANKING_INDICE_MAX_LIMIT, RANKING_INDICE_COMPROBACION_SEGUNDOS, SYNC_DELTA, SYNC_CONCURRENCIA, SYNC_TAMANO_LOTE
+from backend.controller.logs import LOGGER_EVENTOS
+from backend.model.sincronizacion import mapeoApi
+from backend.model.sincronizacion.sincronizadorContenidos import SincronizadorContenidos
+from backend.model.sincronizacion.huellas import huella, separar_cambios, HUELLA_ARTISTAS, HUELLA_CONTENIDOS
+from backend.model.sincronizacion.catalogoComunidades import get_catalogo_comunidades
+from backend.model.sincronizacion.clienteUpstream import get_cliente_upstream, estadisticas_upstreams, UPSTREAM_USUARIOS, UPSTREAM_CONTENIDO
+from backend.model.buffers.bufferReproducciones import get_buffer_reproducciones
+from backend.model.buffers.bufferBusquedas import get_buffer_busquedas
+from backend.model.dao.postgresql.upsertMasivo import trocear
+from backend.model.cache.cacheConsultas import cacheado, get_cache, CACHE_ARTISTAS, CACHE_CONTENIDOS, CACHE_COMUNIDADES
+from backend.model.ranking.indiceRanking import get_indices_ranking, tras_escritura
+from backend.model.dao.postgresql.replicas import en_primario
 
 # IMPORTS DE LOS DTOs ESTANDARIZADOS
 from backend.model.dto.contenidoDTO import ContenidoDTO
@@ -10,10 +24,14 @@ from backend.model.dto.busquedaArtistaDTO import BusquedaArtistaDTO
 from backend.model.dto.comunidadMensualDTO import ComunidadDTO
 from backend.model.dto.reproduccionDTO import ReproduccionDTO
 
+logger = logging.getLogger(__name__)
+# Una línea por búsqueda registrada: logger muestreado (ver controller/logs.py)
+eventos = logging.getLogger(LOGGER_EVENTOS)
+
 class Model:
-    def __init__(self):
-        # Crear fábrica de DAOs de PostgreSQL
-        self.factory = PostgreSQLDAOFactory()
+    def __init__(self, db=None):
+        # Crear fábrica de DAOs de PostgreSQL (una sesión del pool por instancia)
+        self.factory = PostgreSQLDAOFactory(db)
         
         # Instancias de los DAOs
         self.artistasMensualesDAO = self.factory.get_artistas_mensuales_dao()
@@ -21,6 +39,10 @@ class Model:
         self.contenidoDAO = self.factory.get_contenido_dao()      
         self.comunidadDAO = self.factory.get_comunidad_dao()
         self.reproduccionesDAO = self.factory.get_reproducciones_dao()
+        self.particionesDAO = self.factory.get_particiones_dao()
+        self.huellasDAO = self.factory.get_huellas_sincronizacion_dao()
+        self.ejecucionesJobsDAO = self.factory.get_ejecuciones_jobs_dao()
+        self.versionesRankingsDAO = self.factory.get_versiones_rankings_dao()
         
         # URLs
         self.URL_CONTENIDOS = f"{CONTENIDO_API_BASE_URL}/elementos" 
@@ -30,6 +52,20 @@ class Model:
         # Sesión DB
         self.db = self.factory.db 
 
+        # Con AsyncModel (run_sync, en el hilo del event loop) tras_escritura no se ejecuta aquí:
+        # se apunta en esta lista y AsyncModel la ejecuta después en un hilo (usa la caché)
+        self.escrituras_diferidas = None
+
+    def close(self):
+        """Libera la sesión de esta unidad de trabajo (vuelve al pool)."""
+        self.factory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     # ================== ARTISTAS (GET) ==================
 
     def get_todos_los_artistas(self):
@@ -39,11 +75,33 @@ class Model:
             # DAO devuelve lista de objetos ArtistaMensualDTO
             lista_dtos = self.artistasMensualesDAO.obtener_todos()
             
-            # Convertimos a diccionarios para el JSON
-            return [dto.to_dict() for dto in lista_dtos]
+            # Los DTOs se devuelven tal cual: RespuestaJSON los serializa sin pasar por dict
+            return lista_dtos
+
+        except Exception as e:
+            logger.error(f"Error DB en get_todos_los_artistas: {e}")
+            self.db.rollback()
+            raise e
 
+    def get_pagina_artistas(self, despues_de: int | None = None, limite: int = 100):
+        """Página de artistas ordenados por id, a partir del id `despues_de` (excluido)."""
+        self.db.rollback()
+        try:
+            lista_dtos = self.artistasMensualesDAO.obtener_pagina(despues_de, limite)
+            return lista_dtos
         except Exception as e:
-            print(f"❌ Error DB en get_todos_los_artistas: {e}")
+            logger.error(f"Error DB en get_pagina_artistas: {e}")
+            self.db.rollback()
+            raise e
+
+    def iterar_todos_los_artistas(self, tamano_lote: int = 1000):
+        """Generador de artistas (DTO) para respuestas en streaming: nunca tiene la tabla entera en memoria."""
+        self.db.rollback()
+        try:
+            for dto in self.artistasMensualesDAO.iterar_todos(tamano_lote):
+                yield dto
+        except Exception as e:
+            logger.error(f"Error DB en iterar_todos_los_artistas: {e}")
             self.db.rollback()
             raise e
 
@@ -58,131 +116,183 @@ class Model:
             
             return dto.to_dict()
         except Exception as e:
-            print(f"❌ Error DB en get_artista_oyentes: {e}")
+            logger.error(f"Error DB en get_artista_oyentes: {e}")
             self.db.rollback()
             raise e
         
+    @cacheado(CACHE_ARTISTAS)
     def get_ranking_artistas_oyentes(self):
         self.db.rollback()
         try:
+            indice = self._indice_ranking(CACHE_ARTISTAS, 10)
+            if indice:
+                return indice.top("numOyentes", 10)
+
             lista_dtos = self.artistasMensualesDAO.obtener_ranking_oyentes()
-            return [dto.to_dict() for dto in lista_dtos]
+            return lista_dtos
         except Exception as e:
-            print(f"❌ Error DB en get_ranking_artistas_oyentes: {e}")
+            logger.error(f"Error DB en get_ranking_artistas_oyentes: {e}")
             self.db.rollback()
             raise e
 
     # ================== ARTISTAS (SYNC) ==================
 
+    def obtener_artista_desde_api(self, id_artista: int) -> ArtistaMensualDTO:
+        """Pide un artista al MS Usuarios y lo devuelve como DTO (no toca la BD)."""
+        url = f"{MS_USUARIOS_BASE_URL}/api/usuarios/artistas/{id_artista}"
+
+        resp = get_cliente_upstream(UPSTREAM_USUARIOS).get(url)
+        if resp.status_code == 404:
+            raise HTTPException(status_code=404, detail="Artista no encontrado en MS Usuarios")
+        resp.raise_for_status()
+
+        return mapeoApi.dto_artista_desde_api(resp.json(), id_artista)
+
     def sync_artista_oyentes(self, id_artista: int):
         self.db.rollback()
         try:
-            url = f"{MS_USUARIOS_BASE_URL}/api/usuarios/artistas/{id_artista}"
-
-            # 1. Petición API Externa
-            resp = requests.get(url, timeout=20)
-            if resp.status_code == 404:
-                raise HTTPException(status_code=404, detail="Artista no encontrado en MS Usuarios")
-            resp.raise_for_status()
-            data = resp.json()
-
-            # 2. Crear DTO con los datos recibidos
-            # A veces el ID viene como 'id' o 'idUsuario' dependiendo de la API
-            raw_id = data.get("id") or data.get("idUsuario") or id_artista
-            
-            dto = ArtistaMensualDTO(
-                idartista=raw_id,
-                numOyentes=int(data.get("oyentes", 0)),
-                valoracionmedia=int(data.get("valoracion", 0))
-            )
+            # 1. y 2. Petición API Externa y DTO con los datos recibidos
+            dto = self.obtener_artista_desde_api(id_artista)
 
             # 3. Llamar al DAO pasando el DTO (método actualizado)
             self.artistasMensualesDAO.actualizar_o_insertar(dto)
+            self.huellasDAO.guardar(HUELLA_ARTISTAS, {int(dto.idArtista): huella(dto)})
             self.db.commit()
+            self._tras_escritura(CACHE_ARTISTAS, actualizados=[dto])
 
             return dto.to_dict()
             
         except Exception as e:
-            print(f"❌ Error en sync_artista_oyentes: {e}")
+            logger.error(f"Error en sync_artista_oyentes: {e}")
             self.db.rollback()
             raise e
 
     def obtener_artistas_desde_api(self):
         url = f"{MS_USUARIOS_BASE_URL}/api/usuarios/artistas" 
         try:
-            resp = requests.get(url, timeout=20)
+            resp = get_cliente_upstream(UPSTREAM_USUARIOS).get(url, timeout_lectura=20)
             resp.raise_for_status()
             return resp.json() 
         except Exception as e:
-            print("❌ Error obteniendo artistas desde MS Usuarios:", e)
+            logger.error(f"Error obteniendo artistas desde MS Usuarios: {e}")
             return []
         
-    def sync_todos_los_artistas(self):
+    def sync_todos_los_artistas(self, delta: bool = SYNC_DELTA):
+        """
+        Sync masiva de artistas. Con `delta` solo se escriben los artistas cuya huella ha
+        cambiado desde la última sincronización. Devuelve el resumen con los contadores
+        (a cero si no llega ningún artista).
+        """
         self.db.rollback()
         artistas = self.obtener_artistas_desde_api()
 
         if not artistas:
-            print("⚠️ No se pudo obtener la lista de artistas")
-            return
+            logger.warning("No se pudo obtener la lista de artistas")
+            return {"total": 0, "cambiados": 0, "sinCambios": 0, "fallidos": []}
+
+        logger.info(f"Sincronizando {len(artistas)} artistas{' (delta)' if delta else ''}...")
 
-        print(f"🔄 Sincronizando {len(artistas)} artistas...")
-        resultados = []
+        # 1. El listado ya trae oyentes y valoración: se usa directamente
+        dtos = []
+        incompletos = []
         for artista in artistas:
             id_artista = artista.get("id")
+            if mapeoApi.artista_completo(artista):
+                dtos.append(mapeoApi.dto_artista_desde_api(artista, id_artista))
+            else:
+                incompletos.append(id_artista)
+
+        # 2. Solo los registros incompletos se piden uno a uno, varios a la vez
+        fallidos = []
+        if incompletos:
+            logger.info(f"{len(incompletos)} artistas sin datos en el listado, pidiéndolos uno a uno...")
+            with ThreadPoolExecutor(max_workers=max(1, SYNC_CONCURRENCIA)) as pool:
+                futuros = {pool.submit(self.obtener_artista_desde_api, id_artista): id_artista for id_artista in incompletos}
+                for futuro in as_completed(futuros):
+                    try:
+                        dtos.append(futuro.result())
+                    except Exception as e:
+                        logger.error(f"Error sincronizando artista {futuros[futuro]}: {e}")
+                        fallidos.append(futuros[futuro])
+
+        # 3. Un INSERT ... ON CONFLICT y un commit por bloque (solo lo que ha cambiado, en modo delta)
+        guardadas = self.huellasDAO.obtener(HUELLA_ARTISTAS) if delta else {}
+        cambiados = sin_cambios = 0
+        for lote in trocear(dtos, SYNC_TAMANO_LOTE):
             try:
-                # Reutilizamos el método individual
-                resultado = self.sync_artista_oyentes(id_artista)
-                resultados.append(resultado)
-            except Exception as e:
-                print(f"❌ Error sincronizando artista {id_artista}:", e)
-                self.db.rollback() 
-
-        print("✅ Sincronización completa")
-        return resultados
+                escritos = self._guardar_lote_artistas(lote, guardadas)
+                cambiados += escritos
+                sin_cambios += len(lote) - escritos
+            except Exception:
+                fallidos.extend(dto.idArtista for dto in lote)
+
+        resumen = {"total": len(artistas), "cambiados": cambiados, "sinCambios": sin_cambios, "fallidos": fallidos}
+        logger.info(f"Sincronización completa: {cambiados} cambiados, {sin_cambios} sin cambios, {len(fallidos)} con error")
+        return resumen
+
+    def _guardar_lote_artistas(self, dtos: list[ArtistaMensualDTO], guardadas: dict) -> int:
+        """Guarda un lote de artistas en una transacción, saltándose los que coinciden con su huella."""
+        try:
+            cambiados, huellas_nuevas, _ = separar_cambios(dtos, guardadas, lambda d: int(d.idArtista))
+            if not cambiados:
+                return 0
+            self.artistasMensualesDAO.bulk_upsert(cambiados)
+            self.huellasDAO.guardar(HUELLA_ARTISTAS, huellas_nuevas)
+            self.db.commit()
+            self._tras_escritura(CACHE_ARTISTAS, actualizados=cambiados)
+            return len(cambiados)
+        except Exception as e:
+            logger.error(f"Error guardando lote de artistas: {e}")
+            self.db.rollback()
+            raise e
     
     def delete_artista_estadisticas(self, id_artista: int):
         self.db.rollback()
         try:
             eliminado = self.artistasMensualesDAO.eliminar(id_artista)
+            self.huellasDAO.eliminar(HUELLA_ARTISTAS, [id_artista])
             self.db.commit()
+            self._tras_escritura(CACHE_ARTISTAS, eliminados=[id_artista])
             
             if not eliminado:
                 return None
             
             return {"idArtista": id_artista, "mensaje": "Eliminado correctamente"}
         except Exception as e:
-            print(f"❌ Error DB en delete_artista_estadisticas: {e}")
+            logger.error(f"Error DB en delete_artista_estadisticas: {e}")
             self.db.rollback()
             raise e
 
     # ================== BUSQUEDAS ARTISTAS ==================
 
     def registrar_o_actualizar_busqueda_artista(self, id_artista: int, id_usuario: int | None = None):
-        self.db.rollback()
-        print(f"✅ Registrando búsqueda: Artista {id_artista}, Usuario {id_usuario}")
-        try:
-            # Este DAO sigue usando params sueltos según tu código anterior, 
-            # pero el retorno de get_top sí usa DTOs.
-            self.busquedasArtistasDAO.insertar_o_actualizar_busqueda(id_artista, id_usuario)
-            self.db.commit()
-        except Exception as e:
-            print(f"❌ Error en registrar busqueda: {e}")
-            self.db.rollback()
-            raise e
+        # Se encola en el buffer de búsquedas, que las escribe por lotes en segundo plano
+        eventos.info("Registrando búsqueda: artista %s, usuario %s", id_artista, id_usuario)
+        get_buffer_busquedas().registrar([(id_artista, id_usuario)])
+
+    def registrar_busquedas_lote(self, busquedas: list[tuple[int, int | None]]) -> int:
+        """Encola varias búsquedas (idartista, idusuario). Devuelve cuántas se aceptaron."""
+        eventos.info("Registrando lote de %d búsquedas", len(busquedas))
+        return get_buffer_busquedas().registrar(busquedas)
 
     def get_top_artistas_busquedas(self, limit: int = 10):
         self.db.rollback()
         try:
             # DAO devuelve lista de BusquedaArtistaDTO
             lista_dtos = self.busquedasArtistasDAO.get_top_artistas_busquedas(limit)
-            return [dto.to_dict() for dto in lista_dtos]
+            return lista_dtos
         except Exception as e:
             self.db.rollback()
             raise e
         
-    def delete_busquedas_artista(self, id_artista: int):
+    def delete_busquedas_artista(self, id_artista: int, vaciar_buffer: bool = True):
+        """`vaciar_buffer=False` si quien llama ya ha vaciado el buffer (AsyncModel, fuera del event loop)."""
         self.db.rollback()
         try:
+            # Lo que siga en el buffer se escribe antes, para que también se borre.
+            # Si no se puede escribir no se borra nada: volverían a aparecer después
+            if vaciar_buffer:
+                get_buffer_busquedas().vaciar_o_fallar()
             filas = self.busquedasArtistasDAO.eliminar_busquedas_por_artista(id_artista)
             self.db.commit()
             return {"idArtista": id_artista, "filasEliminadas": filas}
@@ -190,9 +300,14 @@ class Model:
             self.db.rollback()
             raise e
 
-    def delete_busquedas_usuario(self, id_usuario: int):
+    def delete_busquedas_usuario(self, id_usuario: int, vaciar_buffer: bool = True):
+        """`vaciar_buffer=False` si quien llama ya ha vaciado el buffer (AsyncModel, fuera del event loop)."""
         self.db.rollback()
         try:
+            # Lo que siga en el buffer se escribe antes, para que también se borre.
+            # Si no se puede escribir no se borra nada: volverían a aparecer después
+            if vaciar_buffer:
+                get_buffer_busquedas().vaciar_o_fallar()
             filas = self.busquedasArtistasDAO.eliminar_busquedas_por_usuario(id_usuario)
             self.db.commit()
             return {"idUsuario": id_usuario, "filasEliminadas": filas}
@@ -200,21 +315,6 @@ class Model:
             self.db.rollback()
             raise e
         
-    def resetear_busquedas_mensuales(self):
-        print("🗑️ Reseteando búsquedas mensuales...")
-        try:
-            # ❌ MAL: Antes tenías esto, que pide un ID que no tienes
-            # self.registrar_o_actualizar_busqueda_artista() 
-
-            # ✅ BIEN: Llama al nuevo método del DAO que no pide argumentos
-            self.busquedasArtistasDAO.eliminar_todas_las_busquedas()
-            
-            print("✅ Búsquedas mensuales reseteadas correctamente.")
-        except Exception as e:
-            print(f"❌ Error reseteo búsquedas: {e}")
-            # No hagas raise aquí si es una tarea en segundo plano (cron), 
-            # o parará todo el servidor. Solo loguealo.
-        
     # ================== CONTENIDO ==================    
 
     def get_todos_los_contenidos(self):
@@ -222,87 +322,127 @@ class Model:
         try:
             # DAO devuelve lista de ContenidoDTO
             lista_dtos = self.contenidoDAO.obtener_todos()
-            return [dto.to_dict() for dto in lista_dtos]
+            return lista_dtos
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+    def get_pagina_contenidos(self, despues_de: int | None = None, limite: int = 100):
+        """Página de contenidos ordenados por id, a partir del id `despues_de` (excluido)."""
+        self.db.rollback()
+        try:
+            lista_dtos = self.contenidoDAO.obtener_pagina(despues_de, limite)
+            return lista_dtos
         except Exception as e:
+            logger.error(f"Error DB en get_pagina_contenidos: {e}")
+            self.db.rollback()
+            raise e
+
+    def iterar_todos_los_contenidos(self, tamano_lote: int = 1000):
+        """Generador de contenidos (DTO) para respuestas en streaming."""
+        self.db.rollback()
+        try:
+            for dto in self.contenidoDAO.iterar_todos(tamano_lote):
+                yield dto
+        except Exception as e:
+            logger.error(f"Error DB en iterar_todos_los_contenidos: {e}")
             self.db.rollback()
             raise e
 
     def sincronizar_desde_api_externa(self, id_contenido: int):
         self.db.rollback()
-        print(f"🔄 Sincronizando contenido ID: {id_contenido}...")
+        logger.info(f"Sincronizando contenido ID: {id_contenido}...")
 
         try:
             # 1. Calls APIs
-            resp_elem = requests.get(f"{self.URL_CONTENIDOS}/{id_contenido}", timeout=10)
+            cliente = get_cliente_upstream(UPSTREAM_CONTENIDO)
+            resp_elem = cliente.get(f"{self.URL_CONTENIDOS}/{id_contenido}")
             resp_elem.raise_for_status()
             data_elem = resp_elem.json()
 
             num_comentarios = 0
             try:
-                resp_com = requests.get(f"{self.URL_VALORACIONES}/{id_contenido}", timeout=10)
+                resp_com = cliente.get(f"{self.URL_VALORACIONES}/{id_contenido}")
                 if resp_com.status_code == 200:
-                    lista = resp_com.json()
-                    reales = [c for c in lista if c.get("comentario") and str(c.get("comentario")).strip() != ""]
-                    num_comentarios = len(reales)
-            except (requests.RequestException, ValueError):
-                print(f"⚠️ No se pudieron obtener comentarios para contenido {id_contenido}")
+                    num_comentarios = mapeoApi.contar_comentarios(resp_com.json())
+            except Exception:
+                logger.warning(f"No se pudieron obtener comentarios para contenido {id_contenido}")
                 num_comentarios = 0
 
-            # 2. Extracción segura
-            obj_genero = data_elem.get("genero")
-            nombre_genero = "Desconocido"
-            if isinstance(obj_genero, dict):
-                nombre_genero = obj_genero.get("nombre") or "Desconocido"
-
-            # 3. Crear DTO
-            dto = ContenidoDTO(
-                idcontenido=id_contenido,
-                numventas=int(data_elem.get("numventas", 0)),
-                esalbum=bool(data_elem.get("esalbum", False)),
-                sumavaloraciones=float(data_elem.get("valoracion", 0.0)),
-                numcomentarios=int(num_comentarios),
-                genero=str(nombre_genero),
-                esnovedad=bool(data_elem.get("esnovedad", False))
-            )
+            # 2. y 3. Extracción segura y creación del DTO
+            dto = mapeoApi.dto_contenido_desde_api(id_contenido, data_elem, num_comentarios)
 
             # 4. Guardar usando DTO
             self.contenidoDAO.actualizar_o_insertar(dto)
+            self.huellasDAO.guardar(HUELLA_CONTENIDOS, {int(dto.idContenido): huella(dto)})
             self.db.commit()
+            self._tras_escritura(CACHE_CONTENIDOS, actualizados=[dto])
             
-            print(f"✅ Contenido {id_contenido} sincronizado")
+            logger.info(f"Contenido {id_contenido} sincronizado")
             return dto.to_dict()
 
         except Exception as e:
-            print(f"❌ Error procesando contenido: {e}")
+            logger.error(f"Error procesando contenido: {e}")
             self.db.rollback()
             raise e
     
     def obtener_lista_contenidos_api(self):
         try:
-            resp = requests.get(self.URL_CONTENIDOS, timeout=20)
+            resp = get_cliente_upstream(UPSTREAM_CONTENIDO).get(self.URL_CONTENIDOS, timeout_lectura=20)
             resp.raise_for_status()
             return resp.json()
         except Exception as e:
-            print("❌ Error API externa contenidos:", e)
+            logger.error(f"Error API externa contenidos: {e}")
             return []
 
-    def sync_todos_los_contenidos(self):
+    def sync_todos_los_contenidos(self, delta: bool = SYNC_DELTA):
+        """
+        Sync masiva: descarga los contenidos en paralelo (cliente HTTP asíncrono con
+        límite de concurrencia y reintentos) y los guarda en BD por lotes.
+        Con `delta` solo se escriben los contenidos cuya huella ha cambiado.
+        Devuelve el resumen con los contadores (a cero si no llega ningún contenido).
+        """
         self.db.rollback()
         contenidos = self.obtener_lista_contenidos_api()
-        if not contenidos: return
-
-        print(f"🔄 Sync masiva: {len(contenidos)} contenidos...")
-        resultados = []
-        for item in contenidos:
-            id_cont = item.get("id")
-            if not id_cont: continue
-            try:
-                res = self.sincronizar_desde_api_externa(id_cont)
-                resultados.append(res)
-            except Exception as e:
-                print(f"❌ Error contenido {id_cont}:", e)
-                self.db.rollback()
-        return resultados    
+        if not contenidos:
+            return {"total": 0, "cambiados": 0, "sinCambios": 0, "fallidos": []}
+
+        ids = [item.get("id") for item in contenidos if item.get("id")]
+        logger.info(f"Sync masiva: {len(ids)} contenidos{' (delta)' if delta else ''}...")
+
+        guardadas = self.huellasDAO.obtener(HUELLA_CONTENIDOS) if delta else {}
+        self.db.rollback()  # No dejar la transacción de la lectura abierta durante las descargas
+        resumen = SincronizadorContenidos().sincronizar(
+            ids, lambda dtos: self._guardar_lote_contenidos(dtos, guardadas)
+        )
+
+        resumen = {
+            "total": resumen["total"],
+            "cambiados": resumen["escritos"],
+            "sinCambios": resumen["sincronizados"] - resumen["escritos"],
+            "fallidos": resumen["fallidos"]
+        }
+        logger.info(f"Sync masiva terminada: {resumen['cambiados']} cambiados, {resumen['sinCambios']} sin cambios, {len(resumen['fallidos'])} con error")
+        return resumen
+
+    def _guardar_lote_contenidos(self, dtos: list[ContenidoDTO], guardadas: dict | None = None) -> int:
+        """
+        Guarda un lote de contenidos en una sola transacción (INSERT ... ON CONFLICT multi-fila),
+        saltándose los que coinciden con su huella en `guardadas`. Devuelve los escritos.
+        """
+        try:
+            cambiados, huellas_nuevas, _ = separar_cambios(dtos, guardadas or {}, lambda d: int(d.idContenido))
+            if not cambiados:
+                return 0
+            self.contenidoDAO.bulk_upsert(cambiados)
+            self.huellasDAO.guardar(HUELLA_CONTENIDOS, huellas_nuevas)
+            self.db.commit()
+            self._tras_escritura(CACHE_CONTENIDOS, actualizados=cambiados)
+            return len(cambiados)
+        except Exception as e:
+            logger.error(f"Error guardando lote de contenidos: {e}")
+            self.db.rollback()
+            raise e
 
     def get_contenido_detalle(self, id_contenido: int):
         self.db.rollback()
@@ -310,7 +450,7 @@ class Model:
             dto = self.contenidoDAO.obtener_por_id(id_contenido)
             return dto.to_dict() if dto else None
         except Exception as e:
-            print(f"❌ Error en get_contenido: {e}")
+            logger.error(f"Error en get_contenido: {e}")
             self.db.rollback()
             raise e
 
@@ -318,7 +458,9 @@ class Model:
         self.db.rollback()
         try:
             ok = self.contenidoDAO.eliminar(id_contenido)
+            self.huellasDAO.eliminar(HUELLA_CONTENIDOS, [id_contenido])
             self.db.commit()
+            self._tras_escritura(CACHE_CONTENIDOS, eliminados=[id_contenido])
             if not ok: return None
             return {"idContenido": id_contenido, "mensaje": "Eliminado"}
         except Exception as e:
@@ -327,36 +469,56 @@ class Model:
 
     # ================== TOPS CONTENIDO ==================
 
+    @cacheado(CACHE_CONTENIDOS)
     def get_top_contenidos_valoracion(self, limit: int = 10):
         self.db.rollback()
         try:
+            indice = self._indice_ranking(CACHE_CONTENIDOS, limit)
+            if indice:
+                return indice.top("sumaValoraciones", limit)
+
             lista = self.contenidoDAO.get_top_valorados(limit)
-            return [dto.to_dict() for dto in lista]
+            return lista
         except Exception as e:
             self.db.rollback()
             raise e
 
+    @cacheado(CACHE_CONTENIDOS)
     def get_top_contenidos_comentarios(self, limit: int = 10):
         self.db.rollback()
         try:
+            indice = self._indice_ranking(CACHE_CONTENIDOS, limit)
+            if indice:
+                return indice.top("numComentarios", limit)
+
             lista = self.contenidoDAO.get_top_comentados(limit)
-            return [dto.to_dict() for dto in lista]
+            return lista
         except Exception as e:
             self.db.rollback()
             raise e
 
+    @cacheado(CACHE_CONTENIDOS)
     def get_top_contenidos_ventas(self, limit: int = 10):
         self.db.rollback()
         try:
+            indice = self._indice_ranking(CACHE_CONTENIDOS, limit)
+            if indice:
+                return indice.top("numVentas", limit)
+
             lista = self.contenidoDAO.get_top_vendidos(limit)
-            return [dto.to_dict() for dto in lista]
+            return lista
         except Exception as e:
             self.db.rollback()
             raise e
         
+    @cacheado(CACHE_CONTENIDOS)
     def get_top_generos(self, limit: int = 5):
         self.db.rollback()
         try:
+            indice = self._indice_ranking(CACHE_CONTENIDOS, limit)
+            if indice:
+                return [{"genero": g, "totalVentas": int(total)} for g, total in indice.top_grupos(limit)]
+
             # Este DAO ya devuelve diccionarios, no DTOs (porque es agrupación)
             return self.contenidoDAO.get_top_generos_por_ventas(limit)
         except Exception as e:
@@ -374,29 +536,34 @@ class Model:
         comunidades_data = self.obtener_comunidades_desde_api()
 
         if not comunidades_data:
-            print("⚠️ No se pudo obtener la lista de comunidades")
+            logger.warning("No se pudo obtener la lista de comunidades")
             return
 
-        print(f"🔄 Sincronizando {len(comunidades_data)} comunidades...")
-        resultados = []
+        logger.info(f"Sincronizando {len(comunidades_data)} comunidades...")
+        dtos = []
 
-        # 2. Iterar y procesar
+        # 2. Iterar y mapear (la lista ya trae los datos, no hace falta otra petición API)
         for datos_comunidad in comunidades_data:
             # Protegemos la lectura del ID por si viene como 'id' o 'idComunidad'
             id_comunidad = datos_comunidad.get("idComunidad") or datos_comunidad.get("id")
             
             try:
-                # Llamamos al método que procesa una sola comunidad
-                # Pasamos 'datos_comunidad' directamente para evitar otra petición API
-                resultado = self.sync_comunidad_metricas(id_comunidad, datos_comunidad)
-                resultados.append(resultado)
-                
+                dtos.append(mapeoApi.dto_comunidad_desde_api(datos_comunidad, id_comunidad))
             except Exception as e:
-                print(f"❌ Error sincronizando comunidad {id_comunidad}:", e)
-                self.db.rollback() # Rollback solo de esta iteración fallida
+                logger.error(f"Error sincronizando comunidad {id_comunidad}: {e}")
 
-        print("✅ Sincronización de comunidades completa")
-        return resultados
+        # 3. Guardar todas con un INSERT ... ON CONFLICT por bloque
+        try:
+            self.comunidadDAO.bulk_upsert(dtos)
+            self.db.commit()
+            self._tras_escritura(CACHE_COMUNIDADES, actualizados=dtos)
+        except Exception as e:
+            logger.error(f"Error guardando comunidades: {e}")
+            self.db.rollback()
+            raise e
+
+        logger.info("Sincronización de comunidades completa")
+        return [dto.to_dict() for dto in dtos]
 
     def sync_comunidad_metricas(self, id_comunidad, datos=None):
         """
@@ -412,80 +579,56 @@ class Model:
                  raise Exception("Datos no proporcionados para sincronización individual")
 
             # 1. Crear DTO con los datos recibidos
-            # Mapeamos los campos del JSON externo a tu DTO
-            dto = ComunidadDTO(
-                idcomunidad=id_comunidad,
-                numpublicaciones=int(datos.get("numPublicaciones", 0)),
-                # Ojo: Tu API parece devolver 'numUsuarios', pero tu DTO usa 'numMiembros'
-                nummiembros=int(datos.get("numUsuarios", 0)) 
-            )
+            dto = mapeoApi.dto_comunidad_desde_api(datos, id_comunidad)
 
             # 2. Llamar al DAO (Upsert)
             self.comunidadDAO.actualizar_o_insertar_comunidad(dto)
             self.db.commit()
+            self._tras_escritura(CACHE_COMUNIDADES, actualizados=[dto])
 
             return dto.to_dict()
             
         except Exception as e:
-            print(f"❌ Error en sync_comunidad_metricas para ID {id_comunidad}: {e}")
+            logger.error(f"Error en sync_comunidad_metricas para ID {id_comunidad}: {e}")
             self.db.rollback()
             raise e
 
     def obtener_comunidades_desde_api(self):
         """
-        Consulta el microservicio externo para obtener todas las comunidades.
+        Listado completo del MS Comunidad. Sale del catálogo local, revalidado con una
+        petición condicional (si no ha cambiado, el MS responde 304 y no se descarga).
         """
-        # Usamos la URL base que tenías definida en tu otro método
-        url = f"{self.URL_COMUNIDAD}/" 
         try:
-            resp = requests.get(url, timeout=20)
-            resp.raise_for_status()
-            return resp.json() 
+            return get_catalogo_comunidades().listado(revalidar=True)
         except Exception as e:
-            print("❌ Error obteniendo comunidades desde API Externa:", e)
+            logger.error(f"Error obteniendo comunidades desde API Externa: {e}")
             return []
         
     def sincronizar_comunidad_desde_api(self, id_comunidad):
         try: self.db.rollback() 
         except Exception: pass
-        print(f"🔄 Sincronizando comunidad ID: {id_comunidad}...")
+        logger.info(f"Sincronizando comunidad ID: {id_comunidad}...")
         try:
-            url = f"{self.URL_COMUNIDAD}/"
-            resp = requests.get(url, timeout=10)
-            if resp.status_code >= 400:
-                print(f"⚠️ Error servidor externo: {resp.text}")
-            resp.raise_for_status()
-            
-            lista = resp.json()
-            datos = None
-            target = str(id_comunidad)
-            
-            if isinstance(lista, list):
-                for item in lista:
-                    if str(item.get("idComunidad")) == target:
-                        datos = item
-                        break
+            # El MS no tiene endpoint por id: se busca en el catálogo local (índice por id)
+            datos = get_catalogo_comunidades().obtener(id_comunidad)
             
             if not datos:
-                print(f"⚠️ Comunidad {id_comunidad} no encontrada.")
+                logger.warning(f"Comunidad {id_comunidad} no encontrada.")
                 return None
 
             # Crear DTO
-            dto = ComunidadDTO(
-                idcomunidad=datos.get("idComunidad"),
-                numpublicaciones=int(datos.get("numPublicaciones", 0)),
-                nummiembros=int(datos.get("numUsuarios", 0))
-            )
+            dto = mapeoApi.dto_comunidad_desde_api(datos)
 
             # Guardar DTO
             self.comunidadDAO.actualizar_o_insertar_comunidad(dto)
             self.db.commit()
+            self._tras_escritura(CACHE_COMUNIDADES, actualizados=[dto])
             
-            print(f"✅ Comunidad {id_comunidad} sincronizada.")
+            logger.info(f"Comunidad {id_comunidad} sincronizada.")
             return dto.to_dict()
 
         except Exception as e:
-            print(f"❌ Error comunidad: {e}")
+            logger.error(f"Error comunidad: {e}")
             try: self.db.rollback()
             except Exception: pass
             raise e
@@ -497,37 +640,70 @@ class Model:
             
             # DAO devuelve DTOs
             lista = self.comunidadDAO.obtener_todas()
-            return [dto.to_dict() for dto in lista]
+            return lista
         except Exception as e:
             raise e
 
+    def obtener_pagina_comunidades(self, despues_de: int | None = None, limite: int = 100):
+        """Página de comunidades ordenadas por id, a partir del id `despues_de` (excluido)."""
+        self.db.rollback()
+        try:
+            lista = self.comunidadDAO.obtener_pagina(despues_de, limite)
+            return lista
+        except Exception as e:
+            logger.error(f"Error DB en obtener_pagina_comunidades: {e}")
+            self.db.rollback()
+            raise e
+
+    def iterar_todas_las_comunidades(self, tamano_lote: int = 1000):
+        """Generador de comunidades (DTO) para respuestas en streaming."""
+        self.db.rollback()
+        try:
+            for dto in self.comunidadDAO.iterar_todas(tamano_lote):
+                yield dto
+        except Exception as e:
+            logger.error(f"Error DB en iterar_todas_las_comunidades: {e}")
+            self.db.rollback()
+            raise e
+
     def eliminar_comunidad(self, id_comunidad):
         try:
             self.db.rollback()
             ok = self.comunidadDAO.eliminar(id_comunidad)
             self.db.commit()
+            self._tras_escritura(CACHE_COMUNIDADES, eliminados=[int(id_comunidad)])
             return ok
         except Exception as e:
             self.db.rollback()
             raise e
         
+    @cacheado(CACHE_COMUNIDADES)
     def obtener_ranking_comunidades_miembros(self):
         try:
             try: self.db.rollback() 
             except Exception: pass
             
+            indice = self._indice_ranking(CACHE_COMUNIDADES, 10)
+            if indice:
+                return indice.top("numMiembros", 10)
+
             lista = self.comunidadDAO.obtener_ranking_miembros(limite=10)
-            return [dto.to_dict() for dto in lista]
+            return lista
         except Exception as e:
             raise e
 
+    @cacheado(CACHE_COMUNIDADES)
     def obtener_ranking_comunidades_publicaciones(self):
         try:
             try: self.db.rollback() 
             except Exception: pass
             
+            indice = self._indice_ranking(CACHE_COMUNIDADES, 10)
+            if indice:
+                return indice.top("numPublicaciones", 10)
+
             lista = self.comunidadDAO.obtener_ranking_publicaciones(limite=10)
-            return [dto.to_dict() for dto in lista]
+            return lista
         except Exception as e:
             raise e
         
@@ -541,60 +717,265 @@ class Model:
         except Exception as e:
             raise e
         
+    # ================== PARTICIONES ==================
+
+    def mantener_particiones(self, meses_adelante: int = PARTICIONES_MESES_ADELANTE):
+        """
+        Crea por adelantado las particiones mensuales de los logs, para que las
+        escrituras de los próximos meses no caigan en la partición DEFAULT.
+        """
+        self.db.rollback()
+        try:
+            particiones = self.particionesDAO.asegurar_particiones(meses_adelante)
+            self.db.commit()
+            logger.info(f"Particiones al día: {', '.join(particiones)}")
+            return particiones
+        except Exception as e:
+            logger.error(f"Error creando particiones: {e}")
+            self.db.rollback()
+            raise e
+
+    def rollover_logs(self):
+        """
+        Cierre de mes de los logs: cada partición de un mes ya terminado se suelta y después
+        se suma a su tabla mensual (busquedasartistasmensual / reproduccionesmensual) y se
+        borra, en la misma transacción. El mes en curso sigue leyendo y escribiendo mientras tanto.
+        Se suelta antes de resumir para que ningún evento caiga en ella después del resumen:
+        los que lleguen tarde fallan sin partición y los buffers los suman al resumen.
+        Si falla el resumen de una partición, queda suelta y el siguiente rollover la termina.
+        Es el único cierre de mes de los logs (job rollover_logs_mensual del planificador).
+        """
+        self.db.rollback()
+        logger.info("Iniciando rollover mensual de los logs...")
+
+        # Lo que quede en los buffers puede ser del mes que se cierra
+        get_buffer_reproducciones().vaciar()
+        get_buffer_busquedas().vaciar()
+
+        mes_actual = date.today().replace(day=1)
+        resultado = []
+        try:
+            for tabla, particion, mes in self.particionesDAO.listar_particiones_cerradas(mes_actual):
+                self.particionesDAO.soltar_particion(tabla, particion)
+                filas = self.particionesDAO.archivar_particion(tabla, particion, mes)
+                self.db.commit()
+                logger.info(f"{particion} archivada ({filas} filas de resumen) y eliminada")
+                resultado.append({"tabla": tabla, "mes": mes.isoformat(), "filasResumen": filas})
+
+            return resultado
+
+        except Exception as e:
+            logger.error(f"Error en rollover de logs: {e}")
+            self.db.rollback()
+            raise e
+
+    # ================== JOBS DEL SCHEDULER ==================
+
+    def registrar_ejecucion_job(self, job: str, instancia: str, inicio: datetime, duracion_ms: int,
+                                estado: str, filas: int | None = None, error: str | None = None):
+        """Guarda en el historial una ejecución terminada de un job."""
+        self.db.rollback()
+        try:
+            self.ejecucionesJobsDAO.registrar(job, instancia, inicio, duracion_ms, estado, filas, error)
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error registrando la ejecución del job {job}: {e}")
+            self.db.rollback()
+            raise e
+
+    def obtener_historial_jobs(self, job: str | None = None, limite: int = 50):
+        """Últimas ejecuciones de los jobs (o de `job`), de la más reciente a la más antigua."""
+        self.db.rollback()
+        try:
+            return self.ejecucionesJobsDAO.obtener_ultimas(job, limite)
+        except Exception as e:
+            logger.error(f"Error DB en obtener_historial_jobs: {e}")
+            self.db.rollback()
+            raise e
+
+    # ================== BUFFERS ==================
+
+    def obtener_estadisticas_buffers(self):
+        """Métricas de los buffers de escritura (pendientes, descartados, latencia de escritura)."""
+        return [
+            get_buffer_reproducciones().estadisticas(),
+            get_buffer_busquedas().estadisticas()
+        ]
+
+    # ================== MICROSERVICIOS EXTERNOS ==================
+
+    def obtener_estadisticas_upstreams(self):
+        """Estado del circuito, llamadas, reintentos, errores y latencia de cada microservicio externo."""
+        return estadisticas_upstreams()
+
+    # ================== ÍNDICE DE RANKINGS ==================
+
+    def _leer_tabla_mensual(self, namespace: str):
+        # Del primario: el índice se mantiene después con cada escritura y no debe partir de una réplica con retraso
+        with en_primario(self.db):
+            if namespace == CACHE_ARTISTAS:
+                return self.artistasMensualesDAO.obtener_todos()
+            if namespace == CACHE_CONTENIDOS:
+                return self.contenidoDAO.obtener_todos()
+            return self.comunidadDAO.obtener_todas()
+
+    def _version_tabla_mensual(self, namespace: str):
+        # Versión de la tabla en versionesrankings (la suben sus triggers en cada transacción que la modifica)
+        with en_primario(self.db):
+            return self.versionesRankingsDAO.obtener(get_indices_ranking().de(namespace).nombre)
+
+    def _indice_ranking(self, namespace: str, limit: int, comprobar: bool = False):
+        """
+        Índice en memoria de la tabla, o None si no se puede usar y hay que ir a la BD.
+        Como mucho cada RANKING_INDICE_COMPROBACION_SEGUNDOS (siempre con `comprobar`) compara
+        su versión con la de la tabla en la BD y, si otro proceso ha escrito, recarga con una
+        lectura completa. Hasta esa comprobación un proceso puede servir un top que no incluya
+        lo que otro acaba de escribir. Un índice vacío no se usa: la consulta SQL es igual de
+        barata y no depende de que el índice esté al día.
+        """
+        if not RANKING_INDICE_MEMORIA or limit > RANKING_INDICE_MAX_LIMIT:
+            return None
+        indice = get_indices_ranking().de(namespace)
+        if comprobar or indice.hay_que_comprobar(RANKING_INDICE_COMPROBACION_SEGUNDOS):
+            try:
+                version = self._version_tabla_mensual(namespace)
+                indice.recargar_si_hace_falta(lambda: self._leer_tabla_mensual(namespace), version)
+            except Exception as e:
+                logger.warning(f"Índice de {namespace} sin comprobar, se consulta la BD: {e}")
+                self.db.rollback()
+                return None
+        if not indice.cargado or indice.vacio:
+            return None
+        return indice
+
+    def _tras_escritura(self, namespace: str, actualizados=(), eliminados=()):
+        """tras_escritura con la versión de la tabla que ha dejado el commit que se acaba de hacer."""
+        version_nueva = None
+        if RANKING_INDICE_MEMORIA:
+            try:
+                version_nueva = self._version_tabla_mensual(namespace)
+            except Exception as e:
+                # Sin versión el índice se marca para recargar en la siguiente lectura
+                logger.warning(f"No se pudo leer la versión de {namespace} tras escribir: {e}")
+                self.db.rollback()
+        if self.escrituras_diferidas is not None:
+            self.escrituras_diferidas.append((namespace, actualizados, eliminados, version_nueva))
+            return
+        tras_escritura(namespace, actualizados, eliminados, version_nueva)
+
+    def cargar_indices_ranking(self):
+        """Carga los índices de rankings (una lectura de cada tabla mensual). Se llama al arrancar."""
+        self.db.rollback()
+        try:
+            for namespace in (CACHE_ARTISTAS, CACHE_CONTENIDOS, CACHE_COMUNIDADES):
+                # La versión antes que las filas: si alguien escribe entre medias, se recarga después
+                version = self._version_tabla_mensual(namespace)
+                get_indices_ranking().de(namespace).cargar(self._leer_tabla_mensual(namespace), version)
+            return get_indices_ranking().estadisticas()
+        except Exception as e:
+            logger.error(f"Error cargando índices de rankings: {e}")
+            self.db.rollback()
+            raise e
+
+    def comprobar_indices_ranking(self, limit: int = RANKING_INDICE_MAX_LIMIT):
+        """
+        Compara cada top servido desde el índice con el mismo top calculado en SQL.
+        Devuelve las diferencias encontradas (lista vacía si todo cuadra).
+        """
+        self.db.rollback()
+        comprobaciones = [
+            (CACHE_ARTISTAS, "numOyentes", lambda: self.artistasMensualesDAO.obtener_ranking_oyentes(limit)),
+            (CACHE_CONTENIDOS, "sumaValoraciones", lambda: self.contenidoDAO.get_top_valorados(limit)),
+            (CACHE_CONTENIDOS, "numComentarios", lambda: self.contenidoDAO.get_top_comentados(limit)),
+            (CACHE_CONTENIDOS, "numVentas", lambda: self.contenidoDAO.get_top_vendidos(limit)),
+            (CACHE_COMUNIDADES, "numMiembros", lambda: self.comunidadDAO.obtener_ranking_miembros(limite=limit)),
+            (CACHE_COMUNIDADES, "numPublicaciones", lambda: self.comunidadDAO.obtener_ranking_publicaciones(limite=limit))
+        ]
+        try:
+            # Contra el primario, igual que se carga el índice
+            with en_primario(self.db):
+                diferencias = []
+                for namespace, metrica, consulta_sql in comprobaciones:
+                    indice = self._indice_ranking(namespace, limit, comprobar=True)
+                    if indice is None:
+                        continue
+                    en_indice = [dto.to_dict() for dto in indice.top(metrica, limit)]
+                    en_sql = [dto.to_dict() for dto in consulta_sql()]
+                    if en_indice != en_sql:
+                        diferencias.append({"namespace": namespace, "metrica": metrica, "indice": en_indice, "sql": en_sql})
+
+                indice = self._indice_ranking(CACHE_CONTENIDOS, limit, comprobar=True)
+                if indice is not None:
+                    en_indice = [{"genero": g, "totalVentas": int(total)} for g, total in indice.top_grupos(limit)]
+                    en_sql = self.contenidoDAO.get_top_generos_por_ventas(limit)
+                    if en_indice != en_sql:
+                        diferencias.append({"namespace": CACHE_CONTENIDOS, "metrica": "genero", "indice": en_indice, "sql": en_sql})
+
+                return {
+                    "consistente": not diferencias,
+                    "indices": get_indices_ranking().estadisticas(),
+                    "diferencias": diferencias
+                }
+        except Exception as e:
+            logger.error(f"Error comprobando índices de rankings: {e}")
+            self.db.rollback()
+            raise e
+
+    # ================== CACHÉ ==================
+
+    def obtener_estadisticas_cache(self):
+        """Aciertos, fallos e invalidaciones de la caché de rankings, y estado del catálogo de comunidades."""
+        return {**get_cache().estadisticas(), "catalogoComunidades": get_catalogo_comunidades().estadisticas()}
+
     # ================== REPRODUCCIONES ==================
     def registrar_reproduccion(self, id_usuario: int, id_contenido: int, segundos: int):
-        # El DAO ya gestiona el commit/rollback, así que aquí solo llamamos
-        print(f"🎵 Registrando reproducción: Usuario {id_usuario}, Contenido {id_contenido}")
+        # Pasa por el buffer de reproducciones (COPY por lotes), no por la sesión de la petición
+        eventos.info("Registrando reproducción: usuario %s, contenido %s", id_usuario, id_contenido)
         try:
-            self.reproduccionesDAO.insertar_reproduccion(id_usuario, id_contenido, segundos)
+            get_buffer_reproducciones().registrar([
+                ReproduccionDTO(id_usuario=id_usuario, id_contenido=id_contenido, segundos=segundos, fecha=datetime.now())
+            ])
         except Exception as e:
             raise e
 
+    def registrar_reproducciones_lote(self, reproducciones: list[tuple[int, int, int]]) -> int:
+        """
+        Registra varias reproducciones (id_usuario, id_contenido, segundos) de una vez.
+        Todas llevan la fecha de recepción de la petición.
+        """
+        eventos.info("Registrando lote de %d reproducciones", len(reproducciones))
+        ahora = datetime.now()
+        dtos = [
+            ReproduccionDTO(id_usuario=u, id_contenido=c, segundos=s, fecha=ahora)
+            for u, c, s in reproducciones
+        ]
+        return get_buffer_reproducciones().registrar(dtos)
+
     def obtener_historial_personal(self, id_usuario: int) -> list[dict]:
         """ Devuelve la lista de diccionarios lista para enviar al frontend """
         try:
             dtos = self.reproduccionesDAO.obtener_historial_por_usuario(id_usuario)
             return [dto.to_dict() for dto in dtos]
         except Exception as e:
-            print(f"❌ Error obteniendo historial en modelo: {e}")
+            logger.error(f"Error obteniendo historial en modelo: {e}")
             return []
 
-    def resetear_reproducciones_mensuales(self):
-        """
-        Se ejecuta mensualmente (después de procesar las estadísticas).
-        Borra todo el historial de escucha para empezar el mes limpio.
-        """
-        self.db.rollback()
-        print("🗑️ Iniciando reseteo mensual de historial de reproducciones...")
-        
-        try:
-            # Llamamos al DAO
-            self.reproduccionesDAO.eliminar_todo_el_historial()
-            
-            self.db.commit()
-            print("✅ Historial de reproducciones eliminado. Tabla vacía.")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error CRITICO reseteando reproducciones: {e}")
-            self.db.rollback()
-            return False
-    
-    def obtener_top_canciones_usuario(self, id_usuario: int, limit: int = 5):
+    def obtener_top_canciones_usuario(self, id_usuario: int, limit: int = 5, orden: str = "reproducciones"):
         """
         Devuelve las canciones más escuchadas reutilizando ReproduccionDTO.
-        NOTA: En el JSON devuelto, 'segundosReproducidos' indicará el NÚMERO DE VECES escuchado.
+        NOTA: En el JSON devuelto, 'segundosReproducidos' indicará el NÚMERO DE VECES escuchado
+        (o los segundos totales con orden="segundos") y 'fechaReproduccion' la última escucha.
         """
         self.db.rollback()
         try:
             # 1. Obtenemos la lista de DTOs reutilizados
-            top_dtos = self.reproduccionesDAO.get_top_reproducciones_usuario(id_usuario, limit)
+            top_dtos = self.reproduccionesDAO.get_top_reproducciones_usuario(id_usuario, limit, orden)
             
             # 2. Convertimos a diccionario usando el método existente del DTO
             return [dto.to_dict() for dto in top_dtos]
             
         except Exception as e:
-            print(f"❌ Error en modelo top canciones usuario: {e}")
+            logger.error(f"Error en modelo top canciones usuario: {e}")
             self.db.rollback()
             raise e    
     
\ No newline at end of file
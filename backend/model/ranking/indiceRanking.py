@@ -0,0 +1,271 @@
+import bisect
+import threading
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from backend.model.dto.artistaMensualDTO import ArtistaMensualDTO
+from backend.model.dto.contenidoDTO import ContenidoDTO
+from backend.model.dto.comunidadMensualDTO import ComunidadDTO
+from backend.model.cache.cacheConsultas import invalidar_cache, CACHE_ARTISTAS, CACHE_CONTENIDOS, CACHE_COMUNIDADES
+from backend.controller.config import RANKING_INDICE_MEMORIA
+
+
+class IndiceTopK:
+    """
+    Ranking en memoria de una tabla mensual: las filas por id y, por cada métrica, un
+    array ordenado de (-valor, id). Un top-N es un corte de los N primeros, sin ordenar nada.
+    El orden (métrica DESC, id ASC) es el mismo que el ORDER BY de los DAOs.
+
+    Opcionalmente suma una métrica por grupo (ventas por género).
+
+    `version` es la versión de la tabla en versionesrankings (migración 007) con la que
+    está al día. La suben los triggers de la tabla en cada transacción que la modifica,
+    venga del proceso que venga, así que si la de la BD es otra hay que recargar.
+    La versión de la caché no sirve para esto: con CACHE_BACKEND=memoria es de cada
+    proceso y con ninguna no existe.
+    """
+
+    def __init__(self, nombre: str, id_de, metricas: dict, normalizar, grupo=None):
+        self.nombre = nombre
+        self.id_de = id_de
+        self.metricas = metricas        # nombre -> función(dto) con el valor
+        self.normalizar = normalizar    # dto tal y como lo devolvería la BD
+        self.grupo = grupo              # (función grupo(dto) o None, función valor(dto))
+        self.cargado = False
+        self.version = None
+        self.recargas = 0
+        self._comprobado = 0.0          # time.monotonic() de la última comparación con la BD
+        self._filas = {}
+        self._ordenados = {m: [] for m in metricas}
+        self._grupos = {}               # grupo -> [filas, total]
+        self._lock = threading.Lock()
+        self._lock_recarga = threading.Lock()
+
+    # ---------- mantenimiento ----------
+
+    def cargar(self, dtos: list, version: int):
+        """Sustituye todo el contenido del índice (una lectura completa de la tabla)."""
+        filas = {}
+        for dto in dtos:
+            dto = self.normalizar(dto)
+            filas[self.id_de(dto)] = dto
+
+        ordenados = {
+            m: sorted((-valor(dto), id_) for id_, dto in filas.items())
+            for m, valor in self.metricas.items()
+        }
+        grupos = {}
+        if self.grupo:
+            grupo_de, valor_de = self.grupo
+            for dto in filas.values():
+                g = grupo_de(dto)
+                if g is not None:
+                    acumulado = grupos.setdefault(g, [0, 0])
+                    acumulado[0] += 1
+                    acumulado[1] += valor_de(dto)
+
+        with self._lock:
+            self._filas, self._ordenados, self._grupos = filas, ordenados, grupos
+            self.version = version
+            self.cargado = True
+            self.recargas += 1
+            self._comprobado = time.monotonic()
+
+    def recargar_si_hace_falta(self, leer_todos, version: int) -> bool:
+        """
+        Recarga con `leer_todos()` si el índice no está al día con `version` (la de la BD,
+        leída antes que las filas). Solo recarga un hilo a la vez; el resto usa el resultado.
+        """
+        with self._lock_recarga:
+            if self.al_dia(version):
+                with self._lock:
+                    self._comprobado = time.monotonic()
+                return False
+            self.cargar(leer_todos(), version)
+            return True
+
+    def al_dia(self, version: int | None) -> bool:
+        with self._lock:
+            return self.cargado and version is not None and version == self.version
+
+    def hay_que_comprobar(self, intervalo: float) -> bool:
+        """True si no está cargado o hace más de `intervalo` segundos que no se compara con la BD."""
+        with self._lock:
+            return not self.cargado or time.monotonic() - self._comprobado >= intervalo
+
+    @property
+    def vacio(self) -> bool:
+        with self._lock:
+            return not self._filas
+
+    def aplicar(self, actualizados=(), eliminados=(), version_nueva: int | None = None):
+        """
+        Aplica una escritura ya confirmada en la BD. `version_nueva` es la versión de la tabla
+        leída después del commit: si no es la siguiente a la del índice, alguien más ha escrito
+        entre medias y el índice se marca para recargar. Sin versión (no se pudo leer) también.
+        """
+        with self._lock:
+            if not self.cargado:
+                return
+            if version_nueva is None or self.version is None or version_nueva != self.version + 1:
+                self.cargado = False
+                return
+
+            for id_ in eliminados:
+                self._quitar(id_)
+            for dto in actualizados:
+                dto = self.normalizar(dto)
+                id_ = self.id_de(dto)
+                self._quitar(id_)
+                self._poner(id_, dto)
+
+            self.version = version_nueva
+
+    def _quitar(self, id_):
+        dto = self._filas.pop(id_, None)
+        if dto is None:
+            return
+        for m, valor in self.metricas.items():
+            ordenado = self._ordenados[m]
+            pos = bisect.bisect_left(ordenado, (-valor(dto), id_))
+            if pos < len(ordenado) and ordenado[pos][1] == id_:
+                ordenado.pop(pos)
+        if self.grupo:
+            grupo_de, valor_de = self.grupo
+            g = grupo_de(dto)
+            if g is not None:
+                acumulado = self._grupos[g]
+                acumulado[0] -= 1
+                acumulado[1] -= valor_de(dto)
+                if acumulado[0] == 0:
+                    del self._grupos[g]
+
+    def _poner(self, id_, dto):
+        self._filas[id_] = dto
+        for m, valor in self.metricas.items():
+            bisect.insort(self._ordenados[m], (-valor(dto), id_))
+        if self.grupo:
+            grupo_de, valor_de = self.grupo
+            g = grupo_de(dto)
+            if g is not None:
+                acumulado = self._grupos.setdefault(g, [0, 0])
+                acumulado[0] += 1
+                acumulado[1] += valor_de(dto)
+
+    # ---------- consultas ----------
+
+    def top(self, metrica: str, limit: int) -> list:
+        with self._lock:
+            return [self._filas[id_] for _, id_ in self._ordenados[metrica][:limit]]
+
+    def top_grupos(self, limit: int) -> list[tuple]:
+        """[(grupo, total)] por total DESC y grupo ASC."""
+        with self._lock:
+            totales = [(g, acumulado[1]) for g, acumulado in self._grupos.items()]
+        totales.sort(key=lambda t: (-t[1], t[0]))
+        return totales[:limit]
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "nombre": self.nombre,
+                "cargado": self.cargado,
+                "filas": len(self._filas),
+                "version": self.version,
+                "recargas": self.recargas
+            }
+
+
+# ---------- filas tal y como las guarda PostgreSQL ----------
+
+def _normalizar_artista(dto: ArtistaMensualDTO) -> ArtistaMensualDTO:
+    return ArtistaMensualDTO(
+        idartista=int(dto.idArtista),
+        numOyentes=int(dto.numOyentes),
+        valoracionmedia=int(dto.valoracionMedia)
+    )
+
+def _normalizar_contenido(dto: ContenidoDTO) -> ContenidoDTO:
+    # sumavaloraciones es numeric(2,1): PostgreSQL redondea a un decimal (mitades hacia arriba)
+    # y el DAO lo lee como float
+    valoracion = float(Decimal(str(dto.sumaValoraciones or 0)).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP))
+    return ContenidoDTO(
+        idcontenido=int(dto.idContenido),
+        numventas=int(dto.numVentas),
+        esalbum=dto.esAlbum,
+        sumavaloraciones=valoracion,
+        numcomentarios=int(dto.numComentarios),
+        genero=dto.genero,
+        esnovedad=dto.esNovedad
+    )
+
+def _normalizar_comunidad(dto: ComunidadDTO) -> ComunidadDTO:
+    # El id puede llegar como string desde la API; en la tabla es integer
+    return ComunidadDTO(
+        idcomunidad=int(dto.idComunidad),
+        numpublicaciones=int(dto.numPublicaciones),
+        nummiembros=int(dto.numMiembros)
+    )
+
+def _genero_con_ventas(dto: ContenidoDTO):
+    # Mismo filtro que get_top_generos_por_ventas
+    return dto.genero if dto.genero is not None and dto.genero != "Desconocido" else None
+
+
+class IndicesRanking:
+    """Un índice por tabla mensual, con el mismo espacio de nombres que su caché."""
+
+    def __init__(self):
+        self.indices = {
+            CACHE_ARTISTAS: IndiceTopK(
+                "artistasmensual", lambda d: d.idArtista,
+                {"numOyentes": lambda d: d.numOyentes},
+                _normalizar_artista
+            ),
+            CACHE_CONTENIDOS: IndiceTopK(
+                "contenidosmensual", lambda d: d.idContenido,
+                {
+                    "sumaValoraciones": lambda d: d.sumaValoraciones,
+                    "numComentarios": lambda d: d.numComentarios,
+                    "numVentas": lambda d: d.numVentas
+                },
+                _normalizar_contenido,
+                grupo=(_genero_con_ventas, lambda d: d.numVentas)
+            ),
+            CACHE_COMUNIDADES: IndiceTopK(
+                "comunidadesmensual", lambda d: d.idComunidad,
+                {
+                    "numMiembros": lambda d: d.numMiembros,
+                    "numPublicaciones": lambda d: d.numPublicaciones
+                },
+                _normalizar_comunidad
+            )
+        }
+
+    def de(self, namespace: str) -> IndiceTopK:
+        return self.indices[namespace]
+
+    def estadisticas(self) -> list[dict]:
+        return [indice.estadisticas() for indice in self.indices.values()]
+
+
+# Índices compartidos por todo el proceso
+_indices = None
+_lock_indices = threading.Lock()
+
+def get_indices_ranking() -> IndicesRanking:
+    global _indices
+    with _lock_indices:
+        if _indices is None:
+            _indices = IndicesRanking()
+    return _indices
+
+
+def tras_escritura(namespace: str, actualizados=(), eliminados=(), version_nueva: int | None = None):
+    """
+    Llamar después de cada commit que toque una tabla mensual: invalida su caché y
+    aplica el cambio al índice en memoria (en lugar de volver a leer la tabla).
+    `version_nueva` es la de la tabla en versionesrankings tras el commit (Model._tras_escritura).
+    """
+    invalidar_cache(namespace)
+    if RANKING_INDICE_MEMORIA:
+        get_indices_ranking().de(namespace).aplicar(actualizados, eliminados, version_nueva)
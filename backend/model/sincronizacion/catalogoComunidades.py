@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from backend.controller.config import COMUNIDAD_API_BASE_URL, COMUNIDADES_CATALOGO_TTL
+from backend.model.sincronizacion.clienteUpstream import get_cliente_upstream, UPSTREAM_COMUNIDAD
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogoComunidades:
+    """
+    Copia local del listado del MS Comunidad (GET /comunidad/), que no tiene endpoint por id.
+
+    - Índice idComunidad -> registro, así que sincronizar una comunidad no recorre la lista.
+    - Durante `ttl` segundos se sirve de memoria sin tocar la red.
+    - Pasado el TTL (o si se pide un id que no está) se revalida con una petición condicional
+      (If-None-Match / If-Modified-Since): si el MS responde 304 no se descarga nada.
+    - El job de sincronización masiva usa la misma copia.
+
+    Sirve tanto a Model (`get`) como a AsyncModel (`get_async`) del cliente del MS Comunidad:
+    el transporte cambia, el estado y el tratamiento de la respuesta son los mismos.
+    """
+
+    def __init__(self, base_url: str = COMUNIDAD_API_BASE_URL, ttl: float = COMUNIDADES_CATALOGO_TTL,
+                 timeout: float = 20):
+        self.url = f"{base_url}/comunidad/"
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lista = None
+        self._por_id = {}
+        self._etag = None
+        self._last_modified = None
+        self._revalidado_en = None
+        self._lock = threading.Lock()
+        self._metricas = {"aciertos": 0, "descargas": 0, "noModificado": 0, "errores": 0}
+
+    # ---------- estado ----------
+
+    def _caducado(self) -> bool:
+        return self._lista is None or time.monotonic() - self._revalidado_en >= self.ttl
+
+    def _cabeceras(self) -> dict:
+        cabeceras = {}
+        if self._lista is not None:
+            if self._etag:
+                cabeceras["If-None-Match"] = self._etag
+            if self._last_modified:
+                cabeceras["If-Modified-Since"] = self._last_modified
+        return cabeceras
+
+    def _aplicar_respuesta(self, status_code: int, cabeceras, leer_json):
+        """Actualiza la copia con la respuesta del MS (200 con la lista o 304 sin cuerpo)."""
+        with self._lock:
+            if status_code == 304 and self._lista is not None:
+                self._metricas["noModificado"] += 1
+            else:
+                lista = leer_json()
+                if not isinstance(lista, list):
+                    raise ValueError("El MS Comunidad no devolvió una lista")
+                self._lista = lista
+                self._por_id = {str(item.get("idComunidad")): item for item in lista}
+                self._etag = cabeceras.get("ETag")
+                self._last_modified = cabeceras.get("Last-Modified")
+                self._metricas["descargas"] += 1
+            self._revalidado_en = time.monotonic()
+
+    def _contar(self, metrica: str):
+        with self._lock:
+            self._metricas[metrica] += 1
+
+    # ---------- versión síncrona ----------
+
+    def _revalidar(self):
+        try:
+            resp = get_cliente_upstream(UPSTREAM_COMUNIDAD).get(
+                self.url, headers=self._cabeceras(), timeout_lectura=self.timeout
+            )
+            if resp.status_code >= 400:
+                logger.warning(f"Error servidor externo: {resp.text}")
+            resp.raise_for_status()
+            self._aplicar_respuesta(resp.status_code, resp.headers, resp.json)
+        except Exception:
+            self._contar("errores")
+            raise
+
+    def obtener(self, id_comunidad) -> dict | None:
+        """Registro de la comunidad o None si el MS no la tiene."""
+        clave = str(id_comunidad)
+        if not self._caducado() and clave in self._por_id:
+            self._contar("aciertos")
+            return self._por_id[clave]
+        self._revalidar()
+        return self._por_id.get(clave)
+
+    def listado(self, revalidar: bool = False) -> list:
+        """Lista completa. Con `revalidar=True` se pregunta al MS aunque no haya caducado."""
+        if revalidar or self._caducado():
+            self._revalidar()
+        else:
+            self._contar("aciertos")
+        return list(self._lista)
+
+    # ---------- versión asíncrona ----------
+
+    async def _revalidar_async(self):
+        try:
+            resp = await get_cliente_upstream(UPSTREAM_COMUNIDAD).get_async(
+                self.url, headers=self._cabeceras(), timeout_lectura=self.timeout
+            )
+            if resp.status_code >= 400:
+                logger.warning(f"Error servidor externo: {resp.text}")
+            if resp.status_code != 304:
+                # httpx trata el 304 como error en raise_for_status (requests no)
+                resp.raise_for_status()
+            self._aplicar_respuesta(resp.status_code, resp.headers, resp.json)
+        except Exception:
+            self._contar("errores")
+            raise
+
+    async def obtener_async(self, id_comunidad) -> dict | None:
+        clave = str(id_comunidad)
+        if not self._caducado() and clave in self._por_id:
+            self._contar("aciertos")
+            return self._por_id[clave]
+        await self._revalidar_async()
+        return self._por_id.get(clave)
+
+    # ---------- métricas ----------
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "comunidades": len(self._por_id),
+                "etag": self._etag,
+                "lastModified": self._last_modified,
+                "segundosDesdeRevalidacion": (
+                    round(time.monotonic() - self._revalidado_en, 1) if self._revalidado_en is not None else None
+                ),
+                **self._metricas
+            }
+
+
+# Copia compartida por todo el proceso
+_catalogo = None
+_lock_catalogo = threading.Lock()
+
+def get_catalogo_comunidades() -> CatalogoComunidades:
+    global _catalogo
+    with _lock_catalogo:
+        if _catalogo is None:
+            _catalogo = CatalogoComunidades()
+    return _catalogo
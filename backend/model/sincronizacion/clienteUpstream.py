@@ -0,0 +1,303 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+import httpx
+import requests
+from fastapi import HTTPException
+from requests.adapters import HTTPAdapter
+from backend.controller.metricas import UPSTREAM_LATENCIA, UPSTREAM_EVENTOS
+from backend.controller.config import (
+    MS_USUARIOS_BASE_URL,
+    CONTENIDO_API_BASE_URL,
+    COMUNIDAD_API_BASE_URL,
+    UPSTREAM_TIMEOUT_CONEXION,
+    UPSTREAM_TIMEOUT_LECTURA,
+    UPSTREAM_REINTENTOS,
+    UPSTREAM_BACKOFF_BASE,
+    UPSTREAM_MAX_CONEXIONES,
+    UPSTREAM_CIRCUITO_FALLOS,
+    UPSTREAM_CIRCUITO_ESPERA,
+)
+
+# Servicios externos (uno por microservicio)
+UPSTREAM_USUARIOS = "usuarios"
+UPSTREAM_CONTENIDO = "contenido"
+UPSTREAM_COMUNIDAD = "comunidad"
+
+
+class CircuitoAbierto(HTTPException):
+    """El servicio ha fallado seguido y no se le llama hasta que pase la espera (503)."""
+
+    def __init__(self, servicio: str, segundos: float):
+        super().__init__(
+            status_code=503,
+            detail=f"MS {servicio} no disponible, se reintentará en {segundos:.0f} s"
+        )
+
+
+class Cortacircuitos:
+    """
+    Circuit breaker por servicio.
+    - cerrado: se llama normalmente; `umbral_fallos` fallos seguidos lo abren.
+    - abierto: se rechaza sin llamar durante `espera` segundos.
+    - semiabierto: pasada la espera se deja pasar una sola llamada de prueba;
+      si va bien se cierra y si falla se vuelve a abrir.
+    """
+    CERRADO, ABIERTO, SEMIABIERTO = "cerrado", "abierto", "semiabierto"
+
+    def __init__(self, umbral_fallos: int, espera: float):
+        self.umbral_fallos = max(1, umbral_fallos)
+        self.espera = espera
+        self.estado = self.CERRADO
+        self.fallos_seguidos = 0
+        self.aperturas = 0
+        self._abierto_en = 0.0
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        with self._lock:
+            if self.estado == self.CERRADO:
+                return True
+            if self.estado == self.ABIERTO and time.monotonic() - self._abierto_en >= self.espera:
+                self.estado = self.SEMIABIERTO
+            if self.estado == self.SEMIABIERTO and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            return False
+
+    def exito(self):
+        with self._lock:
+            self.estado = self.CERRADO
+            self.fallos_seguidos = 0
+            self._prueba_en_curso = False
+
+    def fallo(self):
+        with self._lock:
+            self.fallos_seguidos += 1
+            if self.estado == self.SEMIABIERTO or self.fallos_seguidos >= self.umbral_fallos:
+                if self.estado != self.ABIERTO:
+                    self.aperturas += 1
+                self.estado = self.ABIERTO
+                self._abierto_en = time.monotonic()
+            self._prueba_en_curso = False
+
+    def segundos_restantes(self) -> float:
+        with self._lock:
+            return max(0.0, self.espera - (time.monotonic() - self._abierto_en))
+
+
+class ClienteUpstream:
+    """
+    Cliente HTTP de un microservicio externo, compartido por todo el proceso.
+
+    - Conexiones keep-alive: una requests.Session con pool para Model y un
+      httpx.AsyncClient (creado al primer uso) para AsyncModel.
+    - Timeout de conexión corto y de lectura aparte: un servicio caído falla en segundos.
+    - Reintentos con backoff exponencial y jitter ante errores de red, 5xx y 429 (solo GET).
+    - Circuit breaker: con el servicio caído se responde 503 al momento en lugar de esperar.
+    - Métricas: llamadas, reintentos, errores, rechazos y latencia.
+
+    `get` y `get_async` devuelven la respuesta tal cual (también 4xx y el último 5xx);
+    cada llamador decide qué hacer con el código, como hacía con requests/httpx.
+    """
+
+    def __init__(self, nombre: str, base_url: str,
+                 timeout_conexion: float = UPSTREAM_TIMEOUT_CONEXION,
+                 timeout_lectura: float = UPSTREAM_TIMEOUT_LECTURA,
+                 reintentos: int = UPSTREAM_REINTENTOS,
+                 backoff_base: float = UPSTREAM_BACKOFF_BASE,
+                 max_conexiones: int = UPSTREAM_MAX_CONEXIONES,
+                 umbral_fallos: int = UPSTREAM_CIRCUITO_FALLOS,
+                 espera_circuito: float = UPSTREAM_CIRCUITO_ESPERA):
+        self.nombre = nombre
+        self.base_url = base_url
+        self.timeout_conexion = timeout_conexion
+        self.timeout_lectura = timeout_lectura
+        self.reintentos = max(0, reintentos)
+        self.backoff_base = backoff_base
+        self.max_conexiones = max(1, max_conexiones)
+        self.circuito = Cortacircuitos(umbral_fallos, espera_circuito)
+
+        self.session = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_conexiones)
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+        self._cliente_async = None
+
+        self._lock = threading.Lock()
+        self._latencias = deque(maxlen=1000)  # ms de las últimas llamadas
+        self._metricas = {"llamadas": 0, "reintentos": 0, "errores": 0, "rechazadas": 0}
+        self._latencia_prometheus = UPSTREAM_LATENCIA.labels(nombre)
+
+    # ---------- comunes ----------
+
+    @staticmethod
+    def _reintentable(status_code: int) -> bool:
+        return status_code >= 500 or status_code == 429
+
+    def _espera(self, intento: int, backoff_base: float) -> float:
+        # Backoff exponencial con jitter para no sincronizar los reintentos
+        return backoff_base * (2 ** intento) * random.uniform(0.5, 1.5)
+
+    def _entrar(self):
+        if not self.circuito.permitir():
+            self._contar("rechazadas")
+            raise CircuitoAbierto(self.nombre, self.circuito.segundos_restantes())
+
+    def _salir(self, inicio: float, correcta: bool):
+        if correcta:
+            self.circuito.exito()
+        else:
+            self.circuito.fallo()
+        segundos = time.perf_counter() - inicio
+        with self._lock:
+            self._metricas["llamadas"] += 1
+            if not correcta:
+                self._metricas["errores"] += 1
+            self._latencias.append(segundos * 1000)
+        self._latencia_prometheus.observe(segundos)
+        if not correcta:
+            UPSTREAM_EVENTOS.labels(self.nombre, "errores").inc()
+
+    def _contar(self, metrica: str):
+        with self._lock:
+            self._metricas[metrica] += 1
+        UPSTREAM_EVENTOS.labels(self.nombre, metrica).inc()
+
+    # ---------- síncrono (Model) ----------
+
+    def get(self, url: str, headers: dict | None = None, timeout_lectura: float | None = None,
+            reintentos: int | None = None) -> requests.Response:
+        self._entrar()
+        reintentos = self.reintentos if reintentos is None else reintentos
+        timeout = (self.timeout_conexion, timeout_lectura or self.timeout_lectura)
+        inicio = time.perf_counter()
+        intento = 0
+        while True:
+            try:
+                resp = self.session.get(url, headers=headers, timeout=timeout)
+                if not self._reintentable(resp.status_code) or intento >= reintentos:
+                    self._salir(inicio, not self._reintentable(resp.status_code))
+                    return resp
+            except requests.RequestException:
+                if intento >= reintentos:
+                    self._salir(inicio, False)
+                    raise
+            except Exception:
+                self._salir(inicio, False)
+                raise
+            self._contar("reintentos")
+            time.sleep(self._espera(intento, self.backoff_base))
+            intento += 1
+
+    # ---------- asíncrono (AsyncModel y sync masiva) ----------
+
+    def cliente_async(self) -> httpx.AsyncClient:
+        if self._cliente_async is None:
+            self._cliente_async = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout_lectura, connect=self.timeout_conexion),
+                limits=httpx.Limits(
+                    max_connections=self.max_conexiones,
+                    max_keepalive_connections=self.max_conexiones
+                )
+            )
+        return self._cliente_async
+
+    async def get_async(self, url: str, headers: dict | None = None, timeout_lectura: float | None = None,
+                        reintentos: int | None = None, backoff_base: float | None = None,
+                        cliente: httpx.AsyncClient | None = None) -> httpx.Response:
+        """
+        Igual que `get`. Con `cliente` se usa ese httpx.AsyncClient en lugar del compartido
+        (la sync masiva tiene el suyo en otro event loop), pero con el mismo circuito y métricas.
+        """
+        self._entrar()
+        cliente = cliente or self.cliente_async()
+        reintentos = self.reintentos if reintentos is None else reintentos
+        backoff_base = self.backoff_base if backoff_base is None else backoff_base
+        extra = {}
+        if timeout_lectura:
+            extra["timeout"] = httpx.Timeout(timeout_lectura, connect=self.timeout_conexion)
+        inicio = time.perf_counter()
+        intento = 0
+        while True:
+            try:
+                resp = await cliente.get(url, headers=headers, **extra)
+                if not self._reintentable(resp.status_code) or intento >= reintentos:
+                    self._salir(inicio, not self._reintentable(resp.status_code))
+                    return resp
+            except httpx.TransportError:
+                if intento >= reintentos:
+                    self._salir(inicio, False)
+                    raise
+            except Exception:
+                self._salir(inicio, False)
+                raise
+            self._contar("reintentos")
+            await asyncio.sleep(self._espera(intento, backoff_base))
+            intento += 1
+
+    async def cerrar_async(self):
+        if self._cliente_async is not None:
+            await self._cliente_async.aclose()
+            self._cliente_async = None
+
+    # ---------- métricas ----------
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            latencias = sorted(self._latencias)
+            metricas = dict(self._metricas)
+
+        def percentil(p):
+            return round(latencias[min(len(latencias) - 1, int(len(latencias) * p))], 1) if latencias else None
+
+        return {
+            "servicio": self.nombre,
+            "baseUrl": self.base_url,
+            "circuito": self.circuito.estado,
+            "fallosSeguidos": self.circuito.fallos_seguidos,
+            "aperturas": self.circuito.aperturas,
+            **metricas,
+            "latenciaMs": {
+                "p50": percentil(0.5),
+                "p95": percentil(0.95),
+                "max": round(latencias[-1], 1) if latencias else None
+            }
+        }
+
+
+# Un cliente por servicio, compartido por todo el proceso
+_clientes = {}
+_lock_clientes = threading.Lock()
+
+_BASE_URLS = {
+    UPSTREAM_USUARIOS: MS_USUARIOS_BASE_URL,
+    UPSTREAM_CONTENIDO: CONTENIDO_API_BASE_URL,
+    UPSTREAM_COMUNIDAD: COMUNIDAD_API_BASE_URL,
+}
+
+def get_cliente_upstream(servicio: str) -> ClienteUpstream:
+    with _lock_clientes:
+        if servicio not in _clientes:
+            _clientes[servicio] = ClienteUpstream(servicio, _BASE_URLS[servicio])
+        return _clientes[servicio]
+
+def estadisticas_upstreams() -> list[dict]:
+    return [get_cliente_upstream(servicio).estadisticas() for servicio in _BASE_URLS]
+
+def _tras_fork():
+    """Un worker recién creado no comparte las conexiones keep-alive del padre: crea sus clientes."""
+    global _lock_clientes
+    _lock_clientes = threading.Lock()
+    _clientes.clear()
+
+os.register_at_fork(after_in_child=_tras_fork)
+
+async def cerrar_clientes_async():
+    """Cierra los httpx.AsyncClient (al apagar la app en modo async)."""
+    for cliente in list(_clientes.values()):
+        await cliente.cerrar_async()
@@ -0,0 +1,32 @@
+import hashlib
+import json
+
+# Entidades con huella (columna `entidad` de huellassincronizacion)
+HUELLA_ARTISTAS = "artistas"
+HUELLA_CONTENIDOS = "contenidos"
+
+
+def huella(dto) -> str:
+    """
+    Hash de la fila que se escribiría para el DTO. Se calcula sobre lo que se guarda y
+    no sobre la respuesta entera del microservicio: un cambio en campos que no se
+    guardan no cuenta como cambio.
+    """
+    datos = json.dumps(dto.to_dict(), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(datos.encode()).hexdigest()
+
+
+def separar_cambios(dtos: list, guardadas: dict, id_de) -> tuple[list, dict, int]:
+    """
+    Compara cada DTO con la huella guardada de su id.
+    Devuelve (DTOs que han cambiado o son nuevos, sus huellas {id: huella}, nº sin cambios).
+    """
+    cambiados, huellas_nuevas, sin_cambios = [], {}, 0
+    for dto in dtos:
+        id_, h = id_de(dto), huella(dto)
+        if guardadas.get(id_) == h:
+            sin_cambios += 1
+            continue
+        cambiados.append(dto)
+        huellas_nuevas[id_] = h
+    return cambiados, huellas_nuevas, sin_cambios
@@ -0,0 +1,51 @@
+"""
+Mapeo de las respuestas de los otros microservicios a nuestros DTOs.
+Compartido por Model, AsyncModel y los sincronizadores masivos para que
+todos guarden exactamente lo mismo.
+"""
+from backend.model.dto.contenidoDTO import ContenidoDTO
+from backend.model.dto.artistaMensualDTO import ArtistaMensualDTO
+from backend.model.dto.comunidadMensualDTO import ComunidadDTO
+
+def dto_artista_desde_api(data: dict, id_artista: int) -> ArtistaMensualDTO:
+    # A veces el ID viene como 'id' o 'idUsuario' dependiendo de la API
+    raw_id = data.get("id") or data.get("idUsuario") or id_artista
+
+    return ArtistaMensualDTO(
+        idartista=raw_id,
+        numOyentes=int(data.get("oyentes", 0)),
+        valoracionmedia=int(data.get("valoracion", 0))
+    )
+
+def artista_completo(data: dict) -> bool:
+    """True si el registro ya trae todo lo que se guarda (el listado de MS Usuarios suele traerlo)."""
+    return data.get("oyentes") is not None and data.get("valoracion") is not None
+
+def contar_comentarios(valoraciones) -> int:
+    """Cuenta solo las valoraciones que traen un comentario no vacío."""
+    reales = [c for c in valoraciones if c.get("comentario") and str(c.get("comentario")).strip() != ""]
+    return len(reales)
+
+def dto_contenido_desde_api(id_contenido: int, data_elem: dict, num_comentarios: int = 0) -> ContenidoDTO:
+    obj_genero = data_elem.get("genero")
+    nombre_genero = "Desconocido"
+    if isinstance(obj_genero, dict):
+        nombre_genero = obj_genero.get("nombre") or "Desconocido"
+
+    return ContenidoDTO(
+        idcontenido=id_contenido,
+        numventas=int(data_elem.get("numventas", 0)),
+        esalbum=bool(data_elem.get("esalbum", False)),
+        sumavaloraciones=float(data_elem.get("valoracion", 0.0)),
+        numcomentarios=int(num_comentarios),
+        genero=str(nombre_genero),
+        esnovedad=bool(data_elem.get("esnovedad", False))
+    )
+
+def dto_comunidad_desde_api(datos: dict, id_comunidad=None) -> ComunidadDTO:
+    # Ojo: la API devuelve 'numUsuarios', pero el DTO usa 'numMiembros'
+    return ComunidadDTO(
+        idcomunidad=id_comunidad if id_comunidad is not None else datos.get("idComunidad"),
+        numpublicaciones=int(datos.get("numPublicaciones", 0)),
+        nummiembros=int(datos.get("numUsuarios", 0))
+    )
@@ -0,0 +1,144 @@
+import logging
+import asyncio
+import httpx
+from backend.model.sincronizacion import mapeoApi
+from backend.model.sincronizacion.clienteUpstream import get_cliente_upstream, UPSTREAM_CONTENIDO
+from backend.controller.config import (
+    CONTENIDO_API_BASE_URL,
+    SYNC_CONCURRENCIA,
+    SYNC_MAX_CONEXIONES_HOST,
+    SYNC_REINTENTOS,
+    SYNC_BACKOFF_BASE,
+    SYNC_TAMANO_LOTE,
+)
+
+logger = logging.getLogger(__name__)
+
+class SincronizadorContenidos:
+    """
+    Sincronización masiva de contenidos contra el MS Contenido.
+
+    - Un único httpx.AsyncClient con keep-alive y un máximo de conexiones al host.
+    - `concurrencia` trabajadores descargan contenidos a la vez (cada contenido
+      pide /elementos/{id} y /usuarioValoraElem/{id} en paralelo).
+    - Reintentos con backoff exponencial y jitter ante errores de red, 5xx y 429, con el
+      circuit breaker y las métricas del cliente del MS Contenido (si el MS cae, el resto
+      de contenidos falla al momento en lugar de agotar los reintentos uno a uno).
+    - Los DTOs se agrupan en lotes y se entregan a `guardar_lote` en un hilo aparte,
+      así que las descargas siguen mientras se escribe en BD.
+
+    La URL base es configurable para poder apuntarlo a un servidor stub local.
+    """
+
+    def __init__(self, base_url: str = CONTENIDO_API_BASE_URL,
+                 concurrencia: int = SYNC_CONCURRENCIA,
+                 max_conexiones: int = SYNC_MAX_CONEXIONES_HOST,
+                 reintentos: int = SYNC_REINTENTOS,
+                 backoff_base: float = SYNC_BACKOFF_BASE,
+                 tamano_lote: int = SYNC_TAMANO_LOTE,
+                 timeout: float = 10):
+        self.url_contenidos = f"{base_url}/elementos"
+        self.url_valoraciones = f"{base_url}/usuarioValoraElem"
+        self.concurrencia = max(1, concurrencia)
+        self.max_conexiones = max(1, max_conexiones)
+        self.reintentos = max(0, reintentos)
+        self.backoff_base = backoff_base
+        self.tamano_lote = max(1, tamano_lote)
+        self.timeout = timeout
+        self.upstream = get_cliente_upstream(UPSTREAM_CONTENIDO)
+
+    # ================== HTTP ==================
+
+    async def _get_con_reintentos(self, cliente: httpx.AsyncClient, url: str) -> httpx.Response:
+        # El cliente es el de esta sync (vive en su propio event loop); reintentos, circuito
+        # y métricas los pone el cliente compartido del MS Contenido
+        return await self.upstream.get_async(
+            url, cliente=cliente, reintentos=self.reintentos, backoff_base=self.backoff_base
+        )
+
+    async def obtener_contenido(self, cliente: httpx.AsyncClient, id_contenido: int):
+        """Descarga un contenido y sus comentarios y devuelve su ContenidoDTO."""
+        resp_elem, resp_com = await asyncio.gather(
+            self._get_con_reintentos(cliente, f"{self.url_contenidos}/{id_contenido}"),
+            self._get_con_reintentos(cliente, f"{self.url_valoraciones}/{id_contenido}"),
+            return_exceptions=True
+        )
+        if isinstance(resp_elem, BaseException):
+            raise resp_elem
+        resp_elem.raise_for_status()
+
+        # Los comentarios son opcionales: si fallan, contamos 0 (igual que la sync individual)
+        num_comentarios = 0
+        try:
+            if not isinstance(resp_com, BaseException) and resp_com.status_code == 200:
+                num_comentarios = mapeoApi.contar_comentarios(resp_com.json())
+        except ValueError:
+            num_comentarios = 0
+
+        return mapeoApi.dto_contenido_desde_api(id_contenido, resp_elem.json(), num_comentarios)
+
+    # ================== ORQUESTACIÓN ==================
+
+    async def ejecutar(self, ids: list, guardar_lote) -> dict:
+        """
+        Sincroniza todos los `ids`. `guardar_lote(dtos)` es una función bloqueante
+        que persiste una lista de DTOs (se ejecuta en un hilo, un lote cada vez) y puede
+        devolver cuántos escribió de verdad (los demás no habían cambiado).
+        Devuelve un resumen con los contenidos guardados, los escritos y los IDs que fallaron.
+        """
+        pendientes = asyncio.Queue()
+        for id_contenido in ids:
+            pendientes.put_nowait(id_contenido)
+
+        descargados = asyncio.Queue()
+        resumen = {"total": len(ids), "sincronizados": 0, "escritos": 0, "fallidos": []}
+
+        async def trabajador(cliente):
+            while True:
+                try:
+                    id_contenido = pendientes.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    dto = await self.obtener_contenido(cliente, id_contenido)
+                    await descargados.put(dto)
+                except Exception as e:
+                    logger.error(f"Error contenido {id_contenido}: {e}")
+                    resumen["fallidos"].append(id_contenido)
+
+        async def escritor():
+            # Un único escritor: la sesión de BD no admite uso concurrente
+            fin = False
+            while not fin:
+                lote = []
+                while len(lote) < self.tamano_lote:
+                    dto = await descargados.get()
+                    if dto is None:
+                        fin = True
+                        break
+                    lote.append(dto)
+                if not lote:
+                    continue
+                try:
+                    escritos = await asyncio.to_thread(guardar_lote, lote)
+                    resumen["sincronizados"] += len(lote)
+                    resumen["escritos"] += len(lote) if escritos is None else escritos
+                except Exception as e:
+                    logger.error(f"Error guardando lote de {len(lote)} contenidos: {e}")
+                    resumen["fallidos"].extend(dto.idContenido for dto in lote)
+
+        limites = httpx.Limits(
+            max_connections=self.max_conexiones,
+            max_keepalive_connections=self.max_conexiones
+        )
+        async with httpx.AsyncClient(limits=limites, timeout=self.timeout) as cliente:
+            tarea_escritor = asyncio.create_task(escritor())
+            await asyncio.gather(*(trabajador(cliente) for _ in range(self.concurrencia)))
+            await descargados.put(None)  # Marca de fin para el escritor
+            await tarea_escritor
+
+        return resumen
+
+    def sincronizar(self, ids: list, guardar_lote) -> dict:
+        """Punto de entrada bloqueante (para el scheduler y el Model síncrono)."""
+        return asyncio.run(self.ejecutar(ids, guardar_lote))
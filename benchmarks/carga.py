@@ -0,0 +1,406 @@
+"""
+Prueba de carga de la API: lanza cada ruta con `--concurrencia` clientes durante
+`--duracion` segundos y mide latencia (p50/p95/p99/máx) y peticiones por segundo.
+Con --jobs mide además los jobs de sincronización mensual (en este proceso, contra la BD
+y los microservicios configurados), y con --arranque N el tiempo de arranque de la API:
+la arranca N veces (uvicorn, con el entorno de este proceso) y mide cuánto tarda en
+responder /health/live y /health/ready. Con --presupuesto-arranque-ms termina con código 1
+si el p95 hasta /health/live lo supera.
+
+Las rutas salen de la propia API (GET /openapi.json), no de estadisticas.yaml, que describe
+rutas que la API no implementa: al final se listan las rutas sin escenario.
+
+Preparación (desde la raíz del repo):
+    python -m benchmarks.semilla --confirmar
+    python -m benchmarks.stubMicroservicios &
+    MS_USUARIOS_BASE_URL=http://127.0.0.1:9911 MS_CONTENIDO_BASE_URL=http://127.0.0.1:9911/api \\
+    MS_COMUNIDAD_BASE_URL=http://127.0.0.1:9911 uvicorn backend.controller.fastapi:app --port 8000 &
+
+Uso:
+    python -m benchmarks.carga [--url http://127.0.0.1:8000] [--duracion 10] [--concurrencia 32]
+        [--fases lectura,escritura,borrado] [--filtro contenido] [--jobs] [--salida benchmarks/resultados]
+        [--arranque 5] [--presupuesto-arranque-ms 3000]
+    python -m benchmarks.carga --fases "" --arranque 10     (solo el arranque)
+
+Los volúmenes (--contenidos, --artistas...) deben ser los de la semilla: de ellos salen los ids.
+La fase de borrado usa ids del último 10 % de cada rango (los menos consultados); tras ella
+conviene volver a sembrar antes de otra ejecución comparable.
+
+El resultado se guarda en <salida>/<fecha>_<commit>.json; para compararlo con otro:
+    python -m benchmarks.comparar antes.json despues.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+import httpx
+import orjson
+
+FASES = ("lectura", "escritura", "borrado")
+
+
+class Escenario:
+    """Una ruta con su forma de generar peticiones. `ruta` es la plantilla de /openapi.json."""
+
+    def __init__(self, fase: str, metodo: str, ruta: str, peticion, variante: str = ""):
+        self.fase = fase
+        self.metodo = metodo
+        self.ruta = ruta
+        self.peticion = peticion    # función(ids) -> (url, kwargs de httpx)
+        self.nombre = f"{metodo} {ruta}{variante}"
+
+
+class Ids:
+    """Ids válidos según los volúmenes de la semilla, con el mismo sesgo de popularidad."""
+
+    def __init__(self, args):
+        self.contenidos = args.contenidos
+        self.artistas = args.artistas
+        self.comunidades = args.comunidades
+        self.usuarios = args.usuarios
+
+    @staticmethod
+    def _popular(n: int) -> int:
+        return 1 + int(random.random() ** 3 * n) % n
+
+    @staticmethod
+    def _reservado(n: int) -> int:
+        # Último 10 %: lo que se borra en la fase de borrado
+        return random.randint(max(1, n - n // 10), n)
+
+    def contenido(self): return self._popular(self.contenidos)
+    def artista(self): return self._popular(self.artistas)
+    def comunidad(self): return random.randint(1, self.comunidades)
+    def usuario(self): return 1 + int(random.random() ** 2 * self.usuarios) % self.usuarios
+    def contenido_reservado(self): return self._reservado(self.contenidos)
+    def artista_reservado(self): return self._reservado(self.artistas)
+    def comunidad_reservada(self): return self._reservado(self.comunidades)
+    def usuario_reservado(self): return self._reservado(self.usuarios)
+
+
+def escenarios() -> list[Escenario]:
+    base = "/estadisticas"
+
+    def get(ruta, url=None, params=None, variante=""):
+        def peticion(ids):
+            return (url(ids) if url else ruta), {"params": params(ids) if params else None}
+        return Escenario("lectura", "GET", ruta, peticion, variante)
+
+    def put(ruta, body):
+        return Escenario("escritura", "PUT", ruta, lambda ids: (ruta, {"json": body(ids)}))
+
+    def delete(ruta, url):
+        return Escenario("borrado", "DELETE", ruta, lambda ids: (url(ids), {}))
+
+    pagina = lambda total: (lambda ids: {"limit": 100, "despues_de": random.randint(0, max(0, total(ids) - 100))})
+    ndjson = lambda ids: {"formato": "ndjson"}
+
+    return [
+        # ---------- lecturas ----------
+        get(f"{base}/artistas/oyentes"),
+        get(f"{base}/artistas/oyentes", params=pagina(lambda ids: ids.artistas), variante=" ?limit=100"),
+        get(f"{base}/artistas/oyentes", params=ndjson, variante=" ?formato=ndjson"),
+        get(f"{base}/artistas/oyentes/{{id_artista}}", url=lambda ids: f"{base}/artistas/oyentes/{ids.artista()}"),
+        get(f"{base}/artistas/ranking/oyentes"),
+        get(f"{base}/artistas/top", params=lambda ids: {"limit": 10}),
+        get(f"{base}/contenido"),
+        get(f"{base}/contenido", params=pagina(lambda ids: ids.contenidos), variante=" ?limit=100"),
+        get(f"{base}/contenido", params=ndjson, variante=" ?formato=ndjson"),
+        get(f"{base}/contenido/{{id_contenido}}", url=lambda ids: f"{base}/contenido/{ids.contenido()}"),
+        get(f"{base}/contenidos/valoracion/top", params=lambda ids: {"limit": 10}),
+        get(f"{base}/contenidos/comentarios/top", params=lambda ids: {"limit": 10}),
+        get(f"{base}/contenidos/ventas/top", params=lambda ids: {"limit": 10}),
+        get(f"{base}/contenidos/genero/top", params=lambda ids: {"limit": 10}),
+        get(f"{base}/comunidad"),
+        get(f"{base}/comunidad", params=pagina(lambda ids: ids.comunidades), variante=" ?limit=100"),
+        get(f"{base}/comunidad", params=ndjson, variante=" ?formato=ndjson"),
+        get(f"{base}/comunidad/{{id_comunidad}}", url=lambda ids: f"{base}/comunidad/{ids.comunidad()}"),
+        get(f"{base}/comunidad/ranking/miembros"),
+        get(f"{base}/comunidad/ranking/publicaciones"),
+        get(f"{base}/reproducciones/usuario/{{id_usuario}}",
+            url=lambda ids: f"{base}/reproducciones/usuario/{ids.usuario()}"),
+        get(f"{base}/reproducciones/top/usuario/{{id_usuario}}",
+            url=lambda ids: f"{base}/reproducciones/top/usuario/{ids.usuario()}"),
+        get(f"{base}/reproducciones/top/usuario/{{id_usuario}}",
+            url=lambda ids: f"{base}/reproducciones/top/usuario/{ids.usuario()}",
+            params=lambda ids: {"orden": "segundos"}, variante=" ?orden=segundos"),
+        get(f"{base}/buffers"),
+        get(f"{base}/upstreams"),
+        get(f"{base}/cache"),
+        get(f"{base}/rankings/consistencia"),
+        get("/"),
+        get("/metrics"),
+        get("/health/live"),
+        get("/health/ready"),
+
+        # ---------- escrituras ----------
+        put(f"{base}/artistas/oyentes", lambda ids: {"idArtista": ids.artista()}),
+        put(f"{base}/artistas/busqueda", lambda ids: {"idArtista": ids.artista(), "idUsuario": ids.usuario()}),
+        put(f"{base}/artistas/busqueda/lote",
+            lambda ids: [{"idArtista": ids.artista(), "idUsuario": ids.usuario()} for _ in range(50)]),
+        put(f"{base}/contenido", lambda ids: {"idContenido": ids.contenido()}),
+        put(f"{base}/comunidad", lambda ids: {"idComunidad": str(ids.comunidad())}),
+        put(f"{base}/reproducciones/registrar",
+            lambda ids: {"idUsuario": ids.usuario(), "idContenido": ids.contenido(), "segundos": random.randint(1, 300)}),
+        put(f"{base}/reproducciones/registrar/lote",
+            lambda ids: [{"idUsuario": ids.usuario(), "idContenido": ids.contenido(), "segundos": random.randint(1, 300)}
+                         for _ in range(100)]),
+
+        # ---------- borrados (ids reservados) ----------
+        delete(f"{base}/artistas/{{id_artista}}", lambda ids: f"{base}/artistas/{ids.artista_reservado()}"),
+        delete(f"{base}/artistas/busqueda/artista/{{id_artista}}",
+               lambda ids: f"{base}/artistas/busqueda/artista/{ids.artista_reservado()}"),
+        delete(f"{base}/artistas/busqueda/usuario/{{id_usuario}}",
+               lambda ids: f"{base}/artistas/busqueda/usuario/{ids.usuario_reservado()}"),
+        delete(f"{base}/contenido/{{id_contenido}}", lambda ids: f"{base}/contenido/{ids.contenido_reservado()}"),
+        delete(f"{base}/comunidad/{{id_comunidad}}", lambda ids: f"{base}/comunidad/{ids.comunidad_reservada()}"),
+    ]
+
+
+# ---------- medición ----------
+
+def percentil(ordenadas: list, p: float) -> float | None:
+    """Percentil por rango más cercano (en ms) de una lista ya ordenada de segundos."""
+    if not ordenadas:
+        return None
+    return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] * 1000, 2)
+
+
+def resumir(latencias: list, segundos: float, codigos: Counter) -> dict:
+    ordenadas = sorted(latencias)
+    errores = sum(n for codigo, n in codigos.items() if codigo == "error" or int(codigo) >= 500)
+    return {
+        "peticiones": len(ordenadas),
+        "errores": errores,
+        "codigos": {str(codigo): n for codigo, n in sorted(codigos.items(), key=lambda c: str(c[0]))},
+        "rps": round(len(ordenadas) / segundos, 1) if segundos else None,
+        "p50": percentil(ordenadas, 0.50),
+        "p95": percentil(ordenadas, 0.95),
+        "p99": percentil(ordenadas, 0.99),
+        "max": round(ordenadas[-1] * 1000, 2) if ordenadas else None,
+    }
+
+
+async def lanzar(cliente: httpx.AsyncClient, escenario: Escenario, ids: Ids,
+                 duracion: float, concurrencia: int) -> dict:
+    """Bucle cerrado: cada cliente lanza la siguiente petición al recibir la anterior."""
+    latencias, codigos = [], Counter()
+    fin = time.perf_counter() + duracion
+
+    async def cliente_virtual():
+        while time.perf_counter() < fin:
+            url, kwargs = escenario.peticion(ids)
+            inicio = time.perf_counter()
+            try:
+                resp = await cliente.request(escenario.metodo, url, **kwargs)
+                codigos[resp.status_code] += 1
+            except httpx.HTTPError:
+                codigos["error"] += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente_virtual() for _ in range(concurrencia)))
+    return resumir(latencias, time.perf_counter() - inicio, codigos)
+
+
+async def medir_endpoints(args, seleccionados: list[Escenario]) -> tuple[dict, list]:
+    ids = Ids(args)
+    limites = httpx.Limits(max_connections=args.concurrencia, max_keepalive_connections=args.concurrencia)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limites) as cliente:
+        rutas_api = await rutas_de_la_api(cliente)
+        resultados = {}
+        for escenario in seleccionados:
+            if args.calentamiento:
+                await lanzar(cliente, escenario, ids, args.calentamiento, args.concurrencia)
+            resultado = await lanzar(cliente, escenario, ids, args.duracion, args.concurrencia)
+            resultados[escenario.nombre] = resultado
+            imprimir_fila(escenario.nombre, resultado)
+
+    cubiertas = {(e.metodo, e.ruta) for e in escenarios()}
+    sin_escenario = sorted(f"{m} {r}" for m, r in rutas_api - cubiertas)
+    return resultados, sin_escenario
+
+
+async def rutas_de_la_api(cliente: httpx.AsyncClient) -> set:
+    resp = await cliente.get("/openapi.json")
+    resp.raise_for_status()
+    return {
+        (metodo.upper(), ruta)
+        for ruta, operaciones in resp.json()["paths"].items()
+        for metodo in operaciones
+    }
+
+
+def medir_jobs(repeticiones: int) -> dict:
+    """
+    Duración de los jobs de sincronización mensual, ejecutados `repeticiones` veces cada uno.
+    Las variantes "(delta)" miden la pasada sin cambios (solo compara huellas).
+    `rps` es aquí filas por segundo.
+    """
+    from backend.model.model import Model
+
+    jobs = {
+        "sync_todos_los_artistas": lambda model: model.sync_todos_los_artistas(delta=False),
+        "sync_todos_los_artistas (delta)": lambda model: model.sync_todos_los_artistas(delta=True),
+        "sync_todos_los_contenidos": lambda model: model.sync_todos_los_contenidos(delta=False),
+        "sync_todos_los_contenidos (delta)": lambda model: model.sync_todos_los_contenidos(delta=True),
+        "sync_todas_las_comunidades": lambda model: model.sync_todas_las_comunidades(),
+    }
+    resultados = {}
+    for nombre, job in jobs.items():
+        duraciones, filas = [], None
+        for _ in range(repeticiones):
+            with Model() as model:
+                inicio = time.perf_counter()
+                resumen = job(model)
+                duraciones.append(time.perf_counter() - inicio)
+            if isinstance(resumen, dict):
+                filas = resumen.get("total")
+            elif isinstance(resumen, list):
+                filas = len(resumen)
+        resultado = resumir(duraciones, sum(duraciones), Counter({200: len(duraciones)}))
+        # En los jobs, el rendimiento son filas sincronizadas por segundo
+        resultado["filas"] = filas
+        resultado["rps"] = round(filas * len(duraciones) / sum(duraciones), 1) if filas else None
+        resultados[nombre] = resultado
+        imprimir_fila(nombre, resultado)
+    return resultados
+
+
+def medir_arranque(repeticiones: int, timeout: float) -> dict:
+    """
+    Arranca la API `repeticiones` veces en un puerto libre y mide, desde que se lanza el
+    proceso, cuánto tarda /health/live (atiende peticiones) y /health/ready (BD preparada)
+    en responder 200. Incluye el arranque del intérprete y la importación de la app.
+    """
+    hasta = {"/health/live": [], "/health/ready": []}
+    fallidos = 0
+    for _ in range(repeticiones):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            puerto = s.getsockname()[1]
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.controller.fastapi:app", "--port", str(puerto),
+             "--log-level", "warning"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{puerto}", timeout=1) as cliente:
+                for ruta, tiempos in hasta.items():
+                    while time.perf_counter() - inicio < timeout and proceso.poll() is None:
+                        try:
+                            if cliente.get(ruta).status_code == 200:
+                                tiempos.append(time.perf_counter() - inicio)
+                                break
+                        except httpx.HTTPError:
+                            pass
+                        time.sleep(0.01)
+                    else:
+                        fallidos += 1
+                        break
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+    resultados = {}
+    for ruta, tiempos in hasta.items():
+        codigos = Counter({200: len(tiempos)})
+        if fallidos:
+            codigos["error"] = fallidos
+        resultado = resumir(tiempos, 0, codigos)
+        nombre = f"hasta {ruta}"
+        resultados[nombre] = resultado
+        imprimir_fila(nombre, resultado)
+    return resultados
+
+
+# ---------- salida ----------
+
+def imprimir_fila(nombre: str, r: dict):
+    print(f"{nombre[:62]:62}{r['peticiones']:>8}{r['errores']:>6}{r['rps'] or 0:>10.1f}"
+          f"{r['p50'] or 0:>10.1f}{r['p95'] or 0:>10.1f}{r['p99'] or 0:>10.1f}", flush=True)
+
+
+def commit_actual() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-sucio" if sucio else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de estadísticas")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--duracion", type=float, default=10, help="segundos por ruta")
+    parser.add_argument("--calentamiento", type=float, default=1, help="segundos sin medir antes de cada ruta")
+    parser.add_argument("--concurrencia", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--fases", default=",".join(FASES))
+    parser.add_argument("--filtro", default="", help="solo las rutas que contengan este texto")
+    parser.add_argument("--jobs", action="store_true", help="mide también los jobs de sincronización")
+    parser.add_argument("--repeticiones-jobs", type=int, default=3)
+    parser.add_argument("--arranque", type=int, default=0, help="veces que se arranca la API para medir su arranque")
+    parser.add_argument("--timeout-arranque", type=float, default=60, help="segundos máximos de cada arranque")
+    parser.add_argument("--presupuesto-arranque-ms", type=float, default=0,
+                        help="p95 máximo hasta /health/live (0 = sin presupuesto)")
+    parser.add_argument("--contenidos", type=int, default=100_000)
+    parser.add_argument("--artistas", type=int, default=10_000)
+    parser.add_argument("--comunidades", type=int, default=5_000)
+    parser.add_argument("--usuarios", type=int, default=50_000)
+    parser.add_argument("--salida", default=os.path.join("benchmarks", "resultados"))
+    return parser.parse_args()
+
+
+def main():
+    args = argumentos()
+    fases = [f for f in args.fases.split(",") if f]
+    seleccionados = [e for e in escenarios() if e.fase in fases and args.filtro in e.nombre]
+
+    print(f"{'':62}{'peticiones':>8}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    # Primero el arranque, sin la carga de las rutas en la misma máquina
+    arranque = medir_arranque(args.arranque, args.timeout_arranque) if args.arranque else {}
+    endpoints, sin_escenario = asyncio.run(medir_endpoints(args, seleccionados)) if seleccionados else ({}, [])
+    jobs = medir_jobs(args.repeticiones_jobs) if args.jobs else {}
+
+    if sin_escenario:
+        print("Rutas de la API sin escenario:", ", ".join(sin_escenario))
+
+    commit = commit_actual()
+    resultado = {
+        "commit": commit,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {k: v for k, v in vars(args).items() if k != "salida"},
+        "endpoints": endpoints,
+        "jobs": jobs,
+        "arranque": arranque,
+        "rutasSinEscenario": sin_escenario,
+    }
+    os.makedirs(args.salida, exist_ok=True)
+    fichero = os.path.join(args.salida, f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json")
+    with open(fichero, "wb") as f:
+        f.write(orjson.dumps(resultado, option=orjson.OPT_INDENT_2))
+    print(f"Resultados en {fichero}")
+
+    fallido = any(r["errores"] for r in (*endpoints.values(), *arranque.values()))
+    if arranque and args.presupuesto_arranque_ms:
+        p95 = arranque["hasta /health/live"]["p95"]
+        if p95 is None or p95 > args.presupuesto_arranque_ms:
+            print(f"Arranque fuera de presupuesto: p95 {p95} ms > {args.presupuesto_arranque_ms:.0f} ms")
+            fallido = True
+    if fallido:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compara dos resultados de benchmarks.carga (por ejemplo, de dos commits) ruta a ruta, job
+a job y el arranque: p50, p95, p99 y peticiones por segundo, con la variación en %.
+
+Marca como regresión lo que empeore más de --umbral % en p95 o en req/s, y en ese caso
+termina con código 1 (para usarlo en CI).
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.comparar antes.json despues.json [--umbral 10]
+"""
+import argparse
+import sys
+import orjson
+
+
+def variacion(antes, despues) -> float | None:
+    if not antes or despues is None:
+        return None
+    return (despues - antes) / antes * 100
+
+
+def formatear(v: float | None) -> str:
+    return f"{v:+.0f}%" if v is not None else "-"
+
+
+def comparar_seccion(titulo: str, antes: dict, despues: dict, umbral: float) -> list[str]:
+    """Imprime la tabla de una sección (endpoints o jobs) y devuelve las regresiones."""
+    nombres = [n for n in despues if n in antes]
+    if not nombres:
+        return []
+
+    print(f"\n{titulo}")
+    print(f"{'':62}{'p50 ms':>16}{'p95 ms':>16}{'p99 ms':>16}{'req/s':>18}")
+    regresiones = []
+    for nombre in nombres:
+        a, d = antes[nombre], despues[nombre]
+        columnas = ""
+        for metrica in ("p50", "p95", "p99"):
+            columnas += f"{d[metrica] or 0:>9.1f} {formatear(variacion(a[metrica], d[metrica])):>6}"
+        columnas += f"{d['rps'] or 0:>11.1f} {formatear(variacion(a['rps'], d['rps'])):>6}"
+
+        peor_p95 = variacion(a["p95"], d["p95"])
+        peor_rps = variacion(a["rps"], d["rps"])
+        regresion = (peor_p95 is not None and peor_p95 > umbral) or (peor_rps is not None and -peor_rps > umbral)
+        if regresion:
+            regresiones.append(nombre)
+        print(f"{('! ' if regresion else '  ') + nombre[:60]:62}{columnas}")
+
+    solo_antes = [n for n in antes if n not in despues]
+    solo_despues = [n for n in despues if n not in antes]
+    if solo_antes:
+        print("  Solo en el primero:", ", ".join(solo_antes))
+    if solo_despues:
+        print("  Solo en el segundo:", ", ".join(solo_despues))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks.carga")
+    parser.add_argument("antes")
+    parser.add_argument("despues")
+    parser.add_argument("--umbral", type=float, default=10, help="% de empeoramiento que cuenta como regresión")
+    args = parser.parse_args()
+
+    with open(args.antes, "rb") as f:
+        antes = orjson.loads(f.read())
+    with open(args.despues, "rb") as f:
+        despues = orjson.loads(f.read())
+
+    print(f"{antes['commit']} ({antes['fecha']})  ->  {despues['commit']} ({despues['fecha']})")
+    if antes["parametros"] != despues["parametros"]:
+        distintos = [k for k in despues["parametros"] if antes["parametros"].get(k) != despues["parametros"][k]]
+        print(f"Aviso: parámetros distintos ({', '.join(distintos)})")
+
+    regresiones = comparar_seccion("Rutas", antes["endpoints"], despues["endpoints"], args.umbral)
+    regresiones += comparar_seccion("Jobs", antes.get("jobs", {}), despues.get("jobs", {}), args.umbral)
+    regresiones += comparar_seccion("Arranque", antes.get("arranque", {}), despues.get("arranque", {}), args.umbral)
+
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones de más del {args.umbral:.0f}%")
+        sys.exit(1)
+    print("\nSin regresiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Rellena la base de datos (la de DATABASE_URL / credentials.json) con volúmenes de prueba
+para los benchmarks de carga:
+
+  - artistasmensual, contenidosmensual y comunidadesmensual, con ids 1..N
+  - historialreproducciones y busquedasartistas repartidas en los últimos `meses` meses,
+    con popularidad sesgada (pocos contenidos y artistas concentran la mayoría)
+  - busquedasartistasmensual y reproduccionesusuario recalculados a partir de los logs sembrados
+
+Los ids coinciden con los que sirve benchmarks/stubMicroservicios.py, así que las
+sincronizaciones del benchmark actualizan las mismas filas.
+
+VACÍA esas tablas (y huellassincronizacion) antes de sembrar: hay que pasar --confirmar.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.semilla --confirmar [--reproducciones 2000000] [--busquedas 1000000]
+        [--contenidos 100000] [--artistas 10000] [--comunidades 5000] [--usuarios 50000] [--meses 1]
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from sqlalchemy import text
+from backend.model.dao.postgresql.posgresConnector import PostgreSQLConnector
+from backend.model.dao.postgresql.migrador import aplicar_migraciones
+from backend.model.model import Model
+
+TABLAS = (
+    "historialreproducciones", "busquedasartistas", "busquedasartistasmensual", "reproduccionesmensual",
+    "reproduccionesusuario", "artistasmensual", "contenidosmensual", "comunidadesmensual", "huellassincronizacion",
+)
+
+# Filas por INSERT ... SELECT de los logs (una transacción cada una)
+TROZO = 500_000
+
+GENEROS = ["Pop", "Rock", "Jazz", "Electrónica", "Hip Hop", "Clásica", "Reggaeton", "Indie", "Desconocido"]
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description="Siembra la BD con datos para los benchmarks")
+    parser.add_argument("--reproducciones", type=int, default=2_000_000)
+    parser.add_argument("--busquedas", type=int, default=1_000_000)
+    parser.add_argument("--contenidos", type=int, default=100_000)
+    parser.add_argument("--artistas", type=int, default=10_000)
+    parser.add_argument("--comunidades", type=int, default=5_000)
+    parser.add_argument("--usuarios", type=int, default=50_000)
+    parser.add_argument("--meses", type=int, default=1, help="meses (hasta el actual) por los que se reparten los logs")
+    parser.add_argument("--confirmar", action="store_true", help="vacía las tablas antes de sembrar")
+    return parser.parse_args()
+
+
+def inicio_de_mes(hace_meses: int) -> date:
+    hoy = date.today()
+    total = hoy.year * 12 + hoy.month - 1 - hace_meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def paso(nombre: str):
+    """Decorador para medir y anunciar cada paso de la siembra."""
+    def decorador(funcion):
+        def envoltura(*args, **kwargs):
+            print(f"- {nombre}...", end=" ", flush=True)
+            inicio = time.perf_counter()
+            resultado = funcion(*args, **kwargs)
+            print(f"{time.perf_counter() - inicio:.1f} s")
+            return resultado
+        return envoltura
+    return decorador
+
+
+@paso("Vaciando tablas")
+def vaciar(engine):
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(TABLAS)}"))
+
+
+@paso("Creando particiones")
+def crear_particiones(engine, meses: int):
+    with Model() as model:
+        model.mantener_particiones()
+    with engine.begin() as conn:
+        for hace in range(meses):
+            mes = inicio_de_mes(hace)
+            conn.execute(text("SELECT crear_particion_mensual('historialreproducciones', 'fecha_reproduccion', :mes)"), {"mes": mes})
+            conn.execute(text("SELECT crear_particion_mensual('busquedasartistas', 'fecha', :mes)"), {"mes": mes})
+
+
+@paso("Sembrando tablas mensuales")
+def sembrar_mensuales(engine, args):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO artistasmensual (idartista, numoyentes, valoracionmedia)
+            SELECT i, (random() * 1000000)::bigint, (random() * 5)::bigint
+            FROM generate_series(1, :n) AS i
+        """), {"n": args.artistas})
+        conn.execute(text("""
+            INSERT INTO contenidosmensual (idcontenido, esalbum, sumavaloraciones, numcomentarios, numventas, genero, esnovedad)
+            SELECT i, i % 5 = 0, round((random() * 5)::numeric, 1), (random() * 500)::int,
+                   (random() * 100000)::bigint, (:generos)[1 + i % :num_generos], i % 20 = 0
+            FROM generate_series(1, :n) AS i
+        """), {"n": args.contenidos, "generos": GENEROS, "num_generos": len(GENEROS)})
+        conn.execute(text("""
+            INSERT INTO comunidadesmensual (idcomunidad, numpublicaciones, nummiembros)
+            SELECT i, (random() * 10000)::bigint, (random() * 100000)::bigint
+            FROM generate_series(1, :n) AS i
+        """), {"n": args.comunidades})
+
+
+def sembrar_log(engine, sql, total: int, params: dict):
+    hecho = 0
+    while hecho < total:
+        n = min(TROZO, total - hecho)
+        with engine.begin() as conn:
+            conn.execute(text(sql), {**params, "n": n})
+        hecho += n
+        print(f"{hecho}", end=" ", flush=True)
+
+
+@paso("Sembrando reproducciones")
+def sembrar_reproducciones(engine, args, desde: date):
+    # power(random(), 3): unos pocos contenidos y usuarios acumulan la mayoría de reproducciones
+    sembrar_log(engine, """
+        INSERT INTO historialreproducciones (id_usuario, id_contenido, fecha_reproduccion, segundos_reproducidos)
+        SELECT 1 + floor(power(random(), 2) * :usuarios)::int,
+               1 + floor(power(random(), 3) * :contenidos)::int,
+               :desde + random() * (now() - :desde),
+               (random() * 300)::int
+        FROM generate_series(1, :n)
+    """, args.reproducciones, {"usuarios": args.usuarios, "contenidos": args.contenidos, "desde": desde})
+
+
+@paso("Sembrando búsquedas")
+def sembrar_busquedas(engine, args, desde: date):
+    sembrar_log(engine, """
+        INSERT INTO busquedasartistas (idartista, idusuario, fecha)
+        SELECT 1 + floor(power(random(), 3) * :artistas)::int,
+               1 + floor(random() * :usuarios)::int,
+               :desde + random() * (now() - :desde)
+        FROM generate_series(1, :n)
+    """, args.busquedas, {"usuarios": args.usuarios, "artistas": args.artistas, "desde": desde})
+
+
+@paso("Recalculando contadores de búsquedas y reproducciones")
+def recalcular_contadores(engine):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO busquedasartistasmensual (mes, idartista, numbusquedas)
+            SELECT date_trunc('month', fecha)::date, idartista, COUNT(*)
+            FROM busquedasartistas
+            GROUP BY 1, 2
+        """))
+        conn.execute(text("""
+            INSERT INTO reproduccionesusuario (id_usuario, id_contenido, numreproducciones, segundostotales, ultimareproduccion)
+            SELECT id_usuario, id_contenido, COUNT(*), COALESCE(SUM(segundos_reproducidos), 0), MAX(fecha_reproduccion)
+            FROM historialreproducciones
+            GROUP BY 1, 2
+        """))
+
+
+@paso("ANALYZE")
+def analizar(engine):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def main():
+    args = argumentos()
+    if not args.confirmar:
+        print(f"Esto vacía {', '.join(TABLAS)}. Vuelve a lanzarlo con --confirmar.")
+        sys.exit(1)
+
+    aplicar_migraciones()
+    engine = PostgreSQLConnector().engine
+    desde = inicio_de_mes(args.meses - 1)
+
+    inicio = time.perf_counter()
+    vaciar(engine)
+    crear_particiones(engine, args.meses)
+    sembrar_mensuales(engine, args)
+    sembrar_reproducciones(engine, args, desde)
+    sembrar_busquedas(engine, args, desde)
+    recalcular_contadores(engine)
+    analizar(engine)
+    print(f"Siembra completa en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
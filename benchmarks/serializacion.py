@@ -0,0 +1,115 @@
+"""
+Microbenchmark de serialización de listados: filas de BD -> JSON de la respuesta.
+
+  antes: fila -> DTO con __dict__ -> to_dict() -> jsonable_encoder -> JSONResponse (json.dumps)
+  ahora: fila -> DTO con __slots__ -> RespuestaJSON (orjson, sin dicts intermedios)
+
+Comprueba además que los bytes de ambas respuestas son idénticos.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.serializacion [filas] [repeticiones]
+"""
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from backend.controller.respuestaJson import RespuestaJSON
+from backend.model.dao.postgresql.collection.postgresContenidoDAO import PostgresContenidoDAO
+
+# Lo que devuelve fetchall(): filas con acceso por atributo
+Fila = namedtuple("Fila", "idcontenido numventas esalbum sumavaloraciones numcomentarios genero esnovedad")
+
+
+class ContenidoDTOAntes:
+    """ContenidoDTO tal y como era antes (instancias con __dict__)."""
+    def __init__(self, idcontenido, numventas=0, esalbum=False, sumavaloraciones=0,
+                 numcomentarios=0, genero=None, esnovedad=False):
+        self.idContenido = idcontenido
+        self.numVentas = numventas
+        self.esAlbum = esalbum
+        self.sumaValoraciones = sumavaloraciones
+        self.numComentarios = numcomentarios
+        self.genero = genero
+        self.esNovedad = esnovedad
+
+    def to_dict(self):
+        return {
+            "idContenido": self.idContenido,
+            "numVentas": self.numVentas,
+            "esAlbum": self.esAlbum,
+            "sumaValoraciones": self.sumaValoraciones,
+            "numComentarios": self.numComentarios,
+            "genero": self.genero,
+            "esNovedad": self.esNovedad
+        }
+
+
+def generar_filas(n: int) -> list:
+    generos = ["Pop", "Rock", "Jazz", "Electrónica", "Desconocido", None]
+    return [
+        Fila(i, i * 7 % 5000, i % 3 == 0, (i % 50) / 10, i % 200, generos[i % len(generos)], i % 11 == 0)
+        for i in range(1, n + 1)
+    ]
+
+
+def ruta_antes(filas) -> bytes:
+    dtos = [
+        ContenidoDTOAntes(
+            idcontenido=f.idcontenido, numventas=int(f.numventas or 0), esalbum=f.esalbum,
+            sumavaloraciones=float(f.sumavaloraciones or 0), numcomentarios=int(f.numcomentarios or 0),
+            genero=f.genero, esnovedad=f.esnovedad
+        )
+        for f in filas
+    ]
+    datos = [dto.to_dict() for dto in dtos]
+    return JSONResponse(jsonable_encoder({"status": "success", "count": len(datos), "data": datos})).body
+
+
+def ruta_ahora(filas) -> bytes:
+    dao = PostgresContenidoDAO(None)
+    dtos = [dao._map_row_to_dto(f) for f in filas]
+    return RespuestaJSON({"status": "success", "count": len(dtos), "data": dtos}).body
+
+
+def medir(funcion, filas, repeticiones: int) -> float:
+    """Mejor tiempo (ms) de `repeticiones` ejecuciones."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(filas)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def memoria_pico(funcion, filas) -> int:
+    tracemalloc.start()
+    funcion(filas)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    filas = generar_filas(n)
+
+    antes, ahora = ruta_antes(filas), ruta_ahora(filas)
+    if antes != ahora:
+        print("❌ Las respuestas no son idénticas")
+        sys.exit(1)
+    print(f"✅ Respuestas idénticas ({len(ahora)} bytes para {n} filas)")
+
+    t_antes, t_ahora = medir(ruta_antes, filas, repeticiones), medir(ruta_ahora, filas, repeticiones)
+    m_antes, m_ahora = memoria_pico(ruta_antes, filas), memoria_pico(ruta_ahora, filas)
+
+    print(f"{'':8}{'ms':>10}{'ms/10k filas':>15}{'pico memoria':>16}")
+    for nombre, t, m in (("antes", t_antes, m_antes), ("ahora", t_ahora, m_ahora)):
+        print(f"{nombre:8}{t:10.2f}{t * 10_000 / n:15.2f}{m / 1024 / 1024:13.2f} MB")
+    print(f"Mejora: x{t_antes / t_ahora:.1f} en tiempo, x{m_antes / m_ahora:.1f} en memoria")
+
+
+if __name__ == "__main__":
+    main()
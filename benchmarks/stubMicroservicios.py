@@ -0,0 +1,141 @@
+"""
+Stub local de los tres microservicios externos (Usuarios, Contenido y Comunidad) para los
+benchmarks. Sirve en un solo puerto las rutas que usa la API, con datos deterministas por id
+y los mismos volúmenes que benchmarks/semilla.py:
+
+  GET /api/usuarios/artistas            listado completo (con oyentes y valoración)
+  GET /api/usuarios/artistas/{id}
+  GET /api/elementos                    listado de ids de contenidos
+  GET /api/elementos/{id}
+  GET /api/usuarioValoraElem/{id}       valoraciones (con y sin comentario)
+  GET /comunidad/                       listado completo, con ETag (responde 304 si no cambia)
+
+Es una app Starlette sobre uvicorn (un solo event loop), para que el stub no sea el cuello
+de botella de las sincronizaciones. `--latencia-ms` añade una espera a cada respuesta
+para simular la red.
+
+La API se apunta al stub con:
+    MS_USUARIOS_BASE_URL=http://127.0.0.1:9911
+    MS_CONTENIDO_BASE_URL=http://127.0.0.1:9911/api
+    MS_COMUNIDAD_BASE_URL=http://127.0.0.1:9911
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.stubMicroservicios [--puerto 9911] [--contenidos 100000] [--artistas 10000]
+        [--comunidades 5000] [--latencia-ms 0]
+"""
+import argparse
+import asyncio
+import threading
+import time
+import orjson
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+GENEROS = ["Pop", "Rock", "Jazz", "Electrónica", "Hip Hop", "Clásica", "Reggaeton", "Indie"]
+
+ETAG_COMUNIDADES = '"bench-v1"'
+
+
+def artista(i: int) -> dict:
+    return {"id": i, "oyentes": i * 37 % 1_000_000, "valoracion": i % 6}
+
+def elemento(i: int) -> dict:
+    return {
+        "id": i,
+        "numventas": i * 13 % 100_000,
+        "esalbum": i % 5 == 0,
+        "valoracion": (i % 50) / 10,
+        "genero": {"nombre": GENEROS[i % len(GENEROS)]},
+        "esnovedad": i % 20 == 0
+    }
+
+def valoraciones(i: int) -> list:
+    return [{"comentario": "Muy bueno" if j % 2 else ""} for j in range(i % 7)]
+
+def comunidad(i: int) -> dict:
+    return {"idComunidad": str(i), "numPublicaciones": i * 7 % 10_000, "numUsuarios": i * 11 % 100_000}
+
+
+def respuesta_json(cuerpo: bytes, status_code: int = 200, headers: dict | None = None) -> Response:
+    return Response(cuerpo, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def crear_app(contenidos: int, artistas: int, comunidades: int, latencia_ms: float = 0) -> Starlette:
+    """App del stub. Los listados se serializan una sola vez al crearla."""
+    latencia = latencia_ms / 1000
+    listado_artistas = orjson.dumps([artista(i) for i in range(1, artistas + 1)])
+    listado_elementos = orjson.dumps([{"id": i} for i in range(1, contenidos + 1)])
+    listado_comunidades = orjson.dumps([comunidad(i) for i in range(1, comunidades + 1)])
+    no_encontrado = orjson.dumps({"detail": "No encontrado"})
+
+    def listado(cuerpo: bytes):
+        async def responder(request):
+            if latencia:
+                await asyncio.sleep(latencia)
+            return respuesta_json(cuerpo)
+        return responder
+
+    def por_id(generador, limite: int):
+        async def responder(request):
+            if latencia:
+                await asyncio.sleep(latencia)
+            i = request.path_params["id"]
+            if not 1 <= i <= limite:
+                return respuesta_json(no_encontrado, 404)
+            return respuesta_json(orjson.dumps(generador(i)))
+        return responder
+
+    async def listado_comunidad(request):
+        if latencia:
+            await asyncio.sleep(latencia)
+        if request.headers.get("if-none-match") == ETAG_COMUNIDADES:
+            return Response(status_code=304, headers={"ETag": ETAG_COMUNIDADES})
+        return respuesta_json(listado_comunidades, headers={"ETag": ETAG_COMUNIDADES})
+
+    return Starlette(routes=[
+        Route("/api/usuarios/artistas", listado(listado_artistas)),
+        Route("/api/usuarios/artistas/{id:int}", por_id(artista, artistas)),
+        Route("/api/elementos", listado(listado_elementos)),
+        Route("/api/elementos/{id:int}", por_id(elemento, contenidos)),
+        Route("/api/usuarioValoraElem/{id:int}", por_id(valoraciones, contenidos)),
+        Route("/comunidad/", listado_comunidad),
+        Route("/comunidad", listado_comunidad),
+    ])
+
+
+def configuracion(puerto: int, contenidos: int, artistas: int, comunidades: int,
+                  latencia_ms: float = 0) -> uvicorn.Config:
+    return uvicorn.Config(
+        crear_app(contenidos, artistas, comunidades, latencia_ms),
+        host="127.0.0.1", port=puerto, log_level="warning", access_log=False
+    )
+
+
+def arrancar_stub(puerto: int, contenidos: int, artistas: int, comunidades: int,
+                  latencia_ms: float = 0) -> uvicorn.Server:
+    """Arranca el stub en un hilo (para usarlo desde otro script). Se para con `.should_exit = True`."""
+    servidor = uvicorn.Server(configuracion(puerto, contenidos, artistas, comunidades, latencia_ms))
+    threading.Thread(target=servidor.run, daemon=True).start()
+    while not servidor.started:
+        time.sleep(0.05)
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub de los microservicios externos")
+    parser.add_argument("--puerto", type=int, default=9911)
+    parser.add_argument("--contenidos", type=int, default=100_000)
+    parser.add_argument("--artistas", type=int, default=10_000)
+    parser.add_argument("--comunidades", type=int, default=5_000)
+    parser.add_argument("--latencia-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    print(f"Stub de microservicios en http://127.0.0.1:{args.puerto}", flush=True)
+    uvicorn.Server(configuracion(args.puerto, args.contenidos, args.artistas, args.comunidades,
+                                 args.latencia_ms)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Configuración del servidor de producción (la usa el Dockerfile):
+
+    gunicorn -c gunicorn.conf.py backend.controller.fastapi:app
+
+Arranca WEB_WORKERS procesos con UvicornWorker (por defecto, uno por núcleo). Cada worker
+crea su propio engine y pool de conexiones después del fork; con DB_MAX_CONEXIONES el
+total se reparte entre los workers (ver tamano_pool en posgresConnector.py).
+Con más de un worker la caché de rankings tiene que ser redis o ninguna (la de memoria es
+de cada worker y no se entera de lo que escriben los demás); sin CACHE_BACKEND se usa ninguna.
+Los índices de rankings en memoria sí valen: comprueban la versión de cada tabla en la BD.
+El spool de reproducciones también: cada worker tiene su carpeta y solo reenvía las de workers muertos.
+Para desarrollo sigue valiendo `uvicorn ... --reload` (docker-compose.yml).
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_WORKERS", "0")) or multiprocessing.cpu_count()
+worker_class = "uvicorn_worker.UvicornWorker"
+
+if workers > 1 and os.getenv("CACHE_BACKEND", "").lower() == "memoria":
+    raise RuntimeError(
+        f"CACHE_BACKEND=memoria no es válido con {workers} workers: cada uno tendría su propia caché "
+        "y no vería las invalidaciones de los demás. Usa CACHE_BACKEND=redis, ninguna o WEB_WORKERS=1."
+    )
+
+# Con preload la app se importa una vez en el proceso maestro y los workers la heredan
+# (arrancan antes y comparten memoria). Las conexiones y los hilos se crean en cada worker.
+preload_app = os.getenv("WEB_PRELOAD", "true").lower() == "true"
+
+# Segundos que se espera a un worker al pararlo: termina las peticiones, vacía los buffers
+# y, si es el líder del scheduler, espera al job en curso
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Los workers leen cuántos son para repartirse DB_MAX_CONEXIONES
+os.environ["WEB_WORKERS"] = str(workers)
+
+# Métricas de Prometheus en modo multiproceso: /metrics junta las de todos los workers.
+# Tiene que existir antes de importar la app (con preload se importa antes de on_starting),
+# y se vacía para no mezclar métricas de una ejecución anterior.
+_directorio_metricas = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "metricas_estadisticas")
+)
+shutil.rmtree(_directorio_metricas, ignore_errors=True)
+os.makedirs(_directorio_metricas, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
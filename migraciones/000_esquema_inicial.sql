@@ -1,20 +1,8 @@
---
--- PostgreSQL database dump clean + Nueva tabla historialreproducciones
---
-
-SET statement_timeout = 0;
-SET lock_timeout = 0;
-SET idle_in_transaction_session_timeout = 0;
-SET client_encoding = 'UTF8';
-SET standard_conforming_strings = on;
-SELECT pg_catalog.set_config('search_path', '', false);
-SET check_function_bodies = false;
-SET xmloption = content;
-SET client_min_messages = warning;
-SET row_security = off;
-
-SET default_tablespace = '';
-SET default_table_access_method = heap;
+-- ============================================================
+-- 000: Esquema inicial (antes init.sql)
+-- ============================================================
+-- En una base de datos que ya se creó con init.sql no se ejecuta:
+-- el migrador la marca como aplicada al ver que las tablas ya existen.
 
 -- ============================================================
 -- 1. Tabla: artistasmensual
@@ -113,5 +101,3 @@ ALTER TABLE ONLY public.comunidadesmensual
 
 ALTER TABLE ONLY public.contenidosmensual
     ADD CONSTRAINT contenidosmensual_pkey PRIMARY KEY (idcontenido);
-
-
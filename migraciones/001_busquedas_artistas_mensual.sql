@@ -0,0 +1,29 @@
+-- ============================================================
+-- 001: Contador mensual de búsquedas por artista
+-- ============================================================
+-- GET /estadisticas/artistas/top lee este contador en lugar de hacer
+-- COUNT(*) ... GROUP BY sobre todo el log del mes. Se mantiene al escribir
+-- las búsquedas (misma transacción que el INSERT en busquedasartistas).
+--
+-- Es idempotente: el backfill recalcula los contadores a partir del log.
+
+CREATE TABLE IF NOT EXISTS public.busquedasartistasmensual (
+    mes date NOT NULL,
+    idartista integer NOT NULL,
+    numbusquedas bigint DEFAULT 0 NOT NULL,
+    CONSTRAINT busquedasartistasmensual_pkey PRIMARY KEY (mes, idartista)
+);
+
+ALTER TABLE public.busquedasartistasmensual OWNER TO postgres;
+
+-- Top del mes: recorre el índice de ese mes de mayor a menor y para en 'limit'
+CREATE INDEX IF NOT EXISTS busquedasartistasmensual_mes_num_idx
+    ON public.busquedasartistasmensual (mes, numbusquedas DESC);
+
+-- Backfill desde el log existente
+INSERT INTO public.busquedasartistasmensual (mes, idartista, numbusquedas)
+SELECT DATE_TRUNC('month', fecha)::date, idartista, COUNT(*)
+FROM public.busquedasartistas
+WHERE fecha IS NOT NULL
+GROUP BY 1, 2
+ON CONFLICT (mes, idartista) DO UPDATE SET numbusquedas = EXCLUDED.numbusquedas;
@@ -0,0 +1,139 @@
+-- ============================================================
+-- 002: Logs particionados por mes e indexados
+-- ============================================================
+-- busquedasartistas e historialreproducciones pasan a ser tablas
+-- particionadas por rango mensual de fecha. Así el reseteo mensual puede
+-- soltar la partición del mes cerrado en lugar de hacer DELETE/TRUNCATE.
+--
+-- - La clave primaria pasa a ser (id, fecha): en una tabla particionada
+--   tiene que incluir la columna de partición. Los IDs siguen saliendo
+--   de la misma secuencia.
+-- - La fecha pasa a ser NOT NULL (las búsquedas sin fecha toman la de la migración).
+-- - Se crea una partición por cada mes con datos, más el actual y los dos
+--   siguientes; la app crea las de los meses futuros (crear_particion_mensual).
+-- - Lo que caiga fuera de las particiones va a la partición DEFAULT.
+
+-- ------------------------------------------------------------
+-- Función para crear la partición de un mes (idempotente)
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.crear_particion_mensual(tabla text, columna text, mes date)
+RETURNS text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inicio date := date_trunc('month', mes)::date;
+    fin date := (date_trunc('month', mes) + interval '1 month')::date;
+    nombre text := format('%s_p%s', tabla, to_char(inicio, 'YYYY_MM'));
+    por_defecto text := tabla || '_default';
+    hay_filas boolean := false;
+BEGIN
+    IF to_regclass('public.' || nombre) IS NOT NULL THEN
+        RETURN nombre;
+    END IF;
+
+    IF to_regclass('public.' || por_defecto) IS NOT NULL THEN
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM public.%I WHERE %I >= %L AND %I < %L)',
+                       por_defecto, columna, inicio, columna, fin)
+        INTO hay_filas;
+    END IF;
+
+    IF NOT hay_filas THEN
+        EXECUTE format('CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                       nombre, tabla, inicio, fin);
+    ELSE
+        -- Hay filas de ese mes en la partición DEFAULT: se mueven antes de enganchar la nueva
+        EXECUTE format('LOCK TABLE public.%I IN ACCESS EXCLUSIVE MODE', por_defecto);
+        EXECUTE format('CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS)', nombre, tabla);
+        EXECUTE format('WITH movidas AS (DELETE FROM public.%I WHERE %I >= %L AND %I < %L RETURNING *) '
+                       'INSERT INTO public.%I SELECT * FROM movidas',
+                       por_defecto, columna, inicio, columna, fin, nombre);
+        EXECUTE format('ALTER TABLE public.%I ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+                       tabla, nombre, inicio, fin);
+    END IF;
+
+    RETURN nombre;
+END;
+$$;
+
+ALTER FUNCTION public.crear_particion_mensual(text, text, date) OWNER TO postgres;
+
+-- ------------------------------------------------------------
+-- busquedasartistas
+-- ------------------------------------------------------------
+ALTER TABLE public.busquedasartistas RENAME TO busquedasartistas_antigua;
+ALTER TABLE public.busquedasartistas_antigua RENAME CONSTRAINT busquedasartistas_pkey TO busquedasartistas_antigua_pkey;
+
+CREATE TABLE public.busquedasartistas (
+    id integer DEFAULT nextval('public.busquedasartistas_id_seq'::regclass) NOT NULL,
+    idartista integer NOT NULL,
+    idusuario integer,
+    fecha timestamp without time zone DEFAULT now() NOT NULL,
+    CONSTRAINT busquedasartistas_pkey PRIMARY KEY (id, fecha)
+) PARTITION BY RANGE (fecha);
+
+ALTER TABLE public.busquedasartistas OWNER TO postgres;
+
+CREATE TABLE public.busquedasartistas_default PARTITION OF public.busquedasartistas DEFAULT;
+
+-- Top por fecha, borrado por usuario y borrado por artista
+CREATE INDEX busquedasartistas_fecha_artista_idx ON public.busquedasartistas (fecha, idartista);
+CREATE INDEX busquedasartistas_usuario_idx ON public.busquedasartistas (idusuario);
+CREATE INDEX busquedasartistas_artista_idx ON public.busquedasartistas (idartista);
+
+SELECT public.crear_particion_mensual('busquedasartistas', 'fecha', m::date)
+FROM generate_series(
+    date_trunc('month', LEAST(COALESCE((SELECT MIN(fecha) FROM public.busquedasartistas_antigua), now()), now())),
+    date_trunc('month', now()) + interval '2 months',
+    interval '1 month'
+) AS m;
+
+INSERT INTO public.busquedasartistas (id, idartista, idusuario, fecha)
+SELECT id, idartista, idusuario, COALESCE(fecha, now())
+FROM public.busquedasartistas_antigua;
+
+ALTER SEQUENCE public.busquedasartistas_id_seq OWNED BY public.busquedasartistas.id;
+DROP TABLE public.busquedasartistas_antigua;
+
+-- Las búsquedas que no tenían fecha ahora cuentan en el mes actual
+INSERT INTO public.busquedasartistasmensual (mes, idartista, numbusquedas)
+SELECT DATE_TRUNC('month', fecha)::date, idartista, COUNT(*)
+FROM public.busquedasartistas
+GROUP BY 1, 2
+ON CONFLICT (mes, idartista) DO UPDATE SET numbusquedas = EXCLUDED.numbusquedas;
+
+-- ------------------------------------------------------------
+-- historialreproducciones
+-- ------------------------------------------------------------
+ALTER TABLE public.historialreproducciones RENAME TO historialreproducciones_antigua;
+ALTER TABLE public.historialreproducciones_antigua RENAME CONSTRAINT historialreproducciones_pkey TO historialreproducciones_antigua_pkey;
+
+CREATE TABLE public.historialreproducciones (
+    id integer DEFAULT nextval('public.historialreproducciones_id_seq'::regclass) NOT NULL,
+    id_usuario integer NOT NULL,
+    id_contenido integer NOT NULL,
+    fecha_reproduccion timestamp without time zone DEFAULT now() NOT NULL,
+    segundos_reproducidos integer DEFAULT 0,
+    CONSTRAINT historialreproducciones_pkey PRIMARY KEY (id, fecha_reproduccion)
+) PARTITION BY RANGE (fecha_reproduccion);
+
+ALTER TABLE public.historialreproducciones OWNER TO postgres;
+
+CREATE TABLE public.historialreproducciones_default PARTITION OF public.historialreproducciones DEFAULT;
+
+-- Historial personal (más recientes primero) y top de canciones por usuario
+CREATE INDEX historialreproducciones_usuario_fecha_idx ON public.historialreproducciones (id_usuario, fecha_reproduccion DESC);
+CREATE INDEX historialreproducciones_usuario_contenido_idx ON public.historialreproducciones (id_usuario, id_contenido);
+
+SELECT public.crear_particion_mensual('historialreproducciones', 'fecha_reproduccion', m::date)
+FROM generate_series(
+    date_trunc('month', LEAST(COALESCE((SELECT MIN(fecha_reproduccion) FROM public.historialreproducciones_antigua), now()), now())),
+    date_trunc('month', now()) + interval '2 months',
+    interval '1 month'
+) AS m;
+
+INSERT INTO public.historialreproducciones (id, id_usuario, id_contenido, fecha_reproduccion, segundos_reproducidos)
+SELECT id, id_usuario, id_contenido, COALESCE(fecha_reproduccion, now()), segundos_reproducidos
+FROM public.historialreproducciones_antigua;
+
+ALTER SEQUENCE public.historialreproducciones_id_seq OWNED BY public.historialreproducciones.id;
+DROP TABLE public.historialreproducciones_antigua;
@@ -0,0 +1,44 @@
+-- ============================================================
+-- 003: Resumen mensual de reproducciones y rollover por particiones
+-- ============================================================
+-- Al cerrar un mes, su partición de cada log se resume (reproduccionesmensual
+-- y busquedasartistasmensual) y después se suelta con
+-- DETACH PARTITION ... CONCURRENTLY + DROP, sin bloquear el mes en curso.
+--
+-- DETACH CONCURRENTLY no se permite si la tabla tiene partición DEFAULT, así
+-- que se eliminan: lo que hubiera en ellas pasa antes a su partición mensual.
+-- Las particiones de los meses siguientes las crea la app por adelantado.
+
+-- ------------------------------------------------------------
+-- Resumen de reproducciones por mes, usuario y contenido
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS public.reproduccionesmensual (
+    mes date NOT NULL,
+    id_usuario integer NOT NULL,
+    id_contenido integer NOT NULL,
+    numreproducciones bigint DEFAULT 0 NOT NULL,
+    segundostotales bigint DEFAULT 0 NOT NULL,
+    CONSTRAINT reproduccionesmensual_pkey PRIMARY KEY (mes, id_usuario, id_contenido)
+);
+
+ALTER TABLE public.reproduccionesmensual OWNER TO postgres;
+
+-- ------------------------------------------------------------
+-- Fuera particiones DEFAULT
+-- ------------------------------------------------------------
+DO $$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN SELECT DISTINCT date_trunc('month', fecha)::date AS mes FROM public.busquedasartistas_default LOOP
+        PERFORM public.crear_particion_mensual('busquedasartistas', 'fecha', r.mes);
+    END LOOP;
+
+    FOR r IN SELECT DISTINCT date_trunc('month', fecha_reproduccion)::date AS mes FROM public.historialreproducciones_default LOOP
+        PERFORM public.crear_particion_mensual('historialreproducciones', 'fecha_reproduccion', r.mes);
+    END LOOP;
+END;
+$$;
+
+DROP TABLE public.busquedasartistas_default;
+DROP TABLE public.historialreproducciones_default;
@@ -0,0 +1,19 @@
+-- ============================================================
+-- 004: Huellas de la última sincronización de cada entidad
+-- ============================================================
+-- La sincronización masiva en modo delta compara la huella (hash) de lo que
+-- devuelve el microservicio con la guardada aquí y solo escribe en
+-- artistasmensual / contenidosmensual las filas que han cambiado.
+--
+-- entidad: 'artistas' o 'contenidos'. Se actualiza en la misma transacción
+-- que la fila sincronizada y se borra al borrar la fila.
+
+CREATE TABLE IF NOT EXISTS public.huellassincronizacion (
+    entidad text NOT NULL,
+    id bigint NOT NULL,
+    huella text NOT NULL,
+    actualizado_en timestamp without time zone DEFAULT now() NOT NULL,
+    CONSTRAINT huellassincronizacion_pkey PRIMARY KEY (entidad, id)
+);
+
+ALTER TABLE public.huellassincronizacion OWNER TO postgres;
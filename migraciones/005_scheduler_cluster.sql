@@ -0,0 +1,44 @@
+-- ============================================================
+-- 005: Scheduler compartido entre instancias
+-- ============================================================
+-- Con varias instancias de la API (workers o réplicas) solo la que tiene el
+-- advisory lock del scheduler ejecuta los jobs (ver backend/controller/planificador.py).
+--
+-- apscheduler_jobs: almacén persistente de los jobs (SQLAlchemyJobStore de
+-- APScheduler). Guarda la próxima ejecución de cada job, así que un cambio de
+-- líder o un reinicio no la pierde y las ejecuciones que se saltaron se recuperan.
+-- Es el esquema que crearía APScheduler; se crea aquí para que quede versionado.
+--
+-- ejecucionesjobs: historial de ejecuciones de cada job (instancia que lo
+-- ejecutó, duración, estado y filas escritas).
+
+CREATE TABLE IF NOT EXISTS public.apscheduler_jobs (
+    id character varying(191) NOT NULL,
+    next_run_time double precision,
+    job_state bytea NOT NULL,
+    CONSTRAINT apscheduler_jobs_pkey PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_apscheduler_jobs_next_run_time
+    ON public.apscheduler_jobs (next_run_time);
+
+ALTER TABLE public.apscheduler_jobs OWNER TO postgres;
+
+
+CREATE TABLE IF NOT EXISTS public.ejecucionesjobs (
+    id bigserial NOT NULL,
+    job text NOT NULL,
+    instancia text NOT NULL,
+    inicio timestamp without time zone NOT NULL,
+    duracion_ms integer NOT NULL,
+    estado text NOT NULL,
+    filas bigint,
+    error text,
+    CONSTRAINT ejecucionesjobs_pkey PRIMARY KEY (id),
+    CONSTRAINT ejecucionesjobs_estado_check CHECK (estado IN ('ok', 'error'))
+);
+
+CREATE INDEX IF NOT EXISTS ejecucionesjobs_job_inicio_idx
+    ON public.ejecucionesjobs (job, inicio DESC);
+
+ALTER TABLE public.ejecucionesjobs OWNER TO postgres;
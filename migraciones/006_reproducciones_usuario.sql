@@ -0,0 +1,41 @@
+-- ============================================================
+-- 006: Acumulado de reproducciones por usuario y contenido
+-- ============================================================
+-- GET /estadisticas/reproducciones/top/usuario/{id} lee este acumulado en lugar
+-- de hacer COUNT(*) ... GROUP BY sobre todo el historial del usuario. Se
+-- mantiene al escribir las reproducciones (misma transacción que el COPY en
+-- historialreproducciones) y el rollover le resta cada mes que archiva, así
+-- que cubre lo mismo que historialreproducciones.
+--
+-- Es idempotente: el backfill recalcula el acumulado a partir del historial.
+
+CREATE TABLE IF NOT EXISTS public.reproduccionesusuario (
+    id_usuario integer NOT NULL,
+    id_contenido integer NOT NULL,
+    numreproducciones bigint DEFAULT 0 NOT NULL,
+    segundostotales bigint DEFAULT 0 NOT NULL,
+    ultimareproduccion timestamp without time zone NOT NULL,
+    CONSTRAINT reproduccionesusuario_pkey PRIMARY KEY (id_usuario, id_contenido)
+);
+
+ALTER TABLE public.reproduccionesusuario OWNER TO postgres;
+
+-- Top de un usuario (por veces o por segundos): recorre su tramo del índice
+-- de mayor a menor y para en 'limit'
+CREATE INDEX IF NOT EXISTS reproduccionesusuario_num_idx
+    ON public.reproduccionesusuario (id_usuario, numreproducciones DESC, id_contenido);
+CREATE INDEX IF NOT EXISTS reproduccionesusuario_segundos_idx
+    ON public.reproduccionesusuario (id_usuario, segundostotales DESC, id_contenido);
+
+-- Solo lo usaba el GROUP BY del top; ya no hace falta mantenerlo en cada COPY
+DROP INDEX IF EXISTS public.historialreproducciones_usuario_contenido_idx;
+
+-- Backfill desde el historial existente
+INSERT INTO public.reproduccionesusuario (id_usuario, id_contenido, numreproducciones, segundostotales, ultimareproduccion)
+SELECT id_usuario, id_contenido, COUNT(*), COALESCE(SUM(segundos_reproducidos), 0), MAX(fecha_reproduccion)
+FROM public.historialreproducciones
+GROUP BY 1, 2
+ON CONFLICT (id_usuario, id_contenido) DO UPDATE
+SET numreproducciones = EXCLUDED.numreproducciones,
+    segundostotales = EXCLUDED.segundostotales,
+    ultimareproduccion = EXCLUDED.ultimareproduccion;
@@ -0,0 +1,58 @@
+-- ============================================================
+-- 007: Versión de las tablas mensuales de los rankings
+-- ============================================================
+-- Cada proceso de la API tiene en memoria un índice de artistasmensual,
+-- contenidosmensual y comunidadesmensual (backend/model/ranking). Para saber
+-- si otro proceso (otro worker, el job de sincronización del líder, un
+-- script) ha escrito en la tabla, compara su versión con la de aquí.
+--
+-- Un trigger por sentencia sube la versión de la tabla una vez por cada
+-- transacción que la modifica, así que quien acaba de escribir sabe si solo
+-- ha escrito él: la versión tras su commit es la que tenía su índice + 1.
+-- La fila de cada tabla se bloquea hasta el commit de quien escribe, así que
+-- las escrituras en una misma tabla se confirman de una en una.
+
+CREATE TABLE IF NOT EXISTS public.versionesrankings (
+    tabla text NOT NULL,
+    version bigint DEFAULT 0 NOT NULL,
+    CONSTRAINT versionesrankings_pkey PRIMARY KEY (tabla)
+);
+
+ALTER TABLE public.versionesrankings OWNER TO postgres;
+
+INSERT INTO public.versionesrankings (tabla)
+VALUES ('artistasmensual'), ('contenidosmensual'), ('comunidadesmensual')
+ON CONFLICT (tabla) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.subir_version_ranking()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    marca text := 'rankings.escrita_' || TG_TABLE_NAME;
+BEGIN
+    -- Una vez por transacción (la marca es local a la transacción)
+    IF COALESCE(current_setting(marca, true), '') = '' THEN
+        UPDATE public.versionesrankings SET version = version + 1 WHERE tabla = TG_TABLE_NAME;
+        PERFORM set_config(marca, '1', true);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+ALTER FUNCTION public.subir_version_ranking() OWNER TO postgres;
+
+DROP TRIGGER IF EXISTS artistasmensual_version ON public.artistasmensual;
+CREATE TRIGGER artistasmensual_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.artistasmensual
+    FOR EACH STATEMENT EXECUTE FUNCTION public.subir_version_ranking();
+
+DROP TRIGGER IF EXISTS contenidosmensual_version ON public.contenidosmensual;
+CREATE TRIGGER contenidosmensual_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.contenidosmensual
+    FOR EACH STATEMENT EXECUTE FUNCTION public.subir_version_ranking();
+
+DROP TRIGGER IF EXISTS comunidadesmensual_version ON public.comunidadesmensual;
+CREATE TRIGGER comunidadesmensual_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.comunidadesmensual
+    FOR EACH STATEMENT EXECUTE FUNCTION public.subir_version_ranking();
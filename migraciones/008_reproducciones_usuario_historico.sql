@@ -0,0 +1,40 @@
+-- ============================================================
+-- 008: reproduccionesusuario vuelve a cubrir todo el histórico
+-- ============================================================
+-- Hasta ahora el rollover restaba de reproduccionesusuario cada mes que
+-- archivaba, así que /reproducciones/top/usuario/{id} solo contaba los meses
+-- que seguían en historialreproducciones. Ya no se resta nada: el acumulado
+-- es de siempre, como era el top antes de tener acumulado.
+--
+-- Se recalcula con el historial que queda más los meses ya archivados en
+-- reproduccionesmensual. De esos meses solo se sabe el mes, así que su última
+-- escucha es el primer día del mes (si no hay otra más reciente).
+--
+-- El LOCK espera a los lotes de reproducciones en curso y frena los nuevos
+-- hasta el final de la migración, para que ninguno se sume a un total que
+-- esta migración vaya a pisar.
+
+LOCK TABLE public.reproduccionesusuario IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO public.reproduccionesusuario (id_usuario, id_contenido, numreproducciones, segundostotales, ultimareproduccion)
+SELECT id_usuario, id_contenido, SUM(n), SUM(s), MAX(ultima)
+FROM (
+    SELECT id_usuario, id_contenido, COUNT(*) AS n, COALESCE(SUM(segundos_reproducidos), 0) AS s,
+           MAX(fecha_reproduccion) AS ultima
+    FROM public.historialreproducciones
+    GROUP BY id_usuario, id_contenido
+
+    UNION ALL
+
+    SELECT m.id_usuario, m.id_contenido, m.numreproducciones, m.segundostotales, m.mes::timestamp
+    FROM public.reproduccionesmensual m
+    WHERE NOT EXISTS (
+        SELECT 1 FROM public.historialreproducciones h
+        WHERE h.fecha_reproduccion >= m.mes AND h.fecha_reproduccion < m.mes + interval '1 month'
+    )
+) t
+GROUP BY id_usuario, id_contenido
+ON CONFLICT (id_usuario, id_contenido) DO UPDATE
+SET numreproducciones = EXCLUDED.numreproducciones,
+    segundostotales = EXCLUDED.segundostotales,
+    ultimareproduccion = GREATEST(reproduccionesusuario.ultimareproduccion, EXCLUDED.ultimareproduccion);
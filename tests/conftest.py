@@ -0,0 +1,105 @@
+"""
+Fixtures compartidas de los tests.
+
+- `stub`: los microservicios externos (benchmarks/stubMicroservicios) en un hilo, detrás de
+  un envoltorio que puede responder 503 a las próximas peticiones y cuenta las que hay en curso.
+- `bd`: la base de datos de TEST_DATABASE_URL con las migraciones aplicadas. Sin esa variable,
+  o si no responde, los tests que la usan se saltan. Escriben en las tablas, así que tiene que
+  ser una BD desechable.
+
+config.py lee las URLs al importarse, así que se fijan aquí, antes de importar nada de backend.
+"""
+import os
+import threading
+import time
+
+STUB_PUERTO = int(os.getenv("TEST_STUB_PUERTO", "9921"))
+os.environ["MS_USUARIOS_BASE_URL"] = f"http://127.0.0.1:{STUB_PUERTO}"
+os.environ["MS_CONTENIDO_BASE_URL"] = f"http://127.0.0.1:{STUB_PUERTO}/api"
+os.environ["MS_COMUNIDAD_BASE_URL"] = f"http://127.0.0.1:{STUB_PUERTO}"
+# Cada test de caché crea la suya; el resto no debe depender de lo que haya cacheado otro
+os.environ["CACHE_BACKEND"] = "ninguna"
+if os.getenv("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import pytest
+import uvicorn
+from starlette.responses import Response
+from benchmarks.stubMicroservicios import crear_app
+
+STUB_CONTENIDOS = 300
+STUB_ARTISTAS = 50
+STUB_COMUNIDADES = 20
+
+
+class StubConFallos:
+    """App ASGI del stub que responde 503 a las `fallos_pendientes` próximas peticiones."""
+
+    def __init__(self, app):
+        self.app = app
+        self.url = f"http://127.0.0.1:{STUB_PUERTO}"
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.fallos_pendientes = 0
+        self.peticiones = 0
+        self.en_curso = 0
+        self.max_en_curso = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        self.peticiones += 1
+        if self.fallos_pendientes > 0:
+            self.fallos_pendientes -= 1
+            return await Response(status_code=503)(scope, receive, send)
+        self.en_curso += 1
+        self.max_en_curso = max(self.max_en_curso, self.en_curso)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.en_curso -= 1
+
+
+@pytest.fixture(scope="session")
+def servidor_stub():
+    stub = StubConFallos(crear_app(STUB_CONTENIDOS, STUB_ARTISTAS, STUB_COMUNIDADES, latencia_ms=5))
+    servidor = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=STUB_PUERTO, log_level="warning"))
+    threading.Thread(target=servidor.run, daemon=True).start()
+    limite = time.monotonic() + 10
+    while not servidor.started:
+        if time.monotonic() > limite:
+            pytest.fail(f"El stub no arrancó en el puerto {STUB_PUERTO}")
+        time.sleep(0.05)
+    yield stub
+    servidor.should_exit = True
+
+
+@pytest.fixture
+def stub(servidor_stub):
+    servidor_stub.reiniciar()
+    return servidor_stub
+
+
+@pytest.fixture
+def upstreams_nuevos():
+    """Clientes de los microservicios sin circuito ni métricas de tests anteriores."""
+    from backend.model.sincronizacion import clienteUpstream
+    clienteUpstream._clientes.clear()
+    yield
+    clienteUpstream._clientes.clear()
+
+
+@pytest.fixture(scope="session")
+def bd():
+    if not os.getenv("TEST_DATABASE_URL"):
+        pytest.skip("Sin TEST_DATABASE_URL")
+    from backend.model.dao.postgresql.posgresConnector import PostgreSQLConnector
+    from backend.model.dao.postgresql.migrador import aplicar_migraciones
+    try:
+        with PostgreSQLConnector.obtener_engine().connect():
+            pass
+    except Exception as e:
+        pytest.skip(f"BD de tests no disponible: {e}")
+    aplicar_migraciones()
+    return PostgreSQLConnector.obtener_engine()
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import fakeredis
+import pytest
+from sqlalchemy import text
+from backend.model.cache import cacheConsultas
+from backend.model.cache.cacheConsultas import CacheConsultas, CACHE_COMUNIDADES
+from backend.model.cache.cacheRedis import CacheRedis
+
+
+class RedisVigilado(fakeredis.FakeRedis):
+    """Cliente redis (bloqueante) que apunta desde qué hilo se le llama."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hilos = []
+
+    def execute_command(self, *args, **kwargs):
+        self.hilos.append(threading.get_ident())
+        return super().execute_command(*args, **kwargs)
+
+
+@pytest.fixture
+def redis_vigilado(monkeypatch):
+    cliente = RedisVigilado()
+    monkeypatch.setattr(cacheConsultas, "_cache", CacheConsultas(CacheRedis(cliente=cliente)))
+    return cliente
+
+
+@pytest.fixture
+def comunidades(bd):
+    with bd.begin() as conn:
+        conn.execute(text("DELETE FROM comunidadesmensual"))
+        conn.execute(text(
+            "INSERT INTO comunidadesmensual (idcomunidad, numpublicaciones, nummiembros) VALUES (1, 1, 10), (2, 1, 20)"
+        ))
+    yield
+    with bd.begin() as conn:
+        conn.execute(text("DELETE FROM comunidadesmensual"))
+
+
+def test_la_cache_no_se_usa_desde_el_event_loop(comunidades, redis_vigilado):
+    from backend.model.asyncModel import AsyncModel
+
+    async def leer_y_borrar():
+        model = AsyncModel()
+        try:
+            primera = await model.obtener_ranking_comunidades_miembros()
+            segunda = await model.obtener_ranking_comunidades_miembros()
+            await model.eliminar_comunidad(2)
+            tercera = await model.obtener_ranking_comunidades_miembros()
+        finally:
+            await model.close()
+        return threading.get_ident(), primera, segunda, tercera
+
+    bucle, primera, segunda, tercera = asyncio.run(leer_y_borrar())
+
+    assert [c.idComunidad for c in primera] == [2, 1]
+    assert [c["idComunidad"] for c in segunda] == [2, 1]     # Acierto: sale de la caché (JSON)
+    assert [c.idComunidad for c in tercera] == [1]           # La invalidación tras borrar se hizo
+    assert redis_vigilado.hilos
+    assert bucle not in redis_vigilado.hilos
+    assert cacheConsultas.get_cache().estadisticas()["porNamespace"][CACHE_COMUNIDADES]["invalidaciones"] == 1
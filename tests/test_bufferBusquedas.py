@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import text
+from backend.model import model as modulo_model
+from backend.model.buffers.bufferBusquedas import BufferBusquedas
+from backend.model.buffers.bufferEscritura import BufferNoVaciado
+
+
+class BufferSinBD(BufferBusquedas):
+    """Buffer de búsquedas cuya 'BD' falla siempre."""
+
+    def __init__(self):
+        super().__init__(intervalo_ms=3_600_000)
+
+    def _escribir(self, lote: list):
+        raise ConnectionError("BD caída")
+
+
+def test_vaciar_indica_si_ha_fallado():
+    buffer = BufferSinBD()
+    assert buffer.vaciar()
+
+    buffer.registrar([(1, 1)])
+    assert not buffer.vaciar()
+    with pytest.raises(BufferNoVaciado):
+        buffer.vaciar_o_fallar()
+    assert buffer.estadisticas()["pendientes"] == 1
+
+
+def test_no_borra_busquedas_si_no_se_puede_vaciar_el_buffer(bd, monkeypatch):
+    artista = 987_654
+    with bd.begin() as conn:
+        conn.execute(text("INSERT INTO busquedasartistas (idartista, idusuario) VALUES (:a, 1)"), {"a": artista})
+    buffer = BufferSinBD()
+    buffer.registrar([(artista, 2)])
+    monkeypatch.setattr(modulo_model, "get_buffer_busquedas", lambda: buffer)
+
+    model = modulo_model.Model()
+    try:
+        with pytest.raises(BufferNoVaciado):
+            model.delete_busquedas_artista(artista)
+    finally:
+        model.factory.close()
+
+    with bd.begin() as conn:
+        assert conn.execute(text("SELECT count(*) FROM busquedasartistas WHERE idartista = :a"), {"a": artista}).scalar() == 1
+        conn.execute(text("DELETE FROM busquedasartistas WHERE idartista = :a"), {"a": artista})
@@ -0,0 +1,146 @@
+import os
+import threading
+from datetime import datetime
+import pytest
+from backend.model.buffers.bufferReproducciones import BufferReproducciones, ResultadoIncierto
+from backend.model.dto.reproduccionDTO import ReproduccionDTO
+
+
+class BufferEnMemoria(BufferReproducciones):
+    """Buffer de reproducciones que 'escribe' en una lista en lugar de en la BD."""
+
+    def __init__(self, spool_dir, **kwargs):
+        opciones = {"durabilidad": "spool", "intervalo_ms": 3_600_000, "tamano_lote": 1000}
+        opciones.update(kwargs)
+        super().__init__(spool_dir=str(spool_dir), **opciones)
+        self.escritas = []
+
+    def _escribir(self, lote: list):
+        self.escritas.extend(r for r, _ in lote)
+
+
+def reproducciones(*usuarios: int) -> list[ReproduccionDTO]:
+    return [ReproduccionDTO(id_usuario=u, id_contenido=1, segundos=30, fecha=datetime(2026, 10, 1)) for u in usuarios]
+
+def segmentos(raiz) -> list:
+    return [f for _, _, ficheros in os.walk(raiz) for f in ficheros if f.endswith(".spool")]
+
+
+def test_cada_proceso_escribe_en_su_carpeta(tmp_path):
+    uno, otro = BufferEnMemoria(tmp_path), BufferEnMemoria(tmp_path)
+    uno.registrar(reproducciones(1))
+    otro.registrar(reproducciones(2))
+
+    assert uno.spool_dir != otro.spool_dir
+    assert os.path.dirname(uno.spool_dir) == str(tmp_path)
+
+
+def test_no_reenvia_el_spool_de_un_worker_vivo(tmp_path):
+    vivo = BufferEnMemoria(tmp_path)
+    vivo.registrar(reproducciones(1, 2, 3))
+
+    nuevo = BufferEnMemoria(tmp_path)
+    nuevo.iniciar()
+
+    assert nuevo.estadisticas()["pendientes"] == 0
+    assert len(segmentos(vivo.spool_dir)) == 1
+
+
+def test_adopta_el_spool_de_un_worker_muerto(tmp_path):
+    muerto = BufferEnMemoria(tmp_path)
+    muerto.registrar(reproducciones(1, 2, 3))
+    carpeta_muerto = muerto.spool_dir
+    muerto._spool.close()
+    muerto._spool_cerrojo.close()    # Lo que hace el sistema al morir el proceso
+
+    nuevo = BufferEnMemoria(tmp_path)
+    nuevo.iniciar()
+    nuevo.vaciar()
+
+    assert sorted(r.id_usuario for r in nuevo.escritas) == [1, 2, 3]
+    assert not os.path.exists(carpeta_muerto)
+    assert segmentos(tmp_path) == []
+
+
+def test_al_parar_sin_pendientes_borra_su_carpeta(tmp_path):
+    buffer = BufferEnMemoria(tmp_path)
+    buffer.registrar(reproducciones(1))
+    carpeta = buffer.spool_dir
+
+    buffer.detener()
+
+    assert [r.id_usuario for r in buffer.escritas] == [1]
+    assert not os.path.exists(carpeta)
+
+
+class BufferLento(BufferReproducciones):
+    """Modo flush con una 'BD' que no termina hasta que el test lo dice."""
+
+    def __init__(self, **kwargs):
+        super().__init__(durabilidad="flush", intervalo_ms=10, timeout_confirmacion=0.2, **kwargs)
+        self.puede_terminar = threading.Event()
+        self.escribiendo = threading.Event()
+        self.escritas = []
+
+    def _escribir(self, lote: list):
+        self.escribiendo.set()
+        self.puede_terminar.wait(5)
+        self.escritas.extend(r for r, _ in lote)
+
+
+def test_flush_tiempo_agotado_sin_escribir_retira_las_reproducciones():
+    buffer = BufferLento(tamano_lote=1)
+    resultados = []
+
+    def registrar_primera():
+        try:
+            buffer.registrar(reproducciones(1))
+        except ResultadoIncierto as e:
+            resultados.append(e)
+
+    primera = threading.Thread(target=registrar_primera)
+    primera.start()
+    buffer.escribiendo.wait(5)      # El hilo de escritura está ocupado con la primera
+
+    with pytest.raises(TimeoutError):
+        buffer.registrar(reproducciones(2, 3))
+
+    buffer.puede_terminar.set()
+    primera.join()
+    buffer.detener()
+    assert [r.id_usuario for r in buffer.escritas] == [1]
+    assert len(resultados) == 1     # La primera ya estaba escribiéndose: incierta
+
+
+def test_flush_tiempo_agotado_escribiendo_es_incierto():
+    buffer = BufferLento()
+
+    with pytest.raises(ResultadoIncierto):
+        buffer.registrar(reproducciones(1))
+
+    buffer.puede_terminar.set()
+    buffer.detener()
+    assert [r.id_usuario for r in buffer.escritas] == [1]
+
+
+def test_spool_aparta_las_filas_que_la_bd_rechaza(bd, tmp_path):
+    from sqlalchemy import text
+    usuario = 900_000 + os.getpid() % 50_000
+    buffer = BufferReproducciones(durabilidad="spool", intervalo_ms=3_600_000, spool_dir=str(tmp_path))
+    buenas = [ReproduccionDTO(id_usuario=usuario, id_contenido=c, segundos=30, fecha=datetime.now()) for c in range(1, 8)]
+    mala = ReproduccionDTO(id_usuario=2**31, id_contenido=1, segundos=30, fecha=datetime.now())    # No cabe en integer
+    buffer.registrar(buenas[:3] + [mala] + buenas[3:])
+
+    buffer.vaciar()
+
+    with bd.connect() as conexion:
+        guardadas = conexion.execute(text(
+            "SELECT count(*) FROM historialreproducciones WHERE id_usuario = :u"), {"u": usuario}).scalar()
+    assert guardadas == len(buenas)
+    assert buffer.estadisticas()["pendientes"] == 0
+    assert buffer.estadisticas()["rechazadas"] == 1
+    assert segmentos(buffer.spool_dir) == []
+    apartadas = os.listdir(tmp_path / "rechazadas")
+    assert len(apartadas) == 1
+    with open(tmp_path / "rechazadas" / apartadas[0], encoding="utf-8") as f:
+        assert f.read().startswith(str(2**31))
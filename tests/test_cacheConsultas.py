@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+import fakeredis
+import pytest
+from backend.model.cache import cacheConsultas
+from backend.model.cache.cacheConsultas import CacheConsultas, cacheado, invalidar_cache, CACHE_ARTISTAS
+from backend.model.cache.cacheRedis import CacheRedis
+
+
+class Lector:
+    """Hace de Model: un método cacheado que cuenta cuántas veces llega a la 'BD'."""
+
+    def __init__(self):
+        self.db = SimpleNamespace(info={})
+        self.llamadas = 0
+
+    @cacheado(CACHE_ARTISTAS)
+    def top(self, limit: int = 10):
+        self.llamadas += 1
+        return [{"id": i, "llamada": self.llamadas} for i in range(limit)]
+
+
+
+class LectorAsync(Lector):
+    """Hace de AsyncModel: mismo nombre de método, así que comparte entradas con Lector."""
+
+    @cacheado(CACHE_ARTISTAS)
+    async def top(self, limit: int = 10):
+        self.llamadas += 1
+        return [{"id": i, "llamada": self.llamadas} for i in range(limit)]
+
+
+@pytest.fixture
+def servidor_redis():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def cache(servidor_redis, monkeypatch):
+    cache = CacheConsultas(CacheRedis(cliente=fakeredis.FakeRedis(server=servidor_redis)))
+    monkeypatch.setattr(cacheConsultas, "_cache", cache)
+    return cache
+
+
+def test_segunda_lectura_sale_de_la_cache(cache):
+    lector = Lector()
+    assert lector.top() == lector.top(limit=10)
+    assert lector.llamadas == 1
+    assert cache.estadisticas()["porNamespace"][CACHE_ARTISTAS]["aciertos"] == 1
+
+
+def test_invalidar_sube_la_version_y_vuelve_a_leer(cache):
+    lector = Lector()
+    lector.top()
+    version = cache.version(CACHE_ARTISTAS)
+
+    assert invalidar_cache(CACHE_ARTISTAS) == {CACHE_ARTISTAS: version + 1}
+    assert lector.top()[0]["llamada"] == 2
+    assert lector.top()[0]["llamada"] == 2
+
+
+def test_invalidacion_de_otro_proceso(cache, servidor_redis):
+    # Otro worker: su propio cliente contra el mismo Redis
+    otro = CacheConsultas(CacheRedis(cliente=fakeredis.FakeRedis(server=servidor_redis)))
+    lector = Lector()
+    lector.top()
+
+    otro.invalidar(CACHE_ARTISTAS)
+
+    assert cache.version(CACHE_ARTISTAS) == otro.version(CACHE_ARTISTAS)
+    lector.top()
+    assert lector.llamadas == 2
+
+
+def test_async_comparte_entrada_con_sync(cache):
+    lector, lector_async = Lector(), LectorAsync()
+    esperado = lector.top(5)
+    assert asyncio.run(lector_async.top(limit=5)) == esperado
+    assert lector_async.llamadas == 0
+
+
+def test_redis_caido_no_rompe_la_lectura(cache, servidor_redis):
+    servidor_redis.connected = False
+    lector = Lector()
+
+    assert len(lector.top()) == 10
+    assert len(lector.top()) == 10
+    assert lector.llamadas == 2
+    assert cache.estadisticas()["porNamespace"][CACHE_ARTISTAS]["errores"] >= 2
+    assert invalidar_cache(CACHE_ARTISTAS) == {}
@@ -0,0 +1,122 @@
+import asyncio
+import time
+import pytest
+from backend.model.sincronizacion.clienteUpstream import ClienteUpstream, CircuitoAbierto, Cortacircuitos
+
+
+def cliente(stub, **kwargs) -> ClienteUpstream:
+    opciones = {"reintentos": 2, "backoff_base": 0, "umbral_fallos": 3, "espera_circuito": 30}
+    opciones.update(kwargs)
+    return ClienteUpstream("pruebas", stub.url, **opciones)
+
+
+def test_reintenta_los_5xx(stub):
+    stub.fallos_pendientes = 2
+    c = cliente(stub)
+
+    resp = c.get(f"{stub.url}/api/elementos/1")
+
+    assert resp.status_code == 200
+    assert stub.peticiones == 3
+    estadisticas = c.estadisticas()
+    assert (estadisticas["reintentos"], estadisticas["errores"], estadisticas["circuito"]) == (2, 0, Cortacircuitos.CERRADO)
+
+
+def test_agotados_los_reintentos_devuelve_el_ultimo_5xx(stub):
+    stub.fallos_pendientes = 10
+    c = cliente(stub, reintentos=1)
+
+    assert c.get(f"{stub.url}/api/elementos/1").status_code == 503
+    assert stub.peticiones == 2
+    assert c.estadisticas()["errores"] == 1
+
+
+def test_un_4xx_no_se_reintenta_ni_cuenta_como_fallo(stub):
+    c = cliente(stub)
+
+    assert c.get(f"{stub.url}/api/elementos/999999").status_code == 404
+    assert stub.peticiones == 1
+    assert c.circuito.fallos_seguidos == 0
+
+
+def test_reintenta_los_errores_de_red():
+    # Nadie escucha en el puerto 9 de localhost: conexión rechazada en cada intento
+    c = ClienteUpstream("caido", "http://127.0.0.1:9", reintentos=2, backoff_base=0)
+
+    with pytest.raises(Exception):
+        c.get("http://127.0.0.1:9/")
+    assert c.estadisticas()["reintentos"] == 2
+    assert c.circuito.fallos_seguidos == 1
+
+
+def test_el_circuito_se_abre_y_rechaza_sin_llamar(stub):
+    stub.fallos_pendientes = 100
+    c = cliente(stub, reintentos=0, umbral_fallos=3)
+
+    for _ in range(3):
+        assert c.get(f"{stub.url}/api/elementos/1").status_code == 503
+    assert c.circuito.estado == Cortacircuitos.ABIERTO
+
+    with pytest.raises(CircuitoAbierto) as error:
+        c.get(f"{stub.url}/api/elementos/1")
+    assert error.value.status_code == 503
+    assert stub.peticiones == 3
+    assert c.estadisticas()["rechazadas"] == 1
+
+
+def test_semiabierto_deja_pasar_una_prueba_y_cierra_si_va_bien(stub):
+    stub.fallos_pendientes = 2
+    c = cliente(stub, reintentos=0, umbral_fallos=2, espera_circuito=0.2)
+    for _ in range(2):
+        c.get(f"{stub.url}/api/elementos/1")
+    assert c.circuito.estado == Cortacircuitos.ABIERTO
+
+    time.sleep(0.25)
+    assert c.get(f"{stub.url}/api/elementos/1").status_code == 200
+    assert c.circuito.estado == Cortacircuitos.CERRADO
+    assert c.circuito.fallos_seguidos == 0
+
+
+def test_semiabierto_vuelve_a_abrir_si_la_prueba_falla(stub):
+    stub.fallos_pendientes = 3
+    c = cliente(stub, reintentos=0, umbral_fallos=2, espera_circuito=0.2)
+    for _ in range(2):
+        c.get(f"{stub.url}/api/elementos/1")
+
+    time.sleep(0.25)
+    assert c.get(f"{stub.url}/api/elementos/1").status_code == 503
+    assert c.circuito.estado == Cortacircuitos.ABIERTO
+    assert c.circuito.aperturas == 2
+    with pytest.raises(CircuitoAbierto):
+        c.get(f"{stub.url}/api/elementos/1")
+
+
+def test_semiabierto_solo_deja_pasar_una_prueba_a_la_vez():
+    circuito = Cortacircuitos(umbral_fallos=1, espera=0)
+    circuito.fallo()
+
+    assert circuito.permitir()
+    assert circuito.estado == Cortacircuitos.SEMIABIERTO
+    assert not circuito.permitir()
+
+
+def test_async_reintenta_y_abre_el_mismo_circuito(stub):
+    c = cliente(stub, reintentos=1, umbral_fallos=1)
+
+    async def llamar():
+        try:
+            stub.fallos_pendientes = 1
+            primera = await c.get_async(f"{stub.url}/api/elementos/1")
+            stub.fallos_pendientes = 2
+            segunda = await c.get_async(f"{stub.url}/api/elementos/1")
+            return primera, segunda
+        finally:
+            await c.cerrar_async()
+
+    primera, segunda = asyncio.run(llamar())
+
+    assert primera.status_code == 200
+    assert segunda.status_code == 503
+    assert c.circuito.estado == Cortacircuitos.ABIERTO
+    with pytest.raises(CircuitoAbierto):
+        c.get(f"{stub.url}/api/elementos/1")
@@ -0,0 +1,126 @@
+import subprocess
+import sys
+import pytest
+from sqlalchemy import text
+from backend.model.dto.comunidadMensualDTO import ComunidadDTO
+from backend.model.ranking import indiceRanking
+from backend.model.ranking.indiceRanking import IndiceTopK, get_indices_ranking
+from backend.model.cache.cacheConsultas import CACHE_COMUNIDADES
+
+
+def indice_comunidades() -> IndiceTopK:
+    return IndiceTopK(
+        "comunidadesmensual", lambda d: d.idComunidad,
+        {"numMiembros": lambda d: d.numMiembros}, lambda d: d
+    )
+
+def comunidad(i: int, miembros: int) -> ComunidadDTO:
+    return ComunidadDTO(idcomunidad=i, numpublicaciones=0, nummiembros=miembros)
+
+
+# ---------- sin BD ----------
+
+def test_aplica_la_escritura_si_la_version_es_la_siguiente():
+    indice = indice_comunidades()
+    indice.cargar([comunidad(1, 10), comunidad(2, 20)], version=4)
+
+    indice.aplicar(actualizados=[comunidad(3, 15)], eliminados=[2], version_nueva=5)
+
+    assert indice.al_dia(5)
+    assert [d.idComunidad for d in indice.top("numMiembros", 10)] == [3, 1]
+
+
+@pytest.mark.parametrize("version_nueva", [6, None])
+def test_otra_escritura_entre_medias_obliga_a_recargar(version_nueva):
+    indice = indice_comunidades()
+    indice.cargar([comunidad(1, 10)], version=4)
+
+    indice.aplicar(actualizados=[comunidad(3, 15)], version_nueva=version_nueva)
+
+    assert not indice.cargado
+    assert indice.hay_que_comprobar(3600)
+    assert indice.recargar_si_hace_falta(lambda: [comunidad(1, 10), comunidad(3, 15), comunidad(4, 1)], 6)
+    assert indice.estadisticas()["filas"] == 3
+
+
+def test_sin_version_nunca_esta_al_dia():
+    indice = indice_comunidades()
+    indice.cargar([], version=1)
+
+    assert not indice.al_dia(None)
+    assert indice.vacio
+
+
+# ---------- con BD ----------
+
+@pytest.fixture
+def comunidades_vacias(bd, monkeypatch):
+    """Índices nuevos (como un proceso recién arrancado) y comunidadesmensual vacía."""
+    monkeypatch.setattr(indiceRanking, "_indices", None)
+    with bd.begin() as conn:
+        conn.execute(text("DELETE FROM comunidadesmensual"))
+    yield
+    with bd.begin() as conn:
+        conn.execute(text("DELETE FROM comunidadesmensual"))
+
+
+def escribir_desde_otro_proceso(sql: str):
+    """Lo que haría otro worker o el job de sincronización: su propio Model y su propio commit."""
+    codigo = (
+        "from sqlalchemy import text\n"
+        "from backend.model.model import Model\n"
+        "with Model() as otro:\n"
+        f"    otro.db.execute(text({sql!r}))\n"
+        "    otro.db.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", codigo], check=True, timeout=60)
+
+
+def test_consistencia_tras_escribir_otro_proceso(comunidades_vacias, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.controller.fastapi import app
+    from backend.model import model as modulo_model
+    from backend.model.model import Model
+
+    with Model() as model:
+        model.cargar_indices_ranking()
+        assert model.obtener_ranking_comunidades_miembros() == []
+    assert get_indices_ranking().de(CACHE_COMUNIDADES).vacio
+
+    escribir_desde_otro_proceso(
+        "INSERT INTO comunidadesmensual (idcomunidad, numpublicaciones, nummiembros) "
+        "VALUES (1, 3, 40), (2, 1, 90), (3, 7, 10)"
+    )
+
+    cliente = TestClient(app)
+    respuesta = cliente.get("/estadisticas/rankings/consistencia")
+    assert respuesta.status_code == 200
+    assert respuesta.json()["consistente"]
+    indice = get_indices_ranking().de(CACHE_COMUNIDADES)
+    assert indice.estadisticas()["filas"] == 3
+
+    # Sin esperar al intervalo de comprobación, los tops ya salen del índice recargado
+    monkeypatch.setattr(modulo_model, "RANKING_INDICE_COMPROBACION_SEGUNDOS", 0)
+    escribir_desde_otro_proceso("UPDATE comunidadesmensual SET nummiembros = 95 WHERE idcomunidad = 3")
+    ranking = cliente.get("/estadisticas/comunidad/ranking/miembros")
+    assert ranking.status_code == 200
+    assert [c["idComunidad"] for c in ranking.json()["data"]] == [3, 2, 1]
+    assert cliente.get("/estadisticas/rankings/consistencia").json()["consistente"]
+
+
+def test_escritura_propia_se_aplica_sin_recargar(comunidades_vacias):
+    from backend.model.model import Model
+
+    escribir_desde_otro_proceso(
+        "INSERT INTO comunidadesmensual (idcomunidad, numpublicaciones, nummiembros) VALUES (1, 3, 40), (2, 1, 90)"
+    )
+    with Model() as model:
+        model.cargar_indices_ranking()
+        indice = get_indices_ranking().de(CACHE_COMUNIDADES)
+        antes = indice.estadisticas()
+
+        model.eliminar_comunidad(2)
+
+        despues = indice.estadisticas()
+        assert (despues["version"], despues["recargas"], despues["filas"]) == (antes["version"] + 1, antes["recargas"], 1)
+        assert model.comprobar_indices_ranking()["consistente"]
@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from backend.model.dao.postgresql.replicas import ReplicasLectura, SesionEnrutada, en_primario, solo_lectura
+
+
+def engine_sqlite(nombre: str):
+    """Una BD en memoria que sabe cómo se llama (así se ve a dónde ha ido cada sentencia)."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE origen (nombre text)"))
+        conn.execute(text("INSERT INTO origen VALUES (:nombre)"), {"nombre": nombre})
+        conn.execute(text("CREATE TABLE escrituras (valor text)"))
+    return engine
+
+def escrituras(engine) -> list:
+    with engine.connect() as conn:
+        return list(conn.execute(text("SELECT valor FROM escrituras")).scalars())
+
+
+class DAO:
+    def __init__(self, db):
+        self.db = db
+
+    @solo_lectura
+    def origen(self):
+        return self.db.execute(text("SELECT nombre FROM origen")).scalar()
+
+    def origen_sin_marcar(self):
+        return self.db.execute(text("SELECT nombre FROM origen")).scalar()
+
+    def escribir(self, valor: str):
+        self.db.execute(text("INSERT INTO escrituras VALUES (:valor)"), {"valor": valor})
+
+
+@pytest.fixture
+def primario():
+    return engine_sqlite("primario")
+
+@pytest.fixture
+def replica():
+    return engine_sqlite("replica")
+
+def sesion_con(primario, *replicas, expulsion: float = 30) -> SesionEnrutada:
+    return SesionEnrutada(bind=primario, replicas=ReplicasLectura(list(replicas), expulsion))
+
+
+def test_lecturas_marcadas_van_a_la_replica(primario, replica):
+    with sesion_con(primario, replica) as sesion:
+        dao = DAO(sesion)
+        assert dao.origen() == "replica"
+        sesion.rollback()
+        assert dao.origen_sin_marcar() == "primario"
+
+
+def test_en_primario_fija_la_sesion_al_primario(primario, replica):
+    with sesion_con(primario, replica) as sesion:
+        dao = DAO(sesion)
+        with en_primario(sesion):
+            assert dao.origen() == "primario"
+        sesion.rollback()
+        assert dao.origen() == "replica"
+
+
+def test_las_escrituras_van_al_primario(primario, replica):
+    with sesion_con(primario, replica) as sesion:
+        DAO(sesion).escribir("a")
+        sesion.commit()
+
+    assert escrituras(primario) == ["a"]
+    assert escrituras(replica) == []
+
+
+def test_tras_escribir_la_transaccion_lee_del_primario(primario, replica):
+    with sesion_con(primario, replica) as sesion:
+        dao = DAO(sesion)
+        dao.escribir("a")
+        assert dao.origen() == "primario"
+        sesion.commit()
+        assert dao.origen() == "replica"
+
+
+def test_sin_replicas_todo_va_al_primario(primario):
+    with SesionEnrutada(bind=primario) as sesion:
+        assert DAO(sesion).origen() == "primario"
+
+
+def test_reparte_por_turnos(primario):
+    replicas = [engine_sqlite("replica1"), engine_sqlite("replica2")]
+    with sesion_con(primario, *replicas) as sesion:
+        dao = DAO(sesion)
+        leidas = []
+        for _ in range(4):
+            leidas.append(dao.origen())
+            sesion.rollback()
+
+    assert sorted(leidas) == ["replica1", "replica1", "replica2", "replica2"]
+    assert leidas[0] != leidas[1]
+
+
+def test_replica_caida_se_expulsa_y_se_lee_del_primario(primario, tmp_path):
+    # No se puede abrir: el directorio no existe
+    caida = create_engine(f"sqlite:///{tmp_path / 'no_existe' / 'replica.db'}")
+    with sesion_con(primario, caida) as sesion:
+        replicas = sesion.replicas
+        dao = DAO(sesion)
+
+        assert dao.origen() == "primario"
+        assert replicas.expulsada(caida)
+        assert replicas.estado()[0]["expulsada"]
+
+        sesion.rollback()
+        assert dao.origen() == "primario"
@@ -0,0 +1,76 @@
+import tempfile
+from datetime import date, datetime
+import pytest
+from sqlalchemy import text
+from backend.model.model import Model
+from backend.model.buffers.bufferReproducciones import BufferReproducciones
+from backend.model.dto.reproduccionDTO import ReproduccionDTO
+from backend.model.dao.postgresql.postgresDAOFactory import PostgreSQLDAOFactory
+
+MES = date(2020, 3, 1)
+PARTICION = "historialreproducciones_p2020_03"
+USUARIO = 880_001
+
+
+def reproducciones(n: int, dia: int = 10) -> list[ReproduccionDTO]:
+    return [ReproduccionDTO(id_usuario=USUARIO, id_contenido=1, segundos=10, fecha=datetime(2020, 3, dia)) for _ in range(n)]
+
+
+def consultar(bd, sql: str):
+    with bd.connect() as conn:
+        return conn.execute(text(sql), {"u": USUARIO, "mes": MES}).fetchone()
+
+
+@pytest.fixture
+def mes_cerrado(bd):
+    def limpiar():
+        with bd.begin() as conn:
+            conn.execute(text(f'DROP TABLE IF EXISTS public."{PARTICION}"'))
+            conn.execute(text("DELETE FROM reproduccionesmensual WHERE id_usuario = :u"), {"u": USUARIO})
+            conn.execute(text("DELETE FROM reproduccionesusuario WHERE id_usuario = :u"), {"u": USUARIO})
+    limpiar()
+    factory = PostgreSQLDAOFactory()
+    try:
+        factory.get_particiones_dao().crear_particion_mensual("historialreproducciones", MES)
+        factory.get_reproducciones_dao().insertar_reproducciones_lote(reproducciones(3))
+        factory.db.commit()
+    finally:
+        factory.close()
+    yield
+    limpiar()
+
+
+def rollover():
+    model = Model()
+    try:
+        return model.rollover_logs()
+    finally:
+        model.factory.close()
+
+
+def test_rollover_archiva_sin_tocar_el_acumulado(bd, mes_cerrado):
+    rollover()
+
+    assert consultar(bd, "SELECT to_regclass('public.historialreproducciones_p2020_03')")[0] is None
+    assert tuple(consultar(bd, "SELECT numreproducciones, segundostotales FROM reproduccionesmensual WHERE id_usuario = :u AND mes = :mes")) == (3, 30)
+    assert tuple(consultar(bd, "SELECT numreproducciones, segundostotales FROM reproduccionesusuario WHERE id_usuario = :u")) == (3, 30)
+
+
+def test_reproducciones_tras_soltar_la_particion_no_se_pierden(bd, mes_cerrado):
+    factory = PostgreSQLDAOFactory()
+    try:
+        # Rollover interrumpido justo después de soltar la partición
+        factory.get_particiones_dao().soltar_particion("historialreproducciones", PARTICION)
+    finally:
+        factory.close()
+
+    # Llegan tarde dos reproducciones de ese mes (p. ej. spool reenviado)
+    buffer = BufferReproducciones(durabilidad="spool", intervalo_ms=3_600_000, spool_dir=tempfile.mkdtemp())
+    buffer.registrar(reproducciones(2, dia=20))
+    assert buffer.vaciar()
+
+    rollover()
+
+    assert consultar(bd, "SELECT to_regclass('public.historialreproducciones_p2020_03')")[0] is None
+    assert tuple(consultar(bd, "SELECT numreproducciones, segundostotales FROM reproduccionesmensual WHERE id_usuario = :u AND mes = :mes")) == (5, 50)
+    assert tuple(consultar(bd, "SELECT numreproducciones, segundostotales FROM reproduccionesusuario WHERE id_usuario = :u")) == (5, 50)
@@ -0,0 +1,98 @@
+import pytest
+from benchmarks import stubMicroservicios
+from backend.model.sincronizacion.sincronizadorContenidos import SincronizadorContenidos
+from conftest import STUB_CONTENIDOS
+
+
+def sincronizador(stub, **kwargs) -> SincronizadorContenidos:
+    opciones = {"concurrencia": 8, "max_conexiones": 4, "reintentos": 3, "backoff_base": 0, "tamano_lote": 64}
+    opciones.update(kwargs)
+    return SincronizadorContenidos(base_url=f"{stub.url}/api", **opciones)
+
+
+@pytest.fixture
+def lotes():
+    return []
+
+
+def test_descarga_todos_y_los_entrega_por_lotes(stub, upstreams_nuevos, lotes):
+    ids = list(range(1, STUB_CONTENIDOS + 1))
+
+    resumen = sincronizador(stub).sincronizar(ids, lotes.append)
+
+    assert resumen == {"total": len(ids), "sincronizados": len(ids), "escritos": len(ids), "fallidos": []}
+    assert all(len(lote) <= 64 for lote in lotes)
+    dtos = {dto.idContenido: dto for lote in lotes for dto in lote}
+    assert sorted(dtos) == ids
+    for i in (1, 5, 6, 140):
+        elemento = stubMicroservicios.elemento(i)
+        assert dtos[i].numVentas == elemento["numventas"]
+        assert dtos[i].genero == elemento["genero"]["nombre"]
+        assert dtos[i].numComentarios == sum(1 for v in stubMicroservicios.valoraciones(i) if v["comentario"])
+
+
+def test_la_concurrencia_no_pasa_del_limite_de_conexiones(stub, upstreams_nuevos, lotes):
+    sincronizador(stub, concurrencia=16, max_conexiones=4).sincronizar(list(range(1, 201)), lotes.append)
+
+    # Cada contenido son dos peticiones; en paralelo, pero nunca más que conexiones
+    assert 1 < stub.max_en_curso <= 4
+
+
+def test_los_5xx_se_reintentan(stub, upstreams_nuevos, lotes):
+    stub.fallos_pendientes = 5
+
+    resumen = sincronizador(stub).sincronizar(list(range(1, 51)), lotes.append)
+
+    assert resumen["fallidos"] == []
+    assert resumen["sincronizados"] == 50
+
+
+def test_los_que_no_existen_se_cuentan_como_fallidos(stub, upstreams_nuevos, lotes):
+    ids = [1, 2, STUB_CONTENIDOS + 1, 3, STUB_CONTENIDOS + 2]
+
+    resumen = sincronizador(stub).sincronizar(ids, lotes.append)
+
+    assert sorted(resumen["fallidos"]) == [STUB_CONTENIDOS + 1, STUB_CONTENIDOS + 2]
+    assert resumen["sincronizados"] == 3
+
+
+def test_un_lote_que_no_se_puede_guardar_marca_sus_ids(stub, upstreams_nuevos):
+    def guardar(lote):
+        if any(dto.idContenido == 10 for dto in lote):
+            raise RuntimeError("BD caída")
+        return 0   # Ninguno había cambiado
+
+    resumen = sincronizador(stub, tamano_lote=5, concurrencia=1).sincronizar(list(range(1, 21)), guardar)
+
+    assert sorted(resumen["fallidos"]) == [6, 7, 8, 9, 10]
+    assert (resumen["sincronizados"], resumen["escritos"]) == (15, 0)
+
+
+def test_sync_masiva_con_bd_es_delta(stub, upstreams_nuevos, bd):
+    from backend.model.model import Model
+
+    with Model() as model:
+        primera = model.sync_todos_los_contenidos(delta=True)
+        segunda = model.sync_todos_los_contenidos(delta=True)
+        dto = model.contenidoDAO.obtener_por_id(7)
+        model.db.rollback()
+
+    assert primera["total"] == STUB_CONTENIDOS
+    assert primera["cambiados"] + primera["sinCambios"] == STUB_CONTENIDOS
+    assert primera["fallidos"] == []
+    assert (segunda["cambiados"], segunda["sinCambios"]) == (0, STUB_CONTENIDOS)
+    assert dto.numVentas == stubMicroservicios.elemento(7)["numventas"]
+
+
+def test_sync_masiva_sin_datos_devuelve_resumen_vacio(bd, monkeypatch):
+    from backend.model.model import Model
+    monkeypatch.setattr(Model, "obtener_artistas_desde_api", lambda self: [])
+    monkeypatch.setattr(Model, "obtener_lista_contenidos_api", lambda self: [])
+
+    with Model() as model:
+        artistas = model.sync_todos_los_artistas(delta=True)
+        contenidos = model.sync_todos_los_contenidos(delta=True)
+
+    vacio = {"total": 0, "cambiados": 0, "sinCambios": 0, "fallidos": []}
+    assert artistas == vacio
+    assert contenidos == vacio